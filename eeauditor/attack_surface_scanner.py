@@ -0,0 +1,169 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import logging
+import socket
+from concurrent.futures import Future, ThreadPoolExecutor
+from os import environ, path
+from threading import Lock
+import nmap3
+import tomli
+
+logger = logging.getLogger("AttackSurfaceScanner")
+
+# FTP, SSH, TelNet, SMTP, HTTP, POP3, NetBIOS, SMB, RDP, MSSQL, MySQL/MariaDB, NFS, Docker, Oracle, PostgreSQL, 
+# Kibana, VMWare, Proxy, Splunk, K8s, Redis, Kafka, Mongo, Rabbit/AmazonMQ, SparkUI
+DEFAULT_TCP_PORTS = [
+    21, 22, 23, 25, 80, 110, 139, 445, 3389, 1433, 3306, 2049, 2375, 1521, 5432, 5601, 8182, 8080, 8089, 10250, 6379, 9092, 27017, 5672, 4040
+]
+DEFAULT_HOST_TIMEOUT_SECONDS = 300
+DEFAULT_MAX_CONCURRENT_SCANS = 8
+
+class AttackSurfaceScanner(object):
+    """
+    Process-wide Nmap scan table shared by every Attack Surface Auditor (AWS, GCP & OCI). Targets are resolved to an IP
+    address and de-duplicated across asset types, scanned by a bounded pool of workers and every result is kept for the
+    rest of the run so an IP shared by e.g., an EC2 Instance and an Elastic IP is only ever scanned once
+    """
+
+    _instance = None
+    _instanceLock = Lock()
+
+    def __init__(self, ports=None, hostTimeoutSeconds=DEFAULT_HOST_TIMEOUT_SECONDS, maxConcurrentScans=DEFAULT_MAX_CONCURRENT_SCANS):
+        ports = ports or DEFAULT_TCP_PORTS
+        self.args = f"-Pn -p {','.join(str(port) for port in ports)} --host-timeout {int(hostTimeoutSeconds)}s"
+        self.nmap = nmap3.NmapScanTechniques()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, int(maxConcurrentScans)), thread_name_prefix="ElectricEyeNmap")
+        # requested host (IP or DNS name) -> Future of its scan
+        self.requests = {}
+        # resolved IP address -> Future of its scan
+        self.scans = {}
+        self.lock = Lock()
+
+    @classmethod
+    def get_scanner(cls):
+        """
+        Returns the shared scanner, creating it from the TOML settings the first time it is requested
+        """
+        if cls._instance is None:
+            with cls._instanceLock:
+                if cls._instance is None:
+                    ports, hostTimeoutSeconds, maxConcurrentScans = get_attack_surface_settings()
+                    cls._instance = cls(ports, hostTimeoutSeconds, maxConcurrentScans)
+
+        return cls._instance
+
+    def prefetch(self, targets):
+        """
+        Queues scans for a list of (host, assetName, assetComponent) tuples without waiting on the results
+        """
+        for host, assetName, assetComponent in targets:
+            self.submit(host, assetName, assetComponent)
+
+    def scan_host(self, host, assetName, assetComponent):
+        """
+        Returns the Nmap results for a host (IP or DNS name), waiting on a queued or in-flight scan if needed. None is
+        returned when Nmap errors on the target
+        """
+        return self.submit(host, assetName, assetComponent).result()
+
+    def submit(self, host, assetName, assetComponent) -> Future:
+        with self.lock:
+            future = self.requests.get(host)
+            if future is None:
+                future = self.executor.submit(self._resolve_and_scan, host, assetName, assetComponent)
+                self.requests[host] = future
+
+        return future
+
+    def _resolve_and_scan(self, host, assetName, assetComponent):
+        """
+        Worker body: resolves the host and either claims the scan of its IP or waits on the worker that already has. The
+        claiming worker always runs the scan itself, so waiting on it can never dead-lock the bounded pool
+        """
+        target = self.resolve(host)
+
+        with self.lock:
+            scan = self.scans.get(target)
+            claimed = scan is None
+            if claimed:
+                scan = Future()
+                self.scans[target] = scan
+
+        if not claimed:
+            logger.info("Re-using the scan of %s for %s %s", target, assetComponent, assetName)
+            return scan.result()
+
+        try:
+            results = self.nmap.nmap_tcp_scan(target, args=self.args)
+            print(f"Scanning {assetComponent} {assetName} on {target}")
+        except KeyError:
+            results = None
+        except Exception as e:
+            scan.set_exception(e)
+            raise e
+
+        scan.set_result(results)
+        return results
+
+    @staticmethod
+    def resolve(host):
+        """
+        Resolves a DNS name to an IPv4 address so that assets sharing an IP are only scanned once, unresolvable names
+        are handed to Nmap as-is
+        """
+        try:
+            return socket.gethostbyname(str(host).rstrip("."))
+        except (socket.gaierror, UnicodeError):
+            return host
+
+def get_attack_surface_settings():
+    """
+    Parses the optional Attack Surface scan settings from [global] within the TOML file, returning the TCP ports to scan,
+    the per-host timeout in seconds and the maximum number of concurrent Nmap scans
+    """
+    tomlPath = environ.get("TOML_FILE_PATH")
+    if not tomlPath or tomlPath == "None":
+        tomlPath = path.join(path.abspath(path.dirname(__file__)), "external_providers.toml")
+
+    try:
+        with open(tomlPath, "rb") as f:
+            data = tomli.load(f)["global"]
+    except (OSError, KeyError, tomli.TOMLDecodeError) as e:
+        logger.warning("Could not read Attack Surface settings from %s: %s", tomlPath, e)
+        data = {}
+
+    return (
+        data.get("attack_surface_tcp_ports") or DEFAULT_TCP_PORTS,
+        data.get("attack_surface_host_timeout_seconds", DEFAULT_HOST_TIMEOUT_SECONDS),
+        data.get("attack_surface_max_concurrent_scans", DEFAULT_MAX_CONCURRENT_SCANS)
+    )
+
+def scan_host(host, assetName, assetComponent):
+    """
+    Returns the (shared, cached) Nmap TCP scan results for a host
+    """
+    return AttackSurfaceScanner.get_scanner().scan_host(host, assetName, assetComponent)
+
+def prefetch_hosts(targets):
+    """
+    Queues concurrent Nmap TCP scans for a list of (host, assetName, assetComponent) tuples
+    """
+    AttackSurfaceScanner.get_scanner().prefetch(targets)
@@ -0,0 +1,148 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import logging
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Full
+from threading import Event
+from time import sleep
+
+logger = logging.getLogger("AuditScheduler")
+
+class AuditUnit(object):
+    """
+    A single schedulable piece of work, typically every Check within one Auditor for one Account & Region. The
+    `runner` is a zero-argument callable that returns an iterable of findings
+    """
+
+    def __init__(self, account, runner, label=None):
+        self.account = account
+        self.runner = runner
+        self.label = label
+
+class _UnitComplete(object):
+    """
+    Marker placed on the results queue by a worker once its AuditUnit has been exhausted (or has failed)
+    """
+
+    def __init__(self, unit, error=None):
+        self.unit = unit
+        self.error = error
+
+class AuditScheduler(object):
+    """
+    Fans AuditUnits out over a thread pool while capping concurrency globally and per Account. Findings are handed
+    back through a bounded queue so that `run()` remains a plain generator for EEAuditor and controller.py
+    """
+
+    def __init__(self, maxWorkers=1, maxWorkersPerAccount=1, delay=0, queueSize=1000):
+        self.maxWorkers = max(1, int(maxWorkers))
+        # a per-Account cap higher than the global cap is meaningless
+        self.maxWorkersPerAccount = min(max(1, int(maxWorkersPerAccount)), self.maxWorkers)
+        self.delay = delay
+        self.queueSize = queueSize
+
+    def run(self, units):
+        """
+        Executes all provided AuditUnits and yields findings as soon as any worker produces them. Units are dispatched
+        in Account order, the first exception raised by a unit's runner (including SystemExit) is re-raised here after the
+        pool is shut down
+        """
+        # Group the work by Account, preserving the order in which Accounts were provided
+        pendingByAccount = OrderedDict()
+        for unit in units:
+            pendingByAccount.setdefault(unit.account, deque()).append(unit)
+
+        inFlight = 0
+        inFlightPerAccount = {}
+        startedAccounts = set()
+        results = Queue(maxsize=self.queueSize)
+        cancelled = Event()
+
+        executor = ThreadPoolExecutor(max_workers=self.maxWorkers, thread_name_prefix="ElectricEye")
+        try:
+            while pendingByAccount or inFlight:
+                # Dispatch as much work as the global and per-Account caps allow, Accounts at their cap are skipped
+                exhaustedAccounts = []
+                for account, queued in pendingByAccount.items():
+                    if inFlight >= self.maxWorkers:
+                        break
+                    while queued and inFlight < self.maxWorkers and inFlightPerAccount.get(account, 0) < self.maxWorkersPerAccount:
+                        # honor the optional delay between Accounts
+                        if account not in startedAccounts:
+                            if startedAccounts and self.delay:
+                                sleep(self.delay)
+                            startedAccounts.add(account)
+                        unit = queued.popleft()
+                        executor.submit(self._run_unit, unit, results, cancelled)
+                        inFlight += 1
+                        inFlightPerAccount[account] = inFlightPerAccount.get(account, 0) + 1
+                    if not queued:
+                        exhaustedAccounts.append(account)
+                for account in exhaustedAccounts:
+                    del pendingByAccount[account]
+
+                # Drain findings until a unit finishes and frees up a slot
+                while True:
+                    item = results.get()
+                    if isinstance(item, _UnitComplete):
+                        inFlight -= 1
+                        inFlightPerAccount[item.unit.account] -= 1
+                        if item.error is not None:
+                            logger.error(
+                                "Unit %s for Account %s failed: %s",
+                                item.unit.label, item.unit.account, item.error
+                            )
+                            raise item.error
+                        break
+                    yield item
+        finally:
+            # Unblock any workers waiting on a full queue (e.g., the consumer stopped early) and drop queued work
+            cancelled.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _run_unit(self, unit, results, cancelled):
+        """
+        Worker body: streams every finding from a unit onto the results queue followed by a completion marker
+        """
+        error = None
+        try:
+            for finding in unit.runner():
+                if cancelled.is_set():
+                    return
+                self._put(results, finding, cancelled)
+        # Checks call sys.exit() on bad configuration, SystemExit is carried over and re-raised on the consumer thread
+        except BaseException as e:
+            error = e
+        finally:
+            # always signal completion, otherwise run() would block forever waiting on this unit
+            self._put(results, _UnitComplete(unit, error), cancelled)
+
+    def _put(self, results, item, cancelled):
+        """
+        Blocking put that gives up once the scheduler has been cancelled
+        """
+        while not cancelled.is_set():
+            try:
+                results.put(item, timeout=1)
+                return
+            except Full:
+                continue
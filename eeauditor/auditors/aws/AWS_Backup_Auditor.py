@@ -24,15 +24,7 @@ from dateutil.parser import parse
 from check_register import CheckRegister
 import base64
 import json
-from botocore.config import Config
-
-# Adding backoff and retries for SSM - this API gets throttled a lot
-config = Config(
-   retries = {
-      'max_attempts': 10,
-      'mode': 'adaptive'
-   }
-)
+from inventory import get_inventory
 
 registry = CheckRegister()
 
@@ -53,35 +45,18 @@ def describe_instances(cache, session):
     if response:
         return response
     
-    instanceList = []
-    
-    ec2 = session.client("ec2")
-    ssm = session.client("ssm", config=config)
     # Enrich EC2 with SSM details - this is done for the EC2 Auditor - all others using EC2 don't matter too much
-    managedInstances = ssm.describe_instance_information()["InstanceInformationList"]
+    managedInstances = {
+        mnginst["InstanceId"]: mnginst for mnginst in get_inventory(cache, session, "ssm.describe_instance_information")
+    }
 
-    for page in ec2.get_paginator("describe_instances").paginate(
-            Filters=[
-                {
-                    "Name": "instance-state-name",
-                    "Values": [ 
-                        "running",
-                        "stopped" 
-                    ]
-                }
-            ]
-        ):
-        for r in page["Reservations"]:
-            for i in r["Instances"]:
-                # Use a list comprehension to attempt to get SSM info for the instance
-                managedInstanceInfo = [mnginst for mnginst in managedInstances if mnginst["InstanceId"] == i["InstanceId"]]
-                i["ManagedInstanceInformation"] = managedInstanceInfo
-                instanceList.append(i)
+    # The Instances are shared with other Auditors, so they are copied before being enriched
+    cache["describe_instances"] = [
+        {**i, "ManagedInstanceInformation": [managedInstances[i["InstanceId"]]] if i["InstanceId"] in managedInstances else []}
+        for i in get_inventory(cache, session, "ec2.describe_instances")
+    ]
+    return cache["describe_instances"]
 
-        cache["describe_instances"] = instanceList
-        return cache["describe_instances"]
-
-# loop through DynamoDB tables
 def list_tables(cache, session):
     dynamodb = session.client("dynamodb")
     ddbTables = []
@@ -98,38 +73,28 @@ def list_tables(cache, session):
 
 # loop through RDS/Aurora DB Instances
 def describe_db_instances(cache, session):
-    rds = session.client("rds")
-    dbInstances = []
     response = cache.get("describe_db_instances")
     if response:
         return response
-    paginator = rds.get_paginator('describe_db_instances')
-    if paginator:
-        for page in paginator.paginate(
-            Filters=[
-                {
-                    "Name": "engine",
-                    "Values": [
-                        "aurora-mysql",
-                        "aurora-postgresql",
-                        "mariadb",
-                        "mysql",
-                        "oracle-ee",
-                        "oracle-ee-cdb",
-                        "oracle-se2",
-                        "oracle-se2-cdb",
-                        "postgres",
-                        "sqlserver-ee",
-                        "sqlserver-se",
-                        "sqlserver-ex",
-                        "sqlserver-web"
-                    ]
-                }
-            ]
-        ):
-            for dbinstance in page["DBInstances"]:
-                dbInstances.append(dbinstance)
-    cache["describe_db_instances"] = dbInstances
+    # The RDS namespace also contains DocumentDB and Neptune, only keep the RDS engines
+    rdsEngines = [
+        "aurora-mysql",
+        "aurora-postgresql",
+        "mariadb",
+        "mysql",
+        "oracle-ee",
+        "oracle-ee-cdb",
+        "oracle-se2",
+        "oracle-se2-cdb",
+        "postgres",
+        "sqlserver-ee",
+        "sqlserver-se",
+        "sqlserver-ex",
+        "sqlserver-web"
+    ]
+    cache["describe_db_instances"] = [
+        dbinstance for dbinstance in get_inventory(cache, session, "rds.describe_db_instances") if dbinstance["Engine"] in rdsEngines
+    ]
     return cache["describe_db_instances"]
 
 # loop through EFS file systems
@@ -19,7 +19,10 @@
 #under the License.
 
 import logging
+import re
+from functools import lru_cache
 from check_register import CheckRegister
+from inventory import get_inventory
 import datetime
 import base64
 import json
@@ -39,6 +42,143 @@ def get_all_shadow_trails(cache, session):
     cache["get_all_shadow_trails"] = cloudtrail.describe_trails(includeShadowTrails=True)["trailList"]
     return cache["get_all_shadow_trails"]
 
+# Tokens of a CloudWatch Logs JSON filter pattern: parentheses, logical operators and comparisons of a selector
+FILTER_PATTERN_TOKEN = re.compile(
+    r"""\s*(?:(?P<paren>[()])|(?P<logic>&&|\|\|)|(?P<term>(?P<selector>\$[^\s=!<>()]*)\s*"""
+    r"""(?:(?P<exists>NOT\s+EXISTS|IS\s+(?:TRUE|FALSE|NULL))|(?P<operator>!=|>=|<=|=|>|<)\s*(?P<value>"(?:[^"\\]|\\.)*"|[^\s()&|]+))))""",
+    re.IGNORECASE
+)
+
+def parse_filter_pattern(tokens, position, operator="||"):
+    """
+    Recursive descent over the tokens of a filter pattern, && binds tighter than ||. Returns a (node, position) tuple
+    where a node is either a canonical comparison string or an (operator, [nodes]) tuple
+    """
+    node, position = parse_filter_operands(tokens, position, operator)
+    children = [node]
+    while position < len(tokens) and tokens[position] == operator:
+        node, position = parse_filter_operands(tokens, position + 1, operator)
+        children.append(node)
+
+    return (children[0] if len(children) == 1 else (operator, children)), position
+
+def parse_filter_operands(tokens, position, operator):
+    # the operands of || are && expressions
+    if operator == "||":
+        return parse_filter_pattern(tokens, position, "&&")
+
+    return parse_filter_operand(tokens, position)
+
+def parse_filter_operand(tokens, position):
+    if position >= len(tokens):
+        raise ValueError("Unexpected end of filter pattern")
+    if tokens[position] == "(":
+        node, position = parse_filter_pattern(tokens, position + 1)
+        if position >= len(tokens) or tokens[position] != ")":
+            raise ValueError("Unbalanced parentheses in filter pattern")
+        return node, position + 1
+    if tokens[position] in ("(", ")", "&&", "||"):
+        raise ValueError(f"Unexpected {tokens[position]} in filter pattern")
+
+    return tokens[position], position + 1
+
+def canonical_filter_node(node) -> str:
+    """
+    Renders a parsed filter pattern with the operands of every && and || flattened, de-duplicated and sorted
+    """
+    if isinstance(node, str):
+        return node
+
+    operator = node[0]
+    operands = set()
+    for child in node[1]:
+        if not isinstance(child, str) and child[0] == operator:
+            operands.update(canonical_filter_node(grandchild) for grandchild in child[1])
+        else:
+            operands.add(canonical_filter_node(child))
+
+    return "(" + operator.join(sorted(operands)) + ")"
+
+@lru_cache(maxsize=4096)
+def normalize_filter_pattern(filterPattern: str) -> str:
+    """
+    Returns a canonical form of a CloudWatch Logs metric filter pattern so that semantically equivalent patterns compare
+    equal: whitespace, quoting of values, redundant parentheses and the order of && / || operands are ignored. Patterns
+    that are not JSON filter patterns only have their whitespace collapsed
+    """
+    collapsed = " ".join(filterPattern.split())
+    if not (collapsed.startswith("{") and collapsed.endswith("}")):
+        return collapsed
+
+    body = collapsed[1:-1].strip()
+    tokens = []
+    position = 0
+    while position < len(body):
+        match = FILTER_PATTERN_TOKEN.match(body, position)
+        if match is None:
+            return collapsed
+        if match.group("paren") or match.group("logic"):
+            tokens.append(match.group("paren") or match.group("logic"))
+        elif match.group("exists"):
+            tokens.append(f"{match.group('selector')} {' '.join(match.group('exists').upper().split())}")
+        else:
+            # quoting a value is only required for special characters, "ConsoleLogin" and ConsoleLogin are the same
+            value = match.group("value").strip('"')
+            tokens.append(f"{match.group('selector')}{match.group('operator')}{value}")
+        position = match.end()
+        while position < len(body) and body[position].isspace():
+            position += 1
+
+    try:
+        node, position = parse_filter_pattern(tokens, 0)
+    except ValueError:
+        return collapsed
+    if position != len(tokens):
+        return collapsed
+
+    return canonical_filter_node(node)
+
+def evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns) -> bool:
+    """
+    Returns whether the CloudWatch Logs group of a trail has a metric filter equivalent to any of `filterPatterns`
+    with an alarm on its metric. Trails without a Log Group fail, Log Groups of other Accounts or Regions cannot be
+    assessed and pass. Metric filters and alarms are collected once per Account & Region, see inventory.py
+    """
+    trailName = trail["Name"]
+    # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
+    # and then that the metrics exist and have an alarm assigned for them
+    if "CloudWatchLogsLogGroupArn" not in trail:
+        return False
+
+    logGroupArn = trail["CloudWatchLogsLogGroupArn"]
+    logGroupAccount = logGroupArn.split(":")[4]
+    logGroupRegion = logGroupArn.split(":")[3]
+    logGroupName = logGroupArn.split(":")[6]
+    if awsAccountId != logGroupAccount:
+        logger.info(
+            "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
+            trailName, awsAccountId
+        )
+        return True
+    if awsRegion != logGroupRegion:
+        logger.info(
+            "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
+            trailName, awsRegion
+        )
+        return True
+
+    wantedPatterns = {normalize_filter_pattern(filterPattern) for filterPattern in filterPatterns}
+    metricAlarms = get_inventory(cache, session, "cloudwatch.describe_alarms")
+    for metricFilter in get_inventory(cache, session, "logs.describe_metric_filters").get(logGroupName, []):
+        if normalize_filter_pattern(metricFilter.get("filterPattern", "")) not in wantedPatterns:
+            continue
+        # check if the metric & namespace combo have an alarm
+        for transformation in metricFilter["metricTransformations"]:
+            if metricAlarms.get((transformation["metricName"], transformation["metricNamespace"])):
+                return True
+
+    return False
+
 def check_if_bucket_is_public(session, bucketName):
     s3 = session.client("s3")
 
@@ -1540,9 +1680,6 @@ def cloudtrail_s3_read_and_write_data_events_check(cache: dict, session, awsAcco
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_unauth_api_calls_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.9] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor unauthorized API calls"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -1551,47 +1688,14 @@ def cloudtrail_cloudwatch_metric_alarm_unauth_api_calls_check(cache: dict, sessi
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.errorCode = *UnauthorizedOperation) || ($.errorCode = AccessDenied*) || ($.sourceIPAddress!=delivery.logs.amazonaws.com) || ($.eventName!=HeadBucket) }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.errorCode = *UnauthorizedOperation) || ($.errorCode = AccessDenied*) || ($.sourceIPAddress!=delivery.logs.amazonaws.com) || ($.eventName!=HeadBucket) }',
+            '{ ($.errorCode = "*UnauthorizedOperation") || ($.errorCode = "AccessDenied*") && ($.sourceIPAddress!="delivery.logs.amazonaws.com") && ($.eventName!="HeadBucket") }',
+            '{ ($.errorCode = "*UnauthorizedOperation") || ($.errorCode = "AccessDenied*") }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -1786,9 +1890,6 @@ def cloudtrail_cloudwatch_metric_alarm_unauth_api_calls_check(cache: dict, sessi
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_console_login_no_mfa_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.10] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor Management Console sign-in without MFA"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -1797,47 +1898,13 @@ def cloudtrail_cloudwatch_metric_alarm_console_login_no_mfa_check(cache: dict, s
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.eventName = "ConsoleLogin") && ($.additionalEventData.MFAUsed != "Yes") }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.eventName = "ConsoleLogin") && ($.additionalEventData.MFAUsed != "Yes") }',
+            '{ ($.eventName = "ConsoleLogin") && ($.additionalEventData.MFAUsed != "Yes") && ($.userIdentity.type = "IAMUser") && ($.responseElements.ConsoleLogin = "Success") }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -2032,9 +2099,6 @@ def cloudtrail_cloudwatch_metric_alarm_console_login_no_mfa_check(cache: dict, s
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_root_user_usage_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.11] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor usage of 'root' account"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -2043,47 +2107,12 @@ def cloudtrail_cloudwatch_metric_alarm_root_user_usage_check(cache: dict, sessio
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ $.userIdentity.type = "Root" && $.userIdentity.invokedBy NOT EXISTS && $.eventType != "AwsServiceEvent" }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ $.userIdentity.type = "Root" && $.userIdentity.invokedBy NOT EXISTS && $.eventType != "AwsServiceEvent" }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -2278,9 +2307,6 @@ def cloudtrail_cloudwatch_metric_alarm_root_user_usage_check(cache: dict, sessio
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_iam_policy_changes_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.12] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor IAM policy changes"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -2289,47 +2315,12 @@ def cloudtrail_cloudwatch_metric_alarm_iam_policy_changes_check(cache: dict, ses
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.eventName=DeleteGroupPolicy) || ($.eventName=DeleteRolePolicy) || ($.eventName=DeleteUserPolicy) || ($.eventName=PutGroupPolicy) || ($.eventName=PutRolePolicy) || ($.eventName=PutUserPolicy) || ($.eventName=CreatePolicy) || ($.eventName=DeletePolicy) || ($.eventName=CreatePolicyVersion) || ($.eventName=DeletePolicyVersion) || ($.eventName=AttachRolePolicy) || ($.eventName=DetachRolePolicy) || ($.eventName=AttachUserPolicy) || ($.eventName=DetachUserPolicy) || ($.eventName=AttachGroupPolicy) || ($.eventName=DetachGroupPolicy) }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.eventName=DeleteGroupPolicy) || ($.eventName=DeleteRolePolicy) || ($.eventName=DeleteUserPolicy) || ($.eventName=PutGroupPolicy) || ($.eventName=PutRolePolicy) || ($.eventName=PutUserPolicy) || ($.eventName=CreatePolicy) || ($.eventName=DeletePolicy) || ($.eventName=CreatePolicyVersion) || ($.eventName=DeletePolicyVersion) || ($.eventName=AttachRolePolicy) || ($.eventName=DetachRolePolicy) || ($.eventName=AttachUserPolicy) || ($.eventName=DetachUserPolicy) || ($.eventName=AttachGroupPolicy) || ($.eventName=DetachGroupPolicy) }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -2524,9 +2515,6 @@ def cloudtrail_cloudwatch_metric_alarm_iam_policy_changes_check(cache: dict, ses
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_cloudtrail_config_changes_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.13] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor CloudTrail configuration changes"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -2535,47 +2523,12 @@ def cloudtrail_cloudwatch_metric_alarm_cloudtrail_config_changes_check(cache: di
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.eventName = CreateTrail) || ($.eventName = UpdateTrail) || ($.eventName = DeleteTrail) || ($.eventName = StartLogging) || ($.eventName = StopLogging) }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.eventName = CreateTrail) || ($.eventName = UpdateTrail) || ($.eventName = DeleteTrail) || ($.eventName = StartLogging) || ($.eventName = StopLogging) }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -2770,9 +2723,6 @@ def cloudtrail_cloudwatch_metric_alarm_cloudtrail_config_changes_check(cache: di
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_console_authentication_failures_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.14] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor AWS Management Console authentication failures"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -2781,47 +2731,12 @@ def cloudtrail_cloudwatch_metric_alarm_console_authentication_failures_check(cac
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.eventName = ConsoleLogin) && ($.errorMessage = "Failed authentication") }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.eventName = ConsoleLogin) && ($.errorMessage = "Failed authentication") }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -3016,9 +2931,6 @@ def cloudtrail_cloudwatch_metric_alarm_console_authentication_failures_check(cac
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_disable_or_delete_aws_kms_cmks_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.15] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor disabling or scheduled deletion of customer created AWS KMS CMKs"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -3027,47 +2939,12 @@ def cloudtrail_cloudwatch_metric_alarm_disable_or_delete_aws_kms_cmks_check(cach
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.eventSource = kms.amazonaws.com) && (($.eventName=DisableKey) || ($.eventName=ScheduleKeyDeletion)) }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.eventSource = kms.amazonaws.com) && (($.eventName=DisableKey) || ($.eventName=ScheduleKeyDeletion)) }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -3262,9 +3139,6 @@ def cloudtrail_cloudwatch_metric_alarm_disable_or_delete_aws_kms_cmks_check(cach
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_s3_bucket_policy_change_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.16] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor Amazon S3 bucket policy changes"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -3273,47 +3147,12 @@ def cloudtrail_cloudwatch_metric_alarm_s3_bucket_policy_change_check(cache: dict
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.eventSource = s3.amazonaws.com) && (($.eventName = PutBucketAcl) || ($.eventName = PutBucketPolicy) || ($.eventName = PutBucketCors) || ($.eventName = PutBucketLifecycle) || ($.eventName = PutBucketReplication) || ($.eventName = DeleteBucketPolicy) || ($.eventName = DeleteBucketCors) || ($.eventName = DeleteBucketLifecycle) || ($.eventName = DeleteBucketReplication)) }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.eventSource = s3.amazonaws.com) && (($.eventName = PutBucketAcl) || ($.eventName = PutBucketPolicy) || ($.eventName = PutBucketCors) || ($.eventName = PutBucketLifecycle) || ($.eventName = PutBucketReplication) || ($.eventName = DeleteBucketPolicy) || ($.eventName = DeleteBucketCors) || ($.eventName = DeleteBucketLifecycle) || ($.eventName = DeleteBucketReplication)) }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -3508,9 +3347,6 @@ def cloudtrail_cloudwatch_metric_alarm_s3_bucket_policy_change_check(cache: dict
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_aws_config_configuration_changes_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.17] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor AWS Config configuration changes"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -3519,47 +3355,12 @@ def cloudtrail_cloudwatch_metric_alarm_aws_config_configuration_changes_check(ca
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.eventSource = config.amazonaws.com) && (($.eventName=StopConfigurationRecorder) || ($.eventName=DeleteDeliveryChannel) || ($.eventName=PutDeliveryChannel) || ($.eventName=PutConfigurationRecorder)) }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.eventSource = config.amazonaws.com) && (($.eventName=StopConfigurationRecorder) || ($.eventName=DeleteDeliveryChannel) || ($.eventName=PutDeliveryChannel) || ($.eventName=PutConfigurationRecorder)) }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -3754,9 +3555,6 @@ def cloudtrail_cloudwatch_metric_alarm_aws_config_configuration_changes_check(ca
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_security_group_changes_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.18] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor AWS EC2 security group changes"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -3765,47 +3563,12 @@ def cloudtrail_cloudwatch_metric_alarm_security_group_changes_check(cache: dict,
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.eventName = AuthorizeSecurityGroupIngress) || ($.eventName = AuthorizeSecurityGroupEgress) || ($.eventName = RevokeSecurityGroupIngress) || ($.eventName = RevokeSecurityGroupEgress) || ($.eventName = CreateSecurityGroup) || ($.eventName = DeleteSecurityGroup) }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.eventName = AuthorizeSecurityGroupIngress) || ($.eventName = AuthorizeSecurityGroupEgress) || ($.eventName = RevokeSecurityGroupIngress) || ($.eventName = RevokeSecurityGroupEgress) || ($.eventName = CreateSecurityGroup) || ($.eventName = DeleteSecurityGroup) }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -4000,9 +3763,6 @@ def cloudtrail_cloudwatch_metric_alarm_security_group_changes_check(cache: dict,
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_nacl_changes_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.19] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor Amazon VPC Network Access Control Lists (NACL) changes"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -4011,47 +3771,12 @@ def cloudtrail_cloudwatch_metric_alarm_nacl_changes_check(cache: dict, session,
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.eventName = CreateNetworkAcl) || ($.eventName = CreateNetworkAclEntry) || ($.eventName = DeleteNetworkAcl) || ($.eventName = DeleteNetworkAclEntry) || ($.eventName = ReplaceNetworkAclEntry) || ($.eventName = ReplaceNetworkAclAssociation) }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.eventName = CreateNetworkAcl) || ($.eventName = CreateNetworkAclEntry) || ($.eventName = DeleteNetworkAcl) || ($.eventName = DeleteNetworkAclEntry) || ($.eventName = ReplaceNetworkAclEntry) || ($.eventName = ReplaceNetworkAclAssociation) }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -4246,9 +3971,6 @@ def cloudtrail_cloudwatch_metric_alarm_nacl_changes_check(cache: dict, session,
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_network_gateway_changes_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.20] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor network gateway changes"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -4257,47 +3979,12 @@ def cloudtrail_cloudwatch_metric_alarm_network_gateway_changes_check(cache: dict
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.eventName = CreateCustomerGateway) || ($.eventName = DeleteCustomerGateway) || ($.eventName = AttachInternetGateway) || ($.eventName = CreateInternetGateway) || ($.eventName = DeleteInternetGateway) || ($.eventName = DetachInternetGateway) }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.eventName = CreateCustomerGateway) || ($.eventName = DeleteCustomerGateway) || ($.eventName = AttachInternetGateway) || ($.eventName = CreateInternetGateway) || ($.eventName = DeleteInternetGateway) || ($.eventName = DetachInternetGateway) }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -4492,9 +4179,6 @@ def cloudtrail_cloudwatch_metric_alarm_network_gateway_changes_check(cache: dict
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_vpc_route_table_changes_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.21] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor Amazon VPC route table changes"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -4503,47 +4187,12 @@ def cloudtrail_cloudwatch_metric_alarm_vpc_route_table_changes_check(cache: dict
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.eventName = CreateRoute) || ($.eventName = CreateRouteTable) || ($.eventName = ReplaceRoute) || ($.eventName = ReplaceRouteTableAssociation) || ($.eventName = DeleteRouteTable) || ($.eventName = DeleteRoute) || ($.eventName = DisassociateRouteTable) }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.eventName = CreateRoute) || ($.eventName = CreateRouteTable) || ($.eventName = ReplaceRoute) || ($.eventName = ReplaceRouteTableAssociation) || ($.eventName = DeleteRouteTable) || ($.eventName = DeleteRoute) || ($.eventName = DisassociateRouteTable) }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -4738,9 +4387,6 @@ def cloudtrail_cloudwatch_metric_alarm_vpc_route_table_changes_check(cache: dict
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_vpc_changes_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.22] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor Amazon VPC changes"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -4749,47 +4395,12 @@ def cloudtrail_cloudwatch_metric_alarm_vpc_changes_check(cache: dict, session, a
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.eventName = CreateVpc) || ($.eventName = DeleteVpc) || ($.eventName = ModifyVpcAttribute) || ($.eventName = AcceptVpcPeeringConnection) || ($.eventName = CreateVpcPeeringConnection) || ($.eventName = DeleteVpcPeeringConnection) || ($.eventName = RejectVpcPeeringConnection) || ($.eventName = AttachClassicLinkVpc) || ($.eventName = DetachClassicLinkVpc) || ($.eventName = DisableVpcClassicLink) || ($.eventName = EnableVpcClassicLink) }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.eventName = CreateVpc) || ($.eventName = DeleteVpc) || ($.eventName = ModifyVpcAttribute) || ($.eventName = AcceptVpcPeeringConnection) || ($.eventName = CreateVpcPeeringConnection) || ($.eventName = DeleteVpcPeeringConnection) || ($.eventName = RejectVpcPeeringConnection) || ($.eventName = AttachClassicLinkVpc) || ($.eventName = DetachClassicLinkVpc) || ($.eventName = DisableVpcClassicLink) || ($.eventName = EnableVpcClassicLink) }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
@@ -4984,9 +4595,6 @@ def cloudtrail_cloudwatch_metric_alarm_vpc_changes_check(cache: dict, session, a
 @registry.register_check("cloudtrail")
 def cloudtrail_cloudwatch_metric_alarm_aws_organizations_changes_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudTrail.23] AWS CloudTrail trails should have CloudWatch metrics and alarms configured to monitor AWS Organizations changes"""
-    # CloudWatch Logs & CloudWatch Client
-    logs = session.client("logs")
-    cloudwatch = session.client("cloudwatch")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for trail in get_all_shadow_trails(cache, session):
@@ -4995,47 +4603,12 @@ def cloudtrail_cloudwatch_metric_alarm_aws_organizations_changes_check(cache: di
         assetB64 = base64.b64encode(assetJson)
         trailArn = trail["TrailARN"]
         trailName = trail["Name"]
-        # Set the "passing state" of the check, this can be overriden in multiple ways
-        filterAlarmPassing = True
-        # This is a compound check as we need to ensure CloudWatch Logs exist for the Trail, are located in the Account being assessed,
-        # and then that the metrics exist and have an alarm assigned for them
-        if "CloudWatchLogsLogGroupArn" in trail:
-            logGroupArn = trail["CloudWatchLogsLogGroupArn"]
-            logGroupAccount = logGroupArn.split(":")[4]
-            logGroupRegion = logGroupArn.split(":")[3]
-            logGroupName = logGroupArn.split(":")[6]
-            if awsAccountId != logGroupAccount:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed account (%s) and cannot be assessed.",
-                    trailName, awsAccountId
-                )
-            if awsRegion != logGroupRegion:
-                logger.info(
-                    "AWS CloudTrail trail %s has an attached CloudWatch Logs Group that is not located in the currently assessed region (%s) and cannot be assessed.",
-                    trailName, awsRegion
-                )
-            else:
-                # Pull out the filters for the Log Group
-                metricFilters = logs.describe_metric_filters(
-                    logGroupName=logGroupName,
-                )["metricFilters"]
-                # Check if any filter matches the pattern being assessed
-                filterPattern = '{ ($.eventSource = organizations.amazonaws.com) && (($.eventName = "AcceptHandshake") || ($.eventName = "AttachPolicy") || ($.eventName = "CreateAccount") || ($.eventName = "CreateOrganizationalUnit") || ($.eventName = "CreatePolicy") || ($.eventName = "DeclineHandshake") || ($.eventName = "DeleteOrganization") || ($.eventName = "DeleteOrganizationalUnit") || ($.eventName = "DeletePolicy") || ($.eventName = "DetachPolicy") || ($.eventName = "DisablePolicyType") || ($.eventName = "EnablePolicyType") || ($.eventName = "InviteAccountToOrganization") || ($.eventName = "LeaveOrganization") || ($.eventName = "MoveAccount") || ($.eventName = "RemoveAccountFromOrganization") || ($.eventName = "UpdatePolicy") || ($.eventName = "UpdateOrganizationalUnit")) }'
-                matchedPatterns = [filters for filters in metricFilters if filterPattern == filters["filterPattern"]]
-                # if there is content, we have match, now to check the alarm
-                if matchedPatterns:
-                    filterAlarmPassing = True
-                    # check if the metric & namespace combo have an alarm
-                    alarmCheck = cloudwatch.describe_alarms_for_metric(
-                        MetricName=matchedPatterns[0]["metricTransformations"][0]["metricName"],
-                        Namespace=matchedPatterns[0]["metricTransformations"][0]["metricNamespace"]
-                    )["MetricAlarms"]
-                    if not alarmCheck:
-                        filterAlarmPassing = False
-                else:
-                    filterAlarmPassing = False
-        else:
-            filterAlarmPassing = False
+        # Check if the Log Group of the trail has a metric filter matching the pattern being assessed (or an equivalent
+        # CIS Benchmark pattern) and that the metric & namespace combo have an alarm
+        filterPatterns = [
+            '{ ($.eventSource = organizations.amazonaws.com) && (($.eventName = "AcceptHandshake") || ($.eventName = "AttachPolicy") || ($.eventName = "CreateAccount") || ($.eventName = "CreateOrganizationalUnit") || ($.eventName = "CreatePolicy") || ($.eventName = "DeclineHandshake") || ($.eventName = "DeleteOrganization") || ($.eventName = "DeleteOrganizationalUnit") || ($.eventName = "DeletePolicy") || ($.eventName = "DetachPolicy") || ($.eventName = "DisablePolicyType") || ($.eventName = "EnablePolicyType") || ($.eventName = "InviteAccountToOrganization") || ($.eventName = "LeaveOrganization") || ($.eventName = "MoveAccount") || ($.eventName = "RemoveAccountFromOrganization") || ($.eventName = "UpdatePolicy") || ($.eventName = "UpdateOrganizationalUnit")) }'
+        ]
+        filterAlarmPassing = evaluate_trail_metric_filter_alarm(cache, session, trail, awsAccountId, awsRegion, filterPatterns)
 
         # this is a failing check
         if filterAlarmPassing is False:
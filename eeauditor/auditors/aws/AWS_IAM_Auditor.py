@@ -21,6 +21,8 @@
 import botocore
 import datetime
 from check_register import CheckRegister
+from inventory import get_inventory
+from policy_analysis import analyze_policy
 import base64
 import json
 
@@ -47,60 +49,148 @@ def global_region_generator(awsPartition):
 
     return globalRegion
 
+def get_authorization_details(cache, session):
+    """
+    Every IAM User, Group, Role and customer managed Policy with their policies, see inventory.py
+    """
+    response = cache.get("get_authorization_details")
+    if response:
+        return response
+
+    cache["get_authorization_details"] = get_inventory(cache, session, "iam.get_account_authorization_details")
+    return cache["get_authorization_details"]
+
+def get_credential_report(cache, session):
+    """
+    The IAM credential report keyed on User name, see inventory.py
+    """
+    response = cache.get("get_credential_report")
+    if response:
+        return response
+
+    cache["get_credential_report"] = get_inventory(cache, session, "iam.get_credential_report")
+    return cache["get_credential_report"]
+
+def summarize_iam_entity(entity, detailKeys):
+    """
+    Drops the policy details from an entry of GetAccountAuthorizationDetails so it reads like the List* APIs
+    """
+    return {k: v for k, v in entity.items() if k not in detailKeys}
+
 def get_iam_users(cache, session):
     response = cache.get("get_iam_users")
     if response:
         return response
-    
-    iam = session.client("iam")
 
-    cache["get_iam_users"] = iam.list_users(MaxItems=1000)["Users"]
+    credentialReport = get_credential_report(cache, session)
+
+    users = []
+    for user in get_authorization_details(cache, session)["Users"].values():
+        user = summarize_iam_entity(user, ("UserPolicyList", "GroupList", "AttachedManagedPolicies"))
+        passwordLastUsed = credentialReport.get(user["UserName"], {}).get("password_last_used", "N/A")
+        if passwordLastUsed not in ("N/A", "no_information"):
+            user["PasswordLastUsed"] = datetime.datetime.fromisoformat(passwordLastUsed)
+        users.append(user)
+
+    cache["get_iam_users"] = users
     return cache["get_iam_users"]
 
 def get_custom_policies(cache, session):
     response = cache.get("get_custom_policies")
     if response:
         return response
-    
-    iam = session.client("iam")
 
-    cache["get_custom_policies"] = iam.list_policies(Scope="Local")["Policies"]
+    cache["get_custom_policies"] = [
+        summarize_iam_entity(policy, ("PolicyVersionList",))
+        for policy in get_authorization_details(cache, session)["Policies"].values()
+    ]
     return cache["get_custom_policies"]
 
-def get_managed_policies(cache, session):
-    response = cache.get("get_managed_policies")
-    if response:
-        return response
-    
-    iam = session.client("iam")
-
-    cache["get_managed_policies"] = iam.list_policies(
-        Scope="AWS",
-        PolicyUsageFilter="PermissionsPolicy",
-        OnlyAttached=False
-    )["Policies"]
-    return cache["get_managed_policies"]
-
 def get_iam_groups(cache, session):
     response = cache.get("get_iam_groups")
     if response:
         return response
-    
-    iam = session.client("iam")
 
-    cache["get_iam_groups"] = iam.list_groups()["Groups"]
+    cache["get_iam_groups"] = [
+        summarize_iam_entity(group, ("GroupPolicyList", "AttachedManagedPolicies"))
+        for group in get_authorization_details(cache, session)["Groups"].values()
+    ]
     return cache["get_iam_groups"]
 
 def get_iam_roles(cache, session):
     response = cache.get("get_iam_roles")
     if response:
         return response
-    
-    iam = session.client("iam")
 
-    cache["get_iam_roles"] = iam.list_roles()["Roles"]
+    cache["get_iam_roles"] = [
+        summarize_iam_entity(role, ("InstanceProfileList", "RolePolicyList", "AttachedManagedPolicies"))
+        for role in get_authorization_details(cache, session)["Roles"].values()
+    ]
     return cache["get_iam_roles"]
 
+def get_policy_default_document(cache, session, policyArn):
+    """
+    Returns the document of the default version of a customer managed Policy
+    """
+    policy = get_authorization_details(cache, session)["Policies"][policyArn]
+    for version in policy["PolicyVersionList"]:
+        if version["IsDefaultVersion"]:
+            return version["Document"]
+
+def get_access_keys(cache, session, userName):
+    """
+    Returns the Access Keys of a User, with "LastUsedDate" added. The credential report supplies the last used date of
+    keys created before it was generated, newer keys (which the report cannot know about) are looked up
+    """
+    accessKeys = cache.setdefault("get_access_keys", {})
+    if userName in accessKeys:
+        return accessKeys[userName]
+
+    reportRow = get_credential_report(cache, session).get(userName)
+
+    # the report does not carry Access Key IDs, its keys are matched on their creation ("last rotated") date
+    reportLastUsed = {}
+    reportGeneratedTime = None
+    if reportRow:
+        reportGeneratedTime = reportRow["report_generated_time"]
+        for keyNumber in ("1", "2"):
+            lastRotated = reportRow[f"access_key_{keyNumber}_last_rotated"]
+            lastUsed = reportRow[f"access_key_{keyNumber}_last_used_date"]
+            if lastRotated != "N/A":
+                reportLastUsed[datetime.datetime.fromisoformat(lastRotated).replace(microsecond=0)] = lastUsed
+
+    iam = session.client("iam")
+    keys = []
+    for key in iam.list_access_keys(UserName=userName)["AccessKeyMetadata"]:
+        key = dict(key)
+        lastUsed = None
+        if reportGeneratedTime is not None and key["CreateDate"] < reportGeneratedTime:
+            lastUsed = reportLastUsed.get(key["CreateDate"].replace(microsecond=0))
+        if lastUsed is None:
+            lastUsedDate = iam.get_access_key_last_used(AccessKeyId=key["AccessKeyId"])["AccessKeyLastUsed"].get("LastUsedDate")
+        elif lastUsed != "N/A":
+            lastUsedDate = datetime.datetime.fromisoformat(lastUsed)
+        else:
+            lastUsedDate = None
+        if lastUsedDate is not None:
+            key["LastUsedDate"] = lastUsedDate
+        keys.append(key)
+
+    accessKeys[userName] = keys
+    return accessKeys[userName]
+
+def get_roles_with_managed_policy(cache, session, policyArn):
+    """
+    Returns the Roles that a managed Policy is attached to, shaped like ListEntitiesForPolicy
+    """
+    return {
+        "PolicyRoles": [
+            {"RoleName": role["RoleName"], "RoleId": role["RoleId"]}
+            for role in get_authorization_details(cache, session)["Roles"].values()
+            if policyArn in [policy["PolicyArn"] for policy in role["AttachedManagedPolicies"]]
+        ]
+    }
+
 def get_account_summary(cache, session):
     response = cache.get("get_account_summary")
     if response:
@@ -124,7 +214,6 @@ def get_virtual_mfa(cache, session):
 @registry.register_check("iam")
 def iam_access_key_age_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.1] IAM Access Keys should be rotated every 90 days"""
-    iam = session.client("iam")
     todaysDatetime = datetime.datetime.now(datetime.timezone.utc)
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
@@ -132,7 +221,7 @@ def iam_access_key_age_check(cache: dict, session, awsAccountId: str, awsRegion:
         userName = users["UserName"]
         userArn = users["Arn"]
         # Get keys per User
-        for keys in iam.list_access_keys(UserName=userName)["AccessKeyMetadata"]:
+        for keys in get_access_keys(cache, session, userName):
             # B64 encode all of the details for the Asset
             assetJson = json.dumps(keys,default=str).encode("utf-8")
             assetB64 = base64.b64encode(assetJson)
@@ -478,6 +567,7 @@ def user_permission_boundary_check(cache: dict, session, awsAccountId: str, awsR
 def user_mfa_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.3] IAM users with passwords should have Multi-Factor Authentication (MFA) enabled"""
     iam = session.client("iam")
+    credentialReport = get_credential_report(cache, session)
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for users in get_iam_users(cache, session):
@@ -486,8 +576,12 @@ def user_mfa_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsP
         assetB64 = base64.b64encode(assetJson)
         userName = users["UserName"]
         userArn = users["Arn"]
+        reportRow = credentialReport.get(userName)
         # check if the user has a password - override MFA passing if not
-        if "PasswordLastUsed" not in users:
+        if reportRow:
+            passwordMfaPassing = reportRow["password_enabled"] != "true" or reportRow["mfa_active"] == "true"
+        # Users created since the credential report was generated
+        elif "PasswordLastUsed" not in users:
             passwordMfaPassing = True
         else:
             if not iam.list_mfa_devices(UserName=userName)["MFADevices"]:
@@ -662,7 +756,7 @@ def user_mfa_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsP
 @registry.register_check("iam")
 def user_inline_policy_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.4] IAM users should not have attached in-line policies"""
-    iam = session.client("iam")
+    userDetails = get_authorization_details(cache, session)["Users"]
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for users in get_iam_users(cache, session):
@@ -673,7 +767,7 @@ def user_inline_policy_check(cache: dict, session, awsAccountId: str, awsRegion:
         userArn = users["Arn"]
         # use a list comprehension to check if there are any inline policies
         # this is a failing check
-        if iam.list_user_policies(UserName=userName)["PolicyNames"]:
+        if userDetails[userName]["UserPolicyList"]:
             finding = {
                 "SchemaVersion": "2018-10-08",
                 "Id": f"{userArn}/iam-user-attach-inline-check",
@@ -834,7 +928,7 @@ def user_inline_policy_check(cache: dict, session, awsAccountId: str, awsRegion:
 @registry.register_check("iam")
 def user_direct_attached_policy_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.5] IAM users should not have attached managed policies"""
-    iam = session.client("iam")
+    userDetails = get_authorization_details(cache, session)["Users"]
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for users in get_iam_users(cache, session):
@@ -845,7 +939,7 @@ def user_direct_attached_policy_check(cache: dict, session, awsAccountId: str, a
         userArn = users["Arn"]
         # use a list comprehension to check if there are any attached managed policies
         # this is a failing check
-        if iam.list_attached_user_policies(UserName=userName)["AttachedPolicies"]:
+        if userDetails[userName]["AttachedManagedPolicies"]:
             finding = {
                 "SchemaVersion": "2018-10-08",
                 "Id": f"{userArn}/iam-user-attach-managed-policy-check",
@@ -1388,7 +1482,6 @@ def aws_iam_server_certifcates_check(cache: dict, session, awsAccountId: str, aw
 @registry.register_check("iam")
 def iam_created_managed_policy_least_priv_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.8] Managed policies should follow least privilege principles"""
-    iam = session.client("iam")
     # ISO time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     try:
@@ -1398,41 +1491,8 @@ def iam_created_managed_policy_least_priv_check(cache: dict, session, awsAccount
             assetB64 = base64.b64encode(assetJson)
             policyArn = mpolicy["Arn"]
             versionId = mpolicy["DefaultVersionId"]
-            policyDocument = iam.get_policy_version(
-                PolicyArn=policyArn,
-                VersionId=versionId
-            )["PolicyVersion"]["Document"]
-            #handle policies docs returned as strings
-            if type(policyDocument) == str:
-                policyDocument = json.loads(policyDocument)
-
-            try:
-                leastPrivilegeRating = "passing"
-                for statement in policyDocument["Statement"]:
-                    if statement["Effect"] == "Allow":
-                        if statement.get("Condition") == None: 
-                            # action structure could be a string or a list
-                            if type(statement["Action"]) == list: 
-                                if len(["True" for x in statement["Action"] if ":*" in x or "*" == x]) > 0:
-                                    if type(statement["Resource"]) == str and statement["Resource"] == "*":
-                                        leastPrivilegeRating = "failedHigh"
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement["Resource"]) == list: 
-                                        leastPrivilegeRating = "failedLow"
-
-                            # Single action in a statement
-                            elif type(statement["Action"]) == str:
-                                if ":*" in statement["Action"] or statement["Action"] == "*":
-                                    if type(statement["Resource"]) == str and statement["Resource"] == "*":
-                                        leastPrivilegeRating = "failedHigh"
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement["Resource"]) == list: 
-                                        leastPrivilegeRating = "failedLow"
-            except KeyError:
-                continue
-
+            policyDocument = get_policy_default_document(cache, session, policyArn)
+            leastPrivilegeRating = analyze_policy(policyDocument)["LeastPrivilegeRating"]
 
             if leastPrivilegeRating == "passing":
                 finding = {
@@ -1648,7 +1708,7 @@ def iam_created_managed_policy_least_priv_check(cache: dict, session, awsAccount
 @registry.register_check("iam")
 def iam_user_policy_least_priv_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.9] User inline policies should follow least privilege principles"""
-    iam = session.client("iam")
+    userDetails = get_authorization_details(cache, session)["Users"]
     try:
         for users in get_iam_users(cache, session):
             # B64 encode all of the details for the Asset
@@ -1657,44 +1717,12 @@ def iam_user_policy_least_priv_check(cache: dict, session, awsAccountId: str, aw
             userArn = users["Arn"]
             userName = users["UserName"]
 
-            policyNames = iam.list_user_policies(
-                UserName=userName
-            )["PolicyNames"]
-            for policyName in policyNames:
-                policyDocument = iam.get_user_policy(
-                    UserName=userName,
-                    PolicyName=policyName
-                )["PolicyDocument"]
-
-                #handle policies docs returned as strings
-                if type(policyDocument) == str:
-                    policyDocument = json.loads(policyDocument)
-
-                leastPrivilegeRating = "passing"
-                for statement in policyDocument["Statement"]:
-                    if statement["Effect"] == "Allow":
-                        if statement.get("Condition") == None: 
-                            # action structure could be a string or a list
-                            if type(statement["Action"]) == list: 
-                                if len(["True" for x in statement["Action"] if ":*" in x or "*" == x]) > 0:
-                                    if type(statement["Resource"]) == str and statement["Resource"] == "*":
-                                        leastPrivilegeRating = "failedHigh"
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement["Resource"]) == list: 
-                                        leastPrivilegeRating = "failedLow"
-
-                            # Single action in a statement
-                            elif type(statement["Action"]) == str:
-                                if ":*" in statement["Action"] or statement["Action"] == "*":
-                                    if type(statement["Resource"]) == str and statement["Resource"] == "*":
-                                        leastPrivilegeRating = "failedHigh"
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement["Resource"]) == list: 
-                                        leastPrivilegeRating = "failedLow"
-
-                iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
+            for inlinePolicy in userDetails[userName]["UserPolicyList"]:
+                policyName = inlinePolicy["PolicyName"]
+                policyDocument = inlinePolicy["PolicyDocument"]
+
+                leastPrivilegeRating = analyze_policy(policyDocument)["LeastPrivilegeRating"]
+
                 if leastPrivilegeRating == "passing":
                     finding = {
                         "SchemaVersion": "2018-10-08",
@@ -1924,7 +1952,7 @@ def iam_user_policy_least_priv_check(cache: dict, session, awsAccountId: str, aw
 @registry.register_check("iam")
 def iam_group_policy_least_priv_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.10] Group inline policies should follow least privilege principles"""
-    iam = session.client("iam")
+    groupDetails = get_authorization_details(cache, session)["Groups"]
     try:
         for group in get_iam_groups(cache, session):
             # B64 encode all of the details for the Asset
@@ -1933,44 +1961,12 @@ def iam_group_policy_least_priv_check(cache: dict, session, awsAccountId: str, a
             groupArn = group["Arn"]
             groupName = group["GroupName"]
 
-            policyNames = iam.list_group_policies(
-                GroupName=groupName
-            )["PolicyNames"]
-            for policyName in policyNames:
-                policyDocument = iam.get_group_policy(
-                    GroupName=groupName,
-                    PolicyName=policyName
-                )["PolicyDocument"]
-
-                #handle policies docs returned as strings
-                if type(policyDocument) == str:
-                    policyDocument = json.loads(policyDocument)
-
-                leastPrivilegeRating = "passing"
-                for statement in policyDocument["Statement"]:
-                    if statement["Effect"] == "Allow":
-                        if statement.get("Condition") == None: 
-                            # action structure could be a string or a list
-                            if type(statement["Action"]) == list: 
-                                if len(["True" for x in statement["Action"] if ":*" in x or "*" == x]) > 0:
-                                    if type(statement["Resource"]) == str and statement["Resource"] == "*":
-                                        leastPrivilegeRating = "failedHigh"
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement["Resource"]) == list: 
-                                        leastPrivilegeRating = "failedLow"
-
-                            # Single action in a statement
-                            elif type(statement["Action"]) == str:
-                                if ":*" in statement["Action"] or statement["Action"] == "*":
-                                    if type(statement["Resource"]) == str and statement["Resource"] == "*":
-                                        leastPrivilegeRating = "failedHigh"
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement["Resource"]) == list: 
-                                        leastPrivilegeRating = "failedLow"
-
-                iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
+            for inlinePolicy in groupDetails[groupName]["GroupPolicyList"]:
+                policyName = inlinePolicy["PolicyName"]
+                policyDocument = inlinePolicy["PolicyDocument"]
+
+                leastPrivilegeRating = analyze_policy(policyDocument)["LeastPrivilegeRating"]
+
                 if leastPrivilegeRating == "passing":
                     finding = {
                         "SchemaVersion": "2018-10-08",
@@ -2200,7 +2196,7 @@ def iam_group_policy_least_priv_check(cache: dict, session, awsAccountId: str, a
 @registry.register_check("iam")
 def iam_role_policy_least_priv_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.11] Role inline policies should follow least privilege principles"""
-    iam = session.client("iam")
+    roleDetails = get_authorization_details(cache, session)["Roles"]
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     try:
         for role in get_iam_roles(cache, session):
@@ -2210,43 +2206,12 @@ def iam_role_policy_least_priv_check(cache: dict, session, awsAccountId: str, aw
             roleArn = role["Arn"]
             roleName = role["RoleName"]
 
-            policyNames = iam.list_role_policies(
-                RoleName=roleName
-            )["PolicyNames"]
-            for policyName in policyNames:
-                policyDocument = iam.get_role_policy(
-                    RoleName=roleName,
-                    PolicyName=policyName
-                )["PolicyDocument"]
-
-                #handle policies docs returned as strings
-                if type(policyDocument) == str:
-                    policyDocument = json.loads(policyDocument)
-
-                leastPrivilegeRating = "passing"
-                for statement in policyDocument["Statement"]:
-                    if statement["Effect"] == "Allow":
-                        if statement.get("Condition") == None: 
-                            # action structure could be a string or a list
-                            if type(statement["Action"]) == list: 
-                                if len(["True" for x in statement["Action"] if ":*" in x or "*" == x]) > 0:
-                                    if type(statement["Resource"]) == str and statement["Resource"] == "*":
-                                        leastPrivilegeRating = "failedHigh"
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement["Resource"]) == list: 
-                                        leastPrivilegeRating = "failedLow"
-
-                            # Single action in a statement
-                            elif type(statement["Action"]) == str:
-                                if ":*" in statement["Action"] or statement["Action"] == "*":
-                                    if type(statement["Resource"]) == str and statement["Resource"] == "*":
-                                        leastPrivilegeRating = "failedHigh"
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement["Resource"]) == list: 
-                                        leastPrivilegeRating = "failedLow"
-                
+            for inlinePolicy in roleDetails[roleName]["RolePolicyList"]:
+                policyName = inlinePolicy["PolicyName"]
+                policyDocument = inlinePolicy["PolicyDocument"]
+
+                leastPrivilegeRating = analyze_policy(policyDocument)["LeastPrivilegeRating"]
+
                 if leastPrivilegeRating == "passing":
                     finding = {
                         "SchemaVersion": "2018-10-08",
@@ -3005,7 +2970,6 @@ def aws_iam_root_user_hardware_mfa_check(cache: dict, session, awsAccountId: str
 @registry.register_check("iam")
 def iam_access_key_unused_fortyfive_days_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.15] AWS IAM Access Keys that have not been used in the last 45 days should be disabled"""
-    iam = session.client("iam")
     todaysDatetime = datetime.datetime.now(datetime.timezone.utc)
     fortyFiveDayDelta = datetime.timedelta(days=45)
     # ISO Time
@@ -3013,15 +2977,14 @@ def iam_access_key_unused_fortyfive_days_check(cache: dict, session, awsAccountI
     for users in get_iam_users(cache, session):
         userName = users["UserName"]
         # Get keys per User
-        for keys in iam.list_access_keys(UserName=userName)["AccessKeyMetadata"]:
+        for keys in get_access_keys(cache, session, userName):
             # B64 encode all of the details for the Asset
             assetJson = json.dumps(keys,default=str).encode("utf-8")
             assetB64 = base64.b64encode(assetJson)
             keyUserName = keys["UserName"]
             keyId = keys["AccessKeyId"]
             keyArn = f"arn:{awsPartition}:iam::{awsAccountId}:user/{keyUserName}/access-key/{keyId}"
-            lastUsed = iam.get_access_key_last_used(AccessKeyId=keyId)["AccessKeyLastUsed"]
-            if "LastUsedDate" not in lastUsed or lastUsed["LastUsedDate"] < (todaysDatetime - fortyFiveDayDelta):
+            if "LastUsedDate" not in keys or keys["LastUsedDate"] < (todaysDatetime - fortyFiveDayDelta):
                 # this is a failing check
                 finding = {
                     "SchemaVersion": "2018-10-08",
@@ -3553,14 +3516,13 @@ def aws_iam_access_analyzer_enabled_check(cache: dict, session, awsAccountId: st
 @registry.register_check("iam")
 def iam_user_multiple_access_key_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.18] AWS IAM Users should never have more than one IAM Access Key"""
-    iam = session.client("iam")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for users in get_iam_users(cache, session):
         userName = users["UserName"]
         userArn = users["Arn"]
         # Check for more than one key
-        accessKeys = iam.list_access_keys(UserName=userName)["AccessKeyMetadata"]
+        accessKeys = get_access_keys(cache, session, userName)
         # B64 encode all of the details for the Asset
         assetJson = json.dumps(accessKeys,default=str).encode("utf-8")
         assetB64 = base64.b64encode(assetJson)
@@ -3736,23 +3698,16 @@ def iam_user_multiple_access_key_check(cache: dict, session, awsAccountId: str,
 @registry.register_check("iam")
 def aws_support_iam_role_in_use_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.19] An IAM Role should be configured to allow incident management capability with AWS Support"""
-    iam = session.client("iam")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     # check if the support policy exists and is attached to a role
     iamSupportRoleEnabled = False
-    supportPolicy = [policy for policy in get_managed_policies(cache, session) if policy["PolicyName"] == "AWSSupportAccess"]
-    if supportPolicy:
-        entityAttachment = iam.list_entities_for_policy(
-            PolicyArn="arn:aws:iam::aws:policy/AWSSupportAccess",
-            EntityFilter="Role",
-            PolicyUsageFilter="PermissionsPolicy"
-        )
-        # B64 encode all of the details for the Asset
-        assetJson = json.dumps(entityAttachment,default=str).encode("utf-8")
-        assetB64 = base64.b64encode(assetJson)
-        if entityAttachment["PolicyRoles"]:
-            iamSupportRoleEnabled = True
+    entityAttachment = get_roles_with_managed_policy(cache, session, f"arn:{awsPartition}:iam::aws:policy/AWSSupportAccess")
+    # B64 encode all of the details for the Asset
+    assetJson = json.dumps(entityAttachment,default=str).encode("utf-8")
+    assetB64 = base64.b64encode(assetJson)
+    if entityAttachment["PolicyRoles"]:
+        iamSupportRoleEnabled = True
 
     # this is a failing check
     if iamSupportRoleEnabled is False:
@@ -3897,16 +3852,11 @@ def aws_support_iam_role_in_use_check(cache: dict, session, awsAccountId: str, a
 @registry.register_check("iam")
 def cloud_shell_iam_role_in_use_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.20] No AWS IAM Role should have the AWSCloudShellFullAccess policy attached to reduce exfiltration risk"""
-    iam = session.client("iam")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     # check if the support policy exists and is attached to a role
     fullCloudShellRoleUsed = False
-    entityAttachment = iam.list_entities_for_policy(
-        PolicyArn="arn:aws:iam::aws:policy/AWSCloudShellFullAccess",
-        EntityFilter="Role",
-        PolicyUsageFilter="PermissionsPolicy"
-    )
+    entityAttachment = get_roles_with_managed_policy(cache, session, f"arn:{awsPartition}:iam::aws:policy/AWSCloudShellFullAccess")
     # B64 encode all of the details for the Asset
     assetJson = json.dumps(entityAttachment,default=str).encode("utf-8")
     assetB64 = base64.b64encode(assetJson)
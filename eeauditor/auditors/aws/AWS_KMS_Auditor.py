@@ -19,6 +19,7 @@
 #under the License.
 
 from check_register import CheckRegister
+from policy_analysis import analyze_policy
 import datetime
 from botocore.exceptions import ClientError
 import base64
@@ -240,22 +241,12 @@ def kms_key_exposed_check(cache: dict, session, awsAccountId: str, awsRegion: st
             # override the asset info
             del assetB64
             assetB64 = base64.b64encode(json.dumps(keyData,default=str).encode("utf-8"))
-            # Pull out the Policy
-            policy = json.loads(
-                kms.get_key_policy(KeyId=keyid, PolicyName="default")["Policy"]
-            )
-            keyExposureStatus = "NOT_EXPOSED"
-            # Begin policy eval
-            for sid in policy["Statement"]:
-                if sid["Principal"] == "*":
-                    access = "*"
-                else:
-                    access = sid["Principal"].get("AWS", None)
-                if access != "*" or (access == "*" and "Condition" in sid):
-                    continue
-                else:
-                    keyExposureStatus = "EXPOSED"
-                    break
+            # Pull out the Policy and check for an unconditional Allow to every Principal
+            policy = kms.get_key_policy(KeyId=keyid, PolicyName="default")["Policy"]
+            if analyze_policy(policy)["IsPublic"]:
+                keyExposureStatus = "EXPOSED"
+            else:
+                keyExposureStatus = "NOT_EXPOSED"
         except ClientError or KeyError:
             keyExposureStatus = "UNKNOWN"
 
@@ -20,6 +20,7 @@
 
 import datetime
 from check_register import CheckRegister
+from inventory import get_inventory
 import base64
 import json
 
@@ -54,19 +55,7 @@ def list_associations(cache, session):
         return cache["list_associations"]
 
 def describe_instances(cache, session):
-    ec2 = session.client("ec2")
-    instanceList = []
-    response = cache.get("describe_instances")
-    if response:
-        return response
-    paginator = ec2.get_paginator("describe_instances")
-    if paginator:
-        for page in paginator.paginate(Filters=[{"Name": "instance-state-name","Values": ["running","stopped"]}]):
-            for r in page["Reservations"]:
-                for i in r["Instances"]:
-                    instanceList.append(i)
-        cache["describe_instances"] = instanceList
-        return cache["describe_instances"]
+    return get_inventory(cache, session, "ec2.describe_instances")
 
 @registry.register_check("ssm")
 def ssm_self_owned_document_public_share_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
@@ -20,26 +20,20 @@
 
 import datetime
 from check_register import CheckRegister
+from inventory import get_inventory
 import base64
 import json
 
 registry = CheckRegister()
 
 def describe_db_instances(cache, session):
-    documentdb = session.client("docdb")
-    docdbInstances = []
     response = cache.get("describe_db_instances")
     if response:
         return response
-    paginator = documentdb.get_paginator('describe_db_instances')
-    if paginator:
-        # paginate all DB instances (since every single RDS-namespace is returned)
-        # and only add pages that are within the docdb engine
-        for page in paginator.paginate():
-            for docdbi in page["DBInstances"]:
-                if docdbi["Engine"] == "docdb":
-                    docdbInstances.append(docdbi)
-    cache["describe_db_instances"] = docdbInstances
+    # every single RDS-namespace DB instance is returned, only keep the ones within the docdb engine
+    cache["describe_db_instances"] = [
+        docdbi for docdbi in get_inventory(cache, session, "rds.describe_db_instances") if docdbi["Engine"] == "docdb"
+    ]
     return cache["describe_db_instances"]
 
 def describe_db_clusters(cache, session):
@@ -23,6 +23,9 @@ import os
 import sys
 from botocore.config import Config
 from check_register import CheckRegister
+from inspector_findings import get_inspector_package_vulnerabilities
+from threat_intel import get_cisa_kev
+from inventory import get_inventory
 from botocore.exceptions import ClientError
 import requests
 import datetime
@@ -49,42 +52,21 @@ def describe_instances(cache, session):
     
     instanceList = []
     
-    ec2 = session.client("ec2")
-    ssm = session.client("ssm", config=config)
     # Enrich EC2 with SSM details - this is done for the EC2 Auditor - all others using EC2 don't matter too much
-    managedInstances = ssm.describe_instance_information()["InstanceInformationList"]
+    managedInstances = {
+        mnginst["InstanceId"]: mnginst for mnginst in get_inventory(cache, session, "ssm.describe_instance_information")
+    }
 
-    for page in ec2.get_paginator("describe_instances").paginate(
-            Filters=[
-                {
-                    "Name": "instance-state-name",
-                    "Values": [ 
-                        "running",
-                        "stopped" 
-                    ]
-                }
-            ]
-        ):
-        for r in page["Reservations"]:
-            for i in r["Instances"]:
-                # Skip Spot Instances, based on the fleet ID or status
-                try:
-                    if i["InstanceLifecycle"] == "spot":
-                        continue
-                except KeyError:
-                    pass
-                try:
-                    i["SpotInstanceRequestId"]
-                    continue
-                except KeyError:
-                    pass
-                # Use a list comprehension to attempt to get SSM info for the instance
-                managedInstanceInfo = [mnginst for mnginst in managedInstances if mnginst["InstanceId"] == i["InstanceId"]]
-                i["ManagedInstanceInformation"] = managedInstanceInfo
-                instanceList.append(i)
+    # The Instances are shared with other Auditors, so they are copied before being enriched
+    for i in get_inventory(cache, session, "ec2.describe_instances"):
+        # Skip Spot Instances, based on the fleet ID or status
+        if i.get("InstanceLifecycle") == "spot" or "SpotInstanceRequestId" in i:
+            continue
+        managedInstanceInfo = [managedInstances[i["InstanceId"]]] if i["InstanceId"] in managedInstances else []
+        instanceList.append({**i, "ManagedInstanceInformation": managedInstanceInfo})
 
-        cache["describe_instances"] = instanceList
-        return cache["describe_instances"]
+    cache["describe_instances"] = instanceList
+    return cache["describe_instances"]
 
 def describe_elastic_ips(cache, session):
     response = cache.get("describe_elastic_ips")
@@ -96,52 +78,21 @@ def describe_elastic_ips(cache, session):
     cache["describe_elastic_ips"] = ec2.describe_addresses()["Addresses"]
     return cache["describe_elastic_ips"]
 
-def get_cisa_kev():
-    """
-    Retrieves the U.S. CISA's Known Exploitable Vulnerabilities (KEV) Catalog and returns a list of CVE ID's
-    """
-
-    rawKev = json.loads(requests.get("https://www.cisa.gov/sites/default/files/feeds/known_exploited_vulnerabilities.json").text)["vulnerabilities"]
-
-    kevCves = [cve["cveID"] for cve in rawKev]
-
-    return kevCves
-
-def find_exploitable_vulnerabilities_for_instance(session, instanceId):
+def find_exploitable_vulnerabilities_for_instance(cache, session, instanceId):
     """
     This function uses the CISA KEV and Amazon Inspector V2 to determine if an EC2 Instance has any vulnerabilities
-    and if it does, if they are exploitable. A Bool for the exploitability, a reason for not having any, and a list
-    of explotiable vulnerabilities are returned
+    and if it does, if they are exploitable. A Bool for the exploitability and a list of explotiable vulnerabilities 
+    are returned. Inspector findings are retrieved once per Account & Region and looked up by the Instance ID
     """
-    inspector = session.client("inspector2")
-
     kev = get_cisa_kev()
 
-    # Filter Inspector findings to the specific Instance and for Package Vulnerabilities only (ignore Reachability)
-    inspectorFindings = inspector.list_findings(
-        filterCriteria={
-            "resourceId": [
-                {
-                    "comparison": "EQUALS",
-                    "value": instanceId
-                }
-            ],
-            "findingType": [
-                {
-                    "comparison": "EQUALS",
-                    "value": "PACKAGE_VULNERABILITY"
-                }
-            ]
-        }
-    )["findings"]
-    if not inspectorFindings:
-        exploitable = False
-        exploitableCves = []
-    # Use a list comprehension to pull out any Inspector vulnerabilities which are tagged as explotiable or that are in the KEV and extend the list above
+    # Active Package Vulnerabilities only (ignore Reachability) for every EC2 Instance, indexed by the Instance ID
+    inspectorFindings = get_inspector_package_vulnerabilities(cache, session, "AWS_EC2_INSTANCE").get(instanceId, [])
+
+    # Use a list comprehension to pull out any Inspector vulnerabilities which are tagged as explotiable or that are in the KEV
     exploitableCves = [
         finding["packageVulnerabilityDetails"]["vulnerabilityId"] for finding in inspectorFindings
-        if finding["status"] == "ACTIVE" 
-        and finding["exploitAvailable"] == "YES"
+        if finding.get("exploitAvailable") == "YES"
         or finding["packageVulnerabilityDetails"]["vulnerabilityId"] in kev
     ]
     if not exploitableCves:
@@ -2742,7 +2693,7 @@ def ec2_instance_exploitable_vulnerability_check(cache: dict, session, awsAccoun
             instanceLaunchedAt = i["LaunchTime"]
 
         # Call helper function to see if the instance has explotiable vulns, and if so, which ones
-        exploitInfo = find_exploitable_vulnerabilities_for_instance(session, instanceId)        
+        exploitInfo = find_exploitable_vulnerabilities_for_instance(cache, session, instanceId)        
            
         if exploitInfo[0] is True:
             cveSentence = ", ".join(exploitInfo[1])
@@ -27,20 +27,14 @@ import ipaddress
 import datetime
 from botocore.exceptions import ClientError
 from check_register import CheckRegister
+from inventory import get_inventory
 import base64
 import json
 
 registry = CheckRegister()
 
 def describe_load_balancers(cache, session):
-    response = cache.get("describe_load_balancers")
-    if response:
-        return response
-    
-    elbv2 = session.client("elbv2")
-
-    cache["describe_load_balancers"] = elbv2.describe_load_balancers()["LoadBalancers"]
-    return cache["describe_load_balancers"]
+    return get_inventory(cache, session, "elbv2.describe_load_balancers")
 
 SHODAN_HOSTS_URL = "https://api.shodan.io/shodan/host/"
 
@@ -133,7 +127,7 @@ def google_dns_resolver(target):
 @registry.register_check("elasticloadbalancingv2")
 def elbv2_alb_logging_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[ELBv2.1] Application Load Balancers should have access logging enabled"""
-    elbv2 = session.client("elbv2")
+    elbv2 = session.memoized_client("elbv2")
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
     for lb in describe_load_balancers(cache, session):
@@ -371,7 +365,7 @@ def elbv2_alb_logging_check(cache: dict, session, awsAccountId: str, awsRegion:
 @registry.register_check("elasticloadbalancingv2")
 def elbv2_deletion_protection_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[ELBv2.2] Application and Network Load Balancers should have deletion protection enabled"""
-    elbv2 = session.client("elbv2")
+    elbv2 = session.memoized_client("elbv2")
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
     for lb in describe_load_balancers(cache, session):
@@ -578,7 +572,7 @@ def elbv2_deletion_protection_check(cache: dict, session, awsAccountId: str, aws
 @registry.register_check("elasticloadbalancingv2")
 def elbv2_internet_facing_secure_listeners_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[ELBv2.3] Internet-facing Application and Network Load Balancers should have secure listeners configured"""
-    elbv2 = session.client("elbv2")
+    elbv2 = session.memoized_client("elbv2")
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
     for lb in describe_load_balancers(cache, session):
@@ -744,7 +738,7 @@ def elbv2_internet_facing_secure_listeners_check(cache: dict, session, awsAccoun
 @registry.register_check("elasticloadbalancingv2")
 def elbv2_tls12_listener_policy_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[ELBv2.4] Application and Network Load Balancers with HTTPS or TLS listeners should enforce TLS 1.2 or TLS 1.3 policies"""
-    elbv2 = session.client("elbv2")
+    elbv2 = session.memoized_client("elbv2")
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
     # valid TLS 1.2 and 1.3 Policies
@@ -941,7 +935,7 @@ def elbv2_tls12_listener_policy_check(cache: dict, session, awsAccountId: str, a
 @registry.register_check("elasticloadbalancingv2")
 def elbv2_drop_invalid_header_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[ELBv2.5] Application Load Balancers should drop invalid HTTP header fields"""
-    elbv2 = session.client("elbv2")
+    elbv2 = session.memoized_client("elbv2")
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
     for lb in describe_load_balancers(cache, session):
@@ -1110,7 +1104,7 @@ def elbv2_drop_invalid_header_check(cache: dict, session, awsAccountId: str, aws
 @registry.register_check("elasticloadbalancingv2")
 def elbv2_nlb_tls_logging_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[ELBv2.6] Network Load Balancers with TLS listeners should have access logging enabled"""
-    elbv2 = session.client("elbv2")
+    elbv2 = session.memoized_client("elbv2")
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
     for lb in describe_load_balancers(cache, session):
@@ -1354,7 +1348,7 @@ def elbv2_nlb_tls_logging_check(cache: dict, session, awsAccountId: str, awsRegi
 @registry.register_check("elasticloadbalancingv2")
 def elbv2_alb_http_desync_protection_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[ELBv2.7] Application Load Balancers should have HTTP Desync protection enabled"""
-    elbv2 = session.client("elbv2")
+    elbv2 = session.memoized_client("elbv2")
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
     for lb in describe_load_balancers(cache, session):
@@ -1550,7 +1544,7 @@ def elbv2_alb_http_desync_protection_check(cache: dict, session, awsAccountId: s
 @registry.register_check("elasticloadbalancingv2")
 def elbv2_alb_sg_risk_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[ELBv2.8] Application Load Balancer security groups should not allow non-Listener ports access"""
-    elbv2 = session.client("elbv2")
+    elbv2 = session.memoized_client("elbv2")
     ec2 = session.client("ec2")
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
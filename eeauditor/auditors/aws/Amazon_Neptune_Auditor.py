@@ -20,19 +20,22 @@
 
 import datetime
 from check_register import CheckRegister
+from inventory import get_inventory
 import base64
 import json
 
 registry = CheckRegister()
 
 def describe_db_instances(cache, session):
-    neptune = session.client("neptune")
     response = cache.get("describe_db_instances")
     if response:
         return response
-    cache["describe_db_instances"] = neptune.describe_db_instances(
-        Filters=[{"Name": "engine", "Values": ["neptune"]}]
-    )
+    # every single RDS-namespace DB instance is returned, only keep the ones within the neptune engine
+    cache["describe_db_instances"] = {
+        "DBInstances": [
+            dbi for dbi in get_inventory(cache, session, "rds.describe_db_instances") if dbi["Engine"] == "neptune"
+        ]
+    }
     return cache["describe_db_instances"]
 
 def describe_db_clusters(cache, session):
@@ -19,6 +19,7 @@
 #under the License.
 
 from check_register import CheckRegister
+from inventory import get_inventory
 import tomli
 import os
 import sys
@@ -121,42 +122,32 @@ def google_dns_resolver(target):
         return None
 
 def describe_db_instances(cache, session):
-    rds = session.client("rds")
-    dbInstances = []
     response = cache.get("describe_db_instances")
     if response:
         return response
-    paginator = rds.get_paginator('describe_db_instances')
-    if paginator:
-        for page in paginator.paginate(
-            Filters=[
-                {
-                    "Name": "engine",
-                    "Values": [
-                        "aurora-mysql",
-                        "aurora-postgresql",
-                        "mariadb",
-                        "mysql",
-                        "oracle-ee",
-                        "oracle-ee-cdb",
-                        "oracle-se2",
-                        "oracle-se2-cdb",
-                        "postgres",
-                        "sqlserver-ee",
-                        "sqlserver-se",
-                        "sqlserver-ex",
-                        "sqlserver-web"
-                    ]
-                }
-            ]
-        ):
-            for dbinstance in page["DBInstances"]:
-                dbInstances.append(dbinstance)
-    cache["describe_db_instances"] = dbInstances
+    # The RDS namespace also contains DocumentDB and Neptune, only keep the RDS engines
+    rdsEngines = [
+        "aurora-mysql",
+        "aurora-postgresql",
+        "mariadb",
+        "mysql",
+        "oracle-ee",
+        "oracle-ee-cdb",
+        "oracle-se2",
+        "oracle-se2-cdb",
+        "postgres",
+        "sqlserver-ee",
+        "sqlserver-se",
+        "sqlserver-ex",
+        "sqlserver-web"
+    ]
+    cache["describe_db_instances"] = [
+        dbinstance for dbinstance in get_inventory(cache, session, "rds.describe_db_instances") if dbinstance["Engine"] in rdsEngines
+    ]
     return cache["describe_db_instances"]
 
 def describe_db_snapshots(cache, session):
-    rds = session.client("rds")
+    rds = session.memoized_client("rds")
     dbSnaps = []
     response = cache.get("describe_db_snapshots")
     if response:
@@ -170,7 +161,7 @@ def describe_db_snapshots(cache, session):
         return cache["describe_db_snapshots"]
 
 def describe_db_clusters(cache, session):
-    rds = session.client("rds")
+    rds = session.memoized_client("rds")
     dbClusters = []
     response = cache.get("describe_db_clusters")
     if response:
@@ -2090,7 +2081,7 @@ def rds_snapshot_encryption_check(cache: dict, session, awsAccountId: str, awsRe
 @registry.register_check("rds")
 def rds_snapshot_public_share_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[RDS.10] Amazon Relational Database Service (RDS) snapshots should not be publicly shared"""
-    rds = session.client("rds")
+    rds = session.memoized_client("rds")
     # ISO Time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for snapshot in describe_db_snapshots(cache, session):
@@ -2665,7 +2656,7 @@ def rds_aurora_cluster_encryption_check(cache: dict, session, awsAccountId: str,
 @registry.register_check("rds")
 def rds_instance_snapshot_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[RDS.13] Amazon Relational Database Service (RDS) instances should have at least one backup to promote resilience"""
-    rds = session.client("rds")
+    rds = session.memoized_client("rds")
     # ISO time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for dbinstances in describe_db_instances(cache, session):
@@ -2859,7 +2850,7 @@ def rds_instance_snapshot_check(cache: dict, session, awsAccountId: str, awsRegi
 @registry.register_check("rds")
 def rds_instance_secgroup_risk_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[RDS.14] Amazon Relational Database Service (RDS) instance security groups should not allow public access to DB ports"""
-    ec2 = session.client("ec2")
+    ec2 = session.memoized_client("ec2")
     # ISO time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     for dbinstances in describe_db_instances(cache, session):
@@ -3056,7 +3047,7 @@ def rds_instance_secgroup_risk_check(cache: dict, session, awsAccountId: str, aw
 @registry.register_check("rds")
 def rds_instance_instance_alerting_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[RDS.15] Amazon Relational Database Service (RDS) instances should be monitored for important events using Event Subscriptions"""
-    rds = session.client("rds")
+    rds = session.memoized_client("rds")
     # ISO time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     # Determine if there are any alerts at all via list comprehension - fail if empty
@@ -3343,7 +3334,7 @@ def rds_instance_instance_alerting_check(cache: dict, session, awsAccountId: str
 @registry.register_check("rds")
 def rds_instance_parameter_group_alerting_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[RDS.16] Amazon Relational Database Service (RDS) parameter groups should be monitored for important events using Event Subscriptions"""
-    rds = session.client("rds")
+    rds = session.memoized_client("rds")
     # ISO time
     iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     # Determine if there are any alerts at all via list comprehension - fail if empty
@@ -19,6 +19,7 @@
 #under the License.
 
 from check_register import CheckRegister
+from policy_analysis import analyze_policy
 import datetime
 import base64
 import json
@@ -1471,15 +1472,9 @@ def aws_s3_bucket_deny_http_access_check(cache: dict, session, awsAccountId: str
         # Attempt to find a blocking policy for HTTP - default the status to not passing
         blockHttpObjectAccess = False
         try:
-            bucketPolicy = json.loads(s3.get_bucket_policy(Bucket=bucketName)["Policy"])
-            for statement in bucketPolicy["Statement"]:
-                if s3Arn and f"{s3Arn}/*" in statement["Resource"]:
-                    if statement["Effect"] == "Deny" and statement["Action"] == "s3:*":
-                        if "Condition" in statement:
-                            if "Bool" in statement["Condition"]:
-                                if statement["Condition"]["Bool"].get("aws:SecureTransport") == "false":
-                                    blockHttpObjectAccess = True
-                                    break
+            bucketPolicy = s3.get_bucket_policy(Bucket=bucketName)["Policy"]
+            if f"{s3Arn}/*" in analyze_policy(bucketPolicy)["InsecureTransportDeniedResources"]:
+                blockHttpObjectAccess = True
         except ClientError:
             blockHttpObjectAccess = False
         
@@ -21,6 +21,7 @@
 import datetime
 import json
 from check_register import CheckRegister
+from policy_analysis import analyze_policy
 import base64
 
 registry = CheckRegister()
@@ -330,20 +331,8 @@ def sns_public_access_check(cache: dict, session, awsAccountId: str, awsRegion:
             f"arn:{awsPartition}:sns:{awsRegion}:{awsAccountId}:", ""
         )
         response = sns.get_topic_attributes(TopicArn=topicarn)
-        statement_json = response["Attributes"]["Policy"]
-        statement = json.loads(statement_json)
-        fail = False
         # this results in one finding per topic instead of one finding per statement
-        for sid in statement["Statement"]:
-            if sid["Principal"] == "*":
-                access = "*"
-            else:
-                access = sid["Principal"].get("AWS", None)
-            if access != "*" or (access == "*" and "Condition" in sid):
-                continue
-            else:
-                fail = True
-                break
+        fail = analyze_policy(response["Attributes"]["Policy"])["IsPublic"]
         if not fail:
             finding = {
                 "SchemaVersion": "2018-10-08",
@@ -575,27 +564,8 @@ def sns_cross_account_check(cache: dict, session, awsAccountId: str, awsRegion:
             f"arn:{awsPartition}:sns:{awsRegion}:{awsAccountId}:", ""
         )
         response = sns.get_topic_attributes(TopicArn=topicarn)
-        myPolicy_json = str(response["Attributes"]["Policy"])
-        myPolicy = json.loads(myPolicy_json)
-        fail = False
-        for statement in myPolicy["Statement"]:
-            if statement["Principal"] == "*":
-                continue
-            else:
-                principal = statement["Principal"].get("AWS", None)
-            if principal:
-                if not principal.isdigit():
-                    # This assumes if it is not a digit that it must be an arn.
-                    # not sure if this is a safe assumption.
-                    try:
-                        principal = principal.split(":")[4]
-                    except IndexError:
-                        continue
-                if principal == awsAccountId:
-                    continue
-                else:
-                    fail = True
-                    break
+        principalAccounts = analyze_policy(response["Attributes"]["Policy"])["PrincipalAccounts"]
+        fail = any(account != awsAccountId for account in principalAccounts)
         if not fail:
             finding = {
                 "SchemaVersion": "2018-10-08",
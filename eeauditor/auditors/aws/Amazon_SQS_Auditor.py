@@ -19,6 +19,7 @@
 #under the License.
 
 from check_register import CheckRegister
+from policy_analysis import analyze_policy
 import datetime
 import base64
 import json
@@ -354,12 +355,7 @@ def sqs_queue_public_accessibility_check(cache: dict, session, awsAccountId: str
         # set the Bool for the Queue not being public, override it in the event it IS public or if there is not a policy
         queueIsPublic = False
         try:
-            queuePolicy=json.loads(queue["Attributes"]["Policy"])
-            for statement in queuePolicy["Statement"]:
-                if statement["Effect"] == "Allow":
-                    if statement.get("Principal") == "*":
-                        if statement.get("Condition") is None: 
-                            queueIsPublic = True
+            queueIsPublic = analyze_policy(queue["Attributes"]["Policy"])["IsPublic"]
         except KeyError:
             queueIsPublic = True
         # this is a failing function
@@ -18,27 +18,16 @@
 #specific language governing permissions and limitations
 #under the License.
 
-import nmap3
 import datetime
 from check_register import CheckRegister
+from attack_surface_scanner import scan_host, prefetch_hosts
 from dateutil.parser import parse
 import base64
 import json
-from botocore.config import Config
-
-# Adding backoff and retries for SSM - this API gets throttled a lot
-config = Config(
-   retries = {
-      'max_attempts': 10,
-      'mode': 'adaptive'
-   }
-)
+from inventory import get_inventory
 
 registry = CheckRegister()
 
-# Instantiate a NMAP scanner for TCP scans to define ports
-nmap = nmap3.NmapScanTechniques()
-
 def global_region_generator(awsPartition):
     # Global Service Region override
     if awsPartition == "aws":
@@ -65,42 +54,21 @@ def describe_instances(cache, session):
     
     instanceList = []
     
-    ec2 = session.client("ec2")
-    ssm = session.client("ssm", config=config)
     # Enrich EC2 with SSM details - this is done for the EC2 Auditor - all others using EC2 don't matter too much
-    managedInstances = ssm.describe_instance_information()["InstanceInformationList"]
+    managedInstances = {
+        mnginst["InstanceId"]: mnginst for mnginst in get_inventory(cache, session, "ssm.describe_instance_information")
+    }
 
-    for page in ec2.get_paginator("describe_instances").paginate(
-            Filters=[
-                {
-                    "Name": "instance-state-name",
-                    "Values": [ 
-                        "running",
-                        "stopped" 
-                    ]
-                }
-            ]
-        ):
-        for r in page["Reservations"]:
-            for i in r["Instances"]:
-                # Skip Spot Instances, based on the fleet ID or status
-                try:
-                    if i["InstanceLifecycle"] == "spot":
-                        continue
-                except KeyError:
-                    pass
-                try:
-                    i["SpotInstanceRequestId"]
-                    continue
-                except KeyError:
-                    pass
-                # Use a list comprehension to attempt to get SSM info for the instance
-                managedInstanceInfo = [mnginst for mnginst in managedInstances if mnginst["InstanceId"] == i["InstanceId"]]
-                i["ManagedInstanceInformation"] = managedInstanceInfo
-                instanceList.append(i)
+    # The Instances are shared with other Auditors, so they are copied before being enriched
+    for i in get_inventory(cache, session, "ec2.describe_instances"):
+        # Skip Spot Instances, based on the fleet ID or status
+        if i.get("InstanceLifecycle") == "spot" or "SpotInstanceRequestId" in i:
+            continue
+        managedInstanceInfo = [managedInstances[i["InstanceId"]]] if i["InstanceId"] in managedInstances else []
+        instanceList.append({**i, "ManagedInstanceInformation": managedInstanceInfo})
 
-        cache["describe_instances"] = instanceList
-        return cache["describe_instances"]
+    cache["describe_instances"] = instanceList
+    return cache["describe_instances"]
     
 def describe_elastic_ips(cache, session):
     response = cache.get("describe_elastic_ips")
@@ -113,24 +81,10 @@ def describe_elastic_ips(cache, session):
     return cache["describe_elastic_ips"]
 
 def describe_load_balancers(cache, session):
-    response = cache.get("describe_load_balancers")
-    if response:
-        return response
-    
-    elbv2 = session.client("elbv2")
-
-    cache["describe_load_balancers"] = elbv2.describe_load_balancers()["LoadBalancers"]
-    return cache["describe_load_balancers"]
+    return get_inventory(cache, session, "elbv2.describe_load_balancers")
 
 def describe_clbs(cache, session):
-    response = cache.get("describe_load_balancers")
-    if response:
-        return response
-    
-    elb = session.client("elb")
-
-    cache["describe_load_balancers"] = elb.describe_load_balancers()["LoadBalancerDescriptions"]
-    return cache["describe_load_balancers"]
+    return get_inventory(cache, session, "elb.describe_load_balancers")
 
 def cloudfront_paginate(cache, session):
     cloudfront = session.client("cloudfront")
@@ -168,26 +122,15 @@ def get_public_hosted_zones(cache, session):
         cache["get_hosted_zones"] = zones
         return cache["get_hosted_zones"]
 
-# This function performs the actual NMAP Scan
-def scan_host(host_ip, host_name, asset_type):
-    try:
-        results = nmap.nmap_tcp_scan(
-            host_ip,
-            # FTP, SSH, TelNet, SMTP, HTTP, POP3, NetBIOS, SMB, RDP, MSSQL, MySQL/MariaDB, NFS, Docker, Oracle, PostgreSQL, 
-            # Kibana, VMWare, Proxy, Splunk, K8s, Redis, Kafka, Mongo, Rabbit/AmazonMQ, SparkUI
-            args="-Pn -p 21,22,23,25,80,110,139,445,3389,1433,3306,2049,2375,1521,5432,5601,8182,8080,8089,10250,6379,9092,27017,5672,4040"
-        )
-
-        print(f"Scanning {asset_type} {host_name} on {host_ip}")
-        return results
-    except KeyError:
-        results = None
-
 @registry.register_check("ec2")
 def ec2_attack_surface_open_tcp_port_check(cache: dict, session, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[AttackSurface.EC2.{checkIdNumber}] EC2 Instances should not be publicly reachable on {serviceName}"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    # Queue concurrent Nmap scans for every public Instance, results are read back from the shared scan table below
+    prefetch_hosts(
+        [(i["PublicIpAddress"], str(i["InstanceId"]), "EC2 Instance") for i in describe_instances(cache, session) if i.get("PublicIpAddress")]
+    )
     # Paginate the iterator object from Cache
     for i in describe_instances(cache, session):
         # B64 encode all of the details for the Asset
@@ -406,6 +349,13 @@ def elbv2_attack_surface_open_tcp_port_check(cache: dict, session, awsAccountId:
     """[AttackSurface.ELBv2.{checkIdNumber}] Application Load Balancers should not be publicly reachable on {serviceName}"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    # Queue concurrent Nmap scans for every public ALB, results are read back from the shared scan table below
+    prefetch_hosts(
+        [
+            (str(lb["DNSName"]), str(lb["LoadBalancerName"]), "Application load balancer") for lb in describe_load_balancers(cache, session)
+            if lb["Scheme"] == "internet-facing" and lb["Type"] == "application"
+        ]
+    )
     # Loop ELBs and select the public ALBs
     for lb in describe_load_balancers(cache, session):
         # B64 encode all of the details for the Asset
@@ -619,6 +569,13 @@ def elb_attack_surface_open_tcp_port_check(cache: dict, session, awsAccountId: s
     """[AttackSurface.ELB.{checkIdNumber}] Classic Load Balancers should not be publicly reachable on {serviceName}"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    # Queue concurrent Nmap scans for every public CLB, results are read back from the shared scan table below
+    prefetch_hosts(
+        [
+            (str(lb["DNSName"]), str(lb["LoadBalancerName"]), "Classic load balancer") for lb in describe_clbs(cache, session)
+            if lb["Scheme"] == "internet-facing"
+        ]
+    )
     for lb in describe_clbs(cache, session):
         # B64 encode all of the details for the Asset
         assetJson = json.dumps(lb,default=str).encode("utf-8")
@@ -632,7 +589,7 @@ def elb_attack_surface_open_tcp_port_check(cache: dict, session, awsAccountId: s
         lbVpc = lb["VPCId"]
         clbScheme = str(lb["Scheme"])
         if clbScheme == 'internet-facing':
-            scanner = scan_host(dnsName, clbName)
+            scanner = scan_host(dnsName, clbName, "Classic load balancer")
             # NoneType returned on KeyError due to Nmap errors
             if scanner == None:
                 continue
@@ -836,6 +793,10 @@ def eip_attack_surface_open_tcp_port_check(cache: dict, session, awsAccountId: s
     """[AttackSurface.EIP.{checkIdNumber}] Elastic IPs should not advertise publicly reachable {serviceName} services"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    # Queue concurrent Nmap scans for every EIP, IPs also attached to a public Instance are only scanned once
+    prefetch_hosts(
+        [(eip["PublicIp"], eip["AllocationId"], "Elastic IP") for eip in describe_elastic_ips(cache, session)]
+    )
     # Gather all EIPs
     for eip in describe_elastic_ips(cache, session):
         # B64 encode all of the details for the Asset
@@ -1034,6 +995,10 @@ def cloudfront_attack_surface_open_tcp_port_check(cache: dict, session, awsAccou
     """[AttackSurface.Cloudfront.{checkIdNumber}] Cloudfront Distributions should not be publicly reachable on {serviceName}"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    # Queue concurrent Nmap scans for every Distribution, results are read back from the shared scan table below
+    prefetch_hosts(
+        [(dist["DomainName"], dist["Id"], "CloudFront Distribution") for dist in cloudfront_paginate(cache, session) or []]
+    )
     for dist in cloudfront_paginate(cache, session):
         # B64 encode all of the details for the Asset
         assetJson = json.dumps(dist,default=str).encode("utf-8")
@@ -1245,8 +1210,12 @@ def route53_public_hz_attack_surface_open_tcp_port_check(cache: dict, session, a
         hzId = zone["Id"]
         hzName = zone["Name"]
         hzArn = f"arn:aws:route53:::hostedzone/{hzName}"
-        # Get the A Records
-        for record in route53.list_resource_record_sets(HostedZoneId=hzId)["ResourceRecordSets"]:
+        # Get the A Records and queue concurrent Nmap scans for all of them before evaluating each one
+        recordSets = route53.list_resource_record_sets(HostedZoneId=hzId)["ResourceRecordSets"]
+        prefetch_hosts(
+            [(str(record["Name"]), hzName, "Route53 Public Hosted Zone A Record") for record in recordSets if str(record["Type"]) == "A"]
+        )
+        for record in recordSets:
             # skip non "A" Records - "A" will also pick up on Alias records to LBs, etc.
             if str(record["Type"]) != "A":
                 continue
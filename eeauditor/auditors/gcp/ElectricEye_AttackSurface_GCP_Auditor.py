@@ -19,17 +19,14 @@
 #under the License.
 
 import datetime
-import nmap3
 from check_register import CheckRegister
+from attack_surface_scanner import scan_host, prefetch_hosts
 import googleapiclient.discovery
 import base64
 import json
 
 registry = CheckRegister()
 
-# Instantiate a NMAP scanner for TCP scans to define ports
-nmap = nmap3.NmapScanTechniques()
-
 def get_compute_engine_instances(cache: dict, gcpProjectId: str):
     '''
     AggregatedList result provides Zone information as well as every single Instance in a Project
@@ -63,27 +60,22 @@ def get_compute_engine_instances(cache: dict, gcpProjectId: str):
 
     return results
 
-# This function performs the actual NMAP Scan
-def scan_host(hostIp, assetName, assetComponent):
-    try:
-        results = nmap.nmap_tcp_scan(
-            hostIp,
-            # FTP, SSH, TelNet, SMTP, HTTP, POP3, NetBIOS, SMB, RDP, MSSQL, MySQL/MariaDB, NFS, Docker, Oracle, PostgreSQL, 
-            # Kibana, VMWare, Proxy, Splunk, K8s, Redis, Kafka, Mongo, Rabbit/AmazonMQ, SparkUI
-            args="-Pn -p 21,22,23,25,80,110,139,445,3389,1433,3306,2049,2375,1521,5432,5601,8182,8080,8089,10250,6379,9092,27017,5672,4040"
-        )
-
-        print(f"Scanning {assetComponent} {assetName} on {hostIp}")
-        return results
-    except KeyError:
-        results = None
-
 @registry.register_check("gce")
 def gce_attack_surface_open_tcp_port_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str, gcpProjectId: str):
     """[AttackSurface.GCP.GCE.{checkIdNumber}] Google Compute Engine VM instances should not be publicly reachable on {serviceName}"""
     iso8601Time = datetime.datetime.now(datetime.timezone.utc).isoformat()
 
-    for gce in get_compute_engine_instances(cache, gcpProjectId):
+    # Queue concurrent Nmap scans for every public VM instance, results are read back from the shared scan table below
+    gceInstances = get_compute_engine_instances(cache, gcpProjectId)
+    prefetchTargets = []
+    for gce in gceInstances:
+        try:
+            prefetchTargets.append((gce["networkInterfaces"][0]["accessConfigs"][0]["natIP"], gce["name"], "GCE VM instance"))
+        except KeyError:
+            continue
+    prefetch_hosts(prefetchTargets)
+
+    for gce in gceInstances:
         # B64 encode all of the details for the Asset
         assetJson = json.dumps(gce,default=str).encode("utf-8")
         assetB64 = base64.b64encode(assetJson)
@@ -23,6 +23,7 @@ import datetime
 import base64
 import json
 from check_register import CheckRegister
+from threat_intel import get_cisa_kev
 
 registry = CheckRegister()
 
@@ -147,22 +148,6 @@ def get_vulns_by_machine(token, machineId):
     else:
         return []
 
-# Called by get_vulns_by_machine()
-def get_cisa_kev():
-    """
-    Retrieves the U.S. CISA's Known Exploitable Vulnerabilities (KEV) Catalog and returns a list of CVE ID's
-    """
-
-    rawKev = json.loads(
-        requests.get(
-            "https://www.cisa.gov/sites/default/files/feeds/known_exploited_vulnerabilities.json"
-        ).text
-    )["vulnerabilities"]
-
-    kevCves = [cve["cveID"] for cve in rawKev]
-
-    return kevCves
-
 @registry.register_check("m365.mde")
 def m365_mde_machine_unhealthy_sensor_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str, tenantId: str, clientId: str, clientSecret: str, tenantLocation: str) -> dict:
     """
@@ -21,17 +21,14 @@
 import os
 import oci
 from oci.config import validate_config
-import nmap3
 import datetime
 import base64
 import json
 from check_register import CheckRegister
+from attack_surface_scanner import scan_host, prefetch_hosts
 
 registry = CheckRegister()
 
-# Instantiate a NMAP scanner for TCP scans to define ports
-nmap = nmap3.NmapScanTechniques()
-
 def process_response(responseObject):
     """
     Receives an OCI Python SDK `Response` type (differs by service) and returns a JSON object
@@ -136,21 +133,6 @@ def get_oci_load_balancers(cache, ociTenancyId, ociUserId, ociRegionName, ociCom
     cache["get_oci_load_balancers"] = lbList
     return cache["get_oci_load_balancers"]
 
-# This function performs the actual NMAP Scan
-def scan_host(hostIp, assetName, assetComponent):
-    try:
-        results = nmap.nmap_tcp_scan(
-            hostIp,
-            # FTP, SSH, TelNet, SMTP, HTTP, POP3, NetBIOS, SMB, RDP, MSSQL, MySQL/MariaDB, NFS, Docker, Oracle, PostgreSQL, 
-            # Kibana, VMWare, Proxy, Splunk, K8s, Redis, Kafka, Mongo, Rabbit/AmazonMQ, SparkUI
-            args="-Pn -p 21,22,23,25,80,110,139,445,3389,1433,3306,2049,2375,1521,5432,5601,8182,8080,8089,10250,6379,9092,27017,5672,4040"
-        )
-
-        print(f"Scanning {assetComponent} {assetName} on {hostIp}")
-        return results
-    except KeyError:
-        results = None
-
 @registry.register_check("oci.computeinstances")
 def oci_compute_attack_surface_open_tcp_port_check(cache, awsAccountId, awsRegion, awsPartition, ociTenancyId, ociUserId, ociRegionName, ociCompartments, ociUserApiKeyFingerprint):
     """
@@ -158,7 +140,21 @@ def oci_compute_attack_surface_open_tcp_port_check(cache, awsAccountId, awsRegio
     """
     # ISO Time
     iso8601Time = datetime.datetime.now(datetime.timezone.utc).isoformat()
-    for instance in get_oci_compute_instances(cache, ociTenancyId, ociUserId, ociRegionName, ociCompartments, ociUserApiKeyFingerprint):
+    # Retrieve the VNIC of every instance up front and queue concurrent Nmap scans for the public ones, results are
+    # read back from the shared scan table below
+    ociInstances = get_oci_compute_instances(cache, ociTenancyId, ociUserId, ociRegionName, ociCompartments, ociUserApiKeyFingerprint)
+    instanceVnics = {}
+    for instance in ociInstances:
+        instanceVnics[instance["id"]] = get_compute_instance_vnic(ociTenancyId, ociUserId, ociRegionName, ociUserApiKeyFingerprint, instance["compartment_id"], instance["id"])
+    prefetch_hosts(
+        [
+            (instanceVnics[instance["id"]]["public_ip"], instance["display_name"], "OCI Cloud Compute instance")
+            for instance in ociInstances
+            if instanceVnics[instance["id"]]["public_ip"] is not None
+        ]
+    )
+
+    for instance in ociInstances:
         # B64 encode all of the details for the Asset
         assetJson = json.dumps(instance,default=str).encode("utf-8")
         assetB64 = base64.b64encode(assetJson)
@@ -169,7 +165,7 @@ def oci_compute_attack_surface_open_tcp_port_check(cache, awsAccountId, awsRegio
         shape = instance["shape"]
         lifecycleState = instance["lifecycle_state"]
         # Get the VNIC info
-        instanceVnic = get_compute_instance_vnic(ociTenancyId, ociUserId, ociRegionName, ociUserApiKeyFingerprint, compartmentId, instanceId)
+        instanceVnic = instanceVnics[instanceId]
         # Skip over instances that are not public
         pubIp = instanceVnic["public_ip"]
         if instanceVnic["public_ip"] is None:
@@ -375,6 +371,14 @@ def oci_load_balancer_attack_surface_open_tcp_port_check(cache, awsAccountId, aw
     """
     # ISO Time
     iso8601Time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    # Queue concurrent Nmap scans for the first Public IP of every Load Balancer, results are read back from the shared scan table below
+    prefetchTargets = []
+    for loadbalancer in get_oci_load_balancers(cache, ociTenancyId, ociUserId, ociRegionName, ociCompartments, ociUserApiKeyFingerprint):
+        publicIps = [ip["ip_address"] for ip in loadbalancer["ip_addresses"] if ip["is_public"] is True]
+        if publicIps:
+            prefetchTargets.append((publicIps[0], loadbalancer["display_name"], "OCI Load Balancer"))
+    prefetch_hosts(prefetchTargets)
+
     for loadbalancer in get_oci_load_balancers(cache, ociTenancyId, ociUserId, ociRegionName, ociCompartments, ociUserApiKeyFingerprint):
         # B64 encode all of the details for the Asset
         assetJson = json.dumps(loadbalancer,default=str).encode("utf-8")
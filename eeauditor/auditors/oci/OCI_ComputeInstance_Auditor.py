@@ -21,11 +21,11 @@
 import os
 import oci
 from oci.config import validate_config
-import requests
 import datetime
 import base64
 import json
 from check_register import CheckRegister
+from threat_intel import get_cisa_kev
 
 registry = CheckRegister()
 
@@ -102,17 +102,6 @@ def get_compute_instance_vnic(ociTenancyId, ociUserId, ociRegionName, ociUserApi
 
     return process_response(vnicData)
 
-def get_cisa_kev():
-    """
-    Retrieves the U.S. CISA's Known Exploitable Vulnerabilities (KEV) Catalog and returns a list of CVE ID's
-    """
-
-    rawKev = json.loads(requests.get("https://www.cisa.gov/sites/default/files/feeds/known_exploited_vulnerabilities.json").text)["vulnerabilities"]
-
-    kevCves = [cve["cveID"] for cve in rawKev]
-
-    return kevCves
-
 def get_exploitable_compute_instances(cache, ociTenancyId, ociUserId, ociRegionName, ociCompartments, ociUserApiKeyFingerprint):
     
     response = cache.get("get_exploitable_compute_instances")
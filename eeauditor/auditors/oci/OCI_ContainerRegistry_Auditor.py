@@ -21,11 +21,11 @@
 import os
 import oci
 from oci.config import validate_config
-import requests
 import datetime
 import base64
 import json
 from check_register import CheckRegister
+from threat_intel import get_cisa_kev
 
 registry = CheckRegister()
 
@@ -137,17 +137,6 @@ def get_repository_images(cache, ociTenancyId, ociUserId, ociRegionName, ociComp
     cache["get_repository_images"] = containerRegistryImages
     return cache["get_repository_images"]
 
-def get_cisa_kev():
-    """
-    Retrieves the U.S. CISA's Known Exploitable Vulnerabilities (KEV) Catalog and returns a list of CVE ID's
-    """
-
-    rawKev = json.loads(requests.get("https://www.cisa.gov/sites/default/files/feeds/known_exploited_vulnerabilities.json").text)["vulnerabilities"]
-
-    kevCves = [cve["cveID"] for cve in rawKev]
-
-    return kevCves
-
 def get_container_images_with_exploitable_vulns(cache, ociTenancyId, ociUserId, ociRegionName, ociCompartments, ociUserApiKeyFingerprint):
     response = cache.get("get_container_images_with_exploitable_vulns")
     if response:
@@ -0,0 +1,92 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+# Compares holding and decoding a per-Check copy of `AssetDetails` with the AssetRegistry used by processor.main
+# usage (from the eeauditor directory): python3 benchmarks/bench_asset_registry.py
+
+import base64
+import json
+import os
+import sys
+import tracemalloc
+from timeit import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from processor.asset_registry import AssetRegistry
+from processor.normalization import normalize_finding
+
+# (Assets, Checks evaluating each Asset) - e.g., EC2 Instances are evaluated by ~40 Checks
+SCALES = [(1_000, 40), (2_500, 40)]
+
+def synthetic_findings(assetCount, checksPerAsset):
+    """
+    Yields findings the way the Auditors produce them: every Check serializes and base64 encodes its own Asset copy
+    """
+    for check in range(checksPerAsset):
+        for i in range(assetCount):
+            asset = {
+                "InstanceId": f"i-{i:017x}",
+                "Tags": [{"Key": f"tag-{t}", "Value": "x" * 32} for t in range(8)],
+                "SecurityGroups": [{"GroupId": f"sg-{i:017x}", "GroupName": "default"}]
+            }
+            yield {
+                "Id": f"check-{check}/i-{i:017x}",
+                "Resources": [{"Id": f"arn:aws:ec2:us-east-1:012345678901:instance/i-{i:017x}"}],
+                "ProductFields": {
+                    "Provider": "AWS",
+                    "ProviderAccountId": "012345678901",
+                    "AssetDetails": base64.b64encode(json.dumps(asset, default=str).encode("utf-8"))
+                },
+                "Compliance": {"RelatedRequirements": []}
+            }
+
+def peak_memory(assetCount, checksPerAsset, assetRegistry=None):
+    """
+    Returns the peak traced memory, in MiB, of holding every finding (as the buffered outputs do)
+    """
+    tracemalloc.start()
+    if assetRegistry is None:
+        findings = list(synthetic_findings(assetCount, checksPerAsset))
+    else:
+        findings = [assetRegistry.register(f) for f in synthetic_findings(assetCount, checksPerAsset)]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del findings
+    return peak / 1024 / 1024
+
+def main():
+    for assetCount, checksPerAsset in SCALES:
+        print(f"{assetCount * checksPerAsset} findings / {assetCount} Assets")
+        print(f"  peak memory per Check copy:  {peak_memory(assetCount, checksPerAsset):.1f} MiB")
+        print(f"  peak memory with registry:   {peak_memory(assetCount, checksPerAsset, AssetRegistry()):.1f} MiB")
+
+        findings = list(synthetic_findings(assetCount, checksPerAsset))
+        assetRegistry = AssetRegistry()
+        for finding in findings:
+            assetRegistry.register(finding)
+        legacySeconds = timeit(lambda: [normalize_finding(f) for f in findings], number=1)
+        registrySeconds = timeit(lambda: [normalize_finding(f, assetRegistry) for f in findings], number=1)
+        print(f"  normalize per Check copy:    {legacySeconds * 1000:.2f} ms")
+        print(f"  normalize with registry:     {registrySeconds * 1000:.2f} ms")
+        print(f"  speedup:                     {legacySeconds / registrySeconds:.1f}x")
+
+if __name__ == "__main__":
+    main()
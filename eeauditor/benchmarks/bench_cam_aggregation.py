@@ -0,0 +1,119 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+
+# Compares the previous per-Asset rescan used by the CAM outputs with the single-pass aggregate_cam_assets group-by
+# usage (from the eeauditor directory): python3 benchmarks/bench_cam_aggregation.py [--legacy-max N]
+# the legacy implementation is O(assets x findings) and is only timed up to --legacy-max findings (default 10000)
+
+import base64
+import json
+import os
+import random
+import sys
+from timeit import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from processor.cam_aggregation import aggregate_cam_assets
+
+SCALES = [10_000, 100_000, 1_000_000]
+# roughly the 400k findings / 60k Assets ratio seen in large AWS Organizations
+FINDINGS_PER_ASSET = 7
+SEVERITIES = ["INFORMATIONAL", "LOW", "MEDIUM", "HIGH", "CRITICAL"]
+
+def synthetic_findings(count):
+    """
+    Generates `count` minimal ASFF findings spread over count / FINDINGS_PER_ASSET Assets
+    """
+    rng = random.Random(count)
+    assetCount = max(1, count // FINDINGS_PER_ASSET)
+    assetDetails = base64.b64encode(json.dumps({"InstanceId": "i-0123456789abcdef0", "Tags": []}).encode("utf-8")).decode("utf-8")
+    findings = []
+    for i in range(count):
+        assetId = f"arn:aws:ec2:us-east-1:012345678901:instance/i-{rng.randrange(assetCount):017x}"
+        findings.append(
+            {
+                "FirstObservedAt": f"2023-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T00:00:00.000000+00:00",
+                "Severity": {"Label": rng.choice(SEVERITIES)},
+                "Resources": [{"Id": assetId}],
+                "ProductFields": {
+                    "Provider": "AWS",
+                    "ProviderType": "CSP",
+                    "ProviderAccountId": "012345678901",
+                    "AssetRegion": "us-east-1",
+                    "AssetDetails": assetDetails,
+                    "AssetClass": "Compute",
+                    "AssetService": "Amazon EC2",
+                    "AssetComponent": "Instance"
+                }
+            }
+        )
+
+    return findings
+
+def legacy_process_findings(findings):
+    """
+    The decode-everything-then-rescan-per-Asset implementation the CAM outputs used to share
+    """
+    cloudAssetManagementFindings = []
+    data = [
+        {**d, "ProductFields": {**d["ProductFields"],
+            "AssetDetails": json.loads(base64.b64decode(d["ProductFields"]["AssetDetails"]).decode("utf-8"))
+                if d["ProductFields"]["AssetDetails"] is not None
+                else None
+        }} if "AssetDetails" in d["ProductFields"]
+        else d
+        for d in findings
+    ]
+    uniqueIds = set(item["Resources"][0]["Id"] for item in data)
+    for uid in uniqueIds:
+        subData = [item for item in data if item["Resources"][0]["Id"] == uid]
+        counts = dict.fromkeys(SEVERITIES, 0)
+        for item in subData:
+            counts[item["Severity"]["Label"]] += 1
+        cloudAssetManagementFindings.append({"AssetId": uid, **counts})
+
+    return cloudAssetManagementFindings
+
+def main():
+    legacyMax = 10_000
+    if "--legacy-max" in sys.argv:
+        legacyMax = int(sys.argv[sys.argv.index("--legacy-max") + 1])
+
+    for scale in SCALES:
+        findings = synthetic_findings(scale)
+        assets = aggregate_cam_assets(findings)
+        aggregateSeconds = timeit(lambda: aggregate_cam_assets(findings), number=1)
+        print(f"{scale} findings / {len(assets)} Assets")
+        print(f"  single pass:  {aggregateSeconds * 1000:.2f} ms")
+
+        if scale <= legacyMax:
+            legacy = {a["AssetId"]: a for a in legacy_process_findings(findings)}
+            for asset in assets:
+                assert legacy[asset["AssetId"]]["HIGH"] == asset["HighSeverityFindings"]
+            legacySeconds = timeit(lambda: legacy_process_findings(findings), number=1)
+            print(f"  legacy:       {legacySeconds * 1000:.2f} ms")
+            print(f"  speedup:      {legacySeconds / aggregateSeconds:.1f}x")
+        else:
+            print("  legacy:       skipped (see --legacy-max)")
+
+if __name__ == "__main__":
+    main()
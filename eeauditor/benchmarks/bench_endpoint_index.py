@@ -0,0 +1,91 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+# Compares the previous per-(service, Region) linear scan of endpoints.json with the ServiceEndpointIndex lookup
+# usage (from the eeauditor directory): python3 benchmarks/bench_endpoint_index.py [path/to/endpoints.json]
+
+import json
+import os
+import sys
+from timeit import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from endpoint_index import GLOBAL_ENDPOINT_PSEUDO_REGIONS, ServiceEndpointIndex
+
+def legacy_scan(endpointData, awsPartition, service, awsRegion):
+    """
+    The linear scan that check_service_endpoint_availability used to perform for every (service, Region)
+    """
+    serviceAvailable = False
+    for partition in endpointData["partitions"]:
+        if awsPartition == partition["partition"]:
+            services = partition["services"]
+            for serviceName, serviceData in services.items():
+                try:
+                    serviceName = str(serviceName).split("api.")[1]
+                except IndexError:
+                    serviceName = serviceName
+                if service == serviceName:
+                    regions = list(serviceData["endpoints"].keys())
+                    if any(item in GLOBAL_ENDPOINT_PSEUDO_REGIONS for item in regions):
+                        serviceAvailable = True
+                        break
+                    if awsRegion in regions:
+                        serviceAvailable = True
+                        break
+                    else:
+                        serviceAvailable = False
+                    break
+                else:
+                    serviceAvailable = False
+
+    return serviceAvailable
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            endpointData = json.load(f)
+    else:
+        from botocore.loaders import create_loader
+        endpointData = create_loader().load_data("endpoints")
+
+    awsPartition = [p for p in endpointData["partitions"] if p["partition"] == "aws"][0]
+    services = [str(s).split("api.")[-1] for s in awsPartition["services"]][:90]
+    regions = list(awsPartition["regions"].keys())[:17]
+    lookups = [(service, region) for service in services for region in regions]
+
+    buildSeconds = timeit(lambda: ServiceEndpointIndex.from_endpoint_data(endpointData), number=1)
+    endpointIndex = ServiceEndpointIndex.from_endpoint_data(endpointData)
+
+    for service, region in lookups:
+        assert legacy_scan(endpointData, "aws", service, region) == endpointIndex.is_available("aws", service, region)
+
+    legacySeconds = timeit(lambda: [legacy_scan(endpointData, "aws", s, r) for s, r in lookups], number=1)
+    indexSeconds = timeit(lambda: [endpointIndex.is_available("aws", s, r) for s, r in lookups], number=1)
+
+    print(f"{len(lookups)} (service, Region) lookups")
+    print(f"legacy scan:         {legacySeconds * 1000:.2f} ms")
+    print(f"index build:         {buildSeconds * 1000:.2f} ms")
+    print(f"index lookups:       {indexSeconds * 1000:.2f} ms")
+    print(f"speedup (incl build): {legacySeconds / (buildSeconds + indexSeconds):.1f}x")
+
+if __name__ == "__main__":
+    main()
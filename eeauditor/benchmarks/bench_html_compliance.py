@@ -0,0 +1,168 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+# Compares the previous multi-pass html_compliance aggregation (which also re-read control_objectives.json for every
+# framework) with the single-pass aggregate_findings and the cached control objectives, chart rendering is not timed
+# usage (from the eeauditor directory): python3 benchmarks/bench_html_compliance.py [--legacy-max N]
+# the legacy implementation is O(findings x unique controls) and is only timed up to --legacy-max findings (default 10000)
+
+import json
+import os
+import random
+import sys
+from timeit import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from processor.normalization import CONTROLS_CROSSWALK, normalize_finding
+from processor.outputs.html_compliance_output import JsonProvider, SUPPORTED_FRAMEWORKS, here
+
+SCALES = [10_000, 100_000, 250_000]
+CHECK_REQUIREMENTS = 250
+
+def synthetic_findings(count):
+    """
+    Generates `count` normalized findings over count / 7 Assets with realistic, crosswalked RelatedRequirements
+    """
+    rng = random.Random(count)
+    nistCsf = list(CONTROLS_CROSSWALK)
+    requirementLists = [rng.sample(nistCsf, rng.randint(1, 4)) for _ in range(CHECK_REQUIREMENTS)]
+    assetCount = max(1, count // 7)
+    return [
+        normalize_finding(
+            {
+                "Resources": [{"Id": f"arn:aws:ec2:us-east-1:012345678901:instance/i-{rng.randrange(assetCount):017x}"}],
+                "ProductFields": {
+                    "Provider": "AWS",
+                    "ProviderAccountId": rng.choice(["012345678901", "210987654321"]),
+                    "AssetRegion": rng.choice(["us-east-1", "us-west-2", "eu-west-1"]),
+                    "AssetClass": rng.choice(["Compute", "Storage", "Networking"]),
+                    "AssetService": rng.choice(["Amazon EC2", "Amazon S3", "Amazon VPC"]),
+                    "AssetComponent": rng.choice(["Instance", "Bucket", "Security Group"])
+                },
+                "Compliance": {"Status": rng.choice(["PASSED", "FAILED"]), "RelatedRequirements": list(rng.choice(requirementLists))}
+            }
+        ) for _ in range(count)
+    ]
+
+def legacy_report_data(findings):
+    """
+    The process_findings / get_unique_controls / get_asset_information_per_control / generate_controls_aggregation /
+    generate_executive_summary passes and the per-framework control_objectives.json reads html_compliance used to run
+    """
+    processedFindings = [
+        {
+            "AssetId": f["Resources"][0]["Id"],
+            "AssetRegion": f["ProductFields"]["AssetRegion"],
+            "AssetClass": f["ProductFields"]["AssetClass"],
+            "AssetService": f["ProductFields"]["AssetService"],
+            "AssetComponent": f["ProductFields"]["AssetComponent"],
+            "ComplianceStatus": f["Compliance"]["Status"],
+            "ComplianceRelatedRequirements": f["Compliance"]["RelatedRequirements"]
+        } for f in findings
+    ]
+
+    def get_unique_controls():
+        uniqueControls = []
+        for finding in processedFindings:
+            for control in finding["ComplianceRelatedRequirements"]:
+                if control not in uniqueControls:
+                    uniqueControls.append(control)
+        return uniqueControls
+
+    uniqueControls = get_unique_controls()
+    controlDict = {}
+    for asset in processedFindings:
+        for control in asset["ComplianceRelatedRequirements"]:
+            details = controlDict.setdefault(control, {"ResourcesImpacted": set(), "PassingControls": set()})
+            details["ResourcesImpacted"].add(asset["AssetId"])
+            if asset["ComplianceStatus"] == "PASSED":
+                details["PassingControls"].add(asset["AssetId"])
+
+    controlsStatusAggregation = {framework: {} for framework in SUPPORTED_FRAMEWORKS}
+    for controlTitle in uniqueControls:
+        for framework in SUPPORTED_FRAMEWORKS:
+            if controlTitle.startswith(framework):
+                controlsStatusAggregation[framework][controlTitle] = {"Passed": 0, "Failed": 0}
+    for finding in processedFindings:
+        for control in finding["ComplianceRelatedRequirements"]:
+            for framework in SUPPORTED_FRAMEWORKS:
+                if control.startswith(framework):
+                    controlsStatusAggregation[framework][control]["Passed" if finding["ComplianceStatus"] == "PASSED" else "Failed"] += 1
+
+    # generate_executive_summary
+    len(get_unique_controls())
+    uniques = {key: [] for key in ("AssetRegion", "AssetClass", "AssetService", "AssetComponent", "AssetId")}
+    for finding in processedFindings:
+        for key, values in uniques.items():
+            if finding[key] not in values:
+                values.append(finding[key])
+
+    # generate_control_table
+    for framework, controls in controlsStatusAggregation.items():
+        if controls:
+            with open(f"{here}/control_objectives.json") as jsonfile:
+                data = json.load(jsonfile)
+            [c for c in data if c["ControlTitle"].startswith(framework) and c["ControlTitle"] in list(controls)]
+
+    return controlsStatusAggregation
+
+def report_data(provider, findings):
+    controlsAggregation, assetDataPerControl, summaryStatistics = provider.aggregate_findings(findings)
+    provider.generate_executive_summary(summaryStatistics)
+    for framework, controls in controlsAggregation.items():
+        if controls:
+            provider.generate_control_table(
+                framework, list(controls), [i for i in assetDataPerControl if i["ControlId"].startswith(framework)]
+            )
+
+    return controlsAggregation
+
+def main():
+    legacyMax = 10_000
+    if "--legacy-max" in sys.argv:
+        legacyMax = int(sys.argv[sys.argv.index("--legacy-max") + 1])
+
+    # only the aggregation and the control tables are timed, so the TOML file is never needed
+    provider = JsonProvider.__new__(JsonProvider)
+    stdout = sys.stdout
+    for scale in SCALES:
+        findings = synthetic_findings(scale)
+        # the provider reports progress with print(), which is not what is being measured
+        sys.stdout = open(os.devnull, "w")
+        try:
+            singlePassSeconds = timeit(lambda: report_data(provider, findings), number=1)
+            if scale <= legacyMax:
+                assert json.dumps(legacy_report_data(findings)) == json.dumps(report_data(provider, findings))
+                legacySeconds = timeit(lambda: legacy_report_data(findings), number=1)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+        print(f"{scale} findings")
+        print(f"  single pass:  {singlePassSeconds * 1000:.2f} ms")
+        if scale <= legacyMax:
+            print(f"  legacy:       {legacySeconds * 1000:.2f} ms")
+            print(f"  speedup:      {legacySeconds / singlePassSeconds:.1f}x")
+        else:
+            print("  legacy:       skipped (see --legacy-max)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+
+# Compares the previous one-update_one()-per-finding upsert with the unordered bulk_write() batches used by the MongoDB outputs
+# requires a reachable mongod, e.g., a local container:
+#   docker run --name my-mongo -p 27017:27017 -d mongo
+# usage (from the eeauditor directory): python3 benchmarks/bench_mongodb_upsert.py [findings] [batch size] [connection string]
+
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pymongo import MongoClient
+from processor.mongodb_bulk import bulk_upsert
+
+DATABASE_NAME = "electriceye_benchmark"
+
+def synthetic_findings(count):
+    """
+    Generates `count` minimal findings, roughly 10% of the IDs are repeated as happens with re-runs
+    """
+    return [
+        {
+            "Id": f"arn:aws:securityhub:us-east-1:012345678901:finding/{i % int(count * 0.9 or 1)}",
+            "Title": f"[EC2.{i % 50}] Synthetic check",
+            "Severity": {"Label": "LOW"},
+            "Compliance": {"Status": "PASSED", "RelatedRequirements": ["NIST CSF V1.1 ID.AM-2", "ISO 27001:2022 A5.9"]},
+            "ProductFields": {"AssetDetails": {"InstanceId": f"i-{i:017x}", "Tags": []}}
+        } for i in range(count)
+    ]
+
+def legacy_upsert(collection, findings):
+    """
+    The per-finding update_one() loop the MongoDB outputs used to run
+    """
+    for finding in findings:
+        doc = {**finding, "_id": finding["Id"]}
+        collection.update_one({"_id": doc["_id"]}, {"$set": doc}, upsert=True)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    batchSize = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    connectionString = sys.argv[3] if len(sys.argv) > 3 else "mongodb://localhost:27017"
+    findings = synthetic_findings(count)
+
+    client = MongoClient(connectionString)
+    db = client[DATABASE_NAME]
+    db.drop_collection("legacy")
+    db.drop_collection("bulk")
+
+    start = perf_counter()
+    legacy_upsert(db["legacy"], findings)
+    legacySeconds = perf_counter() - start
+
+    start = perf_counter()
+    written, failed = bulk_upsert(db["bulk"], findings, "Id", batchSize)
+    bulkSeconds = perf_counter() - start
+
+    assert failed == 0
+    assert db["legacy"].count_documents({}) == db["bulk"].count_documents({})
+
+    client.drop_database(DATABASE_NAME)
+    client.close()
+
+    print(f"{count} findings, batch size {batchSize}")
+    print(f"update_one loop: {legacySeconds:.2f} s ({count / legacySeconds:,.0f} findings/s)")
+    print(f"bulk_write:      {bulkSeconds:.2f} s ({count / bulkSeconds:,.0f} findings/s)")
+    print(f"speedup:         {legacySeconds / bulkSeconds:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+# Compares every output decoding `AssetDetails` and crosswalking NIST CSF controls for itself with the shared, memoized
+# normalization done once per batch by processor.main
+# usage (from the eeauditor directory): python3 benchmarks/bench_normalization.py [--outputs N]
+
+import base64
+import json
+import os
+import random
+import sys
+from timeit import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from processor.normalization import CONTROLS_CROSSWALK, crosswalk_requirements, normalize_finding
+
+SCALES = [1_000, 10_000, 50_000]
+# mirrors processor.main.OUTPUT_BATCH_SIZE, which is not imported as that loads every output provider
+OUTPUT_BATCH_SIZE = 500
+# Checks map into a handful of NIST CSF Subcategories and a few other frameworks
+CHECK_REQUIREMENTS = 250
+
+def synthetic_findings(count):
+    """
+    Generates `count` minimal ASFF findings with base64 encoded `AssetDetails` and realistic RelatedRequirements
+    """
+    rng = random.Random(count)
+    nistCsf = list(CONTROLS_CROSSWALK)
+    requirementLists = [
+        rng.sample(nistCsf, rng.randint(1, 4)) + ["AICPA TSC CC7.2", "ISO 27001:2013 A.12.4.1"]
+        for _ in range(CHECK_REQUIREMENTS)
+    ]
+    assetDetails = base64.b64encode(
+        json.dumps({"InstanceId": "i-0123456789abcdef0", "Tags": [{"Key": "Name", "Value": "x" * 64}] * 8}).encode("utf-8")
+    ).decode("utf-8")
+    return [
+        {
+            "Id": f"finding-{i}",
+            "ProductFields": {"Provider": "AWS", "AssetDetails": assetDetails},
+            "Compliance": {"Status": "FAILED", "RelatedRequirements": list(rng.choice(requirementLists))}
+        } for i in range(count)
+    ]
+
+def legacy_output(findings):
+    """
+    The decode + crosswalk every output used to run over its own copy of the findings
+    """
+    decodedFindings = [
+        {**d, "ProductFields": {**d["ProductFields"],
+            "AssetDetails": json.loads(base64.b64decode(d["ProductFields"]["AssetDetails"]).decode("utf-8"))
+                if d["ProductFields"]["AssetDetails"] is not None
+                else None
+        }} if "AssetDetails" in d["ProductFields"]
+        else d
+        for d in findings
+    ]
+    for finding in decodedFindings:
+        complianceRelatedRequirements = list(finding["Compliance"]["RelatedRequirements"])
+        newControls = []
+        nistCsfControls = [control for control in complianceRelatedRequirements if control.startswith("NIST CSF V1.1")]
+        for control in nistCsfControls:
+            for crosswalk in CONTROLS_CROSSWALK.get(control, []):
+                if crosswalk not in newControls:
+                    newControls.append(crosswalk)
+        complianceRelatedRequirements.extend(newControls)
+        finding["Compliance"] = {**finding["Compliance"], "RelatedRequirements": complianceRelatedRequirements}
+
+    return decodedFindings
+
+def shared_normalization(findings):
+    """
+    What processor.main.write_batch does: one normalized view per batch, shared by every output that opts in
+    """
+    normalized = []
+    for i in range(0, len(findings), OUTPUT_BATCH_SIZE):
+        normalized.extend(normalize_finding(finding) for finding in findings[i : i + OUTPUT_BATCH_SIZE])
+    return normalized
+
+def main():
+    outputs = 3
+    if "--outputs" in sys.argv:
+        outputs = int(sys.argv[sys.argv.index("--outputs") + 1])
+
+    for scale in SCALES:
+        findings = synthetic_findings(scale)
+        assert [f["Compliance"] for f in legacy_output(findings)] == [f["Compliance"] for f in shared_normalization(findings)]
+
+        legacySeconds = timeit(lambda: [legacy_output(findings) for _ in range(outputs)], number=1)
+        crosswalk_requirements.cache_clear()
+        sharedSeconds = timeit(lambda: shared_normalization(findings), number=1)
+        print(f"{scale} findings / {outputs} outputs")
+        print(f"  per output:   {legacySeconds * 1000:.2f} ms")
+        print(f"  shared:       {sharedSeconds * 1000:.2f} ms")
+        print(f"  speedup:      {legacySeconds / sharedSeconds:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+# Compares the statement walker the IAM least privilege checks used to copy-paste with analyze_policy() over a corpus
+# of synthetic policy documents attached to many principals, the same way a managed policy is attached to many Roles
+# usage (from the eeauditor directory): python3 benchmarks/bench_policy_analysis.py
+
+import json
+import os
+import random
+import sys
+from timeit import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from policy_analysis import PolicyAnalysisCache, analyze_policy
+
+UNIQUE_POLICIES = [1_000, 5_000, 10_000]
+ATTACHMENTS_PER_POLICY = 10
+ACTIONS = [
+    "s3:GetObject", "s3:PutObject", "s3:Get*", "s3:*", "ec2:DescribeInstances", "ec2:Describe*", "iam:PassRole",
+    "kms:Decrypt", "kms:*", "sqs:SendMessage", "sns:Publish", "dynamodb:Query", "lambda:InvokeFunction", "*"
+]
+RESOURCES = ["*", "arn:aws:s3:::bucket/*", "arn:aws:kms:us-east-1:012345678901:key/abc", "arn:aws:sqs:us-east-1:012345678901:q"]
+
+def synthetic_policies(count):
+    """
+    Generates `count` unique policy documents of 1 to 8 Statements with a mix of single and listed Actions / Resources
+    """
+    rng = random.Random(count)
+    policies = []
+    for i in range(count):
+        statements = []
+        for _ in range(rng.randint(1, 8)):
+            statement = {
+                "Sid": f"Statement{i}x{len(statements)}",
+                "Effect": rng.choice(["Allow", "Allow", "Allow", "Deny"]),
+                "Action": rng.choice(ACTIONS) if rng.random() < 0.5 else rng.sample(ACTIONS, rng.randint(1, 5)),
+                "Resource": rng.choice(RESOURCES) if rng.random() < 0.5 else rng.sample(RESOURCES, rng.randint(1, 3))
+            }
+            if rng.random() < 0.1:
+                statement["Condition"] = {"Bool": {"aws:MultiFactorAuthPresent": "true"}}
+            statements.append(statement)
+        policies.append({"Version": "2012-10-17", "Statement": statements})
+
+    return policies
+
+def legacy_rating(policyDocument):
+    """
+    The nested statement walker of the IAM least privilege checks
+    """
+    leastPrivilegeRating = "passing"
+    for statement in policyDocument["Statement"]:
+        if statement["Effect"] == "Allow":
+            if statement.get("Condition") == None:
+                if type(statement["Action"]) == list:
+                    if len(["True" for x in statement["Action"] if ":*" in x or "*" == x]) > 0:
+                        if type(statement["Resource"]) == str and statement["Resource"] == "*":
+                            leastPrivilegeRating = "failedHigh"
+                        elif type(statement["Resource"]) == list:
+                            leastPrivilegeRating = "failedLow"
+                elif type(statement["Action"]) == str:
+                    if ":*" in statement["Action"] or statement["Action"] == "*":
+                        if type(statement["Resource"]) == str and statement["Resource"] == "*":
+                            leastPrivilegeRating = "failedHigh"
+                        elif type(statement["Resource"]) == list:
+                            leastPrivilegeRating = "failedLow"
+
+    return leastPrivilegeRating
+
+def time_corpus(label, attachments, legacy):
+    """
+    Times the legacy walker and analyze_policy() with a cold and a warm memo over the same evaluations
+    """
+    legacySeconds = timeit(lambda: [legacy(policy) for policy in attachments], number=1)
+    PolicyAnalysisCache.reset()
+    coldSeconds = timeit(lambda: [analyze_policy(policy)["LeastPrivilegeRating"] for policy in attachments], number=1)
+    warmSeconds = timeit(lambda: [analyze_policy(policy)["LeastPrivilegeRating"] for policy in attachments], number=1)
+
+    print(f"  {label}")
+    print(f"    legacy walker:          {legacySeconds * 1000:.2f} ms")
+    print(f"    analyze_policy (cold):  {coldSeconds * 1000:.2f} ms")
+    print(f"    analyze_policy (warm):  {warmSeconds * 1000:.2f} ms")
+
+def main():
+    for count in UNIQUE_POLICIES:
+        policies = synthetic_policies(count)
+        # every policy is evaluated once per principal or resource it is attached to
+        attachments = [policy for policy in policies for _ in range(ATTACHMENTS_PER_POLICY)]
+        random.Random(0).shuffle(attachments)
+
+        legacyFailures = sum(legacy_rating(policy) != "passing" for policy in policies)
+        analysisFailures = sum(analyze_policy(policy)["LeastPrivilegeRating"] != "passing" for policy in policies)
+        print(f"{count} unique policies, {len(attachments)} evaluations")
+        print(f"  failing policies: {legacyFailures} legacy, {analysisFailures} analyze_policy")
+
+        # IAM documents are already decoded by botocore
+        time_corpus("decoded documents (IAM)", attachments, legacy_rating)
+        # resource policies (KMS, S3, SNS, SQS) are returned as JSON text which the checks used to parse every time
+        documents = {id(policy): json.dumps(policy) for policy in policies}
+        time_corpus(
+            "JSON documents (resource policies)",
+            [documents[id(policy)] for policy in attachments],
+            lambda policy: legacy_rating(json.loads(policy))
+        )
+
+if __name__ == "__main__":
+    main()
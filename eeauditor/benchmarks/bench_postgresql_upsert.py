@@ -0,0 +1,138 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+
+# Compares the previous one-INSERT-per-finding upsert with the bulk staging table merge used by the PostgreSQL outputs
+# requires a reachable PostgreSQL, e.g., a local container:
+#   docker run -d --name my-postgres -e POSTGRES_PASSWORD=mysecretpassword -p 5432:5432 postgres
+# usage (from the eeauditor directory): PGPASSWORD=mysecretpassword python3 benchmarks/bench_postgresql_upsert.py [findings] [batch size]
+# standard libpq environment variables (PGHOST, PGPORT, PGUSER, PGDATABASE) are honored
+
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import psycopg2 as psql
+from processor.postgresql_bulk import bulk_upsert
+
+TABLE_NAME = "electriceye_upsert_benchmark"
+COLUMNS = ["id", "first_observed_at", "created_at", "updated_at", "severity_label", "title", "compliance_related_requirements"]
+
+def synthetic_rows(count):
+    """
+    Generates `count` rows for the benchmark table, roughly 10% of the IDs are repeated as happens with re-runs
+    """
+    return [
+        (
+            f"arn:aws:securityhub:us-east-1:012345678901:finding/{i % int(count * 0.9 or 1)}",
+            f"2023-05-{1 + i % 28:02d}T00:00:00+00:00",
+            f"2023-05-{1 + i % 28:02d}T00:00:00+00:00",
+            "2023-06-01T00:00:00+00:00",
+            "LOW",
+            f"[EC2.{i % 50}] Synthetic check",
+            ["NIST CSF V1.1 ID.AM-2", "ISO 27001:2022 A5.9"]
+        ) for i in range(count)
+    ]
+
+def reset_table(cursor):
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+    cursor.execute(f"""
+        CREATE TABLE {TABLE_NAME} (
+            id TEXT PRIMARY KEY,
+            first_observed_at TIMESTAMP WITH TIME ZONE,
+            created_at TIMESTAMP WITH TIME ZONE,
+            updated_at TIMESTAMP WITH TIME ZONE,
+            severity_label TEXT,
+            title TEXT,
+            compliance_related_requirements TEXT[]
+        )
+    """)
+
+def legacy_upsert(engine, rows):
+    """
+    The per-finding INSERT ... ON CONFLICT loop the PostgreSQL outputs used to run, committed once at the end
+    """
+    cursor = engine.cursor()
+    for row in rows:
+        cursor.execute(f"""
+            INSERT INTO {TABLE_NAME} ({", ".join(COLUMNS)})
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (id) DO UPDATE
+                SET updated_at = excluded.updated_at,
+                    severity_label = excluded.severity_label,
+                    title = excluded.title,
+                    compliance_related_requirements = excluded.compliance_related_requirements,
+                    first_observed_at = CASE
+                                            WHEN {TABLE_NAME}.first_observed_at < excluded.first_observed_at THEN {TABLE_NAME}.first_observed_at
+                                            ELSE excluded.first_observed_at
+                                        END,
+                    created_at = CASE
+                                        WHEN {TABLE_NAME}.created_at < excluded.created_at THEN {TABLE_NAME}.created_at
+                                        ELSE excluded.created_at
+                                    END
+            """,
+            row
+        )
+    engine.commit()
+    cursor.close()
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    batchSize = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rows = synthetic_rows(count)
+
+    engine = psql.connect(
+        host=os.environ.get("PGHOST", "localhost"),
+        port=os.environ.get("PGPORT", 5432),
+        user=os.environ.get("PGUSER", "postgres"),
+        database=os.environ.get("PGDATABASE", "postgres")
+    )
+    cursor = engine.cursor()
+
+    reset_table(cursor)
+    engine.commit()
+    start = perf_counter()
+    legacy_upsert(engine, rows)
+    legacySeconds = perf_counter() - start
+    cursor.execute(f"SELECT id, first_observed_at, created_at FROM {TABLE_NAME} ORDER BY id")
+    legacyResult = cursor.fetchall()
+
+    reset_table(cursor)
+    engine.commit()
+    start = perf_counter()
+    for i in range(0, len(rows), batchSize):
+        bulk_upsert(engine, TABLE_NAME, COLUMNS, rows[i : i + batchSize], earliestColumns=("first_observed_at", "created_at"), pageSize=batchSize)
+    bulkSeconds = perf_counter() - start
+    cursor.execute(f"SELECT id, first_observed_at, created_at FROM {TABLE_NAME} ORDER BY id")
+    assert cursor.fetchall() == legacyResult
+
+    cursor.execute(f"DROP TABLE {TABLE_NAME}")
+    engine.commit()
+    engine.close()
+
+    print(f"{count} rows ({len(legacyResult)} unique IDs), batch size {batchSize}")
+    print(f"row-by-row:   {legacySeconds:.2f} s ({count / legacySeconds:,.0f} rows/s)")
+    print(f"bulk merge:   {bulkSeconds:.2f} s ({count / bulkSeconds:,.0f} rows/s)")
+    print(f"speedup:      {legacySeconds / bulkSeconds:.1f}x")
+
+if __name__ == "__main__":
+    main()
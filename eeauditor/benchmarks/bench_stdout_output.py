@@ -0,0 +1,105 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+# Compares the previous stdout output (a list based Finding ID dedupe, a json.dumps / json.loads round trip and a print()
+# per finding) with the buffered NdjsonStream shared by the stdout and ocsf_stdout outputs, writing to os.devnull
+# usage (from the eeauditor directory): python3 benchmarks/bench_stdout_output.py [--legacy-max N]
+# the legacy implementation is O(n^2) and is only timed up to --legacy-max findings (default 50000)
+
+import json
+import os
+import random
+import sys
+from contextlib import redirect_stdout
+from timeit import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from processor.outputs import output_base
+from processor.outputs.output_base import NdjsonStream
+
+SCALES = [10_000, 50_000, 250_000]
+
+def synthetic_findings(count):
+    """
+    Generates `count` normalized findings (about 2KB each) where every 20th finding repeats an earlier Finding ID
+    """
+    rng = random.Random(count)
+    findings = []
+    for i in range(count):
+        findingId = f"arn:aws:ec2:us-east-1:012345678901:instance/i-{(i - 1 if i % 20 == 0 else i):017x}/ec2-imdsv2-check"
+        findings.append(
+            {
+                "SchemaVersion": "2018-10-08",
+                "Id": findingId,
+                "Title": "[EC2.1] EC2 Instances should be configured to use instance metadata service V2 (IMDSv2)",
+                "Description": "x" * rng.randint(200, 600),
+                "Severity": {"Label": rng.choice(["INFORMATIONAL", "LOW", "MEDIUM", "HIGH"])},
+                "ProductFields": {
+                    "Provider": "AWS",
+                    "ProviderAccountId": "012345678901",
+                    "AssetDetails": {"InstanceId": f"i-{i:017x}", "Tags": [{"Key": "Name", "Value": str(i)}] * 5}
+                },
+                "Resources": [{"Id": findingId.rsplit("/", 1)[0], "Type": "AwsEc2Instance"}],
+                "Compliance": {"Status": "FAILED", "RelatedRequirements": [f"NIST SP 800-53 Rev. 4 AC-{n}" for n in range(20)]}
+            }
+        )
+
+    return findings
+
+def legacy_stdout(findings):
+    checkedIds = []
+    for finding in findings:
+        parsedFinding = json.loads(json.dumps(finding, default=str))
+        if parsedFinding["Id"] not in checkedIds:
+            checkedIds.append(parsedFinding["Id"])
+            print(json.dumps(finding))
+
+def ndjson_stdout(findings):
+    stream = NdjsonStream(sys.stdout, default=str)
+    for finding in findings:
+        stream.write(finding, key=finding["Id"])
+    stream.close()
+
+def main():
+    legacyMax = 50_000
+    if "--legacy-max" in sys.argv:
+        legacyMax = int(sys.argv[sys.argv.index("--legacy-max") + 1])
+
+    orjson = output_base.orjson
+    for scale in SCALES:
+        findings = synthetic_findings(scale)
+        results = {}
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            if scale <= legacyMax:
+                results["legacy"] = timeit(lambda: legacy_stdout(findings), number=1)
+            output_base.orjson = None
+            results["ndjson (json)"] = timeit(lambda: ndjson_stdout(findings), number=1)
+            output_base.orjson = orjson
+            if orjson is not None:
+                results["ndjson (orjson)"] = timeit(lambda: ndjson_stdout(findings), number=1)
+
+        print(f"{scale} findings")
+        for name, seconds in results.items():
+            speedup = f" ({results['legacy'] / seconds:.1f}x)" if "legacy" in results and name != "legacy" else ""
+            print(f"  {name + ':':17} {seconds * 1000:.2f} ms{speedup}")
+
+if __name__ == "__main__":
+    main()
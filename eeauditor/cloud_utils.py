@@ -25,7 +25,10 @@ import sys
 from os import environ, path, chmod
 from re import compile
 import json
+from threading import Lock
+from botocore.credentials import RefreshableCredentials
 from botocore.exceptions import ClientError
+from botocore.session import get_session
 from azure.identity import ClientSecretCredential
 from azure.mgmt.resource.subscriptions import SubscriptionClient
 
@@ -41,6 +44,210 @@ org = boto3.client("organizations")
 AWS_MULTI_ACCOUNT_TARGET_TYPE_CHOICES = ["Accounts", "OU", "Organization"]
 CREDENTIALS_LOCATION_CHOICES = ["AWS_SSM", "AWS_SECRETS_MANAGER", "CONFIG_FILE"]
 
+# Read-only operations (by prefix) that MemoizingClient caches the responses of
+MEMOIZED_OPERATION_PREFIXES = ("Describe", "Get", "List")
+# Read-only operations whose responses are time-sensitive and are never memoized
+MEMOIZE_OPT_OUT_OPERATIONS = frozenset([
+    "GetCredentialReport",
+    "GetAccountAuthorizationDetails",
+    "DescribeStackEvents",
+    "GetQueryResults",
+    "GetMetricData",
+    "GetMetricStatistics"
+])
+
+class MemoizingClient(object):
+    """
+    Wraps a Boto3 client and memoizes the responses of its Describe*, Get* and List* operations by (operation,
+    parameters) for as long as the wrapper lives (one Auditor run). Responses are shared by every caller and must be
+    treated as read-only. Operations in MEMOIZE_OPT_OUT_OPERATIONS or `optOut`, errors, paginators and everything else
+    go straight to the client, which is also reachable as `.uncached`
+    """
+
+    def __init__(self, client, optOut=()):
+        self.uncached = client
+        self._memo = {}
+        self._memoLock = Lock()
+        self.counters = {"hits": 0, "misses": 0}
+        self._optOut = MEMOIZE_OPT_OUT_OPERATIONS.union(optOut)
+        self._operations = client.meta.method_to_api_mapping
+
+    def __getattr__(self, name):
+        attribute = getattr(self.uncached, name)
+        operationName = self._operations.get(name)
+        if (
+            operationName is None
+            or not operationName.startswith(MEMOIZED_OPERATION_PREFIXES)
+            or operationName in self._optOut
+        ):
+            return attribute
+
+        def memoized_call(**kwargs):
+            memoKey = (name, json.dumps(kwargs, sort_keys=True, default=str))
+            with self._memoLock:
+                if memoKey in self._memo:
+                    self.counters["hits"] += 1
+                    return self._memo[memoKey]
+
+            response = attribute(**kwargs)
+            with self._memoLock:
+                self.counters["misses"] += 1
+                self._memo[memoKey] = response
+
+            return response
+
+        return memoized_call
+
+class PooledAwsSession(object):
+    """
+    A lightweight, Region-specific view over a Boto3 Session that is shared by every Region and Auditor of the same
+    Account & IAM Role. Clients are created once per (service, Region, client arguments) and then re-used, anything
+    else is passed through to the underlying Boto3 Session
+    """
+
+    def __init__(self, session, region, clientCache, clientLock):
+        self._session = session
+        self._region = region
+        self._clientCache = clientCache
+        self._clientLock = clientLock
+        self._memoizingClients = {}
+
+    @property
+    def region_name(self):
+        return self._region
+
+    def client(self, service_name, region_name=None, **kwargs):
+        region_name = region_name or self._region
+        # botocore Config objects and the like are not hashable, they are keyed on identity and the arguments are
+        # kept alongside the client so those objects are never garbage collected and their id() re-used
+        clientKey = (
+            service_name,
+            region_name,
+            tuple(
+                sorted(
+                    (k, v if isinstance(v, (str, int, float, bool, type(None))) else id(v)) for k, v in kwargs.items()
+                )
+            )
+        )
+        # Boto3 Sessions are not thread-safe, clients themselves are
+        with self._clientLock:
+            cached = self._clientCache.get(clientKey)
+            if cached is None:
+                cached = (self._session.client(service_name, region_name=region_name, **kwargs), kwargs)
+                self._clientCache[clientKey] = cached
+
+        return cached[0]
+
+    def memoized_client(self, service_name, region_name=None, optOut=(), **kwargs):
+        """
+        Returns a MemoizingClient over the pooled client, memoized responses live as long as this (per-Auditor) view of
+        the Session. `optOut` is a list of additional API operation names (e.g., "DescribeInstances") to never memoize
+        """
+        client = self.client(service_name, region_name=region_name, **kwargs)
+        # pooled clients are never garbage collected so their id() is stable
+        memoKey = (id(client), tuple(sorted(optOut)))
+        with self._clientLock:
+            memoizingClient = self._memoizingClients.get(memoKey)
+            if memoizingClient is None:
+                memoizingClient = self._memoizingClients[memoKey] = MemoizingClient(client, optOut)
+
+        return memoizingClient
+
+    def memo_counters(self) -> dict:
+        """
+        Returns the memoization hits and misses of every memoized client of this view of the Session
+        """
+        counters = {"hits": 0, "misses": 0}
+        for memoizingClient in list(self._memoizingClients.values()):
+            for key in counters:
+                counters[key] += memoizingClient.counters[key]
+
+        return counters
+
+    def resource(self, service_name, region_name=None, **kwargs):
+        with self._clientLock:
+            return self._session.resource(service_name, region_name=region_name or self._region, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+class AwsSessionPool(object):
+    """
+    Caches one Boto3 Session per (Account, Partition, IAM Role) so that STS AssumeRole is called once per Account instead
+    of once per Account, Region and Auditor. Assumed Role credentials are refreshed by botocore shortly before they expire
+    """
+
+    def __init__(self):
+        self._identities = {}
+        self._poolLock = Lock()
+        self._identityLocks = {}
+
+    def get_session(self, account: str, partition: str, region: str, roleName: str = None) -> PooledAwsSession:
+        """
+        Returns a Region-specific PooledAwsSession for an Account, assuming the IAM Role the first time it is requested.
+        If no Role name is provided the current (default chain) credentials are used
+        """
+        identityKey = (account, partition, roleName)
+
+        with self._poolLock:
+            identity = self._identities.get(identityKey)
+            if identity is None:
+                identityLock = self._identityLocks.setdefault(identityKey, Lock())
+        # Only block other callers for the same identity while AssumeRole is in flight
+        if identity is None:
+            with identityLock:
+                identity = self._identities.get(identityKey)
+                if identity is None:
+                    identity = (self._create_boto3_session(account, partition, roleName), {}, Lock())
+                    with self._poolLock:
+                        self._identities[identityKey] = identity
+
+        session, clientCache, clientLock = identity
+
+        return PooledAwsSession(session, region, clientCache, clientLock)
+
+    def _create_boto3_session(self, account, partition, roleName):
+        if roleName is None:
+            return boto3.Session()
+
+        crossAccountRoleArn = f"arn:{partition}:iam::{account}:role/{roleName}"
+
+        botocoreSession = get_session()
+        botocoreSession._credentials = RefreshableCredentials.create_from_metadata(
+            metadata=self._assume_role(crossAccountRoleArn),
+            refresh_using=lambda: self._assume_role(crossAccountRoleArn),
+            method="sts-assume-role"
+        )
+
+        return boto3.Session(botocore_session=botocoreSession)
+
+    def _assume_role(self, crossAccountRoleArn):
+        """
+        Assumes an IAM Role and returns its credentials in the metadata format expected by RefreshableCredentials
+        """
+        try:
+            memberAcct = sts.assume_role(
+                RoleArn=crossAccountRoleArn,
+                RoleSessionName="ElectricEye"
+            )
+            logger.info("Assumed role: %s successfully", crossAccountRoleArn)
+        except ClientError as e:
+            logger.error(
+                "Failed to assume role %s: %s",
+                crossAccountRoleArn, e
+            )
+            raise e
+
+        return {
+            "access_key": memberAcct["Credentials"]["AccessKeyId"],
+            "secret_key": memberAcct["Credentials"]["SecretAccessKey"],
+            "token": memberAcct["Credentials"]["SessionToken"],
+            "expiry_time": memberAcct["Credentials"]["Expiration"].isoformat()
+        }
+
+# Shared by every Auditor within this process
+awsSessionPool = AwsSessionPool()
+
 class CloudConfig(object):
     """
     This Class handles processing of Credentials, Regions, Accounts, and other Provider-specific configurations
@@ -119,6 +326,27 @@ class CloudConfig(object):
                 electricEyeRoleName = None
             
             self.electricEyeRoleName = electricEyeRoleName
+
+            # Process ["aws_max_concurrent_auditors"] and ["aws_max_concurrent_auditors_per_account"] - older TOML files will
+            # not have these values so default to running every Auditor one at a time as ElectricEye always has
+            awsValues = data["regions_and_accounts"]["aws"]
+            self.awsMaxConcurrentAuditors = self.validate_positive_integer(
+                awsValues.get("aws_max_concurrent_auditors", 1),
+                "aws_max_concurrent_auditors"
+            )
+            self.awsMaxConcurrentAuditorsPerAccount = self.validate_positive_integer(
+                awsValues.get("aws_max_concurrent_auditors_per_account", self.awsMaxConcurrentAuditors),
+                "aws_max_concurrent_auditors_per_account"
+            )
+
+            # Process ["aws_endpoint_index_cache_path"] and ["aws_endpoint_index_cache_ttl_hours"] - if no path is provided
+            # the endpoint data shipped with the installed botocore package is used and nothing is downloaded
+            awsEndpointIndexCachePath = awsValues.get("aws_endpoint_index_cache_path")
+            self.awsEndpointIndexCachePath = path.expanduser(awsEndpointIndexCachePath) if awsEndpointIndexCachePath else None
+            self.awsEndpointIndexCacheTtlHours = self.validate_positive_integer(
+                awsValues.get("aws_endpoint_index_cache_ttl_hours", 24),
+                "aws_endpoint_index_cache_ttl_hours"
+            )
         
         # GCP
         elif assessmentTarget == "GCP":
@@ -515,6 +743,19 @@ class CloudConfig(object):
 
         return regions
     
+    def validate_positive_integer(self, value, configurationName):
+        """
+        Ensures a TOML-provided value (concurrency limits, TTLs) is a positive integer and returns it
+        """
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            logger.error(
+                "Invalid value for %s, it must be an integer of at least 1.",
+                configurationName
+            )
+            sys.exit(2)
+
+        return value
+    
     def get_credential_from_aws_ssm(self, value, configurationName):
         """
         Retrieves a TOML variable from AWS Systems Manager Parameter Store and returns it
@@ -599,33 +840,12 @@ class CloudConfig(object):
         return accounts
 
     # This function is called outside of this Class
-    def create_aws_session(account: str, partition: str, region: str, roleName: str) -> boto3.Session:
+    def create_aws_session(account: str, partition: str, region: str, roleName: str) -> PooledAwsSession:
         """
-        Creates a Boto3 Session by assuming a given AWS IAM Role
+        Returns a Boto3 Session for an Account & Region by assuming a given AWS IAM Role, or the current credentials if no
+        Role is provided. Sessions, credentials and clients are pooled and re-used across Regions and Auditors
         """
-        crossAccountRoleArn = f"arn:{partition}:iam::{account}:role/{roleName}"
-
-        try:
-            memberAcct = sts.assume_role(
-                RoleArn=crossAccountRoleArn,
-                RoleSessionName="ElectricEye"
-            )
-            logger.info("Assumed role: %s successfully", crossAccountRoleArn)
-        except ClientError as e:
-            logger.error(
-                "Failed to assume role %s: %s",
-                crossAccountRoleArn, e
-            )
-            raise e
-
-        session = boto3.Session(
-            aws_access_key_id=memberAcct["Credentials"]["AccessKeyId"],
-            aws_secret_access_key=memberAcct["Credentials"]["SecretAccessKey"],
-            aws_session_token=memberAcct["Credentials"]["SessionToken"],
-            region_name=region
-        )
-
-        return session
+        return awsSessionPool.get_session(account, partition, region, roleName)
     
     # This function is called outside of this Class and from create_aws_session()
     def check_aws_partition(region: str):
@@ -23,6 +23,7 @@ import click
 from insights import create_sechub_insights
 from eeauditor import EEAuditor
 from processor.main import get_providers, process_findings
+from processor.delta_state import CheckRunTracker, FindingStateStore, get_delta_state_path
 from os import environ
 
 def print_controls(assessmentTarget, auditorName=None):
@@ -39,42 +40,64 @@ def print_checks(assessmentTarget, auditorName=None):
         
     app.print_checks_md()
 
-def run_auditor(assessmentTarget, auditorName=None, pluginName=None, delay=0, outputs=None, outputFile="", tomlPath=None):
+def run_auditor(assessmentTarget, auditorName=None, pluginName=None, delay=0, outputs=None, outputFile="", tomlPath=None, delta=False):
     if not outputs:
         outputs = ["stdout"]
     
+    # Set the TOML path before running any Auditors, shared modules (e.g., threat_intel) and Outputs read it
+    if tomlPath is None:
+        environ["TOML_FILE_PATH"] = "None"
+    else:
+        environ["TOML_FILE_PATH"] = tomlPath
+
     app = EEAuditor(assessmentTarget, tomlPath)
 
     app.load_plugins(auditorName)
+    # In delta mode the findings of a Check are only resolved if that Check ran to completion
+    if delta:
+        app.checkRuns = CheckRunTracker()
     # Per-target calls - ensure you use the right run_*_checks*() function
     if assessmentTarget == "AWS":
-        findings = list(app.run_aws_checks(pluginName=pluginName, delay=delay))
+        findings = app.run_aws_checks(pluginName=pluginName, delay=delay)
     elif assessmentTarget == "GCP":
-        findings = list(app.run_gcp_checks(pluginName=pluginName, delay=delay))
+        findings = app.run_gcp_checks(pluginName=pluginName, delay=delay)
     elif assessmentTarget == "OCI":
-        findings = list(app.run_oci_checks(pluginName=pluginName, delay=delay))
+        findings = app.run_oci_checks(pluginName=pluginName, delay=delay)
     elif assessmentTarget == "Azure":
-        findings = list(app.run_azure_checks(pluginName=pluginName, delay=delay))
+        findings = app.run_azure_checks(pluginName=pluginName, delay=delay)
     elif assessmentTarget == "M365":
-        findings = list(app.run_m365_checks(pluginName=pluginName, delay=delay))
+        findings = app.run_m365_checks(pluginName=pluginName, delay=delay)
     elif assessmentTarget == "Salesforce":
-        findings = list(app.run_salesforce_checks(pluginName=pluginName, delay=delay))
+        findings = app.run_salesforce_checks(pluginName=pluginName, delay=delay)
     else:
-        findings = list(app.run_non_aws_checks(pluginName=pluginName, delay=delay))
+        findings = app.run_non_aws_checks(pluginName=pluginName, delay=delay)
+
+    # In delta mode only the findings that are new, changed or resolved since the last run are sent to the outputs
+    stateStore = None
+    if delta:
+        stateStore = FindingStateStore(get_delta_state_path())
+        findings = stateStore.delta(
+            findings, assessmentTarget, scope=f"{auditorName or ''}/{pluginName or ''}", checkRuns=app.checkRuns
+        )
 
-    print(f"Done running Checks for {assessmentTarget}")
+    try:
+        # Multiple outputs supported, findings are streamed to every output as the Checks produce them
+        delivered = process_findings(
+            findings=findings,
+            outputs=outputs,
+            output_file=outputFile
+        )
+        # The state is only saved once every output delivered every finding, otherwise the same delta is sent again on the next run
+        if stateStore:
+            if delivered:
+                stateStore.commit()
+            else:
+                print("Not every finding was delivered, the delta state was not saved and the same delta is sent on the next --delta run.")
+    finally:
+        if stateStore:
+            stateStore.close()
 
-    if tomlPath is None:
-        environ["TOML_FILE_PATH"] = "None"
-    else:
-        environ["TOML_FILE_PATH"] = tomlPath
-    
-    # Multiple outputs supported
-    process_findings(
-        findings=findings,
-        outputs=outputs,
-        output_file=outputFile
-    )
+    print(f"Done running Checks for {assessmentTarget}")
 
 @click.command()
 # Assessment Target
@@ -162,6 +185,12 @@ def run_auditor(assessmentTarget, auditorName=None, pluginName=None, delay=0, ou
     default=None,
     help="The full path to the TOML file used for configure e.g., ~/path/to/mydir/external_providers.toml. If this value is not provided the default path of ElectricEye/eeauditor/external_providers.toml is used."
 )
+# Delta Mode
+@click.option(
+    "--delta",
+    is_flag=True,
+    help="Only send findings that are new, changed or resolved since the last --delta run of the same Assessment Target, Auditor and Check to the Outputs. State is kept in the SQLite file at [global.delta_state_path]"
+)
 
 def main(
     target_provider,
@@ -174,7 +203,8 @@ def main(
     list_checks,
     create_insights,
     list_controls,
-    toml_path
+    toml_path,
+    delta
 ):
     if list_controls:
         print_controls(
@@ -207,7 +237,8 @@ def main(
         delay=delay,
         outputs=outputs,
         outputFile=output_file,
-        tomlPath=toml_path
+        tomlPath=toml_path,
+        delta=delta
     )
 
 if __name__ == "__main__":
@@ -26,9 +26,11 @@ import sys
 from time import sleep
 from traceback import format_exc
 import json
-from requests import get
+from audit_scheduler import AuditScheduler, AuditUnit
 from check_register import CheckRegister
 from cloud_utils import CloudConfig
+from endpoint_index import ServiceEndpointIndex
+from inventory import AuditorCache, InventoryCache
 from pluginbase import PluginBase
 
 logger = logging.getLogger("EEAuditor")
@@ -48,6 +50,8 @@ class EEAuditor(object):
         self.registry = CheckRegister()
         self.name = assessmentTarget
         self.plugin_base = PluginBase(package="electriceye")
+        # Set by controller.py in --delta mode to record which Check produced each finding and which Checks completed
+        self.checkRuns = None
         ##################################
         # PUBLIC CLOUD SERVICE PROVIDERS #
         ##################################
@@ -59,6 +63,10 @@ class EEAuditor(object):
             self.awsAccountTargets = utils.awsAccountTargets
             self.awsRegionsSelection = utils.awsRegionsSelection
             self.electricEyeRoleName = utils.electricEyeRoleName
+            self.awsMaxConcurrentAuditors = utils.awsMaxConcurrentAuditors
+            self.awsMaxConcurrentAuditorsPerAccount = utils.awsMaxConcurrentAuditorsPerAccount
+            self.awsEndpointIndexCachePath = utils.awsEndpointIndexCachePath
+            self.awsEndpointIndexCacheTtlHours = utils.awsEndpointIndexCacheTtlHours
         # GCP
         if assessmentTarget == "GCP":
             searchPath = "./auditors/gcp"
@@ -153,18 +161,12 @@ class EEAuditor(object):
                     raise e
 
     # Called within this class    
-    def check_service_endpoint_availability(self, endpointData, awsPartition, service, awsRegion):
+    def check_service_endpoint_availability(self, endpointIndex, awsPartition, service, awsRegion):
         """
-        This function downloads the latest version of botocore's endpoints.json file from GitHub and checks if a provided
-        service within a specific AWS Partition and Region is available
+        This function checks if a provided service within a specific AWS Partition and Region is available using a precomputed
+        ServiceEndpointIndex built from botocore's endpoints.json data
         """
 
-        # these are "endpoints" and not real regions, since ElectricEye provides local overrides to the "global"
-        # AWS region within each Auditor already as long as these are present for a specific service then we're good
-        globalEndpointPseudoRegions = [
-            "aws-global", "fips-aws-global", "aws-cn-global", "aws-us-gov-global", "aws-us-gov-global-fips", "iam-govcloud", "iam-govcloud-fips", "aws-iso-global", "aws-iso-b-global", "aws-iso-e-global"
-        ]
-
         # FIS isn't in the endpoints for some reason, which is stupid, so I need to have a list of FIS regions
         # https://docs.aws.amazon.com/general/latest/gr/fis.html
         fisRegions = [
@@ -185,52 +187,60 @@ class EEAuditor(object):
             else:
                 return False
 
-        for partition in endpointData["partitions"]:
-            if awsPartition == partition["partition"]:
-                services = partition["services"]
-                for serviceName, serviceData in services.items():
-                    try:
-                        # ecr, sagemaker, and a few other services have "api." on their names
-                        # which is not consistent with the service at all
-                        serviceName = str(serviceName).split("api.")[1]
-                    except IndexError:
-                        serviceName = serviceName
-                    
-                    # Compare the provided service name (from ElectricEye Plugin name) to service derived from the endpoint data
-                    if service == serviceName:
-                        regions = list(serviceData["endpoints"].keys())
-                        # Backcheck on the "global" services e.g., Support, Trustedadvisor, CloudFront, IAM
-                        if any(item in globalEndpointPseudoRegions for item in regions):
-                            serviceAvailable = True
-                            break
-                        # Each service endpoint has a dict of Regions where the endpoint is available, at this point we have a valid service availability for the region + partition
-                        if awsRegion in regions:
-                            serviceAvailable = True
-                            break
-                        else:
-                            serviceAvailable = False
-                        # break if there is nothing else
-                        break
-                    else:
-                        serviceAvailable = False
-
-        return serviceAvailable
+        return endpointIndex.is_available(awsPartition, service, awsRegion)
     
+    # Called by every run_*_checks() function
+    def track_check(self, unit, findings):
+        """
+        Passes through the (non-empty) findings of a single Check. With a CheckRunTracker every finding is attributed to the
+        Check's unit and the unit is marked completed once the Check was exhausted without raising
+        """
+        for finding in findings:
+            if finding is not None:
+                if self.checkRuns:
+                    self.checkRuns.produced(finding, unit)
+                yield finding
+
+        if self.checkRuns:
+            self.checkRuns.completed(unit)
+
     # Called from eeauditor/controller.py run_auditor()
     def run_aws_checks(self, pluginName=None, delay=0):
         """
-        Runs AWS Auditors across all TOML-specified Accounts and Regions in a specific Partition
+        Runs AWS Auditors across all TOML-specified Accounts and Regions in a specific Partition. Every (Account, Region, Auditor)
+        combination is an independent unit of work which is fanned out by the AuditScheduler within the TOML-specified concurrency limits
+        """
+
+        # Build the service availability index once, from the installed botocore data or the on-disk cache
+        endpointIndex = ServiceEndpointIndex.load(
+            cachePath=self.awsEndpointIndexCachePath,
+            ttlHours=self.awsEndpointIndexCacheTtlHours
+        )
+
+        scheduler = AuditScheduler(
+            maxWorkers=self.awsMaxConcurrentAuditors,
+            maxWorkersPerAccount=self.awsMaxConcurrentAuditorsPerAccount,
+            delay=delay
+        )
+
+        # Inventory (e.g., EC2 Instances) shared by every Auditor of an Account & Region, collected at most once per scope
+        inventory = InventoryCache()
+
+        for finding in scheduler.run(self.plan_aws_audit_units(endpointIndex, inventory, pluginName)):
+            yield finding
+
+    # Called within this class
+    def plan_aws_audit_units(self, endpointIndex, inventory, pluginName=None):
+        """
+        Builds the list of AuditUnits for every Account, Region and Auditor that should run. Service availability and
+        "global" Auditor de-duplication are decided up front so that no Session is created for work that will be skipped,
+        every unit is also registered with the InventoryCache so a scope's inventory is freed after its last Auditor
         """
 
         # "Global" Auditors that should only need to be ran once per Account
         globalAuditors = ["cloudfront", "globalaccelerator", "iam", "health", "support", "account", "s3"]
-        
-        # Retrieve the endpoints.json data to prevent multiple outbound calls
-        endpointData = json.loads(
-            get(
-                "https://raw.githubusercontent.com/boto/botocore/develop/botocore/data/endpoints.json"
-            ).text
-        )
+
+        units = []
 
         for account in self.awsAccountTargets:
 
@@ -238,25 +248,12 @@ class EEAuditor(object):
             globalAuditorsCompleted = []
 
             for region in self.awsRegionsSelection:
+                # Dervice the Partition ID from the AWS Region - needed for ASFF & service availability checks
+                partition = CloudConfig.check_aws_partition(region)
+
                 for serviceName, checkList in self.registry.checks.items():
-                    # Pass the Cache at the "serviceName" level aka Plugin
-                    auditorCache = {}
-                    # Dervice the Partition ID from the AWS Region - needed for ASFF & service availability checks
-                    partition = CloudConfig.check_aws_partition(region)
-                    # Setup Boto3 Session with STS AssumeRole
-                    if self.electricEyeRoleName is not None:
-                        session = CloudConfig.create_aws_session(
-                            account,
-                            partition,
-                            region,
-                            self.electricEyeRoleName
-                        )
-                    # attempt to use current session creds
-                    else:
-                        import boto3
-                        session = boto3.Session(region_name=region)
                     # Check service availability, not always accurate
-                    if self.check_service_endpoint_availability(endpointData, partition, serviceName, region) is False:
+                    if self.check_service_endpoint_availability(endpointIndex, partition, serviceName, region) is False:
                         logger.info(
                             "%s is not available in %s",
                             serviceName, region
@@ -295,35 +292,76 @@ class EEAuditor(object):
                             )
                             continue
 
-                    for checkName, check in checkList.items():
-                        # if a specific check is requested, only run that one check
-                        if (
-                            not pluginName
-                            or pluginName
-                            and pluginName == checkName
-                        ):
-                            try:
-                                logger.info(
-                                    "Executing Check %s for Account %s in region %s",
-                                    checkName, account, region
-                                )
-                                for finding in check(
-                                    cache=auditorCache,
-                                    session=session,
-                                    awsAccountId=account,
-                                    awsRegion=region,
-                                    awsPartition=partition,
-                                ):
-                                    if finding is not None:
-                                        yield finding
-                            except Exception:
-                                logger.warn(
-                                    "Failed to execute check %s with traceback %s",
-                                    checkName, format_exc()
-                                )
-                        
-            # optional sleep if specified - defaults to 0 seconds
-            sleep(delay)
+                    inventory.expect(account, region)
+                    units.append(
+                        AuditUnit(
+                            account=account,
+                            runner=partial(
+                                self.run_aws_auditor,
+                                account,
+                                region,
+                                partition,
+                                checkList,
+                                inventory,
+                                pluginName
+                            ),
+                            label=f"{serviceName}/{region}"
+                        )
+                    )
+
+        return units
+
+    # Called by the AuditScheduler from run_aws_checks()
+    def run_aws_auditor(self, account, region, partition, checkList, inventory, pluginName=None):
+        """
+        Runs every (or the one requested) Check of a single AWS Auditor for one Account & Region. Each call gets its own
+        cache so Auditors running concurrently never share state, only the (read-only) inventory of the scope is shared
+        """
+        # Pass the Cache at the "serviceName" level aka Plugin
+        auditorCache = AuditorCache(inventory=inventory.open(account, region))
+        try:
+            # Setup (pooled) Boto3 Session with STS AssumeRole, or attempt to use current session creds if no Role was provided
+            session = CloudConfig.create_aws_session(
+                account,
+                partition,
+                region,
+                self.electricEyeRoleName
+            )
+
+            for checkName, check in checkList.items():
+                # if a specific check is requested, only run that one check
+                if (
+                    not pluginName
+                    or pluginName
+                    and pluginName == checkName
+                ):
+                    try:
+                        logger.info(
+                            "Executing Check %s for Account %s in region %s",
+                            checkName, account, region
+                        )
+                        for finding in self.track_check(f"{account}/{region}/{checkName}", check(
+                            cache=auditorCache,
+                            session=session,
+                            awsAccountId=account,
+                            awsRegion=region,
+                            awsPartition=partition,
+                        )):
+                            yield finding
+                    except Exception:
+                        logger.warn(
+                            "Failed to execute check %s with traceback %s",
+                            checkName, format_exc()
+                        )
+
+            memoCounters = session.memo_counters()
+            logger.debug(
+                "Memoized API calls for Account %s in region %s: %s hits, %s misses",
+                account, region, memoCounters["hits"], memoCounters["misses"]
+            )
+        finally:
+            # the last Auditor of the Account & Region frees the inventory
+            inventory.release(account, region)
 
     # Called from eeauditor/controller.py run_auditor()
     def run_gcp_checks(self, pluginName=None, delay=0):
@@ -357,15 +395,14 @@ class EEAuditor(object):
                                 "Executing Check %s for GCP Project %s",
                                 checkName, project
                             )
-                            for finding in check(
+                            for finding in self.track_check(f"{project}/{serviceName}/{checkName}", check(
                                 cache=auditorCache,
                                 awsAccountId=account,
                                 awsRegion=region,
                                 awsPartition=partition,
                                 gcpProjectId=project
-                            ):
-                                if finding is not None:
-                                    yield finding
+                            )):
+                                yield finding
                         except Exception:
                             logger.warn(
                                 "Failed to execute check %s with traceback %s",
@@ -404,7 +441,7 @@ class EEAuditor(object):
                             "Executing Check %s for OCI",
                             checkName
                         )
-                        for finding in check(
+                        for finding in self.track_check(f"{serviceName}/{checkName}", check(
                             cache=auditorCache,
                             awsAccountId=account,
                             awsRegion=region,
@@ -414,9 +451,8 @@ class EEAuditor(object):
                             ociRegionName=self.ociRegionName,
                             ociCompartments=self.ociCompartments,
                             ociUserApiKeyFingerprint=self.ociUserApiKeyFingerprint
-                        ):
-                            if finding is not None:
-                                yield finding
+                        )):
+                            yield finding
                     except Exception:
                         logger.warn(
                             "Failed to execute check %s with traceback %s",
@@ -457,16 +493,15 @@ class EEAuditor(object):
                                 "Executing Check %s for Azure Sub %s",
                                 checkName, azSubId
                             )
-                            for finding in check(
+                            for finding in self.track_check(f"{azSubId}/{serviceName}/{checkName}", check(
                                 cache=auditorCache,
                                 awsAccountId=account,
                                 awsRegion=region,
                                 awsPartition=partition,
                                 azureCredential=self.azureCredentials,
                                 azSubId=azSubId
-                            ):
-                                if finding is not None:
-                                    yield finding
+                            )):
+                                yield finding
                         except Exception:
                             logger.warn(
                                 "Failed to execute check %s with traceback %s",
@@ -506,7 +541,7 @@ class EEAuditor(object):
                             "Executing Check %s for M365",
                             checkName
                         )
-                        for finding in check(
+                        for finding in self.track_check(f"{serviceName}/{checkName}", check(
                             cache=auditorCache,
                             awsAccountId=account,
                             awsRegion=region,
@@ -515,9 +550,8 @@ class EEAuditor(object):
                             clientId=self.m365ClientId,
                             clientSecret=self.m365SecretId,
                             tenantLocation=self.m365TenantLocation,
-                        ):
-                            if finding is not None:
-                                yield finding
+                        )):
+                            yield finding
                     except Exception:
                         logger.warn(
                             "Failed to execute check %s with traceback %s",
@@ -558,7 +592,7 @@ class EEAuditor(object):
                             "Executing Check %s for Salesforce instance",
                             checkName
                         )
-                        for finding in check(
+                        for finding in self.track_check(f"{serviceName}/{checkName}", check(
                             cache=auditorCache,
                             awsAccountId=account,
                             awsRegion=region,
@@ -569,9 +603,8 @@ class EEAuditor(object):
                             salesforceApiPassword = self.salesforceApiPassword,
                             salesforceUserSecurityToken = self.salesforceUserSecurityToken,
                             salesforceInstanceLocation = self.salesforceInstanceLocation
-                        ):
-                            if finding is not None:
-                                yield finding
+                        )):
+                            yield finding
                     except Exception:
                         logger.warn(
                             "Failed to execute check %s with traceback %s",
@@ -610,14 +643,13 @@ class EEAuditor(object):
                             "Executing Check %s",
                             checkName
                         )
-                        for finding in check(
+                        for finding in self.track_check(f"{serviceName}/{checkName}", check(
                             cache=auditorCache,
                             awsAccountId=account,
                             awsRegion=region,
                             awsPartition=partition
-                        ):
-                            if finding is not None:
-                                yield finding
+                        )):
+                            yield finding
                     except Exception:
                         logger.warn(
                             "Failed to execute check %s with traceback %s",
@@ -0,0 +1,182 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import logging
+import json
+from os import path, makedirs
+from time import time
+
+logger = logging.getLogger("EndpointIndex")
+
+BOTOCORE_ENDPOINTS_URL = "https://raw.githubusercontent.com/boto/botocore/develop/botocore/data/endpoints.json"
+
+# these are "endpoints" and not real regions, since ElectricEye provides local overrides to the "global"
+# AWS region within each Auditor already as long as these are present for a specific service then we're good
+GLOBAL_ENDPOINT_PSEUDO_REGIONS = [
+    "aws-global", "fips-aws-global", "aws-cn-global", "aws-us-gov-global", "aws-us-gov-global-fips", "iam-govcloud", "iam-govcloud-fips", "aws-iso-global", "aws-iso-b-global", "aws-iso-e-global"
+]
+
+class ServiceEndpointIndex(object):
+    """
+    Precomputed (Partition, service) -> Regions index built from botocore's endpoints.json data. By default the data
+    that ships with the installed botocore package is used so no outbound call is needed, optionally the latest data
+    can be downloaded from GitHub and the resulting index persisted to disk for a configurable TTL
+    """
+
+    def __init__(self, index):
+        # {partition: {service: None (global endpoint) | frozenset(regions)}}
+        self.index = index
+
+    @classmethod
+    def from_endpoint_data(cls, endpointData):
+        """
+        Builds the index from the parsed contents of an endpoints.json file
+        """
+        index = {}
+        for partition in endpointData["partitions"]:
+            services = index.setdefault(partition["partition"], {})
+            for serviceName, serviceData in partition["services"].items():
+                try:
+                    # ecr, sagemaker, and a few other services have "api." on their names
+                    # which is not consistent with the service at all
+                    serviceName = str(serviceName).split("api.")[1]
+                except IndexError:
+                    serviceName = serviceName
+                # the first endpoint entry for a service name wins, same as the original linear scan
+                if serviceName in services:
+                    continue
+                regions = serviceData.get("endpoints", {}).keys()
+                # Backcheck on the "global" services e.g., Support, Trustedadvisor, CloudFront, IAM
+                if any(item in GLOBAL_ENDPOINT_PSEUDO_REGIONS for item in regions):
+                    services[serviceName] = None
+                else:
+                    services[serviceName] = frozenset(regions)
+
+        return cls(index)
+
+    @classmethod
+    def from_botocore(cls):
+        """
+        Builds the index from the endpoints.json data that ships with the installed version of botocore
+        """
+        from botocore.loaders import create_loader
+
+        return cls.from_endpoint_data(create_loader().load_data("endpoints"))
+
+    @classmethod
+    def from_github(cls):
+        """
+        Builds the index from the latest endpoints.json within the botocore GitHub repository
+        """
+        from requests import get
+
+        r = get(BOTOCORE_ENDPOINTS_URL, timeout=30)
+        r.raise_for_status()
+
+        return cls.from_endpoint_data(r.json())
+
+    @classmethod
+    def load(cls, cachePath=None, ttlHours=24):
+        """
+        Returns an index built from the installed botocore data. If a `cachePath` is provided, a cached index younger than
+        `ttlHours` is re-used, otherwise the latest data is downloaded from GitHub (falling back to the installed botocore
+        data when offline) and written to `cachePath` for the next run
+        """
+        if not cachePath:
+            return cls.from_botocore()
+
+        cached = cls.read_cache(cachePath, ttlHours)
+        if cached is not None:
+            return cached
+
+        try:
+            endpointIndex = cls.from_github()
+        except Exception as e:
+            logger.warning(
+                "Could not download the latest endpoints.json, using the data from the installed botocore package instead: %s",
+                e
+            )
+            endpointIndex = cls.from_botocore()
+
+        endpointIndex.write_cache(cachePath)
+
+        return endpointIndex
+
+    @classmethod
+    def read_cache(cls, cachePath, ttlHours):
+        """
+        Returns a cached index if one exists at `cachePath` and has not expired, otherwise None
+        """
+        if not path.exists(cachePath):
+            return None
+
+        try:
+            with open(cachePath, "r") as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable endpoint index cache %s: %s", cachePath, e)
+            return None
+
+        if time() - cached.get("createdAt", 0) > ttlHours * 3600:
+            logger.info("Endpoint index cache %s has expired", cachePath)
+            return None
+
+        return cls(
+            {
+                partition: {
+                    service: None if regions is None else frozenset(regions) for service, regions in services.items()
+                } for partition, services in cached["index"].items()
+            }
+        )
+
+    def write_cache(self, cachePath):
+        """
+        Persists the index as JSON to `cachePath`, failures are logged and otherwise ignored
+        """
+        payload = {
+            "createdAt": time(),
+            "index": {
+                partition: {
+                    service: None if regions is None else sorted(regions) for service, regions in services.items()
+                } for partition, services in self.index.items()
+            }
+        }
+
+        try:
+            cacheDir = path.dirname(path.abspath(cachePath))
+            makedirs(cacheDir, exist_ok=True)
+            with open(cachePath, "w") as f:
+                json.dump(payload, f)
+        except OSError as e:
+            logger.warning("Failed to write endpoint index cache %s: %s", cachePath, e)
+
+    def is_available(self, partition, service, region):
+        """
+        Returns True if a service has an endpoint in a Region (or a global endpoint) within a Partition
+        """
+        regions = self.index.get(partition, {}).get(service, False)
+        # service is not in the endpoint data for this Partition at all
+        if regions is False:
+            return False
+        # global endpoint
+        if regions is None:
+            return True
+
+        return region in regions
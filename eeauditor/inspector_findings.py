@@ -0,0 +1,77 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+from botocore.config import Config
+
+# Adding backoff and retries for Inspector - ListFindings is paginated heavily on large accounts
+config = Config(
+   retries = {
+      'max_attempts': 10,
+      'mode': 'adaptive'
+   }
+)
+
+def get_inspector_package_vulnerabilities(cache, session, resourceType=None):
+    """
+    Pages through every ACTIVE Amazon Inspector V2 PACKAGE_VULNERABILITY finding in the current Account & Region once and
+    returns a dict of resource ID -> list of findings, stored in the Auditor's cache. Optionally limit the findings to an
+    Inspector resource type such as AWS_EC2_INSTANCE, AWS_ECR_CONTAINER_IMAGE or AWS_LAMBDA_FUNCTION
+    """
+    cacheKey = "get_inspector_package_vulnerabilities"
+    if resourceType:
+        cacheKey = f"{cacheKey}_{resourceType}"
+
+    # an empty index is a valid (and cacheable) result
+    response = cache.get(cacheKey)
+    if response is not None:
+        return response
+
+    inspector = session.client("inspector2", config=config)
+
+    filterCriteria = {
+        "findingStatus": [
+            {
+                "comparison": "EQUALS",
+                "value": "ACTIVE"
+            }
+        ],
+        "findingType": [
+            {
+                "comparison": "EQUALS",
+                "value": "PACKAGE_VULNERABILITY"
+            }
+        ]
+    }
+    if resourceType:
+        filterCriteria["resourceType"] = [
+            {
+                "comparison": "EQUALS",
+                "value": resourceType
+            }
+        ]
+
+    findingsByResource = {}
+    for page in inspector.get_paginator("list_findings").paginate(filterCriteria=filterCriteria):
+        for finding in page["findings"]:
+            for resource in finding.get("resources", []):
+                findingsByResource.setdefault(resource["id"], []).append(finding)
+
+    cache[cacheKey] = findingsByResource
+    return cache[cacheKey]
@@ -0,0 +1,274 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import logging
+import csv
+from io import StringIO
+from threading import Lock
+from time import sleep
+from botocore.config import Config
+
+logger = logging.getLogger("Inventory")
+
+# Adding backoff and retries for SSM - this API gets throttled a lot
+SSM_CONFIG = Config(
+   retries = {
+      "max_attempts": 10,
+      "mode": "adaptive"
+   }
+)
+
+# How many times, and how many seconds apart, to check whether the IAM credential report finished generating
+CREDENTIAL_REPORT_POLL_ATTEMPTS = 30
+CREDENTIAL_REPORT_POLL_SECONDS = 2
+
+# Every named collector, a function of a boto3 Session that returns the raw inventory
+COLLECTORS = {}
+
+def inventory_collector(name):
+    """
+    Decorator that registers a collector under `name`, which is what Auditors pass to get_inventory()
+    """
+
+    def decorator_register(func):
+        COLLECTORS[name] = func
+        return func
+
+    return decorator_register
+
+def get_inventory(cache, session, name):
+    """
+    Returns the inventory collected by the `name` collector, shared by every Auditor of the same Account & Region. The
+    result is shared read-only, Auditors must copy anything they want to change. Outside of a scheduled run (a plain dict
+    cache) the collector is simply called
+    """
+    scope = getattr(cache, "inventory", None)
+    if scope is None:
+        return COLLECTORS[name](session)
+
+    return scope.get(name, session)
+
+class AuditorCache(dict):
+    """
+    The per-Auditor `cache` dict handed to every Check, which also carries the InventoryScope of its Account & Region
+    """
+
+    def __init__(self, inventory=None):
+        super().__init__()
+        self.inventory = inventory
+
+class InventoryScope(object):
+    """
+    Results of the named collectors for one Account & Region, each collector runs at most once. Auditors running
+    concurrently that need the same collector wait for the first one instead of calling the APIs again
+    """
+
+    def __init__(self, account, region):
+        self.account = account
+        self.region = region
+        self.results = {}
+        self.locks = {}
+        self.lock = Lock()
+        self.hits = 0
+
+    def get(self, name, session):
+        with self.lock:
+            collectorLock = self.locks.setdefault(name, Lock())
+
+        with collectorLock:
+            if name in self.results:
+                self.hits += 1
+                return self.results[name]
+
+            logger.info("Collecting %s for Account %s in region %s", name, self.account, self.region)
+            # a collector that raises is not cached, the next Auditor that needs it will try again
+            self.results[name] = COLLECTORS[name](session)
+
+            return self.results[name]
+
+class InventoryCache(object):
+    """
+    Tracks an InventoryScope per (Account, Region). The number of Auditors planned for every scope is declared up front
+    with `expect()` and the scope, with everything it collected, is dropped once the last of them called `release()`
+    """
+
+    def __init__(self):
+        self.scopes = {}
+        self.pending = {}
+        self.lock = Lock()
+
+    def expect(self, account, region):
+        with self.lock:
+            self.pending[(account, region)] = self.pending.get((account, region), 0) + 1
+
+    def open(self, account, region) -> InventoryScope:
+        with self.lock:
+            scope = self.scopes.get((account, region))
+            if scope is None:
+                scope = self.scopes[(account, region)] = InventoryScope(account, region)
+
+            return scope
+
+    def release(self, account, region):
+        with self.lock:
+            self.pending[(account, region)] -= 1
+            if self.pending[(account, region)] > 0:
+                return
+            del self.pending[(account, region)]
+            scope = self.scopes.pop((account, region), None)
+
+        if scope is not None:
+            logger.info(
+                "Released the inventory of Account %s in region %s, %s collections were re-used %s times",
+                account, region, len(scope.results), scope.hits
+            )
+
+@inventory_collector("ec2.describe_instances")
+def collect_ec2_instances(session) -> list:
+    """
+    Every running or stopped EC2 Instance
+    """
+    instances = []
+    for page in session.client("ec2").get_paginator("describe_instances").paginate(
+        Filters=[{"Name": "instance-state-name", "Values": ["running", "stopped"]}]
+    ):
+        for reservation in page["Reservations"]:
+            instances.extend(reservation["Instances"])
+
+    return instances
+
+@inventory_collector("ssm.describe_instance_information")
+def collect_ssm_managed_instances(session) -> list:
+    """
+    Every Instance managed by AWS Systems Manager
+    """
+    managedInstances = []
+    for page in session.client("ssm", config=SSM_CONFIG).get_paginator("describe_instance_information").paginate():
+        managedInstances.extend(page["InstanceInformationList"])
+
+    return managedInstances
+
+@inventory_collector("elbv2.describe_load_balancers")
+def collect_elbv2_load_balancers(session) -> list:
+    """
+    Every Application, Network and Gateway Load Balancer
+    """
+    loadBalancers = []
+    for page in session.client("elbv2").get_paginator("describe_load_balancers").paginate():
+        loadBalancers.extend(page["LoadBalancers"])
+
+    return loadBalancers
+
+@inventory_collector("elb.describe_load_balancers")
+def collect_classic_load_balancers(session) -> list:
+    """
+    Every Classic Load Balancer
+    """
+    loadBalancers = []
+    for page in session.client("elb").get_paginator("describe_load_balancers").paginate():
+        loadBalancers.extend(page["LoadBalancerDescriptions"])
+
+    return loadBalancers
+
+@inventory_collector("rds.describe_db_instances")
+def collect_db_instances(session) -> list:
+    """
+    Every DB Instance of the RDS namespace, which includes Amazon DocumentDB and Amazon Neptune, filter on `Engine`
+    """
+    dbInstances = []
+    for page in session.client("rds").get_paginator("describe_db_instances").paginate():
+        dbInstances.extend(page["DBInstances"])
+
+    return dbInstances
+
+@inventory_collector("iam.get_account_authorization_details")
+def collect_iam_authorization_details(session) -> dict:
+    """
+    Every IAM User, Group and Role (by name) with their inline policies, attached managed policies and group memberships
+    and every customer managed Policy (by ARN) with all of its versions, in a handful of paginated calls
+    """
+    authorizationDetails = {"Users": {}, "Groups": {}, "Roles": {}, "Policies": {}}
+    for page in session.client("iam").get_paginator("get_account_authorization_details").paginate(
+        Filter=["User", "Group", "Role", "LocalManagedPolicy"]
+    ):
+        for user in page["UserDetailList"]:
+            authorizationDetails["Users"][user["UserName"]] = user
+        for group in page["GroupDetailList"]:
+            authorizationDetails["Groups"][group["GroupName"]] = group
+        for role in page["RoleDetailList"]:
+            authorizationDetails["Roles"][role["RoleName"]] = role
+        for policy in page["Policies"]:
+            authorizationDetails["Policies"][policy["Arn"]] = policy
+
+    return authorizationDetails
+
+@inventory_collector("iam.get_credential_report")
+def collect_iam_credential_report(session) -> dict:
+    """
+    The IAM credential report as a dict of rows keyed on the User name, the AWS Root User is "<root_account>". AWS only
+    regenerates the report every 4 hours so it may not know about the most recent Users and Access Keys, every row also
+    carries the report's "GeneratedTime" as "report_generated_time" so callers can tell what it could have seen
+    """
+    iam = session.client("iam")
+    for _ in range(CREDENTIAL_REPORT_POLL_ATTEMPTS):
+        if iam.generate_credential_report()["State"] == "COMPLETE":
+            break
+        sleep(CREDENTIAL_REPORT_POLL_SECONDS)
+
+    # raises ReportInProgress if the report never finished generating
+    report = iam.get_credential_report()
+
+    rows = {}
+    for row in csv.DictReader(StringIO(report["Content"].decode("utf-8"))):
+        row["report_generated_time"] = report["GeneratedTime"]
+        rows[row["user"]] = row
+
+    return rows
+
+@inventory_collector("logs.describe_metric_filters")
+def collect_metric_filters(session) -> dict:
+    """
+    Every CloudWatch Logs metric filter, as lists keyed on the name of their Log Group
+    """
+    metricFilters = {}
+    for page in session.client("logs").get_paginator("describe_metric_filters").paginate():
+        for metricFilter in page["metricFilters"]:
+            metricFilters.setdefault(metricFilter["logGroupName"], []).append(metricFilter)
+
+    return metricFilters
+
+@inventory_collector("cloudwatch.describe_alarms")
+def collect_metric_alarms(session) -> dict:
+    """
+    Every CloudWatch metric alarm, as lists keyed on the (MetricName, Namespace) they watch. Alarms on metric math are
+    listed under every metric their expression queries
+    """
+    metricAlarms = {}
+    for page in session.client("cloudwatch").get_paginator("describe_alarms").paginate(AlarmTypes=["MetricAlarm"]):
+        for alarm in page["MetricAlarms"]:
+            metrics = {(alarm.get("MetricName"), alarm.get("Namespace"))}
+            for query in alarm.get("Metrics", []):
+                metric = query.get("MetricStat", {}).get("Metric", {})
+                metrics.add((metric.get("MetricName"), metric.get("Namespace")))
+            for metric in metrics:
+                if metric[0]:
+                    metricAlarms.setdefault(metric, []).append(alarm)
+
+    return metricAlarms
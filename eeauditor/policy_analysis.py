@@ -0,0 +1,285 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import json
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from urllib.parse import unquote
+
+# How many analyzed policy documents (by hash) are kept in memory, the least recently used are dropped first
+POLICY_ANALYSIS_CACHE_SIZE = 20_000
+
+# Action exposure of a statement, from the broadest: "*", "service:*", any other wildcard (e.g., "s3:Get*") and none
+ACTION_EXPOSURE_LEVELS = ("FULL", "SERVICE", "PARTIAL", "NONE")
+# Resource exposure of a statement: "*", any other wildcard (e.g., "arn:aws:s3:::bucket/*") and none
+RESOURCE_EXPOSURE_LEVELS = ("ALL", "PARTIAL", "NONE")
+
+# Least privilege ratings, worst first, these are the values the IAM Auditor has always used
+LEAST_PRIVILEGE_RATINGS = ("failedHigh", "failedLow", "passing")
+
+class PolicyAnalysisCache(object):
+    """
+    Process-wide, bounded memo of policy analyses keyed on a SHA-256 digest of the document, so the same managed policy,
+    key policy or resource policy shared by many resources is only ever analyzed once. JSON documents are keyed on their
+    raw text as well as on their canonical form, so a repeated API response is never even parsed again. Documents
+    themselves are never referenced, so caching an analysis does not keep e.g. a released inventory alive
+    """
+
+    _lock = Lock()
+    _analyses = OrderedDict()
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def get(cls, digest, countMiss=True):
+        with cls._lock:
+            analysis = cls._analyses.get(digest)
+            if analysis is None:
+                if countMiss:
+                    cls.misses += 1
+                return None
+            cls._analyses.move_to_end(digest)
+            cls.hits += 1
+            return analysis
+
+    @classmethod
+    def put(cls, digests, analysis):
+        with cls._lock:
+            for digest in digests:
+                cls._analyses[digest] = analysis
+            while len(cls._analyses) > POLICY_ANALYSIS_CACHE_SIZE:
+                cls._analyses.popitem(last=False)
+
+    @classmethod
+    def reset(cls):
+        """
+        Drops every memoized analysis and the counters, mostly useful for testing and benchmarking
+        """
+        with cls._lock:
+            cls._analyses.clear()
+            cls.hits = 0
+            cls.misses = 0
+
+def load_policy_document(document) -> dict:
+    """
+    Returns a policy document as a dict, documents can be given as a dict, a JSON string or a URL-encoded JSON string
+    """
+    if isinstance(document, dict):
+        return document
+
+    try:
+        return json.loads(document)
+    except ValueError:
+        return json.loads(unquote(document))
+
+def as_tuple(value) -> tuple:
+    """
+    Policy elements can either be a single value or a list of them
+    """
+    if value is None:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+
+    return (value,)
+
+def classify_action(action: str) -> str:
+    """
+    Returns the exposure level of a single Action (or NotAction) pattern
+    """
+    if action == "*":
+        return "FULL"
+    if action.endswith(":*"):
+        return "SERVICE"
+    if "*" in action or "?" in action:
+        return "PARTIAL"
+
+    return "NONE"
+
+def classify_resource(resource: str) -> str:
+    """
+    Returns the exposure level of a single Resource (or NotResource) pattern
+    """
+    if resource == "*":
+        return "ALL"
+    if "*" in resource or "?" in resource:
+        return "PARTIAL"
+
+    return "NONE"
+
+def principal_account(principal: str):
+    """
+    Returns the AWS Account ID of an "AWS" Principal given as an Account ID or an ARN, or None for "*" and anything else
+    """
+    if principal.isdigit():
+        return principal
+    parts = principal.split(":")
+    if len(parts) > 4 and parts[4].isdigit():
+        return parts[4]
+
+    return None
+
+def normalize_statement(statement: dict) -> dict:
+    """
+    Normalizes a single Statement: every element becomes a tuple, Actions are lowercased (they are case insensitive),
+    the Not* variants are flagged, and the action and resource exposure of the Statement are classified. An Allow with
+    NotAction or NotResource grants everything that is not listed, which is classified as FULL or ALL respectively
+    """
+    effect = statement.get("Effect")
+
+    notAction = "NotAction" in statement
+    actions = tuple(a.lower() for a in as_tuple(statement.get("NotAction" if notAction else "Action")))
+    notResource = "NotResource" in statement
+    resources = as_tuple(statement.get("NotResource" if notResource else "Resource"))
+
+    notPrincipal = "NotPrincipal" in statement
+    principal = statement.get("NotPrincipal" if notPrincipal else "Principal")
+    if principal is None:
+        principals = {}
+    elif isinstance(principal, dict):
+        principals = {principalType: as_tuple(values) for principalType, values in principal.items()}
+    else:
+        principals = {"*": as_tuple(principal)}
+
+    if effect == "Allow" and notAction:
+        actionExposure = "FULL"
+    else:
+        levels = {classify_action(a) for a in actions}
+        actionExposure = next((level for level in ACTION_EXPOSURE_LEVELS if level in levels), "NONE")
+    if effect == "Allow" and notResource:
+        resourceExposure = "ALL"
+    else:
+        levels = {classify_resource(r) for r in resources}
+        resourceExposure = next((level for level in RESOURCE_EXPOSURE_LEVELS if level in levels), "NONE")
+
+    return {
+        "Sid": statement.get("Sid"),
+        "Effect": effect,
+        "Actions": actions,
+        "NotAction": notAction,
+        "Resources": resources,
+        "NotResource": notResource,
+        "Principals": principals,
+        "NotPrincipal": notPrincipal,
+        "Condition": statement.get("Condition") or {},
+        "ActionExposure": actionExposure,
+        "ResourceExposure": resourceExposure
+    }
+
+def denies_insecure_transport(statement: dict) -> bool:
+    """
+    Whether a normalized Statement denies every action of a service (or every action) when aws:SecureTransport is false.
+    NotAction and NotResource exempt what they list from the Deny, such Statements are never counted as denying insecure transport
+    """
+    if statement["Effect"] != "Deny" or statement["ActionExposure"] not in ("FULL", "SERVICE"):
+        return False
+    if statement["NotAction"] or statement["NotResource"]:
+        return False
+
+    for operator, conditions in statement["Condition"].items():
+        if operator.lower() != "bool":
+            continue
+        for conditionKey, values in conditions.items():
+            if conditionKey.lower() == "aws:securetransport" and any(str(v).lower() == "false" for v in as_tuple(values)):
+                return True
+
+    return False
+
+def analyze_statements(statements: tuple) -> dict:
+    """
+    Summarizes the normalized Statements of one policy document, see analyze_policy()
+    """
+    rating = "passing"
+    wildcardActions = set()
+    isPublic = False
+    principalAccounts = set()
+    insecureTransportDeniedResources = set()
+
+    for statement in statements:
+        if statement["Effect"] == "Allow":
+            for principalType, values in statement["Principals"].items():
+                if principalType in ("*", "AWS"):
+                    principalAccounts.update(
+                        account for account in (principal_account(v) for v in values if v != "*") if account
+                    )
+            if statement["Condition"]:
+                continue
+
+            if statement["NotPrincipal"] or any("*" in values for values in statement["Principals"].values()):
+                isPublic = True
+
+            if statement["ActionExposure"] != "NONE":
+                if statement["NotAction"]:
+                    wildcardActions.add("*")
+                else:
+                    wildcardActions.update(a for a in statement["Actions"] if classify_action(a) != "NONE")
+                if statement["ActionExposure"] in ("FULL", "SERVICE") and statement["ResourceExposure"] == "ALL":
+                    statementRating = "failedHigh"
+                else:
+                    statementRating = "failedLow"
+                rating = min(rating, statementRating, key=LEAST_PRIVILEGE_RATINGS.index)
+
+        elif denies_insecure_transport(statement):
+            insecureTransportDeniedResources.update(statement["Resources"])
+
+    return {
+        "Statements": statements,
+        "LeastPrivilegeRating": rating,
+        "WildcardActions": frozenset(wildcardActions),
+        "IsPublic": isPublic,
+        "PrincipalAccounts": frozenset(principalAccounts),
+        "InsecureTransportDeniedResources": frozenset(insecureTransportDeniedResources)
+    }
+
+def analyze_policy(document) -> dict:
+    """
+    Analyzes an IAM identity or resource-based policy document (a dict, JSON or URL-encoded JSON) and returns a dict of:
+    - `Statements`: the normalized Statements, see normalize_statement()
+    - `LeastPrivilegeRating`: "failedHigh" when an unconditional Allow grants "*" or "service:*" (or NotAction) on every
+    Resource, "failedLow" for any other unconditional wildcard Action, "passing" otherwise
+    - `WildcardActions`: the (lowercased) wildcard Actions of unconditional Allow Statements, NotAction counts as "*"
+    - `IsPublic`: whether an unconditional Allow applies to the "*" Principal (or uses NotPrincipal)
+    - `PrincipalAccounts`: the AWS Account IDs named as Principals of any Allow Statement
+    - `InsecureTransportDeniedResources`: Resources of the Statements that Deny all actions when aws:SecureTransport is false,
+    Statements using NotAction or NotResource are ignored
+    Results are memoized by the hash of the document and shared, they must be treated as read-only. Likewise a decoded
+    document must not be modified once it was analyzed
+    """
+    rawDigest = None
+    if isinstance(document, str):
+        rawDigest = sha256(document.encode("utf-8")).hexdigest()
+        analysis = PolicyAnalysisCache.get(rawDigest, countMiss=False)
+        if analysis is not None:
+            return analysis
+        document = load_policy_document(document)
+
+    digest = sha256(json.dumps(document, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")).hexdigest()
+    analysis = PolicyAnalysisCache.get(digest)
+    if analysis is None:
+        statements = document.get("Statement", [])
+        if isinstance(statements, dict):
+            statements = [statements]
+        analysis = analyze_statements(tuple(normalize_statement(statement) for statement in statements))
+        PolicyAnalysisCache.put([d for d in (digest, rawDigest) if d], analysis)
+    elif rawDigest:
+        PolicyAnalysisCache.put([rawDigest], analysis)
+
+    return analysis
@@ -0,0 +1,93 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import json
+from base64 import b64decode
+from collections import OrderedDict
+
+# Assets (and decoded payloads) kept by an AssetRegistry, the findings of an Asset arrive close together as every
+# (Account, Region, Auditor) unit evaluates it in one go, so only the most recently seen Assets need to be shared
+DEFAULT_MAX_ASSETS = 10_000
+
+class AssetRegistry(object):
+    """
+    Keeps a single copy of every recently seen Asset's `ProductFields.AssetDetails` per (Provider, ProviderAccountId,
+    Resources.[0].Id). Every Check base64 encodes its own copy of the Asset it evaluated, so an EC2 Instance evaluated by 40
+    Checks arrives as 40 identical payloads: registered findings instead reference the one canonical payload (the same
+    object, so ASFF / OCSF serialization is unchanged) and the duplicates are released as soon as the Check yields. The
+    payload is only decoded the first time an output resolves it. Both are least recently used caches of `maxAssets`
+    entries so the registry does not grow with the run, an evicted Asset simply gets a new canonical payload
+    """
+
+    def __init__(self, maxAssets=DEFAULT_MAX_ASSETS):
+        self.maxAssets = maxAssets
+        # (Provider, ProviderAccountId, Resources.[0].Id) -> {payload: payload}, a Check may serialize a different view
+        # of the same Asset so every distinct payload is kept once
+        self.assets = OrderedDict()
+        # canonical payload -> decoded AssetDetails
+        self.decodedAssets = OrderedDict()
+
+    def register(self, finding: dict) -> dict:
+        """
+        Points `ProductFields.AssetDetails` of a raw finding at the canonical payload of its Asset and returns the finding
+        """
+        productFields = finding.get("ProductFields")
+        if not productFields or not isinstance(productFields.get("AssetDetails"), (str, bytes)):
+            return finding
+
+        try:
+            resourceId = finding["Resources"][0]["Id"]
+        except (KeyError, IndexError, TypeError):
+            resourceId = None
+
+        key = (productFields.get("Provider"), productFields.get("ProviderAccountId"), resourceId)
+        payloads = self.assets.get(key)
+        if payloads is None:
+            payloads = self.assets[key] = {}
+            if len(self.assets) > self.maxAssets:
+                self.assets.popitem(last=False)
+        else:
+            self.assets.move_to_end(key)
+        payload = productFields["AssetDetails"]
+        productFields["AssetDetails"] = payloads.setdefault(payload, payload)
+
+        return finding
+
+    def resolve(self, assetDetails):
+        """
+        Returns the decoded `AssetDetails` for a base64 encoded payload, decoding each canonical payload only once. The
+        decoded Asset is shared by every finding that references it and must be treated as read-only
+        """
+        if assetDetails is None:
+            return None
+
+        try:
+            decoded = self.decodedAssets[assetDetails]
+            self.decodedAssets.move_to_end(assetDetails)
+            return decoded
+        except KeyError:
+            decoded = json.loads(b64decode(assetDetails).decode("utf-8"))
+            self.decodedAssets[assetDetails] = decoded
+            if len(self.decodedAssets) > self.maxAssets:
+                self.decodedAssets.popitem(last=False)
+            return decoded
+
+    def __len__(self):
+        return len(self.assets)
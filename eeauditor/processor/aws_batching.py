@@ -0,0 +1,91 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import sys
+from threading import Lock
+from time import monotonic, sleep
+
+def get_integer_setting(details: dict, section: str, key: str, default: int, minimum=1) -> int:
+    """
+    Returns an optional integer `key` from an [outputs.*] section of the TOML file, or `default` when it is not set
+    """
+    value = details.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+        print(f"Invalid value for '[outputs.{section}.{key}]'. Must be an integer of at least {minimum}.")
+        sys.exit(2)
+
+    return value
+
+def pack_batches(records: list, maxCount: int, maxBytes: int, sizeOf=len):
+    """
+    Greedily packs `records`, in order, into lists of at most `maxCount` records whose combined `sizeOf()` is at most
+    `maxBytes` - the shape of the AWS batch APIs (SQS SendMessageBatch, Firehose PutRecordBatch, etc.). A record that is
+    larger than `maxBytes` on its own is yielded alone, callers are expected to deal with those beforehand
+    """
+    batch = []
+    batchBytes = 0
+    for record in records:
+        recordBytes = sizeOf(record)
+        if batch and (len(batch) >= maxCount or batchBytes + recordBytes > maxBytes):
+            yield batch
+            batch = []
+            batchBytes = 0
+        batch.append(record)
+        batchBytes += recordBytes
+
+    if batch:
+        yield batch
+
+class RateLimiter(object):
+    """
+    Thread-safe token bucket used to keep concurrent senders under a service's requests per second quota, `acquire()`
+    blocks until a request is allowed. Up to `burst` requests can be made at once after a quiet period
+    """
+
+    def __init__(self, rate: float, burst=1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = self.capacity
+        self.updated = monotonic()
+        self.lock = Lock()
+
+    def pause(self, seconds: float):
+        """
+        Holds every caller of `acquire()` for `seconds`, e.g., when a service responds with a `Retry-After`
+        """
+        with self.lock:
+            # tokens only start refilling once the pause is over
+            self.updated = max(self.updated, monotonic() + seconds)
+            self.tokens = 0
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = monotonic()
+                if now >= self.updated:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    wait = self.updated - now
+            sleep(wait)
@@ -0,0 +1,86 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import json
+import base64
+
+# Maps the ASFF `Severity.Label` to the per-Asset counter within the Cloud Asset Management (CAM) schema
+SEVERITY_COUNTERS = {
+    "INFORMATIONAL": "InformationalSeverityFindings",
+    "LOW": "LowSeverityFindings",
+    "MEDIUM": "MediumSeverityFindings",
+    "HIGH": "HighSeverityFindings",
+    "CRITICAL": "CriticalSeverityFindings"
+}
+
+def decode_asset_details(productFields: dict):
+    """
+    Returns the base64 decoded `AssetDetails` from ASFF `ProductFields`, None when it is explicitly None and an empty
+    string when it is missing altogether...which shouldn't happen
+    """
+    if "AssetDetails" not in productFields:
+        return ""
+
+    assetDetails = productFields["AssetDetails"]
+    if assetDetails is None:
+        return None
+
+    return json.loads(base64.b64decode(assetDetails).decode("utf-8"))
+
+def aggregate_cam_assets(findings: list) -> list:
+    """
+    Groups ElectricEye findings by `Resources.[0].Id` in a single pass and returns one Cloud Asset Management (CAM)
+    record per Asset. Asset metadata is taken from (and `AssetDetails` only decoded for) the first finding seen for an
+    Asset, severity counters are accumulated and `FirstObservedAt` is the earliest value across all of its findings
+    """
+    assets = {}
+
+    for finding in findings:
+        assetId = finding["Resources"][0]["Id"]
+        firstObserved = finding["FirstObservedAt"]
+        asset = assets.get(assetId)
+
+        if asset is None:
+            productFields = finding["ProductFields"]
+            asset = assets[assetId] = {
+                "AssetId": assetId,
+                "FirstObservedAt": firstObserved,
+                "Provider": productFields.get("Provider", ""),
+                "ProviderType": productFields.get("ProviderType", ""),
+                "ProviderAccountId": productFields.get("ProviderAccountId", ""),
+                "AssetRegion": productFields.get("AssetRegion", ""),
+                "AssetDetails": decode_asset_details(productFields),
+                "AssetClass": productFields.get("AssetClass", ""),
+                "AssetService": productFields.get("AssetService", ""),
+                "AssetComponent": productFields.get("AssetComponent", ""),
+                "InformationalSeverityFindings": 0,
+                "LowSeverityFindings": 0,
+                "MediumSeverityFindings": 0,
+                "HighSeverityFindings": 0,
+                "CriticalSeverityFindings": 0
+            }
+        elif firstObserved < asset["FirstObservedAt"]:
+            asset["FirstObservedAt"] = firstObserved
+
+        counter = SEVERITY_COUNTERS.get(finding["Severity"]["Label"])
+        if counter:
+            asset[counter] += 1
+
+    return list(assets.values())
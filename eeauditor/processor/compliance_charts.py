@@ -0,0 +1,182 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from tempfile import TemporaryDirectory
+
+import matplotlib
+# Charts are only ever written to file, never shown, and the Agg backend is safe to use from worker processes
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+# Bump this whenever the look of the charts changes so that charts cached by a previous version are re-rendered
+CHART_VERSION = "1"
+
+def default_chart_directory() -> str:
+    """
+    Returns the per-user cache directory the charts are written to when no other directory is configured
+    """
+    cacheHome = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+    return os.path.join(cacheHome, "electriceye", "html_compliance_charts")
+
+def is_private_directory(directory: str) -> bool:
+    """
+    Returns whether `directory` is owned by the current user and cannot be written to by anyone else, the cached charts
+    are embedded into the report as-is so they are only trusted from a directory nobody else could have planted them in
+    """
+    # there is no uid to compare against on Windows, where the cache directory is within the user profile
+    if not hasattr(os, "getuid"):
+        return True
+
+    directoryStat = os.stat(directory)
+
+    return directoryStat.st_uid == os.getuid() and not directoryStat.st_mode & 0o022
+
+def chart_file_prefix(framework: str) -> str:
+    """
+    Returns the framework name with the characters that would dick up a filename removed
+    """
+    return str(framework).replace(".", "").replace(" ", "").replace(":", "").lower()
+
+def chart_cache_key(framework: str, controlsData: dict) -> str:
+    """
+    Returns a SHA-256 hash of everything a framework chart is drawn from, unchanged frameworks hash the same between runs
+    regardless of the order the controls were collected in
+    """
+    payload = json.dumps([CHART_VERSION, framework, sorted(controlsData.items())], sort_keys=True, separators=(",", ":"))
+
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def render_framework_chart(framework: str, controlsData: dict, filePath: str) -> str:
+    """
+    Draws the horizontal stacked bar chart of Pass/Fail per control and the overall donut chart for a framework and saves
+    it as an SVG to `filePath`. Runs in a worker process, so everything it needs is passed in as plain data
+    """
+    # Reverse order sorting of the controls, that will put the controls with the most failures closer to the X-Axis. Ties
+    # are ordered by control name so the chart only depends on what chart_cache_key() hashes, not on the collection order
+    controlsData = dict(sorted(sorted(controlsData.items()), key=lambda item: item[1]["Passed"] + item[1]["Failed"], reverse=True))
+
+    # Set the facecolor of the figure and the plots to a very light gray
+    with plt.rc_context({"savefig.facecolor": "f9f9f9", "axes.facecolor": "f9f9f9"}):
+        # create a figure with two subplots: one for the bar chart and one for the donut chart
+        fig, axs = plt.subplots(nrows=2, figsize=(38, 22), tight_layout=True)
+
+        # sum of all passed and failed to calculate percentages later
+        controlsPassedSum = controlsFailedSum = 0
+
+        # iterate over the dictionary to plot each bar chart
+        for i, (key, value) in enumerate(controlsData.items()):
+            passed = value["Passed"]
+            failed = value["Failed"]
+
+            controlsPassedSum += passed
+            controlsFailedSum += failed
+            # Create horizontal bar chart, add a label to the X-Axis, and finally add values for the bars
+            axs[0].barh(key, passed, color="#6aaf35")
+            axs[0].barh(key, failed, left=passed, color="#fe6e73")
+            axs[0].set_xlabel("Total Checks In Scope", fontsize=16)
+            axs[0].text(passed, i, str(passed), color="black", va="center")  # label for "Passed"
+            axs[0].text(passed + failed, i, str(failed), color="red", va="center")  # label for "Failed"
+
+        # create a legend for the bar chart
+        passed_patch = plt.Rectangle((0,0),1,1,fc="#6aaf35", edgecolor = "none")
+        failed_patch = plt.Rectangle((0,0),1,1,fc="#fe6e73",  edgecolor = "none")
+        axs[0].legend([passed_patch, failed_patch], ["Passed", "Failed"], loc="upper right")
+
+        # create a donut chart with the overall passing and failing percentages
+        sizes = [controlsPassedSum, controlsFailedSum]
+        colors = ["#6aaf35", "#fe6e73"]
+
+        axs[1].pie(sizes, labels=["Passed", "Failed"], colors=colors, autopct="%1.1f%%", startangle=90)
+        # this creates the hole in the middle, effectively making the pie chart a donut chart
+        axs[1].add_artist(plt.Circle((0,0),0.70,fc="white"))
+
+        # write to a temporary name first so that a half written SVG is never picked up from the cache
+        temporaryPath = f"{filePath}.{os.getpid()}.tmp"
+        fig.savefig(temporaryPath, format="svg")
+        plt.close(fig)
+
+    os.replace(temporaryPath, filePath)
+
+    return filePath
+
+def render_framework_charts(frameworkControls: dict, chartDirectory=None, maxWorkers=1) -> dict:
+    """
+    Returns the SVG contents of the chart for every framework in `frameworkControls` (a dict of framework -> the Pass/Fail
+    aggregation of its controls). Charts are cached in `chartDirectory` by a hash of their data and only the frameworks
+    that changed since the last run are rendered, in a pool of `maxWorkers` processes
+    """
+    chartDirectory = chartDirectory or default_chart_directory()
+    os.makedirs(chartDirectory, mode=0o700, exist_ok=True)
+    if not is_private_directory(chartDirectory):
+        print(
+            f"The chart directory {chartDirectory} is not owned by you or can be written to by other users, its cached "
+            "charts will not be used!"
+        )
+        with TemporaryDirectory() as privateDirectory:
+            return render_charts_in_directory(frameworkControls, privateDirectory, maxWorkers)
+
+    return render_charts_in_directory(frameworkControls, chartDirectory, maxWorkers)
+
+def render_charts_in_directory(frameworkControls: dict, chartDirectory: str, maxWorkers: int) -> dict:
+    """
+    Renders the framework charts that are not already cached in `chartDirectory` and returns the SVG contents of them all
+    """
+    chartPaths = {}
+    pending = {}
+    for framework, controlsData in frameworkControls.items():
+        filePrefix = chart_file_prefix(framework)
+        filePath = os.path.join(chartDirectory, f"{filePrefix}_{chart_cache_key(framework, controlsData)[:16]}.svg")
+        chartPaths[framework] = filePath
+        if os.path.exists(filePath):
+            print(f"Using the cached visualization for the {framework} framework!")
+            continue
+
+        print(f"Creating a visualization for the {framework} framework!")
+        pending[framework] = (controlsData, filePath)
+        # charts for the previous data of this framework will never be used again
+        stale = re.compile(rf"^{re.escape(filePrefix)}_[0-9a-f]{{16}}\.svg$")
+        for fileName in os.listdir(chartDirectory):
+            if stale.match(fileName):
+                os.remove(os.path.join(chartDirectory, fileName))
+
+    if maxWorkers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(maxWorkers, len(pending))) as executor:
+            futures = [
+                executor.submit(render_framework_chart, framework, controlsData, filePath)
+                for framework, (controlsData, filePath) in pending.items()
+            ]
+            for future in futures:
+                future.result()
+    else:
+        for framework, (controlsData, filePath) in pending.items():
+            render_framework_chart(framework, controlsData, filePath)
+
+    svgImages = {}
+    for framework, filePath in chartPaths.items():
+        with open(filePath, "r") as f:
+            svgImages[framework] = f.read()
+
+    return svgImages
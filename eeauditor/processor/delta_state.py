@@ -0,0 +1,219 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import hashlib
+import json
+import sqlite3
+import tomli
+from datetime import datetime, timezone
+from os import environ, makedirs, path
+from uuid import uuid4
+
+DEFAULT_DELTA_STATE_PATH = "~/.electriceye/delta_state.sqlite3"
+
+# These are re-stamped by every Check on every run and are not part of what makes a finding "changed"
+VOLATILE_FINDING_KEYS = ("FirstObservedAt", "CreatedAt", "UpdatedAt", "ProcessedAt")
+
+def finding_fingerprint(finding: dict) -> str:
+    """
+    Returns a SHA-256 hash of the canonical JSON of a finding, ignoring the timestamps in VOLATILE_FINDING_KEYS
+    """
+    content = {k: v for k, v in finding.items() if k not in VOLATILE_FINDING_KEYS}
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), default=encode_value)
+
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def encode_value(value):
+    """
+    JSON `default` for findings, the base64 encoded `AssetDetails` are bytes and are kept as (equally decodable) strings
+    """
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+
+    return str(value)
+
+def finding_account(finding: dict) -> str:
+    """
+    Returns the Account (AWS Account, GCP Project, Azure Subscription, SaaS tenant, etc.) a finding belongs to
+    """
+    return str(finding.get("ProductFields", {}).get("ProviderAccountId") or finding.get("AwsAccountId", ""))
+
+def get_delta_state_path() -> str:
+    """
+    Parses the optional `delta_state_path` from [global] within the TOML file, falling back to DEFAULT_DELTA_STATE_PATH
+    """
+    tomlPath = environ.get("TOML_FILE_PATH")
+    if not tomlPath or tomlPath == "None":
+        tomlPath = path.join(path.abspath(path.dirname(__file__)), "..", "external_providers.toml")
+
+    try:
+        with open(tomlPath, "rb") as f:
+            statePath = tomli.load(f)["global"].get("delta_state_path")
+    except (OSError, KeyError, tomli.TOMLDecodeError) as e:
+        print(f"Could not read [global.delta_state_path] from {tomlPath}, using {DEFAULT_DELTA_STATE_PATH}: {e}")
+        statePath = None
+
+    return path.expanduser(statePath or DEFAULT_DELTA_STATE_PATH)
+
+class CheckRunTracker(object):
+    """
+    Records which Check (an opaque unit, e.g. "Account/Region/Check") produced every finding of a run and which Checks
+    ran to completion without raising, so that `FindingStateStore.delta()` never resolves the findings of a failed Check
+    """
+
+    def __init__(self):
+        self.findingUnits = {}
+        self.completedUnits = set()
+
+    def produced(self, finding: dict, unit: str):
+        """
+        Attributes a finding to the Check that yielded it, called before the finding is handed to the outputs
+        """
+        self.findingUnits[(finding_account(finding), finding["Id"])] = unit
+
+    def completed(self, unit: str):
+        """
+        Marks a Check as completed, called once it was exhausted without raising
+        """
+        self.completedUnits.add(unit)
+
+    def unit_of(self, key: tuple) -> str:
+        """
+        Returns (and forgets) the Check that produced the finding with the (Account, Finding ID) key
+        """
+        return self.findingUnits.pop(key, "")
+
+class FindingStateStore(object):
+    """
+    SQLite store of the fingerprint (and last copy) of every finding sent to the outputs, keyed by the Assessment Target,
+    the scope of the run (the Auditor & Check selected), the Account and the Finding ID, along with the Check that produced it. `delta()` filters a run down to the
+    NEW, CHANGED and RESOLVED findings, the state is only updated once `commit()` is called after the outputs succeeded
+    """
+
+    def __init__(self, databasePath: str):
+        if databasePath != ":memory:":
+            makedirs(path.dirname(path.abspath(databasePath)), exist_ok=True)
+        self.connection = sqlite3.connect(databasePath)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS finding_state (
+                target TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                account TEXT NOT NULL,
+                finding_id TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                finding TEXT NOT NULL,
+                unit TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (target, scope, account, finding_id)
+            )
+        """)
+        # state files written before the Check was recorded are upgraded in place
+        if "unit" not in [column[1] for column in self.connection.execute("PRAGMA table_info(finding_state)")]:
+            self.connection.execute("ALTER TABLE finding_state ADD COLUMN unit TEXT NOT NULL DEFAULT ''")
+        self.connection.commit()
+        self.counts = {"NEW": 0, "CHANGED": 0, "RESOLVED": 0, "UNCHANGED": 0}
+
+    def delta(self, findings, target: str, scope="", checkRuns=None):
+        """
+        Generator that yields only the findings that are NEW or CHANGED since the last committed run of the same target and
+        scope, followed by a RESOLVED (archived) copy of every previously sent finding that was not produced this time.
+        With a CheckRunTracker, findings are only resolved when the Check that produced them ran to completion in this run,
+        so a Check that raised (or an Account that could not be assessed) is never wiped out. Without one, findings are
+        only resolved for Accounts that produced findings in this run
+        """
+        knownFindings = {
+            (account, findingId): (fingerprint, unit) for account, findingId, fingerprint, unit in self.connection.execute(
+                "SELECT account, finding_id, fingerprint, unit FROM finding_state WHERE target = ? AND scope = ?", (target, scope)
+            )
+        }
+        seenFindings = set()
+        seenAccounts = set()
+
+        for finding in findings:
+            key = (finding_account(finding), finding["Id"])
+            seenAccounts.add(key[0])
+            unit = checkRuns.unit_of(key) if checkRuns else ""
+            if key in seenFindings:
+                continue
+            seenFindings.add(key)
+
+            fingerprint = finding_fingerprint(finding)
+            knownFingerprint, knownUnit = knownFindings.get(key, (None, None))
+            if knownFingerprint == fingerprint:
+                self.counts["UNCHANGED"] += 1
+                # keep the producing Check current, e.g. for findings stored before it was recorded
+                if unit and unit != knownUnit:
+                    self.connection.execute(
+                        "UPDATE finding_state SET unit = ? WHERE target = ? AND scope = ? AND account = ? AND finding_id = ?",
+                        (unit, target, scope, key[0], key[1])
+                    )
+                continue
+
+            self.counts["NEW" if knownFingerprint is None else "CHANGED"] += 1
+            self.connection.execute(
+                "INSERT OR REPLACE INTO finding_state (target, scope, account, finding_id, fingerprint, finding, unit) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (target, scope, key[0], key[1], fingerprint, json.dumps(finding, default=encode_value), unit)
+            )
+
+            yield finding
+
+        if checkRuns:
+            resolvedFindings = [
+                key for key, (_, unit) in knownFindings.items() if unit in checkRuns.completedUnits and key not in seenFindings
+            ]
+        else:
+            resolvedFindings = [
+                key for key in knownFindings if key[0] in seenAccounts and key not in seenFindings
+            ]
+        del knownFindings, seenFindings
+
+        resolvedAt = datetime.now(timezone.utc).isoformat()
+        for account, findingId in resolvedFindings:
+            (storedFinding,) = self.connection.execute(
+                "SELECT finding FROM finding_state WHERE target = ? AND scope = ? AND account = ? AND finding_id = ?",
+                (target, scope, account, findingId)
+            ).fetchone()
+            self.connection.execute(
+                "DELETE FROM finding_state WHERE target = ? AND scope = ? AND account = ? AND finding_id = ?",
+                (target, scope, account, findingId)
+            )
+            self.counts["RESOLVED"] += 1
+
+            finding = json.loads(storedFinding)
+            finding["UpdatedAt"] = resolvedAt
+            finding["Workflow"] = {"Status": "RESOLVED"}
+            finding["RecordState"] = "ARCHIVED"
+
+            yield finding
+
+    def commit(self):
+        """
+        Persists the state of the run, call this only after every output was written successfully
+        """
+        self.connection.commit()
+        print(
+            f"Delta mode sent {self.counts['NEW']} new, {self.counts['CHANGED']} changed and {self.counts['RESOLVED']} resolved findings, "
+            f"skipped {self.counts['UNCHANGED']} unchanged findings."
+        )
+
+    def close(self):
+        """
+        Closes the database, anything that was not committed is rolled back
+        """
+        self.connection.close()
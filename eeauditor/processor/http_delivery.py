@@ -0,0 +1,125 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from random import uniform
+from threading import Lock
+from time import sleep, time
+import requests
+from requests.adapters import HTTPAdapter
+from processor.aws_batching import RateLimiter
+
+# Statuses that are worth sending again, 429 (throttling) is handled separately as it is always retried
+RETRYABLE_STATUS_CODES = (500, 502, 503, 504)
+
+def parse_retry_after(value):
+    """
+    Returns the seconds to wait from a `Retry-After` header, which is either a number of seconds or an HTTP date
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
+
+class HttpDeliveryEngine(object):
+    """
+    Delivers HTTP requests for the webhook-style outputs (e.g., Firemon Cloud Defense and Slack) over a keep-alive
+    connection pool with a bounded number of concurrent senders sharing a token bucket. A throttled (429) response
+    pauses every sender for its `Retry-After` and the request is sent again until it is accepted (up to
+    `maxThrottledRetries` times), server errors and connection failures are retried `maxRetries` times with backoff
+    """
+
+    def __init__(self, requestsPerSecond: float, burst=1, maxWorkers=4, maxRetries=3, maxThrottledRetries=50, timeout=30):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=maxWorkers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.rateLimiter = RateLimiter(requestsPerSecond, burst)
+        self.executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix="ElectricEyeHTTP")
+        self.maxRetries = maxRetries
+        self.maxThrottledRetries = maxThrottledRetries
+        self.timeout = timeout
+        self.lock = Lock()
+        self.requestsSent = 0
+        self.requestsThrottled = 0
+        self.requestsFailed = 0
+
+    def send(self, method: str, url: str, **kwargs):
+        """
+        Sends a single request, blocking until it is accepted or retries are exhausted. Returns the final Response or
+        None if the request could not be sent at all
+        """
+        attempt = throttled = 0
+
+        while True:
+            self.rateLimiter.acquire()
+            try:
+                r = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                r = None
+                error = e
+            with self.lock:
+                self.requestsSent += 1
+
+            if r is not None and r.status_code == 429:
+                with self.lock:
+                    self.requestsThrottled += 1
+                if throttled < self.maxThrottledRetries:
+                    throttled += 1
+                    retryAfter = parse_retry_after(r.headers.get("Retry-After"))
+                    # Every sender backs off, not just this one
+                    self.rateLimiter.pause(retryAfter if retryAfter is not None else min(2 ** throttled, 30))
+                    continue
+            elif r is None or r.status_code in RETRYABLE_STATUS_CODES:
+                if attempt < self.maxRetries:
+                    attempt += 1
+                    sleep(uniform(0, min(0.5 * 2 ** attempt, 10)))
+                    continue
+            else:
+                return r
+
+            with self.lock:
+                self.requestsFailed += 1
+            if r is None:
+                print(f"Failed to send a request to {url} due to: {error}")
+            else:
+                print(f"Failed to send a request to {url}, received a {r.status_code} status code")
+
+            return r
+
+    def send_all(self, requestArgs: list) -> list:
+        """
+        Concurrently sends a list of requests, each is a dict of `send()` arguments, and returns their responses in order
+        """
+        return list(self.executor.map(lambda args: self.send(**args), requestArgs))
+
+    def close(self, wait=True):
+        """
+        Closes the senders and the connection pool, with `wait=False` queued requests are dropped instead of sent
+        """
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+        self.session.close()
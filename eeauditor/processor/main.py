@@ -18,15 +18,109 @@
 #specific language governing permissions and limitations
 #under the License.
 from processor.outputs.output_base import ElectricEyeOutput
+from processor.normalization import decode_finding, normalize_finding
+from processor.asset_registry import AssetRegistry
 
-def process_findings(findings: list, outputs: list, **kwargs):
-    """Process all findings from json file and send to outputs sepecified"""
-    for output in outputs:
+# Findings are handed to every output in batches of (at most) this size so that a run is never held in memory in full
+# unless an output explicitly buffers it
+OUTPUT_BATCH_SIZE = 500
+
+def process_findings(findings, outputs: list, batchSize=OUTPUT_BATCH_SIZE, **kwargs) -> bool:
+    """
+    Streams findings from any iterable (e.g., the run_*_checks generators) to all outputs specified in a single pass,
+    each output receives the same bounded batches via the open / write_batch / close contract. Findings are registered
+    with an AssetRegistry as they arrive so every (recently seen) Asset's `AssetDetails` is held and decoded once.
+    Returns True only if every output delivered every finding, see output_delivered()
+    """
+    providers = []
+    try:
+        for output in outputs:
+            provider = ElectricEyeOutput.get_provider(output)()
+            provider.open(**kwargs)
+            providers.append((output, provider))
+
+        assetRegistry = AssetRegistry()
+        findingsCount = 0
+        batch = []
+        for finding in findings:
+            findingsCount += 1
+            batch.append(assetRegistry.register(finding))
+            if len(batch) >= batchSize:
+                write_batch(providers, batch, assetRegistry)
+                batch = []
+
+        if batch:
+            write_batch(providers, batch, assetRegistry)
+
+        del batch
+    except BaseException:
+        # the Checks or an output failed part way, every opened output is still cleaned up
+        abort_providers(providers)
+        raise
+
+    delivered = True
+    for index, (output, provider) in enumerate(providers):
+        try:
+            closed = provider.close()
+        except Exception as e:
+            print(f"Error writing output {output}: {e}")
+            abort_providers(providers[index + 1:])
+            raise e
+
+        if not output_delivered(provider, closed, findingsCount):
+            print(f"Output {output} did not deliver every finding.")
+            delivered = False
+
+    return delivered
+
+def output_delivered(provider, closed, findingsCount: int) -> bool:
+    """
+    Whether an output delivered every finding: it did not count any `findingsFailed` and, if it was handed any findings,
+    `close()` did not return False. Outputs return False from `close()` when there was nothing to write as well
+    """
+    if getattr(provider, "findingsFailed", 0):
+        return False
+
+    return closed is not False or findingsCount == 0
+
+def write_batch(providers: list, batch: list, assetRegistry=None):
+    """
+    Hands a single batch of findings to every opened output provider. Providers that set `__normalized__ = True` receive
+    the normalized view and providers that set `__decoded__ = True` the findings with only `AssetDetails` decoded (see
+    processor.normalization), each view is only built once per batch, and only if one is selected
+    """
+    normalizedBatch = None
+    decodedBatch = None
+    for output, provider in providers:
         try:
-            ElectricEyeOutput.get_provider(output)().write_findings(findings=findings, **kwargs)
+            if getattr(provider, "__normalized__", False):
+                if normalizedBatch is None:
+                    normalizedBatch = [normalize_finding(finding, assetRegistry) for finding in batch]
+                provider.write_batch(normalizedBatch)
+            elif getattr(provider, "__decoded__", False):
+                if decodedBatch is None:
+                    decodedBatch = [decode_finding(finding, assetRegistry) for finding in batch]
+                provider.write_batch(decodedBatch)
+            else:
+                provider.write_batch(batch)
         except Exception as e:
-            print(f"Error writing output: {e}")
+            print(f"Error writing output {output}: {e}")
             raise e
 
+def abort_providers(providers: list):
+    """
+    Releases the threads, connections and files of opened output providers after a failure, with `abort()` when the
+    provider implements it and `close()` otherwise. Errors are printed so that every provider gets cleaned up
+    """
+    for output, provider in providers:
+        try:
+            abort = getattr(provider, "abort", None)
+            if callable(abort):
+                abort()
+            else:
+                provider.close()
+        except Exception as e:
+            print(f"Error cleaning up output {output}: {e}")
+
 def get_providers():
-    return ElectricEyeOutput.get_all_providers()
\ No newline at end of file
+    return ElectricEyeOutput.get_all_providers()
@@ -0,0 +1,69 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import sys
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Number of upserts sent per unordered bulk_write() unless overridden by [outputs.mongodb.mongodb_batch_size]
+DEFAULT_MONGODB_BATCH_SIZE = 1000
+
+def get_mongodb_batch_size(mongodbDetails: dict) -> int:
+    """
+    Returns the optional `mongodb_batch_size` from the [outputs.mongodb] section of the TOML file
+    """
+    batchSize = mongodbDetails.get("mongodb_batch_size", DEFAULT_MONGODB_BATCH_SIZE)
+    if isinstance(batchSize, bool) or not isinstance(batchSize, int) or batchSize < 1:
+        print("Invalid value for '[outputs.mongodb.mongodb_batch_size]'. Must be a positive integer.")
+        sys.exit(2)
+
+    return batchSize
+
+def bulk_upsert(collection, documents: list, idField: str, batchSize=DEFAULT_MONGODB_BATCH_SIZE) -> tuple:
+    """
+    Upserts `documents` into a MongoDB / AWS DocumentDB collection with unordered bulk_write() calls of up to `batchSize`
+    UpdateOne operations, using `idField` of each document as the "_id". Duplicate IDs within a batch resolve to the last
+    document. Write errors are reported per batch without aborting, returns a tuple of (documents written, write errors).
+    Any other error (e.g., the database is unreachable or the credentials are wrong) is raised
+    """
+    written = failed = 0
+
+    for i in range(0, len(documents), batchSize):
+        # later documents win for a repeated ID, the same as sequential update_one() calls would
+        batch = {}
+        for doc in documents[i : i + batchSize]:
+            batch[doc[idField]] = doc
+
+        operations = [
+            UpdateOne({"_id": docId}, {"$set": {**doc, "_id": docId}}, upsert=True) for docId, doc in batch.items()
+        ]
+
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            written += result.upserted_count + result.matched_count
+        except BulkWriteError as bwe:
+            writeErrors = bwe.details.get("writeErrors", [])
+            written += bwe.details.get("nUpserted", 0) + bwe.details.get("nMatched", 0)
+            failed += len(writeErrors)
+            print(
+                f"Encountered {len(writeErrors)} write errors in a batch of {len(operations)} upserts, continuing to the next batch. First error: {writeErrors[0]['errmsg'] if writeErrors else bwe}"
+            )
+
+    return written, failed
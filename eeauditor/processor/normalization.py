@@ -0,0 +1,76 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import json
+from base64 import b64decode
+from functools import lru_cache
+from os import path
+
+here = path.abspath(path.dirname(__file__))
+with open(f"{here}/outputs/mapped_compliance_controls.json") as jsonfile:
+    CONTROLS_CROSSWALK = json.load(jsonfile)
+
+@lru_cache(maxsize=None)
+def crosswalk_requirements(relatedRequirements: tuple) -> tuple:
+    """
+    Returns `Compliance.RelatedRequirements` followed by every additional control framework control ID that maps into its
+    NIST CSF V1.1 Subcategories (controls), in order and without repeating crosswalked controls. Checks share a small set
+    of requirement lists so expansions are memoized by the requirement tuple
+    """
+    newControls = {}
+    for control in relatedRequirements:
+        if str(control).startswith("NIST CSF V1.1"):
+            # Not every single NIST CSF Control maps across to other frameworks
+            for crosswalk in CONTROLS_CROSSWALK.get(control, []):
+                newControls[crosswalk] = None
+
+    return relatedRequirements + tuple(newControls)
+
+def decode_finding(finding: dict, assetRegistry=None) -> dict:
+    """
+    Returns a copy of an ASFF finding with `ProductFields.AssetDetails` base64 decoded and converted to JSON (unless it is
+    None, which is done for placeholders in Checks where the Asset doesn't exist), the raw finding is not modified. When
+    an AssetRegistry is provided the decoded Asset is resolved from (and shared through) it
+    """
+    productFields = finding["ProductFields"]
+    if "AssetDetails" not in productFields:
+        return finding
+
+    assetDetails = productFields["AssetDetails"]
+    if assetRegistry is not None:
+        assetDetails = assetRegistry.resolve(assetDetails)
+    elif assetDetails is not None:
+        assetDetails = json.loads(b64decode(assetDetails).decode("utf-8"))
+
+    return {**finding, "ProductFields": {**productFields, "AssetDetails": assetDetails}}
+
+def normalize_finding(finding: dict, assetRegistry=None) -> dict:
+    """
+    Returns a normalized copy of an ASFF finding for the outputs: `ProductFields.AssetDetails` is decoded as per
+    decode_finding() and `Compliance.RelatedRequirements` is extended with the NIST CSF V1.1 crosswalk. The raw finding
+    is not modified
+    """
+    finding = decode_finding(finding, assetRegistry)
+
+    # RelatedRequirements is moved to the end of Compliance, as the outputs have always written it
+    compliance = {k: v for k, v in finding["Compliance"].items() if k != "RelatedRequirements"}
+    compliance["RelatedRequirements"] = list(crosswalk_requirements(tuple(finding["Compliance"]["RelatedRequirements"])))
+
+    return {**finding, "Compliance": compliance}
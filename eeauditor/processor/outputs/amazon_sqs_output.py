@@ -23,14 +23,40 @@ import boto3
 import sys
 import os
 import json
-from base64 import b64decode
-#from hashlib import new as hasher
+import gzip
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+from uuid import uuid4
 from botocore.exceptions import ClientError
 from processor.outputs.output_base import ElectricEyeOutput
+from processor.aws_batching import get_integer_setting, pack_batches
+
+# SendMessageBatch accepts at most 10 entries, and every message body and attribute in a request (or a single message)
+# must add up to no more than 256 KiB
+SQS_MAX_BATCH_ENTRIES = 10
+SQS_MAX_PAYLOAD_BYTES = 262_144
+
+# These Constants define legitimate values for certain parameters within the external_providers.toml file
+OVERSIZED_FINDING_HANDLING_CHOICES = ["NONE", "GZIP", "S3"]
+
+# Offloaded findings are sent as the same pointer that the Amazon SQS Extended Client Libraries write and read
+S3_POINTER_CLASS = "software.amazon.payloadoffloading.PayloadS3Pointer"
+
+def sqs_entry_size(entry: dict) -> int:
+    """
+    Returns the size of a SendMessageBatch entry as SQS counts it: the message body plus every attribute name, type and value
+    """
+    size = len(entry["MessageBody"].encode("utf-8"))
+    for name, attribute in entry.get("MessageAttributes", {}).items():
+        size += len(name) + len(attribute["DataType"]) + len(attribute["StringValue"].encode("utf-8"))
+
+    return size
 
 @ElectricEyeOutput
 class AmazonSqsProvider(object):
     __provider__ = "amazon_sqs"
+    __decoded__ = True
 
     def __init__(self):
         print("Preparing Amazon SQS output.")
@@ -63,69 +89,155 @@ class AmazonSqsProvider(object):
             print("An empty value was detected in '[outputs.amazon_sqs]'. Review the TOML file and try again!")
             sys.exit(2)
 
+        queueBatchSize = get_integer_setting(sqsDetails, "amazon_sqs", "amazon_sqs_batch_size", SQS_MAX_BATCH_ENTRIES)
+        if queueBatchSize > SQS_MAX_BATCH_ENTRIES:
+            print(f"'[outputs.amazon_sqs.amazon_sqs_batch_size]' is above the SQS limit, using {SQS_MAX_BATCH_ENTRIES}.")
+            queueBatchSize = SQS_MAX_BATCH_ENTRIES
+
+        oversizedFindingHandling = sqsDetails.get("amazon_sqs_oversized_finding_handling", "NONE")
+        if oversizedFindingHandling not in OVERSIZED_FINDING_HANDLING_CHOICES:
+            print(f"Invalid option for '[outputs.amazon_sqs.amazon_sqs_oversized_finding_handling]'. Must be one of {str(OVERSIZED_FINDING_HANDLING_CHOICES)}.")
+            sys.exit(2)
+
+        if oversizedFindingHandling == "S3":
+            offloadBucketName = sqsDetails.get("amazon_sqs_offload_bucket_name")
+            if not offloadBucketName:
+                print("A value for '[outputs.amazon_sqs.amazon_sqs_offload_bucket_name]' is required to offload findings to Amazon S3.")
+                sys.exit(2)
+            self.offloadBucketName = offloadBucketName
+            self.s3 = boto3.client("s3", region_name=awsRegion)
+
         self.queueUrl = queueUrl
         self.queueBatchSize = queueBatchSize
+        self.maxWorkers = get_integer_setting(sqsDetails, "amazon_sqs", "amazon_sqs_max_workers", 4)
+        self.maxRetries = get_integer_setting(sqsDetails, "amazon_sqs", "amazon_sqs_max_retries", 3, minimum=0)
+        self.oversizedFindingHandling = oversizedFindingHandling
         self.sqs = boto3.client("sqs", region_name=awsRegion)
 
-    def write_findings(self, findings: list, **kwargs):
-        if len(findings) == 0:
-            print("There are not any findings to write to Amazon SQS!")
-            exit(0)
+    def open(self, **kwargs):
+        print(f"Sending findings to Amazon SQS in batches of up to {self.queueBatchSize} messages with {self.maxWorkers} senders.")
+        self.findingsSent = 0
+        self.findingsFailed = 0
+        self.requestsSent = 0
+        # boto3 clients are thread safe, every sender shares the same one
+        self.executor = ThreadPoolExecutor(max_workers=self.maxWorkers, thread_name_prefix="ElectricEyeSQS")
+
+    def write_batch(self, findings: list):
+        # Findings arrive with `AssetDetails` decoded (but without the NIST CSF crosswalk) by processor.main
+        entries = []
+        for finding in findings:
+            entry = self.create_message_entry(finding)
+            if entry is None:
+                self.findingsFailed += 1
+            else:
+                entries.append(entry)
+
+        del findings
 
-        print(f"Sending {len(findings)} findings to Amazon SQS in {self.queueBatchSize}-message batches.")
+        # Pack the messages by both count and size and send the requests concurrently
+        batches = pack_batches(entries, self.queueBatchSize, SQS_MAX_PAYLOAD_BYTES, sizeOf=sqs_entry_size)
+        for sent, failed, requests in self.executor.map(self.send_message_batch, batches):
+            self.findingsSent += sent
+            self.findingsFailed += failed
+            self.requestsSent += requests
 
-        # Unfold the AssetDetails
-        decodedFindings = [
-            {**d, "ProductFields": {**d["ProductFields"],
-                "AssetDetails": json.loads(b64decode(d["ProductFields"]["AssetDetails"]).decode("utf-8"))
-                    if d["ProductFields"]["AssetDetails"] is not None
-                    else None
-            }} if "AssetDetails" in d["ProductFields"]
-            else d
-            for d in findings
-        ]
+    def close(self):
+        self.executor.shutdown(wait=True)
 
-        del findings
+        if self.findingsSent == 0 and self.findingsFailed == 0:
+            print("There are not any findings to write to Amazon SQS!")
+            return False
 
-        for i in range(0, len(decodedFindings), self.queueBatchSize):
-            batch = (decodedFindings[i : i + self.queueBatchSize])
-            # Send to SQS
-            self.send_message_to_sqs(batch)
+        if self.findingsFailed > 0:
+            print(f"Failed to send {self.findingsFailed} findings to Amazon SQS.")
 
-        print(f"Done sending all findings to Amazon SQS!")
-    
-    '''
-    # This was meant for using the BatchSendMessage API which requires a message ID for each of the messages in a batch
-    # may make use of it...eventually? Uncomment the import statement above in case
+        print(f"Done sending {self.findingsSent} findings to Amazon SQS in {self.requestsSent} requests!")
 
-    def create_hashed_message_id(self, findingId):
+        return True
+
+    def abort(self):
+        # drop the queued SendMessageBatch requests, only the ones in flight finish
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def create_message_entry(self, finding: dict):
+        """
+        Returns a SendMessageBatch entry (without its "Id") for a finding. Findings above the SQS size limit are sent gzip
+        compressed or offloaded to S3 per `amazon_sqs_oversized_finding_handling`, otherwise they are skipped (None)
         """
-        Returns a SHA-1 hexdigest of no more than 80 characters from the "Id" of ASFF to use as a SQS MessageId
+        messageBody = json.dumps(finding)
+        entry = {"MessageBody": messageBody, "DelaySeconds": 1}
+        if sqs_entry_size(entry) <= SQS_MAX_PAYLOAD_BYTES:
+            return entry
+
+        if self.oversizedFindingHandling == "GZIP":
+            entry = {
+                "MessageBody": b64encode(gzip.compress(messageBody.encode("utf-8"))).decode("utf-8"),
+                "DelaySeconds": 1,
+                "MessageAttributes": {
+                    "ContentEncoding": {"DataType": "String", "StringValue": "gzip+base64"}
+                }
+            }
+            if sqs_entry_size(entry) <= SQS_MAX_PAYLOAD_BYTES:
+                return entry
+        elif self.oversizedFindingHandling == "S3":
+            return self.offload_finding_to_s3(finding, messageBody)
+
+        print(f"Finding {finding.get('Id')} is larger than 256 KiB and cannot be sent to Amazon SQS, skipping it.")
+
+        return None
+
+    def offload_finding_to_s3(self, finding: dict, messageBody: str):
         """
-        # Create the SHA1 hash object from the bytes of 'findingId' parsed from a finding
-        # and retrieve the digest
-        hashFinding = hasher("sha1").update(findingId.encode("utf-8")).hexdigest()
-                
-        # Truncate the hash if it exceeds 80 characters
-        if len(hashFinding) > 80:
-            hashFinding = hashFinding[:80]
-        
-        return hashFinding
-    '''
-
-    def send_message_to_sqs(self, batch):
+        Writes an oversized finding to S3 and returns an entry with an Extended Client Library compatible pointer to it
         """
-        Writes batches of ASFF findings into SQS
+        payload = messageBody.encode("utf-8")
+        s3Key = str(uuid4())
+        try:
+            self.s3.put_object(Bucket=self.offloadBucketName, Key=s3Key, Body=payload, ContentType="application/json")
+        except ClientError as ce:
+            print(f"Failed to offload finding {finding.get('Id')} to Amazon S3 due to: {ce}, skipping it.")
+            return None
+
+        return {
+            "MessageBody": json.dumps([S3_POINTER_CLASS, {"s3BucketName": self.offloadBucketName, "s3Key": s3Key}]),
+            "DelaySeconds": 1,
+            "MessageAttributes": {
+                "ExtendedPayloadSize": {"DataType": "Number", "StringValue": str(len(payload))}
+            }
+        }
+
+    def send_message_batch(self, batch: list) -> tuple:
         """
-        sqs = self.sqs
+        Writes a batch of up to 10 message entries into SQS with SendMessageBatch, entries that fail on the SQS side are
+        retried with backoff up to `amazon_sqs_max_retries` times. Returns a tuple of (sent, failed, requests)
+        """
+        sent = failed = requests = 0
+        attempt = 0
 
-        for entry in batch:
+        while batch:
+            # Entry IDs only need to be unique within a request, their position maps failures back to the entries
+            entries = [{"Id": str(i), **entry} for i, entry in enumerate(batch)]
             try:
-                sqs.send_message(
-                    QueueUrl=self.queueUrl,
-                    MessageBody=json.dumps(entry),
-                    DelaySeconds=1
-                )
+                response = self.sqs.send_message_batch(QueueUrl=self.queueUrl, Entries=entries)
+                requests += 1
             except ClientError as ce:
                 print(f"Batch failed due to: {ce}, continuing to the next.")
-                continue
\ No newline at end of file
+                return sent, failed + len(batch), requests
+
+            sent += len(response.get("Successful", []))
+
+            retries = []
+            for failure in response.get("Failed", []):
+                # Sender faults (e.g., invalid messages) will fail again, the rest are retried
+                if failure.get("SenderFault") or attempt >= self.maxRetries:
+                    print(f"Failed to send a finding to Amazon SQS due to: {failure.get('Code')} - {failure.get('Message')}")
+                    failed += 1
+                else:
+                    retries.append(batch[int(failure["Id"])])
+
+            batch = retries
+            if batch:
+                attempt += 1
+                sleep(min(0.2 * 2 ** attempt, 5))
+
+        return sent, failed, requests
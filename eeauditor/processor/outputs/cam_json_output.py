@@ -18,15 +18,15 @@
 #specific language governing permissions and limitations
 #under the License.
 
-from processor.outputs.output_base import ElectricEyeOutput
+from processor.outputs.output_base import ElectricEyeOutput, BufferedOutput
+from processor.cam_aggregation import aggregate_cam_assets
 import json
-import base64
 from os import path
 
 here = path.abspath(path.dirname(__file__))
 
 @ElectricEyeOutput
-class CamJsonProvider(object):
+class CamJsonProvider(BufferedOutput):
     __provider__ = "cam_json"
 
     def write_findings(self, findings: list, output_file: str, **kwargs):
@@ -54,75 +54,15 @@ class CamJsonProvider(object):
     
     def process_findings(findings):
         """
-        This function uses the list comprehension to base64 decode all `AssetDetails` and then takes a selective
-        cross-section of unique per-asset details to be written to file within the main function
+        Takes a selective cross-section of unique per-Asset details and severity counts from the findings, with
+        `AssetDetails` base64 decoded, to be written to file within the main function
         """
-        # This list contains the CAM output
-        cloudAssetManagementFindings = []
-        # Create a new list from raw findings that base64 decodes `AssetDetails` where it is not None, if it is, just
-        # use None and bring forward `ProductFields` where it is missing `AssetDetails`...which shouldn't happen
-        print(f"Base64 decoding AssetDetails for {len(findings)} ElectricEye findings.")
+        print(f"Processing Asset and Finding Summary data for {len(findings)} ElectricEye findings.")
 
-        data = [
-            {**d, "ProductFields": {**d["ProductFields"],
-                "AssetDetails": json.loads(base64.b64decode(d["ProductFields"]["AssetDetails"]).decode("utf-8"))
-                    if d["ProductFields"]["AssetDetails"] is not None
-                    else None
-            }} if "AssetDetails" in d["ProductFields"]
-            else d
-            for d in findings
-        ]
+        cloudAssetManagementFindings = aggregate_cam_assets(findings)
+        for asset in cloudAssetManagementFindings:
+            asset["FirstObservedAt"] = str(asset["FirstObservedAt"])
 
-        print(f"Completed base64 decoding for {len(data)} ElectricEye findings.")
-
-        # This list will contain unique identifiers from `Resources.[*].Id`
-        uniqueIds = set(item["Resources"][0]["Id"] for item in data)
-
-        print(f"Processing Asset and Finding Summary data for {len(uniqueIds)} unique Assets.")
-
-        for uid in uniqueIds:
-            subData = [item for item in data if item["Resources"][0]["Id"] == uid]
-            productFields = subData[0]["ProductFields"]
-            infoSevFindings = lowSevFindings = medSevFindings = highSevFindings = critSevFindings = 0
-            
-            for item in subData:
-                firstObserved = str(item["FirstObservedAt"])
-                sevLabel = item["Severity"]["Label"]
-                if sevLabel == "INFORMATIONAL":
-                    infoSevFindings += 1
-                elif sevLabel == "LOW":
-                    lowSevFindings += 1
-                elif sevLabel == "MEDIUM":
-                    medSevFindings += 1
-                elif sevLabel == "HIGH":
-                    highSevFindings += 1
-                elif sevLabel == "CRITICAL":
-                    critSevFindings += 1
-                
-            
-            cloudAssetManagementFindings.append(
-                {
-                    "AssetId": uid,
-                    "FirstObservedAt": firstObserved,
-                    "Provider": productFields.get("Provider", ""),
-                    "ProviderType": productFields.get("ProviderType", ""),
-                    "ProviderAccountId": productFields.get("ProviderAccountId", ""),
-                    "AssetRegion": productFields.get("AssetRegion", ""),
-                    "AssetDetails": productFields.get("AssetDetails", ""),
-                    "AssetClass": productFields.get("AssetClass", ""),
-                    "AssetService": productFields.get("AssetService", ""),
-                    "AssetComponent": productFields.get("AssetComponent", ""),
-                    "InformationalSeverityFindings": infoSevFindings,
-                    "LowSeverityFindings": lowSevFindings,
-                    "MediumSeverityFindings": medSevFindings,
-                    "HighSeverityFindings": highSevFindings,
-                    "CriticalSeverityFindings": critSevFindings
-                }
-            )
-
-        del findings
-        del data
-        del uniqueIds
-        del subData
+        print(f"Completed Asset and Finding Summary data for {len(cloudAssetManagementFindings)} unique Assets.")
 
         return cloudAssetManagementFindings
\ No newline at end of file
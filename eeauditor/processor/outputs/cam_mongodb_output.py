@@ -24,10 +24,10 @@ import os
 import sys
 import requests
 import pymongo
-import json
-import base64
 from botocore.exceptions import ClientError
-from processor.outputs.output_base import ElectricEyeOutput
+from processor.outputs.output_base import ElectricEyeOutput, BufferedOutput
+from processor.mongodb_bulk import bulk_upsert, get_mongodb_batch_size
+from processor.cam_aggregation import aggregate_cam_assets
 
 # Boto3 Clients
 ssm = boto3.client("ssm")
@@ -37,7 +37,7 @@ asm = boto3.client("secretsmanager")
 CREDENTIALS_LOCATION_CHOICES = ["AWS_SSM", "AWS_SECRETS_MANAGER", "CONFIG_FILE"]
 
 @ElectricEyeOutput
-class CamMongodbProvider(object):
+class CamMongodbProvider(BufferedOutput):
     __provider__ = "cam_mongodb"
 
     def __init__(self):
@@ -127,6 +127,7 @@ class CamMongodbProvider(object):
         self.collName = mongodbCollectionName
         self.password = password
         self.tlsPath = mongoTlsCertPath
+        self.batchSize = get_mongodb_batch_size(mongodbDetails)
 
     def write_findings(self, findings: list, output_file: str, **kwargs):
         if len(findings) == 0:
@@ -166,17 +167,11 @@ class CamMongodbProvider(object):
 
         print(f"Attempting to upsert {len(processedFindings)} findings to MongoDB.")
 
-        for doc in processedFindings:
-            try:
-                # use the CAM Output "AssetId" as the MongoDB "_id"
-                doc["_id"] = doc["AssetId"]
-                filter = {'_id': doc['_id']}
-                update = {'$set': doc}
-                collection.update_one(filter, update, upsert=True)
-            except pymongo.errors as e:
-                print(f"Encountered an error during update_one() operation: {e}")
-            except KeyError as ke:
-                raise ke
+        # use the CAM Output "AssetId" as the MongoDB "_id"
+        written, failed = bulk_upsert(collection, processedFindings, "AssetId", self.batchSize)
+        self.findingsFailed = failed
+
+        print(f"Upserted {written} CAM entries to MongoDB with {failed} write errors.")
 
         return True
     
@@ -223,76 +218,14 @@ class CamMongodbProvider(object):
 
     def process_findings(self, findings):
         """
-        This function uses the list comprehension to base64 decode all `AssetDetails` and then takes a selective
-        cross-section of unique per-asset details to be written to file within the main function
+        Takes a selective cross-section of unique per-Asset details and severity counts from the findings, with
+        `AssetDetails` base64 decoded, to be written to MongoDB
         """
-        # This list contains the CAM output
-        cloudAssetManagementFindings = []
-        # Create a new list from raw findings that base64 decodes `AssetDetails` where it is not None, if it is, just
-        # use None and bring forward `ProductFields` where it is missing `AssetDetails`...which shouldn't happen
-        print(f"Base64 decoding AssetDetails for {len(findings)} ElectricEye findings.")
-
-        data = [
-            {**d, "ProductFields": {**d["ProductFields"],
-                "AssetDetails": json.loads(base64.b64decode(d["ProductFields"]["AssetDetails"]).decode("utf-8"))
-                    if d["ProductFields"]["AssetDetails"] is not None
-                    else None
-            }} if "AssetDetails" in d["ProductFields"]
-            else d
-            for d in findings
-        ]
-
-        print(f"Completed base64 decoding for {len(data)} ElectricEye findings.")
-
-        # This list will contain unique identifiers from `Resources.[*].Id`
-        uniqueIds = set(item["Resources"][0]["Id"] for item in data)
-
-        print(f"Processing Asset and Finding Summary data for {len(uniqueIds)} unique Assets.")
-
-        for uid in uniqueIds:
-            subData = [item for item in data if item["Resources"][0]["Id"] == uid]
-            productFields = subData[0]["ProductFields"]
-            infoSevFindings = lowSevFindings = medSevFindings = highSevFindings = critSevFindings = 0
-            
-            for item in subData:
-                firstObserved = str(item["FirstObservedAt"])
-                sevLabel = item["Severity"]["Label"]
-                if sevLabel == "INFORMATIONAL":
-                    infoSevFindings += 1
-                elif sevLabel == "LOW":
-                    lowSevFindings += 1
-                elif sevLabel == "MEDIUM":
-                    medSevFindings += 1
-                elif sevLabel == "HIGH":
-                    highSevFindings += 1
-                elif sevLabel == "CRITICAL":
-                    critSevFindings += 1
-                
-            
-            cloudAssetManagementFindings.append(
-                {
-                    "AssetId": uid,
-                    "FirstObservedAt": firstObserved,
-                    "Provider": productFields.get("Provider", ""),
-                    "ProviderType": productFields.get("ProviderType", ""),
-                    "ProviderAccountId": productFields.get("ProviderAccountId", ""),
-                    "AssetRegion": productFields.get("AssetRegion", ""),
-                    "AssetDetails": productFields.get("AssetDetails", ""),
-                    "AssetClass": productFields.get("AssetClass", ""),
-                    "AssetService": productFields.get("AssetService", ""),
-                    "AssetComponent": productFields.get("AssetComponent", ""),
-                    "InformationalSeverityFindings": infoSevFindings,
-                    "LowSeverityFindings": lowSevFindings,
-                    "MediumSeverityFindings": medSevFindings,
-                    "HighSeverityFindings": highSevFindings,
-                    "CriticalSeverityFindings": critSevFindings
-                }
-            )
+        print(f"Processing Asset and Finding Summary data for {len(findings)} ElectricEye findings.")
 
-        del findings
-        del data
-        del uniqueIds
-        del subData
+        cloudAssetManagementFindings = aggregate_cam_assets(findings)
+
+        print(f"Completed Asset and Finding Summary data for {len(cloudAssetManagementFindings)} unique Assets.")
 
         return cloudAssetManagementFindings
 
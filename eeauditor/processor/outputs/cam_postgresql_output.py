@@ -23,10 +23,11 @@ import boto3
 import sys
 import os
 import json
-import base64
 import psycopg2 as psql
 from botocore.exceptions import ClientError
-from processor.outputs.output_base import ElectricEyeOutput
+from processor.outputs.output_base import ElectricEyeOutput, BufferedOutput
+from processor.cam_aggregation import aggregate_cam_assets
+from processor.postgresql_bulk import bulk_upsert, get_postgresql_batch_size
 
 # Boto3 Clients
 ssm = boto3.client("ssm")
@@ -35,8 +36,15 @@ asm = boto3.client("secretsmanager")
 # These Constants define legitimate values for certain parameters within the external_providers.toml file
 CREDENTIALS_LOCATION_CHOICES = ["AWS_SSM", "AWS_SECRETS_MANAGER", "CONFIG_FILE"]
 
+# Columns of the CAM table in upsert order, "asset_id" (derived from Resources.[*].Id) is the PRIMARY KEY
+CAM_TABLE_COLUMNS = [
+    "asset_id", "first_observed_at", "provider", "provider_type", "provider_account_id", "asset_region", "asset_details",
+    "asset_class", "asset_service", "asset_component", "informational_severity_findings", "low_severity_findings",
+    "medium_severity_findings", "high_severity_findings", "critical_severity_findings"
+]
+
 @ElectricEyeOutput
-class CamPostgresProvider(object):
+class CamPostgresProvider(BufferedOutput):
     __provider__ = "cam_postgresql"
 
     def __init__(self):
@@ -97,6 +105,7 @@ class CamPostgresProvider(object):
         self.endpoint = endpoint
         self.port = port
         self.password = password
+        self.batchSize = get_postgresql_batch_size(postgresqlDetails)
 
     def write_findings(self, findings: list, **kwargs):
         processedFindings = self.create_cam_format(findings)
@@ -137,55 +146,47 @@ class CamPostgresProvider(object):
                 )
             """)
 
+            engine.commit()
+            cursor.close()
+
             print(f"Attempting to write {len(processedFindings)} CAM entries to PostgreSQL.")
-            for f in processedFindings:
-                # The Finding ID is our primary key, on conflicts we will overwrite every single value for the specific ID except
-                # for ASFF FirstObservedAt (first_observed_at) and ASFF CreatedAt (created_at) every other value will be preserved
-                cursor.execute(f"""
-                    INSERT INTO {self.tableName}_cam (asset_id, first_observed_at, provider, provider_type, provider_account_id, asset_region, asset_details, asset_class, asset_service, asset_component, informational_severity_findings, low_severity_findings, medium_severity_findings, high_severity_findings, critical_severity_findings)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (asset_id) DO UPDATE
-                        SET provider = excluded.provider,
-                            provider_type = excluded.provider_type,
-                            provider_account_id = excluded.provider_account_id,
-                            asset_region = excluded.asset_region,
-                            asset_details = excluded.asset_details,
-                            asset_class = excluded.asset_class,
-                            asset_service = excluded.asset_service,
-                            asset_component = excluded.asset_component,
-                            informational_severity_findings = excluded.informational_severity_findings,
-                            low_severity_findings = excluded.low_severity_findings,
-                            medium_severity_findings = excluded.medium_severity_findings,
-                            high_severity_findings = excluded.high_severity_findings,
-                            critical_severity_findings = excluded.critical_severity_findings,
-                            first_observed_at = CASE
-                                                    WHEN {self.tableName}_cam.first_observed_at < excluded.first_observed_at THEN {self.tableName}_cam.first_observed_at
-                                                    ELSE excluded.first_observed_at
-                                                END;
-                    """,
-                    (
-                        f["AssetId"],
-                        f["FirstObservedAt"],
-                        f["Provider"],
-                        f["ProviderType"],
-                        f["ProviderAccountId"],
-                        f["AssetRegion"],
-                        json.dumps(f["AssetDetails"]),
-                        f["AssetClass"],
-                        f["AssetService"],
-                        f["AssetComponent"],
-                        f["InformationalSeverityFindings"],
-                        f["LowSeverityFindings"],
-                        f["MediumSeverityFindings"],
-                        f["HighSeverityFindings"],
-                        f["CriticalSeverityFindings"]
-                    )
+
+            rows = [
+                (
+                    f["AssetId"],
+                    f["FirstObservedAt"],
+                    f["Provider"],
+                    f["ProviderType"],
+                    f["ProviderAccountId"],
+                    f["AssetRegion"],
+                    json.dumps(f["AssetDetails"]),
+                    f["AssetClass"],
+                    f["AssetService"],
+                    f["AssetComponent"],
+                    f["InformationalSeverityFindings"],
+                    f["LowSeverityFindings"],
+                    f["MediumSeverityFindings"],
+                    f["HighSeverityFindings"],
+                    f["CriticalSeverityFindings"]
+                ) for f in processedFindings
+            ]
+
+            del processedFindings
+
+            # The Asset ID is our primary key, on conflicts we will overwrite every single value for the specific ID except
+            # for FirstObservedAt (first_observed_at) where the earliest value is preserved
+            for i in range(0, len(rows), self.batchSize):
+                bulk_upsert(
+                    engine,
+                    f"{self.tableName}_cam",
+                    CAM_TABLE_COLUMNS,
+                    rows[i : i + self.batchSize],
+                    earliestColumns=("first_observed_at",),
+                    pageSize=self.batchSize
                 )
 
-            # commit the changes
-            engine.commit()
             # close communication with the postgres server (rds)
-            cursor.close()
+            engine.close()
             
             print("Completed writing all CAM entries to PostgreSQL.")
 
@@ -240,84 +241,19 @@ class CamPostgresProvider(object):
     
     def create_cam_format(self, findings):
         """
-        This function uses the list comprehension to base64 decode all `AssetDetails` and then takes a selective
-        cross-section of unique per-asset details to be written to PostgreSQL
+        Takes a selective cross-section of unique per-Asset details and severity counts from the findings, with
+        `AssetDetails` base64 decoded, to be written to PostgreSQL
         """
 
         if len(findings) == 0:
             print("There are not any findings to write!")
             exit(0)
 
-        # This list contains the CAM output
-        cloudAssetManagementFindings = []
-        # Create a new list from raw findings that base64 decodes `AssetDetails` where it is not None, if it is, just
-        # use None and bring forward `ProductFields` where it is missing `AssetDetails`...which shouldn't happen
-        print(f"Base64 decoding AssetDetails for {len(findings)} ElectricEye findings.")
-
-        data = [
-            {**d, "ProductFields": {**d["ProductFields"],
-                "AssetDetails": json.loads(base64.b64decode(d["ProductFields"]["AssetDetails"]).decode("utf-8"))
-                    if d["ProductFields"]["AssetDetails"] is not None
-                    else None
-            }} if "AssetDetails" in d["ProductFields"]
-            else d
-            for d in findings
-        ]
-
-        print(f"Completed base64 decoding for {len(data)} ElectricEye findings.")
-
-        # This list will contain unique identifiers from `Resources.[*].Id`
-        uniqueIds = set(item["Resources"][0]["Id"] for item in data)
-
-        print(f"Processing Asset and Finding Summary data for {len(uniqueIds)} unique Assets.")
-
-        for uid in uniqueIds:
-            subData = [item for item in data if item["Resources"][0]["Id"] == uid]
-            productFields = subData[0]["ProductFields"]
-            infoSevFindings = lowSevFindings = medSevFindings = highSevFindings = critSevFindings = 0
-            
-            for item in subData:
-                firstObserved = item["FirstObservedAt"]
-                sevLabel = item["Severity"]["Label"]
-                if sevLabel == "INFORMATIONAL":
-                    infoSevFindings += 1
-                elif sevLabel == "LOW":
-                    lowSevFindings += 1
-                elif sevLabel == "MEDIUM":
-                    medSevFindings += 1
-                elif sevLabel == "HIGH":
-                    highSevFindings += 1
-                elif sevLabel == "CRITICAL":
-                    critSevFindings += 1
-                
-            
-            cloudAssetManagementFindings.append(
-                {
-                    "AssetId": uid,
-                    "FirstObservedAt": firstObserved,
-                    "AssetClass": productFields.get("AssetClass", ""),
-                    "AssetService": productFields.get("AssetService", ""),
-                    "AssetComponent": productFields.get("AssetComponent", ""),
-                    "Provider": productFields.get("Provider", ""),
-                    "ProviderType": productFields.get("ProviderType", ""),
-                    "ProviderAccountId": productFields.get("ProviderAccountId", ""),
-                    "AssetRegion": productFields.get("AssetRegion", ""),
-                    "AssetDetails": productFields.get("AssetDetails", ""),
-                    "AssetClass": productFields.get("AssetClass", ""),
-                    "AssetService": productFields.get("AssetService", ""),
-                    "AssetComponent": productFields.get("AssetComponent", ""),
-                    "InformationalSeverityFindings": infoSevFindings,
-                    "LowSeverityFindings": lowSevFindings,
-                    "MediumSeverityFindings": medSevFindings,
-                    "HighSeverityFindings": highSevFindings,
-                    "CriticalSeverityFindings": critSevFindings
-                }
-            )
+        print(f"Processing Asset and Finding Summary data for {len(findings)} ElectricEye findings.")
 
-        del findings
-        del data
-        del uniqueIds
-        del subData
+        cloudAssetManagementFindings = aggregate_cam_assets(findings)
+
+        print(f"Completed Asset and Finding Summary data for {len(cloudAssetManagementFindings)} unique Assets.")
 
         return cloudAssetManagementFindings
 
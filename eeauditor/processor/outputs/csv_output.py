@@ -29,8 +29,8 @@ here = path.abspath(path.dirname(__file__))
 class CsvProvider(object):
     __provider__ = "csv"
 
-    def write_findings(self, findings: list, output_file: str, **kwargs):
-        csv_columns = [
+    def open(self, output_file: str, **kwargs):
+        self.csvColumns = [
             {"name": "Id", "path": "Id"},
             {"name": "Title", "path": "Title"},
             {"name": "ProductArn", "path": "ProductArn"},
@@ -44,24 +44,42 @@ class CsvProvider(object):
             {"name": "Remediation Recommendation Link", "path": "Remediation.Recommendation.Url",},
         ]
 
-        csvOutputName = f"{here}/{output_file}.csv"
+        self.csvOutputName = f"{here}/{output_file}.csv"
+        self.findingsWritten = 0
 
         try:
-            with open(csvOutputName, "w") as csvfile:
-                print(f"Writing {len(findings)} findings to {csvOutputName}")
-                writer = csv.writer(csvfile, dialect="excel")
-                writer.writerow(item["name"] for item in csv_columns)
-                for finding in findings:
-                    row_data = []
-                    for column_dict in csv_columns:
-                        row_data.append(self.deep_get(finding, column_dict["path"]))
-                    writer.writerow(row_data)
-            csvfile.close()
+            self.csvfile = open(self.csvOutputName, "w")
+            print(f"Writing findings to {self.csvOutputName}")
+            self.writer = csv.writer(self.csvfile, dialect="excel")
+            self.writer.writerow(item["name"] for item in self.csvColumns)
         except IOError as e:
             print(f"Error writing to file {output_file} with exception {e}")
+            self.csvfile = None
+
+    def write_batch(self, findings: list):
+        if self.csvfile is None:
+            return False
+
+        try:
+            for finding in findings:
+                row_data = []
+                for column_dict in self.csvColumns:
+                    row_data.append(self.deep_get(finding, column_dict["path"]))
+                self.writer.writerow(row_data)
+            self.findingsWritten += len(findings)
+        except IOError as e:
+            print(f"Error writing to file {self.csvOutputName} with exception {e}")
             return False
         return True
 
+    def close(self):
+        if self.csvfile is None:
+            return False
+
+        self.csvfile.close()
+        print(f"Wrote {self.findingsWritten} findings to {self.csvOutputName}")
+        return True
+
     # Return nested dictionary values by passing in dictionary and keys separated by "."
     def deep_get(self, dictionary, keys):
         return reduce(
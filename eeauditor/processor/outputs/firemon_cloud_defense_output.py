@@ -23,10 +23,10 @@ import boto3
 import sys
 import json
 import os
-import requests
-from time import sleep
 from botocore.exceptions import ClientError
 from processor.outputs.output_base import ElectricEyeOutput
+from processor.aws_batching import get_integer_setting
+from processor.http_delivery import HttpDeliveryEngine
 
 # Boto3 Clients
 ssm = boto3.client("ssm")
@@ -100,29 +100,55 @@ class FiremonCloudDefenseProvider(object):
         self.url = "https://collector.prod.disruptops.com/event"
         self.clientId = clientId
         self.apiKey = apiKey
+        self.requestsPerSecond = get_integer_setting(
+            fcdDetails, "firemon_cloud_defense", "firemon_cloud_defense_requests_per_second", 10
+        )
+        self.maxWorkers = get_integer_setting(fcdDetails, "firemon_cloud_defense", "firemon_cloud_defense_max_workers", 8)
 
-    def write_findings(self, findings: list, **kwargs):
-        if len(findings) == 0:
-            print("There are not any findings to write!")
-            exit(0)
+    def open(self, **kwargs):
+        self.findingsWritten = 0
+        self.findingsFailed = 0
+        self.engine = HttpDeliveryEngine(self.requestsPerSecond, burst=self.maxWorkers, maxWorkers=self.maxWorkers)
+
+    def write_batch(self, findings: list):
         # Use another list comprehension to remove `ProductFields.AssetDetails` from non-Asset reporting outputs
         noDetails = [
             {**d, "ProductFields": {k: v for k, v in d["ProductFields"].items() if k != "AssetDetails"}} for d in findings
         ]
         del findings
-
-        print(f"Writing {len(noDetails)} results to Firemon Cloud Defense (DisruptOps).")
         
-        for finding in noDetails:
-            r = requests.post(
-                self.url, 
-                data=json.dumps(finding),
-                auth=(self.clientId, self.apiKey)
-            )
-            if r.status_code == 429:
-                sleep(0.5)
-            elif r.status_code == (400, 401, 403, 404):
-                raise r.json()
+        responses = self.engine.send_all(
+            [
+                {"method": "POST", "url": self.url, "data": json.dumps(finding), "auth": (self.clientId, self.apiKey)}
+                for finding in noDetails
+            ]
+        )
+
+        for r in responses:
+            if r is not None and r.status_code in (401, 403, 404):
+                # Every other finding would be rejected the same way
+                raise RuntimeError(f"Firemon Cloud Defense rejected the request with a {r.status_code} status code: {r.text}")
+            if r is None or not r.ok:
+                self.findingsFailed += 1
+            else:
+                self.findingsWritten += 1
+
+    def close(self):
+        self.engine.close()
+
+        if self.findingsFailed > 0:
+            print(f"Failed to write {self.findingsFailed} results to Firemon Cloud Defense (DisruptOps).")
+
+        if self.findingsWritten == 0:
+            print("There are not any findings to write!")
+            return False
+
+        print(f"Wrote {self.findingsWritten} results to Firemon Cloud Defense (DisruptOps).")
+
+        return True
+
+    def abort(self):
+        self.engine.close(wait=False)
         
     def get_credential_from_aws_ssm(self, value, configurationName):
         """
@@ -18,12 +18,17 @@
 #specific language governing permissions and limitations
 #under the License.
 
-from processor.outputs.output_base import ElectricEyeOutput
+import tomli
+import os
+import sys
+from processor.outputs.output_base import ElectricEyeOutput, BufferedOutput
+from processor.aws_batching import get_integer_setting
+from processor.compliance_charts import render_framework_charts
 import json
 import pandas as pd
-import matplotlib.pyplot as plt
 from os import path
 from datetime import datetime
+from functools import lru_cache
 
 here = path.abspath(path.dirname(__file__))
 
@@ -59,214 +64,217 @@ SUPPORTED_FRAMEWORKS = [
     "CIS Microsoft Azure Foundations Benchmark V2.0.0"
 ]
 
-with open(f"{here}/mapped_compliance_controls.json") as jsonfile:
-    CONTROLS_CROSSWALK = json.load(jsonfile)
+# This control was mis-mapped as a single concatenated string and is not counted in the per-Control Asset information
+MALFORMED_CONTROL = "NIST SP 800-53 Rev. 4 AC-1NIST SP 800-53 Rev. 4 AC-3NIST SP 800-53 Rev. 4 AC-17NIST SP 800-53 Rev. 4 AC-22ISO 27001:2013 A.13.1.2"
+
+@lru_cache(maxsize=None)
+def control_frameworks(controlTitle: str) -> tuple:
+    """
+    Returns every entry of SUPPORTED_FRAMEWORKS that a control belongs to (by prefix), memoized per control title
+    """
+    return tuple(framework for framework in SUPPORTED_FRAMEWORKS if controlTitle.startswith(framework))
+
+@lru_cache(maxsize=None)
+def load_control_objectives() -> dict:
+    """
+    Loads control_objectives.json once, keyed by ControlTitle, into a tuple of (position in the file, [descriptions]) as
+    a handful of titles are listed more than once
+    """
+    with open(f"{here}/control_objectives.json") as jsonfile:
+        data = json.load(jsonfile)
+
+    controlObjectives = {}
+    for position, controlInfo in enumerate(data):
+        controlObjectives.setdefault(controlInfo["ControlTitle"], (position, []))[1].append(controlInfo["ControlDescription"])
+
+    return controlObjectives
 
 @ElectricEyeOutput
-class JsonProvider(object):
+class JsonProvider(BufferedOutput):
     __provider__ = "html_compliance"
+    __normalized__ = True
+
+    def __init__(self):
+        if os.environ["TOML_FILE_PATH"] == "None":
+            # Get the absolute path of the current directory
+            currentDir = os.path.abspath(os.path.dirname(__file__))
+            # Go two directories back to /eeauditor/
+            twoBack = os.path.abspath(os.path.join(currentDir, "../../"))
+            # TOML is located in /eeauditor/ directory
+            tomlFile = f"{twoBack}/external_providers.toml"
+        else:
+            tomlFile = os.environ["TOML_FILE_PATH"]
+
+        with open(tomlFile, "rb") as f:
+            data = tomli.load(f)
+
+        # [outputs.html_compliance] is optional, older TOML files will not have it
+        htmlComplianceDetails = data["outputs"].get("html_compliance", {})
+
+        # Where the framework charts are rendered to and cached between runs, defaults to a directory in the system temp dir
+        chartDirectory = htmlComplianceDetails.get("html_compliance_chart_directory", "")
+        if not isinstance(chartDirectory, str):
+            print("Invalid value for '[outputs.html_compliance.html_compliance_chart_directory]'. Must be a string.")
+            sys.exit(2)
+        self.chartDirectory = path.expanduser(chartDirectory) if chartDirectory else None
+        self.maxWorkers = get_integer_setting(
+            htmlComplianceDetails, "html_compliance", "html_compliance_max_workers", min(4, os.cpu_count() or 1)
+        )
 
     def write_findings(self, findings: list, output_file: str, **kwargs):
         if len(findings) == 0:
             print("There are not any findings to write to file!")
             exit(0)
 
-        # Process the findings
-        processedFindings = self.process_findings(findings)
+        # Aggregate everything the report needs in a single pass
+        controlsAggregation, assetDataPerControl, summaryStatistics = self.aggregate_findings(findings)
         # Delete the un-processed findings
         del findings
 
-        uniqueControls = self.get_unique_controls(processedFindings)
-        # Gather and sort the control data enriched with aggregated asset information
-        assetInfoAggregation = self.get_asset_information_per_control(processedFindings)
-        assetDataPerControl = []
-        for control, details in assetInfoAggregation.items():
-            controlAssetPayload = {"ControlId": control}
-            controlAssetPayload.update(details)
-            assetDataPerControl.append(controlAssetPayload)
-
-        # Do one more pass on the aggregated information and add a passing % per control
-        assetDataPerControlWithPercentage = []
-        for controlData in assetDataPerControl:
-            passingPercentage = (controlData["PassingControls"] / controlData["ResourcesImpacted"]) * 100
-            roundedPercentage = f"{round(passingPercentage, 2)}%"
-            controlData["RawPassingScore"] = passingPercentage
-            controlData["PassingPercentage"] = roundedPercentage
-            assetDataPerControlWithPercentage.append(controlData)
-
-        del assetDataPerControl
-        # Get the aggregated pass/fail info per control
-        controlsAggregation = self.generate_controls_aggregation(uniqueControls, processedFindings)
-
-        self.html_creation(processedFindings, controlsAggregation, assetDataPerControlWithPercentage, output_file)
+        self.html_creation(summaryStatistics, controlsAggregation, assetDataPerControl, output_file)
 
         print("Created HTML Compliance report!")
 
-    def process_findings(self, findings):
+    def aggregate_findings(self, findings):
         """
-        Returns a processed list of findings
+        Returns the Pass/Fail stats of every control per framework, the Asset information per control (with a passing %)
+        and the run totals for the executive summary from a single pass over the findings. The NIST CSF crosswalk is
+        already mapped in by processor.main
         """
 
-        processedFindings = []
+        # Create a dict of nested dicts from a list comprehension of a list of Supported Frameworks...holy shit what a word salad
+        controlsAggregation = {framework: {} for framework in SUPPORTED_FRAMEWORKS}
+        controlAssets = {}
+        uniqueControls = set()
+        # dicts are used as insertion-ordered sets for the values listed in the executive summary
+        summaryStatistics = {
+            "Provider": findings[0]["ProductFields"]["Provider"],
+            "Findings": len(findings),
+            "Passed": 0,
+            "Regions": {},
+            "Accounts": {},
+            "AssetClasses": {},
+            "AssetServices": {},
+            "AssetComponents": {},
+            "AssetIds": set()
+        }
 
+        # Findings from the same Check share the same RelatedRequirements, so the Asset details are first grouped per
+        # distinct list of requirements and only then fanned out to every control within it
+        requirementGroups = {}
         for finding in findings:
-            complianceRelatedRequirements = finding["Compliance"]["RelatedRequirements"]
-            newControls = []
-            nistCsfControls = [control for control in complianceRelatedRequirements if control.startswith("NIST CSF V1.1")]
-            for control in nistCsfControls:
-                crosswalkedControls = self.nist_csf_v_1_1_controls_crosswalk(control)
-                # Not every single NIST CSF Control maps across to other frameworks
-                if crosswalkedControls:
-                    for crosswalk in crosswalkedControls:
-                        if crosswalk not in newControls:
-                            newControls.append(crosswalk)
-                else:
-                    continue
-
-            complianceRelatedRequirements.extend(newControls)
-            
-            processedFindings.append(
-                {
-                    "AssetId": finding["Resources"][0]["Id"],
-                    "ProviderAccountId": finding["ProductFields"]["ProviderAccountId"],
-                    "Provider": finding["ProductFields"]["Provider"],
-                    "AssetRegion": finding["ProductFields"]["AssetRegion"],
-                    "AssetClass": finding["ProductFields"]["AssetClass"],
-                    "AssetService": finding["ProductFields"]["AssetService"],
-                    "AssetComponent": finding["ProductFields"]["AssetComponent"],
-                    "ComplianceStatus": finding["Compliance"]["Status"],
-                    "ComplianceRelatedRequirements": complianceRelatedRequirements,
+            productFields = finding["ProductFields"]
+            assetId = finding["Resources"][0]["Id"]
+            assetClass = productFields["AssetClass"]
+            assetService = productFields["AssetService"]
+            assetComponent = productFields["AssetComponent"]
+            passed = finding["Compliance"]["Status"] == "PASSED"
+
+            if passed:
+                summaryStatistics["Passed"] += 1
+            summaryStatistics["Regions"][productFields["AssetRegion"]] = None
+            summaryStatistics["Accounts"][productFields["ProviderAccountId"]] = None
+            summaryStatistics["AssetClasses"][assetClass] = None
+            summaryStatistics["AssetServices"][assetService] = None
+            summaryStatistics["AssetComponents"][assetComponent] = None
+            summaryStatistics["AssetIds"].add(assetId)
+
+            requirements = tuple(finding["Compliance"]["RelatedRequirements"])
+            group = requirementGroups.get(requirements)
+            if group is None:
+                group = requirementGroups[requirements] = {
+                    "Passed": 0,
+                    "Failed": 0,
+                    "UniqueAssetClass": set(),
+                    "UniqueAssetComponent": set(),
+                    "UniqueAssetService": set(),
+                    "ResourcesImpacted": set(),
+                    "PassingControls": set(),
+                    "FailingControls": set(),
                 }
-            )
-
-        print(f"Processed {len(processedFindings)} findings")
-
-        return processedFindings
-    
-    def nist_csf_v_1_1_controls_crosswalk(self, nistCsfSubcategory):
-        """
-        This function returns a list of additional control framework control IDs that mapped into a provided
-        NIST CSF V1.1 Subcategory (control)
-        """
-
-        # Not every single NIST CSF Control maps across to other frameworks
-        try:
-            return CONTROLS_CROSSWALK[nistCsfSubcategory]
-        except KeyError:
-            return []
-
-    def get_unique_controls(self, processedFindings):
-        """
-        This function returns a list of unique controls across all processed findings
-        """
-
-        uniqueControls = []
-
-        for findings in processedFindings:
-            for controls in findings["ComplianceRelatedRequirements"]:
-
-                if controls not in uniqueControls:
-                    uniqueControls.append(controls)
-                else:
-                    continue
-
-        print(f"{len(uniqueControls)} unique controls processed")
-
-        return uniqueControls
-
-    def get_asset_information_per_control(self, processedFindings):
-        """
-        This function returns a DataFrame of controls with the sum of each Account, Asset, and Region in scope for a control
-        """
-
-        controlDict = {}
-
-        for asset in processedFindings:
-            for control in asset["ComplianceRelatedRequirements"]:
-                if control == "NIST SP 800-53 Rev. 4 AC-1NIST SP 800-53 Rev. 4 AC-3NIST SP 800-53 Rev. 4 AC-17NIST SP 800-53 Rev. 4 AC-22ISO 27001:2013 A.13.1.2":
+            group["UniqueAssetClass"].add(assetClass)
+            group["UniqueAssetComponent"].add(assetComponent)
+            group["UniqueAssetService"].add(assetService)
+            group["ResourcesImpacted"].add(assetId)
+            if passed:
+                group["Passed"] += 1
+                group["PassingControls"].add(assetId)
+            else:
+                group["Failed"] += 1
+                group["FailingControls"].add(assetId)
+
+        for requirements, group in requirementGroups.items():
+            # a control listed twice within a single finding is counted twice, as it always has been
+            for control in requirements:
+                uniqueControls.add(control)
+
+                # Count up the pass & fails per control of every framework the control belongs to
+                for framework in control_frameworks(control):
+                    frameworkControls = controlsAggregation[framework]
+                    if control not in frameworkControls:
+                        frameworkControls[control] = {"Passed": 0, "Failed": 0}
+                    frameworkControls[control]["Passed"] += group["Passed"]
+                    frameworkControls[control]["Failed"] += group["Failed"]
+
+                if control == MALFORMED_CONTROL:
                     continue
 
-                if control not in controlDict:
-                    controlDict[control] = {
+                details = controlAssets.get(control)
+                if details is None:
+                    details = controlAssets[control] = {
                         "UniqueAssetClass": set(),
-                        "UniqueAssetComponent": set(), 
+                        "UniqueAssetComponent": set(),
                         "UniqueAssetService": set(),
                         "ResourcesImpacted": set(),
                         "PassingControls": set(),
                         "FailingControls": set(),
                     }
-                controlDict[control]["UniqueAssetClass"].add(asset["AssetClass"])
-                controlDict[control]["UniqueAssetComponent"].add(asset["AssetComponent"])
-                controlDict[control]["UniqueAssetService"].add(asset["AssetService"])
-                controlDict[control]["ResourcesImpacted"].add(asset["AssetId"])
-                if asset["ComplianceStatus"] == "PASSED":
-                    controlDict[control]["PassingControls"].add(asset["AssetId"])
-                else:
-                    controlDict[control]["FailingControls"].add(asset["AssetId"])
+                for key, uniqueSet in details.items():
+                    uniqueSet.update(group[key])
 
-        # Now transform the sets into counts
-        for control, details in controlDict.items():
-            for key, unique_set in details.items():
-                controlDict[control][key] = len(unique_set)
+        summaryStatistics["UniqueControls"] = len(uniqueControls)
 
-        print("Completed aggregation of Asset details per Control for all frameworks.")
-            
-        return controlDict
+        # Now transform the sets into counts and add a passing % per control
+        assetDataPerControl = []
+        for control, details in controlAssets.items():
+            controlData = {"ControlId": control}
+            for key, uniqueSet in details.items():
+                controlData[key] = len(uniqueSet)
+            passingPercentage = (controlData["PassingControls"] / controlData["ResourcesImpacted"]) * 100
+            controlData["RawPassingScore"] = passingPercentage
+            controlData["PassingPercentage"] = f"{round(passingPercentage, 2)}%"
+            assetDataPerControl.append(controlData)
 
-    def generate_controls_aggregation(self, uniqueControls, processedFindings):
-        """
-        This function returns a complex dictionary that records the statistics of all audit readiness frameworks by passing and failing checks
-        """
+        print(f"Processed {len(findings)} findings, {len(uniqueControls)} unique controls processed")
+        print("Finished aggregating Pass/Fail stats and Asset details for all controls.")
 
-        # Create a dict of nested dicts from a list comprehension of a list of Supported Frameworks...holy shit what a word salad
-        controlsStatusAggregation = {framework: {} for framework in SUPPORTED_FRAMEWORKS}
-        # Populate the data structure of pass/fail by individual controls
-        for controlTitle in uniqueControls:
-            for framework in SUPPORTED_FRAMEWORKS:
-                if controlTitle.startswith(framework):
-                    controlsStatusAggregation[framework][controlTitle] = {"Passed": 0, "Failed": 0}
-
-        del uniqueControls
-
-        # Now start to count up the pass & fails
-        for finding in processedFindings:
-            status = finding["ComplianceStatus"]
-            for controls in finding["ComplianceRelatedRequirements"]:
-                for framework in SUPPORTED_FRAMEWORKS:
-                    if controls.startswith(framework):
-                        if status == "PASSED":
-                            controlsStatusAggregation[framework][controls]["Passed"] += 1
-                        else:
-                            controlsStatusAggregation[framework][controls]["Failed"] += 1
-
-        print("Finished aggregating Pass/Fail stats for all controls.")
-
-        return controlsStatusAggregation
+        return controlsAggregation, assetDataPerControl, summaryStatistics
 
     def generate_control_table(self, framework, controls, aggregatedAssetControlsData):
         """
         This function returns a JSON object that contains the Control ID and information about the control from the framework/standard author
-        joined with the information from "get_asset_information_per_control" which is used for the HTML table in the report
+        joined with the Asset information per control from "aggregate_findings" which is used for the HTML table in the report
         """
 
         tableContent = []
 
         print(f"Generating a table of controls objectives and aggregated asset information for {len(controls)} controls in {framework}")
         
-        with open(f"{here}/control_objectives.json") as jsonfile:
-            data = json.load(jsonfile)
-
-        for controlInfo in data:
-            controlTitle = controlInfo["ControlTitle"]
-            # Only grab controls that match the framework that are in the covered controls
-            if controlTitle.startswith(framework) and controlTitle in controls:
-                contentRow = {
-                    "ControlTitle": controlTitle,
-                    "ControlDescription": controlInfo["ControlDescription"]
-                }
-                tableContent.append(contentRow)
-            else:
-                continue
+        controlObjectives = load_control_objectives()
+
+        # Only grab controls that match the framework that are in the covered controls, in the order of the objectives file
+        coveredControls = sorted(
+            (controlTitle for controlTitle in set(controls) if controlTitle.startswith(framework) and controlTitle in controlObjectives),
+            key=lambda controlTitle: controlObjectives[controlTitle][0]
+        )
+        for controlTitle in coveredControls:
+            for controlDescription in controlObjectives[controlTitle][1]:
+                tableContent.append(
+                    {
+                        "ControlTitle": controlTitle,
+                        "ControlDescription": controlDescription
+                    }
+                )
 
         if tableContent:
             tableDf = pd.DataFrame(tableContent)
@@ -291,48 +299,25 @@ class JsonProvider(object):
         else:
             return []
 
-    def generate_executive_summary(self, processedFindings):
+    def generate_executive_summary(self, summaryStatistics):
         """
         Returns a paragraph for the summary header section of the report
         """
 
-        countUniqueControls = len(self.get_unique_controls(processedFindings))
-        countFindings = len(processedFindings)
+        countUniqueControls = summaryStatistics["UniqueControls"]
+        countFindings = summaryStatistics["Findings"]
 
-        providerAssesed = processedFindings[0]["Provider"]
+        providerAssesed = summaryStatistics["Provider"]
 
         # Compliance Passed v Failed
-        totalPassed = [finding for finding in processedFindings if finding["ComplianceStatus"] == "PASSED"]
-
-        passingPercentage = (len(totalPassed) / countFindings) * 100
+        passingPercentage = (summaryStatistics["Passed"] / countFindings) * 100
         roundedPercentage = f"{round(passingPercentage, 2)}%"
 
-        regionsAssessed = []
-        accountsAssessed = []
-        assetClassesAssesed = []
-        assetServicesAssessed = []
-        assetComponentsAssessed = []
-        uniqueResourcesIds = []
-
-        # Append uniques into lists
-        for finding in processedFindings:
-            if finding["AssetRegion"] not in regionsAssessed:
-                regionsAssessed.append(finding["AssetRegion"])
-
-            if finding["ProviderAccountId"] not in accountsAssessed:
-                accountsAssessed.append(finding["ProviderAccountId"])
-
-            if finding["AssetClass"] not in assetClassesAssesed:
-                assetClassesAssesed.append(finding["AssetClass"])
-
-            if finding["AssetService"] not in assetServicesAssessed:
-                assetServicesAssessed.append(finding["AssetService"])
-
-            if finding["AssetComponent"] not in assetComponentsAssessed:
-                assetComponentsAssessed.append(finding["AssetComponent"])
-
-            if finding["AssetId"] not in uniqueResourcesIds:
-                uniqueResourcesIds.append(finding["AssetId"])
+        regionsAssessed = list(summaryStatistics["Regions"])
+        accountsAssessed = list(summaryStatistics["Accounts"])
+        assetClassesAssesed = list(summaryStatistics["AssetClasses"])
+        assetServicesAssessed = list(summaryStatistics["AssetServices"])
+        assetComponentsAssessed = list(summaryStatistics["AssetComponents"])
 
         # Use len to get counts
         countRegionsAssessed = len(regionsAssessed)
@@ -340,7 +325,7 @@ class JsonProvider(object):
         countAssetClassesAssesed = len(assetClassesAssesed)
         countAssetServicesAssessed = len(assetServicesAssessed)
         countAssetComponentsAssessed = len(assetComponentsAssessed)
-        countUniqueResourceIds = len(uniqueResourcesIds)
+        countUniqueResourceIds = len(summaryStatistics["AssetIds"])
 
         # Use join to create sentences of certain lists
         regionSentence = ", ".join(regionsAssessed)
@@ -375,24 +360,28 @@ class JsonProvider(object):
         return summary
 
     def create_visuals(self, controlsAggregation, assetDataPerControl):
-        # Loop through every high level framework aggregation to generate findings
+        # Group the Asset information per control by framework once, instead of scanning it for every framework
+        assetDataPerFramework = {}
+        for info in assetDataPerControl:
+            for framework in control_frameworks(info["ControlId"]):
+                assetDataPerFramework.setdefault(framework, []).append(info)
+
+        frameworkControls = {}
         for framework, controls in controlsAggregation.items():
             if not controls:  # this checks if `controls` is not empty
                 print(f"There are not any results for {framework}, skipping it!")
                 continue
             # Continue with populated Frameworks, this is more or less to be "fuck up proof" in case I forgot to add a Framework to SUPPORTED_FRAMEWORKS
-            print(f"Creating a visualization for the {framework} framework!")
-            # remove shit we don't need so the filename doesn't get dicked up
-            frameworkSavefile = str(framework).replace(".","").replace(" ", "").replace(":","").lower()
-            # access the dict with the specific aggregations
-            controlsData = controlsAggregation[framework]
+            frameworkControls[framework] = controls
+
+        # Render (or re-use the cached) charts for every framework up front, this is by far the slowest part of the report
+        svgImages = render_framework_charts(frameworkControls, self.chartDirectory, self.maxWorkers)
 
+        # Loop through every high level framework aggregation to generate findings
+        for framework, controlsData in frameworkControls.items():
             # Loop the newly assembled list, only taking the controls for a specific framework that comes from the CONSTANT of all available frameworks 
             # at a time and use the info to assemble into a dataframe to combine with another dataframe based on controls information
-            if framework in SUPPORTED_FRAMEWORKS:
-                aggregatedAssetControlsData = [info for info in assetDataPerControl if info["ControlId"].startswith(framework)]
-            else:
-                aggregatedAssetControlsData = []
+            aggregatedAssetControlsData = assetDataPerFramework.get(framework, [])
 
             # Parse out the specific unique controls (again) to get the right information on the controls for the HTML table
             controls = [control for control in controlsData]
@@ -400,59 +389,7 @@ class JsonProvider(object):
             # Sort the table to match the descending values of the matplot lib charts
             tableContent = sorted(tableContent, key=lambda x: x["ResourcesImpacted"], reverse=False)
 
-            # Reverse order sorting of the controls, that will put the controls with the most failures closer to the X-Axis
-            controlsData = dict(sorted(controlsData.items(), key=lambda item: item[1]["Passed"] + item[1]["Failed"], reverse=True))
-
-            # create a figure with two subplots: one for the bar chart and one for the donut chart
-            fig, axs = plt.subplots(nrows=2, figsize=(38, 22), tight_layout=True)
-            """# Set the text size within the elements
-            plt.rcParams['font.size'] = 16  # Change the default font size
-            plt.rcParams['axes.labelsize'] = 14  # Increase the size of axis labels
-            plt.rcParams['axes.titlesize'] = 16  # Increase the size of the figure title
-            plt.rcParams['xtick.labelsize'] = 16  # Increase the size of x-tick labels
-            plt.rcParams['ytick.labelsize'] = 16  # Increase the size of y-tick labels"""
-
-            # sum of all passed and failed to calculate percentages later
-            controlsPassedSum = controlsFailedSum = 0
-
-            # iterate over the dictionary to plot each bar chart
-            for i, (key, value) in enumerate(controlsData.items()):
-                passed = value["Passed"]
-                failed = value["Failed"]
-
-                controlsPassedSum += passed
-                controlsFailedSum += failed
-                # Create horizontal bar chart, add a label to the X-Axis, and finally add values for the bars
-                #Set a title, axs[0].set_title(f"ElectricEye {frameworkTitle} Audit Readiness Report - {timeNow}", fontsize=14, fontweight="bold")
-                axs[0].barh(key, passed, color="#6aaf35")
-                axs[0].barh(key, failed, left=passed, color="#fe6e73")
-                axs[0].set_xlabel("Total Checks In Scope", fontsize=16)
-                axs[0].text(passed, i, str(passed), color="black", va="center")  # label for "Passed"
-                axs[0].text(passed + failed, i, str(failed), color="red", va="center")  # label for "Failed"
-
-            # create a legend for the bar chart
-            passed_patch = plt.Rectangle((0,0),1,1,fc="#6aaf35", edgecolor = "none")
-            failed_patch = plt.Rectangle((0,0),1,1,fc="#fe6e73",  edgecolor = "none")
-            axs[0].legend([passed_patch, failed_patch], ["Passed", "Failed"], loc="upper right")
-
-            # create a donut chart with the overall passing and failing percentages
-            sizes = [controlsPassedSum, controlsFailedSum]
-            colors = ["#6aaf35", "#fe6e73"]
-
-            axs[1].pie(sizes, labels=["Passed", "Failed"], colors=colors, autopct="%1.1f%%", startangle=90)
-            # this creates the hole in the middle, effectively making the pie chart a donut chart
-            axs[1].add_artist(plt.Circle((0,0),0.70,fc="white"))  
-
-            # Set the facecolor of the figure and the plots to a very light gray
-            plt.rcParams["savefig.facecolor"]="f9f9f9"
-            plt.rcParams["axes.facecolor"]="f9f9f9"
-
-            # Save the charts as a SVG and then read out the contents to pass to HTML
-            fig.savefig(f"{here}/{frameworkSavefile}.svg", format="svg")
-            with open(f"{here}/{frameworkSavefile}.svg", "r") as f:
-                svgImageContents = f.read()
-
-            yield tableContent, svgImageContents, framework
+            yield tableContent, svgImages[framework], framework
 
     def generate_stylesheet(self):
         """
@@ -928,7 +865,7 @@ class JsonProvider(object):
 
         return frameworkHeader
 
-    def html_creation(self, processedFindings, controlsAggregation, assetDataPerControl, outputFile):
+    def html_creation(self, summaryStatistics, controlsAggregation, assetDataPerControl, outputFile):
         """
         This function assembles an HTML Report of matplotlib SVGs and tables
         """
@@ -953,7 +890,7 @@ class JsonProvider(object):
                 <img src="https://raw.githubusercontent.com/jonrau1/ElectricEye/master/screenshots/logo.svg" class="summary__header__image">
                 <figcaption>ElectricEye Audit Readiness Report | {dateNow}</figcaption>
             </figure>
-            <h4>{self.generate_executive_summary(processedFindings)}</h4>
+            <h4>{self.generate_executive_summary(summaryStatistics)}</h4>
         </section>
         '''
         # Retrieve the info table contents and the SVG from matplotlib of the bar chart/pie chart for the compliance framework
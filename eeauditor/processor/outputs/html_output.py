@@ -21,7 +21,7 @@
 import os
 from datetime import datetime
 import yaml
-from processor.outputs.output_base import ElectricEyeOutput
+from processor.outputs.output_base import ElectricEyeOutput, BufferedOutput
 import json
 from os import path
 
@@ -38,7 +38,7 @@ with open(f"{here}/mapped_compliance_controls.json") as jsonfile:
     CONTROLS_CROSSWALK = json.load(jsonfile)
 
 @ElectricEyeOutput
-class HtmlProvider(object):
+class HtmlProvider(BufferedOutput):
     __provider__ = "html"
 
     def write_findings(self, findings: list, output_file: str, **kwargs):
@@ -17,8 +17,7 @@
 #KIND, either express or implied.  See the License for the
 #specific language governing permissions and limitations
 #under the License.
-import json
-from processor.outputs.output_base import ElectricEyeOutput
+from processor.outputs.output_base import ElectricEyeOutput, JsonArrayStream
 from os import path
 
 here = path.abspath(path.dirname(__file__))
@@ -27,20 +26,23 @@ here = path.abspath(path.dirname(__file__))
 class JsonProvider(object):
     __provider__ = "json_normalized"
 
-    def write_findings(self, findings: list, output_file: str, **kwargs):
-        if len(findings) == 0:
-            print("There are not any findings to write to file!")
-            exit(0)
-        # create a new empty list to store flattened findings
-        newFindings = []
-        # create another list to hold Finding IDs, this is to prevent duplicates by looking up values later on
-        allIds = []
-
-        print(f"Writing {len(findings)} findings to Normalized JSON file (final total may be different due to dedupe)")
-        
-        # create output file based on inputs
-        jsonfile = f"{here}/{output_file}_normalized.json"
-        print(f"Output file named: {jsonfile}")
+    def open(self, output_file: str, **kwargs):
+        self.outputFile = output_file
+        # the file is only created once the first batch of findings arrives
+        self.jsonfile = None
+        self.jsonStream = None
+        # create a list to hold Finding IDs, this is to prevent duplicates across every batch
+        self.allIds = []
+
+    def write_batch(self, findings: list):
+        allIds = self.allIds
+
+        if self.jsonStream is None:
+            # create output file based on inputs
+            jsonfile = f"{here}/{self.outputFile}_normalized.json"
+            print(f"Output file named: {jsonfile}")
+            self.jsonfile = open(jsonfile, "w")
+            self.jsonStream = JsonArrayStream(self.jsonfile)
 
         # Use another list comprehension to remove `ProductFields.AssetDetails` from non-Asset reporting outputs
         noDetails = [
@@ -89,20 +91,24 @@ class JsonProvider(object):
                 }
                 # append new dict to list if we have not already
                 if findingId not in allIds:
-                    newFindings.append(fDict)
+                    self.jsonStream.write(fDict)
                     # write finding ID to list for later check
                     allIds.append(findingId)
                 continue
             except KeyError as e:
                 print(f"Issue with Finding ID {findingId} due to missing value {e}")
-        # once complete with parsing findings - write to file and purge findings from memory
         del noDetails
 
-        print(f"Wrote {len(allIds)} findings to Normalized JSON file")
+    def close(self):
+        if self.jsonStream is None:
+            print("There are not any findings to write to file!")
+            return False
+
+        self.jsonStream.close()
+        self.jsonfile.close()
 
-        del allIds
+        print(f"Wrote {len(self.allIds)} findings to Normalized JSON file")
 
-        with open(jsonfile, "w") as jsonfile:
-            json.dump(newFindings, jsonfile, indent=4)
+        del self.allIds
 
-        return True
\ No newline at end of file
+        return True
@@ -19,24 +19,19 @@
 #under the License.
 
 import boto3
-from os import path
 import tomli
 import os
 import sys
 import requests
 from pymongo import errors, MongoClient
-import json
-from base64 import b64decode
 from botocore.exceptions import ClientError
 from processor.outputs.output_base import ElectricEyeOutput
+from processor.mongodb_bulk import bulk_upsert, get_mongodb_batch_size
 
 # Boto3 Clients
 ssm = boto3.client("ssm")
 asm = boto3.client("secretsmanager")
 
-here = path.abspath(path.dirname(__file__))
-with open(f"{here}/mapped_compliance_controls.json") as jsonfile:
-    CONTROLS_CROSSWALK = json.load(jsonfile)
 
 # These Constants define legitimate values for certain parameters within the external_providers.toml file
 CREDENTIALS_LOCATION_CHOICES = ["AWS_SSM", "AWS_SECRETS_MANAGER", "CONFIG_FILE"]
@@ -44,6 +39,7 @@ CREDENTIALS_LOCATION_CHOICES = ["AWS_SSM", "AWS_SECRETS_MANAGER", "CONFIG_FILE"]
 @ElectricEyeOutput
 class MongodbProvider(object):
     __provider__ = "mongodb"
+    __normalized__ = True
 
     def __init__(self):
         print("Preparing MongoDB / AWS DocumentDB credentials and PEM files (as needed).")
@@ -132,12 +128,19 @@ class MongodbProvider(object):
         self.collName = mongodbCollectionName
         self.password = password
         self.tlsPath = mongoTlsCertPath
+        self.batchSize = get_mongodb_batch_size(mongodbDetails)
 
-    def write_findings(self, findings: list, output_file: str, **kwargs):
-        if len(findings) == 0:
-            print("There are not any findings to write!")
-            exit(0)
-        
+    def open(self, **kwargs):
+        # the connection is only established once the first batch of findings arrives
+        self.collection = None
+        self.pendingFindings = []
+        self.findingsWritten = 0
+        self.findingsFailed = 0
+
+    def connect(self):
+        """
+        Returns the MongoDB / AWS DocumentDB collection that findings are upserted into
+        """
         # There are different possible connection objects based on if Passwords are used and if TLS is enabled for AWS DocDB
 
         # Self-hosted, no password
@@ -164,54 +167,49 @@ class MongodbProvider(object):
         except errors.ConnectionError as e:
             print(f"Connection or credential issue with MongoDB/AWS DocumentDB!")
             raise e
-        
-        decodedFindings = [
-            {**d, "ProductFields": {**d["ProductFields"],
-                "AssetDetails": json.loads(b64decode(d["ProductFields"]["AssetDetails"]).decode("utf-8"))
-                    if d["ProductFields"]["AssetDetails"] is not None
-                    else None
-            }} if "AssetDetails" in d["ProductFields"]
-            else d
-            for d in findings
-        ]
-
-        del findings
-
-        # Map in the new compliance controls
-        for finding in decodedFindings:
-            complianceRelatedRequirements = finding["Compliance"]["RelatedRequirements"]
-            newControls = []
-            nistCsfControls = [control for control in complianceRelatedRequirements if control.startswith("NIST CSF V1.1")]
-            for control in nistCsfControls:
-                crosswalkedControls = self.nist_csf_v_1_1_controls_crosswalk(control)
-                # Not every single NIST CSF Control maps across to other frameworks
-                if crosswalkedControls:
-                    for crosswalk in crosswalkedControls:
-                        if crosswalk not in newControls:
-                            newControls.append(crosswalk)
-                else:
-                    continue
-
-            complianceRelatedRequirements.extend(newControls)
-            
-            del finding["Compliance"]["RelatedRequirements"]
-            finding["Compliance"]["RelatedRequirements"] = complianceRelatedRequirements
-
-        print(f"Attempting to upsert {len(decodedFindings)} findings to MongoDB.")
-
-        for doc in decodedFindings:
-            try:
-                # use the Finding "Id" as the MongoDB "_id"
-                doc["_id"] = doc["Id"]
-                filter = {'_id': doc['_id']}
-                update = {'$set': doc}
-                collection.update_one(filter, update, upsert=True)
-            except errors as e:
-                print(f"Encountered an error during update_one() operation: {e}")
-            except KeyError as ke:
-                raise ke
+
+        return collection
+
+    def write_batch(self, findings: list):
+        # Findings arrive normalized, with `AssetDetails` decoded and the NIST CSF crosswalk mapped in, by processor.main
+
+        self.pendingFindings.extend(findings)
+
+        while len(self.pendingFindings) >= self.batchSize:
+            self.flush(self.pendingFindings[:self.batchSize])
+            del self.pendingFindings[:self.batchSize]
+
+    def flush(self, findings):
+        """
+        Upserts a batch of findings with an unordered bulk_write(), using the Finding "Id" as the MongoDB "_id"
+        """
+        if self.collection is None:
+            self.collection = self.connect()
+
+        print(f"Attempting to upsert {len(findings)} findings to MongoDB.")
+
+        written, failed = bulk_upsert(self.collection, findings, "Id", self.batchSize)
+        self.findingsWritten += written
+        self.findingsFailed += failed
+
+    def close(self):
+        if self.pendingFindings:
+            self.flush(self.pendingFindings)
+            self.pendingFindings = []
+
+        if self.collection is None:
+            print("There are not any findings to write!")
+            return False
+
+        print(f"Upserted {self.findingsWritten} findings to MongoDB with {self.findingsFailed} write errors.")
 
         return True
+
+    def abort(self):
+        # pending findings are dropped and the client's connection pool is closed
+        self.pendingFindings = []
+        if self.collection is not None:
+            self.collection.database.client.close()
     
     def get_credential_from_aws_ssm(self, value, configurationName):
         """
@@ -254,17 +252,6 @@ class MongodbProvider(object):
         
         return credential
 
-    def nist_csf_v_1_1_controls_crosswalk(self, nistCsfSubcategory):
-        """
-        This function returns a list of additional control framework control IDs that mapped into a provided
-        NIST CSF V1.1 Subcategory (control)
-        """
-
-        # Not every single NIST CSF Control maps across to other frameworks
-        try:
-            return CONTROLS_CROSSWALK[nistCsfSubcategory]
-        except KeyError:
-            return []
 # EOF
 
 """
@@ -21,10 +21,7 @@
 import logging
 import sys
 from typing import NamedTuple
-from os import path
-from processor.outputs.output_base import ElectricEyeOutput
-import json
-from base64 import b64decode
+from processor.outputs.output_base import ElectricEyeOutput, NdjsonStream
 from datetime import datetime
 
 logger = logging.getLogger("OCSF_Stdout_Output")
@@ -69,83 +66,37 @@ class AsffOcsfNormalizedMapping(NamedTuple):
     complianceStatusId: int
     complianceStatus: str
 
-here = path.abspath(path.dirname(__file__))
-with open(f"{here}/mapped_compliance_controls.json") as jsonfile:
-    CONTROLS_CROSSWALK = json.load(jsonfile)
 
 @ElectricEyeOutput
 class OcsfStdoutOutput(object):
     __provider__ = "ocsf_stdout"
+    __normalized__ = True
 
-    def write_findings(self, findings: list, **kwargs):
-        if len(findings) == 0:
-            logger.error("There are not any findings to write to file!")
-            sys.exit(0)
-
-        logger.info(
-            "Writing %s OCSF Compliance Findings to JSON!",
-            len(findings)
-        )
+    def open(self, **kwargs):
+        # Finding IDs (`metadata.uid`) are tracked to ignore duplicates across every batch
+        self.jsonStream = NdjsonStream(sys.stdout, default=str)
 
-        decodedFindings = [
-            {**d, "ProductFields": {**d["ProductFields"],
-                "AssetDetails": json.loads(b64decode(d["ProductFields"]["AssetDetails"]).decode("utf-8"))
-                    if d["ProductFields"]["AssetDetails"] is not None
-                    else None
-            }} if "AssetDetails" in d["ProductFields"]
-            else d
-            for d in findings
-        ]
+    def write_batch(self, findings: list):
+        # Findings arrive normalized, with `AssetDetails` decoded and the NIST CSF crosswalk mapped in, by processor.main
 
-        del findings
+        ocsfFindings = self.ocsf_compliance_finding_mapping(findings)
 
-        # Map in the new compliance controls
-        for finding in decodedFindings:
-            complianceRelatedRequirements = list(finding["Compliance"]["RelatedRequirements"])
-            newControls = []
-            nistCsfControls = [control for control in complianceRelatedRequirements if control.startswith("NIST CSF V1.1")]
-            for control in nistCsfControls:
-                crosswalkedControls = self.nist_csf_v_1_1_controls_crosswalk(control)
-                # Not every single NIST CSF Control maps across to other frameworks
-                if crosswalkedControls:
-                    for crosswalk in crosswalkedControls:
-                        if crosswalk not in newControls:
-                            newControls.append(crosswalk)
-                else:
-                    continue
+        for ocsfFinding in ocsfFindings:
+            self.jsonStream.write(ocsfFinding, key=ocsfFinding["metadata"]["uid"])
 
-            complianceRelatedRequirements.extend(newControls)
-            
-            del finding["Compliance"]["RelatedRequirements"]
-            finding["Compliance"]["RelatedRequirements"] = complianceRelatedRequirements
-
-        ocsfFindings = self.ocsf_compliance_finding_mapping(decodedFindings)
+    def close(self):
+        if self.jsonStream.count == 0:
+            logger.error("There are not any findings to write to file!")
+            return False
 
-        del decodedFindings
-        
-        # create output file based on inputs
-        print(
-            json.dumps(
-                ocsfFindings,
-                indent=4,
-                default=str
-            )
+        self.jsonStream.close()
+        logger.info(
+            "Wrote %s OCSF Compliance Findings to JSON!",
+            self.jsonStream.count
         )
-            
+
         return True
     
-    def nist_csf_v_1_1_controls_crosswalk(self, nistCsfSubcategory):
-        """
-        This function returns a list of additional control framework control IDs that mapped into a provided
-        NIST CSF V1.1 Subcategory (control)
-        """
-
-        # Not every single NIST CSF Control maps across to other frameworks
-        try:
-            return CONTROLS_CROSSWALK[nistCsfSubcategory]
-        except KeyError:
-            return []
-        
     def asff_to_ocsf_normalization(self, severityLabel: str, cloudProvider: str, complianceStatusLabel: str) -> AsffOcsfNormalizedMapping:
         """
         Normalizes the following ASFF Severity, Cloud Account Provider, and Compliance values into OCSF
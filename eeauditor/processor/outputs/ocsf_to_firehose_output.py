@@ -25,13 +25,22 @@ import sys
 from typing import NamedTuple
 from os import path, environ
 from processor.outputs.output_base import ElectricEyeOutput
+from processor.aws_batching import get_integer_setting, pack_batches
 import json
-from base64 import b64decode
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
 from datetime import datetime
+from random import uniform
+from time import sleep
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger("OCSF_to_KDF_Output")
 
+# PutRecordBatch accepts at most 500 records and 4 MiB per request, and each record can be at most 1,000 KiB
+FIREHOSE_MAX_BATCH_RECORDS = 500
+FIREHOSE_MAX_BATCH_BYTES = 4_194_304
+FIREHOSE_MAX_RECORD_BYTES = 1_024_000
+
 # NOTE TO SELF: Updated this and FAQ.md as new standards are added
 SUPPORTED_FRAMEWORKS = [
     "NIST CSF V1.1",
@@ -72,13 +81,11 @@ class AsffOcsfNormalizedMapping(NamedTuple):
     complianceStatusId: int
     complianceStatus: str
 
-here = path.abspath(path.dirname(__file__))
-with open(f"{here}/mapped_compliance_controls.json") as jsonfile:
-    CONTROLS_CROSSWALK = json.load(jsonfile)
 
 @ElectricEyeOutput
 class OcsfFirehoseOutput(object):
     __provider__ = "ocsf_kdf"
+    __normalized__ = True
 
     def __init__(self):
         print("Preparing to send OCSF V1.1.0 Compliance Findings to Amazon Kinesis Data Firehose.")
@@ -111,109 +118,159 @@ class OcsfFirehoseOutput(object):
             sys.exit(2)
 
         self.deliveryStream = deliveryStream
+        self.eventsPerRecord = get_integer_setting(sqsDetails, "firehose", "kinesis_firehose_events_per_record", 1)
+        self.maxWorkers = get_integer_setting(sqsDetails, "firehose", "kinesis_firehose_max_workers", 4)
+        self.maxRetries = get_integer_setting(sqsDetails, "firehose", "kinesis_firehose_max_retries", 5, minimum=0)
         self.firehose = boto3.client("firehose", region_name=awsRegion)
 
-    def write_findings(self, findings: list, **kwargs):
-        if len(findings) == 0:
-            logger.error("There are not any findings to send to Kinesis Data Firehose!")
-            sys.exit(0)
+    def open(self, **kwargs):
+        self.findingsSent = 0
+        self.findingsFailed = 0
+        self.requestsSent = 0
+        # boto3 clients are thread safe, every in-flight batch shares the same one
+        self.executor = ThreadPoolExecutor(max_workers=self.maxWorkers, thread_name_prefix="ElectricEyeKDF")
+        # requests keep running across write_batch() calls, at most two per sender are in flight or queued at once
+        self.slots = BoundedSemaphore(self.maxWorkers * 2)
+        self.pendingRequests = []
 
-        logger.info(
-            "Writing %s OCSF Compliance Findings to Kinesis Data Firehose!",
-            len(findings)
-        )
+    def write_batch(self, findings: list):
+        # Findings arrive normalized, with `AssetDetails` decoded and the NIST CSF crosswalk mapped in, by processor.main
 
-        """# Use another list comprehension to remove `ProductFields.AssetDetails` from non-Asset reporting outputs
-        newFindings = [
-            {**d, "ProductFields": {k: v for k, v in d["ProductFields"].items() if k != "AssetDetails"}} for d in findings
-        ]
+        ocsfFindings = self.ocsf_compliance_finding_mapping(findings)
+
+        records = self.create_records(ocsfFindings)
 
-        del findings"""
+        del ocsfFindings
 
+        # Pack the records by both count and size, the PutRecordBatch requests are not waited on so that the requests of
+        # the next batches of findings are sent while these are in flight
+        for batch in pack_batches(
+            records, FIREHOSE_MAX_BATCH_RECORDS, FIREHOSE_MAX_BATCH_BYTES, sizeOf=lambda record: len(record[0])
+        ):
+            self.slots.acquire()
+            request = self.executor.submit(self.put_record_batch, batch)
+            request.add_done_callback(lambda _: self.slots.release())
+            self.pendingRequests.append(request)
+
+        self.collect_requests()
+
+    def collect_requests(self, wait=False):
         """
-        This list comprhension will base64 decode and convert a string to JSON for all instances of `ProductFields.AssetDetails`
-        except where it is a None type (this is done for placeholders in Checks where the Asset doesn't exist) and it will also
-        skip over areas in the event that `ProductFields` is missing any Cloud Asset Management required fields
+        Adds the results of the finished (or with `wait`, of every) PutRecordBatch request to the counters, errors other
+        than the ones put_record_batch() handles are raised here
         """
-        decodedFindings = [
-            {**d, "ProductFields": {**d["ProductFields"],
-                "AssetDetails": json.loads(b64decode(d["ProductFields"]["AssetDetails"]).decode("utf-8"))
-                    if d["ProductFields"]["AssetDetails"] is not None
-                    else None
-            }} if "AssetDetails" in d["ProductFields"]
-            else d
-            for d in findings
-        ]
+        pendingRequests = []
+        for request in self.pendingRequests:
+            if not wait and not request.done():
+                pendingRequests.append(request)
+                continue
+            sent, failed, requests = request.result()
+            self.findingsSent += sent
+            self.findingsFailed += failed
+            self.requestsSent += requests
+
+        self.pendingRequests = pendingRequests
 
-        del findings
-
-        # Map in the new compliance controls
-        for finding in decodedFindings:
-            complianceRelatedRequirements = list(finding["Compliance"]["RelatedRequirements"])
-            newControls = []
-            nistCsfControls = [control for control in complianceRelatedRequirements if control.startswith("NIST CSF V1.1")]
-            for control in nistCsfControls:
-                crosswalkedControls = self.nist_csf_v_1_1_controls_crosswalk(control)
-                # Not every single NIST CSF Control maps across to other frameworks
-                if crosswalkedControls:
-                    for crosswalk in crosswalkedControls:
-                        if crosswalk not in newControls:
-                            newControls.append(crosswalk)
-                else:
-                    continue
-
-            complianceRelatedRequirements.extend(newControls)
+    def close(self):
+        self.collect_requests(wait=True)
+        self.executor.shutdown(wait=True)
+
+        if self.findingsSent == 0 and self.findingsFailed == 0:
+            logger.error("There are not any findings to send to Kinesis Data Firehose!")
+            return False
+
+        if self.findingsFailed > 0:
+            logger.warning(
+                "Failed to deliver %s OCSF Compliance Findings to Kinesis Data Firehose",
+                self.findingsFailed
+            )
+
+        logger.info(
+            "Wrote %s OCSF Compliance Findings to Kinesis Data Firehose in %s requests!",
+            self.findingsSent,
+            self.requestsSent
+        )
+        print("Finished write OCSF Compliance Findings to Kinesis Data Firehose.")
             
-            del finding["Compliance"]["RelatedRequirements"]
-            finding["Compliance"]["RelatedRequirements"] = complianceRelatedRequirements
+        return True
 
-        ocsfFindings = self.ocsf_compliance_finding_mapping(decodedFindings)
+    def abort(self):
+        # drop the queued PutRecordBatch requests, only the ones in flight finish
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.pendingRequests = []
 
-        del decodedFindings
+    def create_records(self, ocsfFindings: list) -> list:
+        """
+        Returns a list of (Data, event count) Firehose records. With `kinesis_firehose_events_per_record` above 1, up to
+        that many OCSF events are aggregated per record as newline delimited JSON, otherwise every record is one event
+        """
+        events = []
+        for ocsfFinding in ocsfFindings:
+            event = json.dumps(ocsfFinding).encode("utf-8")
+            if len(event) + 1 > FIREHOSE_MAX_RECORD_BYTES:
+                logger.warning(
+                    "OCSF Compliance Finding %s is larger than the Kinesis Data Firehose record limit, skipping it",
+                    ocsfFinding["finding_info"]["uid"]
+                )
+                self.findingsFailed += 1
+                continue
+            events.append(event)
+
+        if self.eventsPerRecord == 1:
+            return [(event, 1) for event in events]
 
-        firehose = self.firehose
+        return [
+            (b"\n".join(recordEvents) + b"\n", len(recordEvents))
+            for recordEvents in pack_batches(
+                events, self.eventsPerRecord, FIREHOSE_MAX_RECORD_BYTES, sizeOf=lambda event: len(event) + 1
+            )
+        ]
 
-        # TODO: Make this more performant, because woah dawg, this shit's stupid!
-        for i in range(0, len(ocsfFindings), 25):
-            encodedRecords = []
-            records = ocsfFindings[i : i + 25]
-            for record in records:
-                encodedRecords.append({"Data": json.dumps(record).encode("utf-8")})
-            del records
+    def put_record_batch(self, batch: list) -> tuple:
+        """
+        Sends a batch of records with PutRecordBatch. Only the records that failed (per `RequestResponses`), or the whole
+        batch if the request failed, are re-driven with jittered exponential backoff up to `kinesis_firehose_max_retries`
+        times. Returns a tuple of (findings sent, findings failed, requests)
+        """
+        sent = requests = 0
+        attempt = 0
 
+        while True:
             try:
-                response = firehose.put_record_batch(
+                response = self.firehose.put_record_batch(
                     DeliveryStreamName=self.deliveryStream,
-                    Records=encodedRecords
+                    Records=[{"Data": data} for data, _ in batch]
                 )
-                if response["FailedPutCount"] > 0:
-                    logger.warning(
-                        "Failed to deliver %s records",
-                        response["FailedPutCount"]
-                    )
+                requests += 1
+                # RequestResponses is in the same order as the Records
+                failedRecords = [
+                    record for record, result in zip(batch, response["RequestResponses"]) if "ErrorCode" in result
+                ]
+                errorMessage = None
+                if failedRecords:
+                    errorMessage = next(r["ErrorMessage"] for r in response["RequestResponses"] if "ErrorCode" in r)
             except ClientError as e:
+                failedRecords = batch
+                errorMessage = e.response["Error"]["Message"]
+
+            sent += sum(events for _, events in batch) - sum(events for _, events in failedRecords)
+
+            if not failedRecords:
+                return sent, 0, requests
+
+            if attempt >= self.maxRetries:
+                failed = sum(events for _, events in failedRecords)
                 logger.warning(
-                    "Error with sending batch to Firehose due to: %s",
-                    e.response["Error"]["Message"]
+                    "Failed to deliver %s records to Kinesis Data Firehose due to: %s",
+                    len(failedRecords),
+                    errorMessage
                 )
-                continue
+                return sent, failed, requests
 
-        print("Finished write OCSF Compliance Findings to Kinesis Data Firehose.")
-            
-        return True
+            attempt += 1
+            batch = failedRecords
+            sleep(uniform(0, min(0.1 * 2 ** attempt, 10)))
     
-    def nist_csf_v_1_1_controls_crosswalk(self, nistCsfSubcategory):
-        """
-        This function returns a list of additional control framework control IDs that mapped into a provided
-        NIST CSF V1.1 Subcategory (control)
-        """
-
-        # Not every single NIST CSF Control maps across to other frameworks
-        try:
-            return CONTROLS_CROSSWALK[nistCsfSubcategory]
-        except KeyError:
-            return []
-        
     def asff_to_ocsf_normalization(self, severityLabel: str, cloudProvider: str, complianceStatusLabel: str) -> AsffOcsfNormalizedMapping:
         """
         Normalizes the following ASFF Severity, Cloud Account Provider, and Compliance values into OCSF
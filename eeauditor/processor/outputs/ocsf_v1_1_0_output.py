@@ -19,12 +19,8 @@
 #under the License.
 
 import logging
-import sys
 from typing import NamedTuple
-from os import path
-from processor.outputs.output_base import ElectricEyeOutput
-import json
-from base64 import b64decode
+from processor.outputs.output_base import ElectricEyeOutput, JsonArrayStream
 from datetime import datetime
 
 logger = logging.getLogger("OCSF_V1.1.0_Output")
@@ -69,86 +65,47 @@ class AsffOcsfNormalizedMapping(NamedTuple):
     complianceStatusId: int
     complianceStatus: str
 
-here = path.abspath(path.dirname(__file__))
-with open(f"{here}/mapped_compliance_controls.json") as jsonfile:
-    CONTROLS_CROSSWALK = json.load(jsonfile)
 
 @ElectricEyeOutput
 class OcsfV110Output(object):
     __provider__ = "ocsf_v1_1_0"
+    __normalized__ = True
 
-    def write_findings(self, findings: list, output_file: str, **kwargs):
-        if len(findings) == 0:
-            logger.error("There are not any findings to write to file!")
-            sys.exit(0)
+    def open(self, output_file: str, **kwargs):
+        self.outputFile = output_file
+        # the file is only created once the first batch of findings arrives
+        self.jsonfile = None
+        self.jsonStream = None
 
-        logger.info(
-            "Writing %s OCSF Compliance Findings to JSON!",
-            len(findings)
-        )
+    def write_batch(self, findings: list):
+        if self.jsonStream is None:
+            # create output file based on inputs
+            jsonfile = f"{self.outputFile}_ocsf_v1-1-0_compliance_findings.json"
+            logger.info(f"Output file named: {jsonfile}")
+            self.jsonfile = open(jsonfile, "w")
+            self.jsonStream = JsonArrayStream(self.jsonfile, default=str)
 
-        decodedFindings = [
-            {**d, "ProductFields": {**d["ProductFields"],
-                "AssetDetails": json.loads(b64decode(d["ProductFields"]["AssetDetails"]).decode("utf-8"))
-                    if d["ProductFields"]["AssetDetails"] is not None
-                    else None
-            }} if "AssetDetails" in d["ProductFields"]
-            else d
-            for d in findings
-        ]
+        # Findings arrive normalized, with `AssetDetails` decoded and the NIST CSF crosswalk mapped in, by processor.main
 
-        del findings
+        ocsfFindings = self.ocsf_compliance_finding_mapping(findings)
 
-        # Map in the new compliance controls
-        for finding in decodedFindings:
-            complianceRelatedRequirements = list(finding["Compliance"]["RelatedRequirements"])
-            newControls = []
-            nistCsfControls = [control for control in complianceRelatedRequirements if control.startswith("NIST CSF V1.1")]
-            for control in nistCsfControls:
-                crosswalkedControls = self.nist_csf_v_1_1_controls_crosswalk(control)
-                # Not every single NIST CSF Control maps across to other frameworks
-                if crosswalkedControls:
-                    for crosswalk in crosswalkedControls:
-                        if crosswalk not in newControls:
-                            newControls.append(crosswalk)
-                else:
-                    continue
+        for ocsfFinding in ocsfFindings:
+            self.jsonStream.write(ocsfFinding)
 
-            complianceRelatedRequirements.extend(newControls)
-            
-            del finding["Compliance"]["RelatedRequirements"]
-            finding["Compliance"]["RelatedRequirements"] = complianceRelatedRequirements
+    def close(self):
+        if self.jsonStream is None:
+            logger.error("There are not any findings to write to file!")
+            return False
 
-        ocsfFindings = self.ocsf_compliance_finding_mapping(decodedFindings)
+        self.jsonStream.close()
+        self.jsonfile.close()
+        logger.info(
+            "Wrote %s OCSF Compliance Findings to JSON!",
+            self.jsonStream.count
+        )
 
-        del decodedFindings
-        
-        # create output file based on inputs
-        jsonfile = f"{output_file}_ocsf_v1-1-0_compliance_findings.json"
-        logger.info(f"Output file named: {jsonfile}")
-        
-        with open(jsonfile, "w") as jsonfile:
-            json.dump(
-                ocsfFindings,
-                jsonfile,
-                indent=4,
-                default=str
-            )
-            
         return True
     
-    def nist_csf_v_1_1_controls_crosswalk(self, nistCsfSubcategory):
-        """
-        This function returns a list of additional control framework control IDs that mapped into a provided
-        NIST CSF V1.1 Subcategory (control)
-        """
-
-        # Not every single NIST CSF Control maps across to other frameworks
-        try:
-            return CONTROLS_CROSSWALK[nistCsfSubcategory]
-        except KeyError:
-            return []
-        
     def asff_to_ocsf_normalization(self, severityLabel: str, cloudProvider: str, complianceStatusLabel: str) -> AsffOcsfNormalizedMapping:
         """
         Normalizes the following ASFF Severity, Cloud Account Provider, and Compliance values into OCSF
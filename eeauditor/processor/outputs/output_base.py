@@ -18,12 +18,39 @@
 #specific language governing permissions and limitations
 #under the License.
 
+import json
+from textwrap import indent
+
+# orjson is an optional, much faster, JSON encoder for the streaming stdout outputs, the standard library is used without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson natively formats datetimes and dataclasses differently than `default` (e.g., str) would, pass them to it instead
+if orjson is not None:
+    NDJSON_ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+# Every output provider must implement the streaming contract: `open(**kwargs)` is called once before any findings are
+# available, `write_batch(findings)` is called with bounded batches of findings and `close()` is called once at the end.
+# When the run fails part way the optional `abort()` is called instead of `close()` to release threads, connections and
+# files without delivering anything else, providers without it are closed as usual. Providers that can drop findings
+# (e.g., rejected by an API after every retry) count them in `findingsFailed` so that the run knows it was incomplete
+STREAMING_OUTPUT_METHODS = ("open", "write_batch", "close")
+
 class ElectricEyeOutput(object):
     """Class to be used as a decorator to register all output providers"""
 
     _outputs = {}
 
     def __new__(cls, output):
+        missing = [m for m in STREAMING_OUTPUT_METHODS if not callable(getattr(output, m, None))]
+        if missing:
+            raise TypeError(
+                f"Output provider {output.__provider__} does not implement {missing}, subclass BufferedOutput to receive all findings at once"
+            )
         ElectricEyeOutput._outputs[output.__provider__] = output
         return output
 
@@ -39,4 +66,115 @@ class ElectricEyeOutput(object):
     @classmethod
     def get_all_providers(cls):
         """Return a list of all the possible output providers"""
-        return [*cls._outputs]
\ No newline at end of file
+        return [*cls._outputs]
+
+class BufferedOutput(object):
+    """
+    Mixin for output providers that need every finding of a run at once (e.g., HTML reports and CAM aggregates). Batches
+    are buffered in memory and handed to the provider's `write_findings()` when the stream is closed
+    """
+
+    def open(self, **kwargs):
+        self.bufferedFindings = []
+        self.outputKwargs = kwargs
+
+    def write_batch(self, findings: list):
+        self.bufferedFindings.extend(findings)
+
+    def close(self):
+        findings = self.bufferedFindings
+        self.bufferedFindings = None
+
+        return self.write_findings(findings=findings, **self.outputKwargs)
+
+    def abort(self):
+        # nothing was written yet, a partial report is never produced
+        self.bufferedFindings = None
+
+class JsonArrayStream(object):
+    """
+    Writes a JSON array to a file-like object one element at a time, the output is identical to `json.dump()` of the
+    whole list with `indent=4`
+    """
+
+    def __init__(self, fileObject, default=None):
+        self.fileObject = fileObject
+        self.default = default
+        self.count = 0
+
+    def write(self, item):
+        self.fileObject.write(",\n" if self.count else "[\n")
+        self.fileObject.write(indent(json.dumps(item, indent=4, default=self.default), "    "))
+        self.count += 1
+
+    def close(self):
+        self.fileObject.write("\n]" if self.count else "[]")
+
+class NdjsonStream(object):
+    """
+    Writes newline delimited JSON (one compact JSON object per line) to a file-like object, skipping items whose `key` was
+    already written. Lines are encoded with orjson when it is installed and buffered into writes of about `bufferSize` bytes.
+    Both encoders write the same bytes: compact separators, raw UTF-8 and datetimes passed to `default` (NaN and Infinity,
+    which are not valid JSON, are the exception)
+    """
+
+    def __init__(self, fileObject, default=None, bufferSize=1_048_576):
+        self.fileObject = fileObject
+        self.default = default
+        self.bufferSize = bufferSize
+        self.count = 0
+        self.duplicates = 0
+        self.seenKeys = set()
+        self.lines = []
+        self.bufferedBytes = 0
+
+    def encode(self, item) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(item, default=self.default, option=NDJSON_ORJSON_OPTIONS)
+            # e.g., integers wider than 64 bits or lone surrogates, which the standard library can still encode
+            except TypeError:
+                pass
+
+        line = json.dumps(item, default=self.default, separators=(",", ":"), ensure_ascii=False) + "\n"
+        # lone surrogates cannot be encoded as UTF-8, they are written as JSON escapes instead
+        return line.encode("utf-8", "backslashreplace")
+
+    def write(self, item, key=None) -> bool:
+        """
+        Buffers `item` as a line of JSON, returns False (and writes nothing) when `key` is a duplicate
+        """
+        if key is not None:
+            if key in self.seenKeys:
+                self.duplicates += 1
+                return False
+            self.seenKeys.add(key)
+
+        line = self.encode(item)
+        self.lines.append(line)
+        self.bufferedBytes += len(line)
+        self.count += 1
+        if self.bufferedBytes >= self.bufferSize:
+            self.flush()
+
+        return True
+
+    def flush(self):
+        if not self.lines:
+            return
+
+        chunk = b"".join(self.lines)
+        self.lines = []
+        self.bufferedBytes = 0
+        # Write the bytes as-is to the binary layer of text streams such as sys.stdout, after anything already printed
+        binaryBuffer = getattr(self.fileObject, "buffer", None)
+        if binaryBuffer is not None:
+            self.fileObject.flush()
+            binaryBuffer.write(chunk)
+            binaryBuffer.flush()
+        else:
+            self.fileObject.write(chunk.decode("utf-8"))
+
+    def close(self):
+        self.flush()
+        self.seenKeys = None
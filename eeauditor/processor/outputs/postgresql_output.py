@@ -19,7 +19,6 @@
 #under the License.
 
 import boto3
-from os import path
 import tomli
 import sys
 import os
@@ -27,21 +26,27 @@ import json
 import psycopg2 as psql
 from botocore.exceptions import ClientError
 from processor.outputs.output_base import ElectricEyeOutput
+from processor.postgresql_bulk import bulk_upsert, get_postgresql_batch_size
 
 # Boto3 Clients
 ssm = boto3.client("ssm")
 asm = boto3.client("secretsmanager")
 
-here = path.abspath(path.dirname(__file__))
-with open(f"{here}/mapped_compliance_controls.json") as jsonfile:
-    CONTROLS_CROSSWALK = json.load(jsonfile)
-
 # These Constants define legitimate values for certain parameters within the external_providers.toml file
 CREDENTIALS_LOCATION_CHOICES = ["AWS_SSM", "AWS_SECRETS_MANAGER", "CONFIG_FILE"]
 
+# Columns of the findings table in upsert order, "id" (the ASFF Finding ID) is the PRIMARY KEY
+FINDINGS_TABLE_COLUMNS = [
+    "id", "product_arn", "types", "first_observed_at", "created_at", "updated_at", "severity_label", "title", "description",
+    "remediation_recommendation_text", "remediation_recommendation_url", "product_name", "provider", "provider_type",
+    "provider_account_id", "asset_region", "asset_class", "asset_service", "asset_component", "resource_id", "resource",
+    "compliance_status", "compliance_related_requirements", "workflow_status", "record_state"
+]
+
 @ElectricEyeOutput
 class PostgresProvider(object):
     __provider__ = "postgresql"
+    __normalized__ = True
 
     def __init__(self):
         print("Preparing PostgreSQL credentials.")
@@ -101,15 +106,18 @@ class PostgresProvider(object):
         self.endpoint = endpoint
         self.port = port
         self.password = password
+        self.batchSize = get_postgresql_batch_size(postgresqlDetails)
 
-    def write_findings(self, findings: list, **kwargs):
-        processedFindings = self.processing_findings_for_upsert(findings)
-        if len(processedFindings) == 0:
-            print("There are not any findings to write!")
-            exit(0)
-
-        del findings
+    def open(self, **kwargs):
+        # the connection is only established once the first batch of findings arrives
+        self.engine = None
+        self.pendingFindings = []
+        self.findingsWritten = 0
 
+    def connect(self):
+        """
+        Connects to PostgreSQL and creates the findings table if it does not exist yet
+        """
         try:
             engine = psql.connect(
                 user=self.userName,
@@ -155,89 +163,103 @@ class PostgresProvider(object):
                 )
             """)
 
-            print(f"Attempting to write {len(processedFindings)} findings to PostgreSQL.")
-            for f in processedFindings:
-                # The Finding ID is our primary key, on conflicts we will overwrite every single value for the specific ID except
-                # for ASFF FirstObservedAt (first_observed_at) and ASFF CreatedAt (created_at) every other value will be preserved
-                cursor.execute(f"""
-                    INSERT INTO {self.tableName} (id, product_arn, types, first_observed_at, created_at, updated_at, severity_label, title, description, remediation_recommendation_text, remediation_recommendation_url, product_name, provider, provider_type, provider_account_id, asset_region, asset_class, asset_service, asset_component, resource_id, resource, compliance_status, compliance_related_requirements, workflow_status, record_state)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (id) DO UPDATE
-                        SET product_arn = excluded.product_arn,
-                            types = excluded.types,
-                            updated_at = excluded.updated_at,
-                            severity_label = excluded.severity_label,
-                            title = excluded.title,
-                            description = excluded.description,
-                            remediation_recommendation_text = excluded.remediation_recommendation_text,
-                            remediation_recommendation_url = excluded.remediation_recommendation_url,
-                            product_name = excluded.product_name,
-                            provider = excluded.provider,
-                            provider_type = excluded.provider_type,
-                            provider_account_id = excluded.provider_account_id,
-                            asset_region = excluded.asset_region,
-                            asset_class = excluded.asset_class,
-                            asset_service = excluded.asset_service,
-                            asset_component = excluded.asset_component,
-                            resource_id = excluded.resource_id,
-                            resource = excluded.resource,
-                            compliance_status = excluded.compliance_status,
-                            compliance_related_requirements = excluded.compliance_related_requirements,
-                            workflow_status = excluded.workflow_status,
-                            record_state = excluded.record_state,
-                            first_observed_at = CASE
-                                                    WHEN {self.tableName}.first_observed_at < excluded.first_observed_at THEN {self.tableName}.first_observed_at
-                                                    ELSE excluded.first_observed_at
-                                                END,
-                            created_at = CASE
-                                                WHEN {self.tableName}.created_at < excluded.created_at THEN {self.tableName}.created_at
-                                                ELSE excluded.created_at
-                                            END;
-                    """,
-                    (
-                        f["Id"],
-                        f["ProductArn"],
-                        f["Types"],
-                        f["FirstObservedAt"],
-                        f["CreatedAt"],
-                        f["UpdatedAt"],
-                        f["SeverityLabel"],
-                        f["Title"],
-                        f["Description"],
-                        f["RemedationRecommendationText"],
-                        f["RemediationRecommendationUrl"],
-                        f["ProductName"],
-                        f["Provider"],
-                        f["ProviderType"],
-                        f["ProviderAccountId"],
-                        f["AssetRegion"],
-                        f["AssetClass"],
-                        f["AssetService"],
-                        f["AssetComponent"],
-                        f["ResourceId"],
-                        json.dumps(f["Resource"]),
-                        f["ComplianceStatus"],
-                        f["ComplianceRelatedRequirements"],
-                        f["WorkflowStatus"],
-                        f["RecordState"]
-                    )
-                )
-
-            # commit the changes
             engine.commit()
-            # close communication with the postgres server (rds)
             cursor.close()
-            
-            print("Completed writing all findings to PostgreSQL.")
+        except psql.OperationalError as oe:
+            print("Cannot connect to your PostgreSQL database. Review your network configuraions and database parameters and try again.")
+            raise oe
+        except Exception as e:
+            raise e
+
+        return engine
+
+    def write_batch(self, findings: list):
+        self.pendingFindings.extend(self.processing_findings_for_upsert(findings))
 
+        del findings
+
+        while len(self.pendingFindings) >= self.batchSize:
+            self.flush(self.pendingFindings[:self.batchSize])
+            del self.pendingFindings[:self.batchSize]
+
+    def flush(self, processedFindings):
+        """
+        Bulk upserts a batch of parsed findings. The Finding ID is our primary key, on conflicts we will overwrite every single
+        value for the specific ID except for ASFF FirstObservedAt (first_observed_at) and ASFF CreatedAt (created_at) where the
+        earliest value is preserved
+        """
+        if self.engine is None:
+            self.engine = self.connect()
+
+        print(f"Attempting to write {len(processedFindings)} findings to PostgreSQL.")
+
+        rows = [
+            (
+                f["Id"],
+                f["ProductArn"],
+                f["Types"],
+                f["FirstObservedAt"],
+                f["CreatedAt"],
+                f["UpdatedAt"],
+                f["SeverityLabel"],
+                f["Title"],
+                f["Description"],
+                f["RemedationRecommendationText"],
+                f["RemediationRecommendationUrl"],
+                f["ProductName"],
+                f["Provider"],
+                f["ProviderType"],
+                f["ProviderAccountId"],
+                f["AssetRegion"],
+                f["AssetClass"],
+                f["AssetService"],
+                f["AssetComponent"],
+                f["ResourceId"],
+                json.dumps(f["Resource"]),
+                f["ComplianceStatus"],
+                f["ComplianceRelatedRequirements"],
+                f["WorkflowStatus"],
+                f["RecordState"]
+            ) for f in processedFindings
+        ]
+
+        try:
+            self.findingsWritten += bulk_upsert(
+                self.engine,
+                self.tableName,
+                FINDINGS_TABLE_COLUMNS,
+                rows,
+                earliestColumns=("first_observed_at", "created_at"),
+                pageSize=self.batchSize
+            )
         except psql.OperationalError as oe:
             print("Cannot connect to your PostgreSQL database. Review your network configuraions and database parameters and try again.")
             raise oe
         except Exception as e:
             raise e
-        
+
+    def close(self):
+        if self.pendingFindings:
+            self.flush(self.pendingFindings)
+            self.pendingFindings = []
+
+        if self.engine is None:
+            print("There are not any findings to write!")
+            return False
+
+        # close communication with the postgres server (rds)
+        self.engine.close()
+
+        print(f"Completed writing all {self.findingsWritten} findings to PostgreSQL.")
+
         return True
 
+    def abort(self):
+        # pending findings are dropped, the connection is closed without committing anything else
+        self.pendingFindings = []
+        if self.engine is not None:
+            self.engine.close()
+
     def get_credential_from_aws_ssm(self, value, configurationName):
         """
         Retrieves a TOML variable from AWS Systems Manager Parameter Store and returns it
@@ -292,21 +314,6 @@ class PostgresProvider(object):
         processedFindings = []
 
         for finding in findings:
-            complianceRelatedRequirements = finding["Compliance"]["RelatedRequirements"]
-            newControls = []
-            nistCsfControls = [control for control in complianceRelatedRequirements if control.startswith("NIST CSF V1.1")]
-            for control in nistCsfControls:
-                crosswalkedControls = self.nist_csf_v_1_1_controls_crosswalk(control)
-                # Not every single NIST CSF Control maps across to other frameworks
-                if crosswalkedControls:
-                    for crosswalk in crosswalkedControls:
-                        if crosswalk not in newControls:
-                            newControls.append(crosswalk)
-                else:
-                    continue
-
-            complianceRelatedRequirements.extend(newControls)
-
             try:
                 processedFindings.append(
                     {
@@ -332,7 +339,7 @@ class PostgresProvider(object):
                         "ResourceId": finding["Resources"][0]["Id"],
                         "Resource": finding["Resources"][0],
                         "ComplianceStatus": finding["Compliance"]["Status"],
-                        "ComplianceRelatedRequirements": complianceRelatedRequirements,
+                        "ComplianceRelatedRequirements": finding["Compliance"]["RelatedRequirements"],
                         "WorkflowStatus": finding["Workflow"]["Status"],
                         "RecordState": finding["RecordState"]
                     }
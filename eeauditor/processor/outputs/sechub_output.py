@@ -19,34 +19,132 @@
 #under the License.
 
 import boto3
+import json
+from concurrent.futures import ThreadPoolExecutor
+from random import uniform
+from time import perf_counter, sleep
+from botocore.exceptions import ClientError
 from processor.outputs.output_base import ElectricEyeOutput
+from processor.aws_batching import RateLimiter, pack_batches
+
+# BatchImportFindings accepts up to 100 findings and 6 MB per request, and a single finding can be up to 240 KB
+SECHUB_MAX_BATCH_FINDINGS = 100
+SECHUB_MAX_BATCH_BYTES = 6_000_000
+SECHUB_MAX_FINDING_BYTES = 240 * 1024
+# BatchImportFindings is throttled at 10 requests per second (with bursts of 30) per account and Region
+SECHUB_REQUESTS_PER_SECOND = 10
+SECHUB_REQUEST_BURST = 30
+SECHUB_MAX_WORKERS = 4
+SECHUB_MAX_RETRIES = 3
+# Security Hub's upper-limit for string values (e.g., the Description) is 1024 characters
+MAX_DESCRIPTION_LENGTH = 1018
 
 @ElectricEyeOutput
 class SecHubProvider(object):
     __provider__ = "sechub"
 
-    def write_findings(self, findings: list, **kwargs):
-        print(f"Writing {len(findings)} results to AWS Security Hub")
-        if findings:
-            sechub = boto3.client("securityhub")
-
-            # Use a list comprehension to flatten the Description if the length exceeds Security Hub's upper-limit of 1024
-            maxDescriptionLength = 1018
-            modifiedDescriptionFindings = [
-                {k: (v[:maxDescriptionLength] + '...' if isinstance(v, str) and len(v) > maxDescriptionLength else v) for k, v in d.items()} for d in findings
-            ]
-            # Use another list comprehension to remove `ProductFields.AssetDetails` from non-Asset reporting outputs
-            newFindings = [
-                {**d, "ProductFields": {k: v for k, v in d["ProductFields"].items() if k != "AssetDetails"}} for d in modifiedDescriptionFindings
-            ]
-
-            del findings
-            del modifiedDescriptionFindings
-
-            # Security Hub supports batches of up to 100 findings for the "BIF" API
-            for i in range(0, len(newFindings), 100):
-                sechub.batch_import_findings(
-                    Findings=newFindings[i : i + 100]
-                )
-        
-        return True
\ No newline at end of file
+    def open(self, **kwargs):
+        self.sechub = None
+        self.executor = None
+        self.findingsWritten = 0
+        self.findingsFailed = 0
+        self.requestsSent = 0
+        self.findingsRetried = 0
+        self.startTime = perf_counter()
+
+    def write_batch(self, findings: list):
+        if self.sechub is None:
+            print("Writing results to AWS Security Hub")
+            self.sechub = boto3.client("securityhub")
+            # boto3 clients are thread safe, every uploader shares the same one and the same request quota
+            self.rateLimiter = RateLimiter(SECHUB_REQUESTS_PER_SECOND, SECHUB_REQUEST_BURST)
+            self.executor = ThreadPoolExecutor(max_workers=SECHUB_MAX_WORKERS, thread_name_prefix="ElectricEyeSecHub")
+
+        entries = []
+        for finding in findings:
+            asffFinding = self.prepare_finding(finding)
+            size = len(json.dumps(asffFinding, default=str))
+            if size > SECHUB_MAX_FINDING_BYTES:
+                print(f"Finding {finding['Id']} is larger than the Security Hub limit of 240 KB, skipping it.")
+                self.findingsFailed += 1
+                continue
+            entries.append((asffFinding, size))
+
+        # Pack the findings by both count and payload size and upload the batches concurrently
+        batches = pack_batches(entries, SECHUB_MAX_BATCH_FINDINGS, SECHUB_MAX_BATCH_BYTES, sizeOf=lambda entry: entry[1] + 1)
+        for written, failed, requests, retried in self.executor.map(self.batch_import_findings, batches):
+            self.findingsWritten += written
+            self.findingsFailed += failed
+            self.requestsSent += requests
+            self.findingsRetried += retried
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+        elapsed = perf_counter() - self.startTime
+        print(f"Wrote {self.findingsWritten} results to AWS Security Hub")
+        print(
+            f"Security Hub upload metrics: {self.requestsSent} BatchImportFindings requests, {self.findingsRetried} retried "
+            f"and {self.findingsFailed} failed findings, {self.findingsWritten / elapsed if elapsed else 0:.1f} findings per second."
+        )
+
+        return True
+
+    def abort(self):
+        # drop the queued BatchImportFindings requests, only the ones in flight finish
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def prepare_finding(self, finding: dict) -> dict:
+        """
+        Returns a copy of an ASFF finding that Security Hub accepts: string values longer than its 1024 character limit
+        are truncated and `ProductFields.AssetDetails` is removed as Security Hub *cannot* support complex types within
+        `ProductFields`
+        """
+        asffFinding = {
+            k: (v[:MAX_DESCRIPTION_LENGTH] + "..." if isinstance(v, str) and len(v) > MAX_DESCRIPTION_LENGTH else v)
+            for k, v in finding.items()
+        }
+        asffFinding["ProductFields"] = {k: v for k, v in finding["ProductFields"].items() if k != "AssetDetails"}
+
+        return asffFinding
+
+    def batch_import_findings(self, batch: list) -> tuple:
+        """
+        Uploads a batch of findings with BatchImportFindings under the shared request quota. Only the `FailedFindings`
+        (or the whole batch if the request failed) are retried with jittered backoff. Returns a tuple of (written, failed,
+        requests, retried)
+        """
+        findings = [finding for finding, _ in batch]
+        written = requests = retried = 0
+        attempt = 0
+
+        while True:
+            self.rateLimiter.acquire()
+            try:
+                response = self.sechub.batch_import_findings(Findings=findings)
+                requests += 1
+                failedIds = {f["Id"] for f in response.get("FailedFindings", [])}
+                failedFindings = [finding for finding in findings if finding["Id"] in failedIds]
+                errorMessage = None
+                if failedFindings:
+                    failure = response["FailedFindings"][0]
+                    errorMessage = f"{failure.get('ErrorCode')} - {failure.get('ErrorMessage')}"
+            except ClientError as ce:
+                failedFindings = findings
+                errorMessage = ce
+
+            written += len(findings) - len(failedFindings)
+
+            if not failedFindings:
+                return written, 0, requests, retried
+
+            if attempt >= SECHUB_MAX_RETRIES:
+                print(f"Failed to import {len(failedFindings)} findings into AWS Security Hub due to: {errorMessage}")
+                return written, len(failedFindings), requests, retried
+
+            attempt += 1
+            retried += len(failedFindings)
+            findings = failedFindings
+            sleep(uniform(0, min(0.5 * 2 ** attempt, 10)))
@@ -19,16 +19,14 @@
 #under the License.
 
 import boto3
-from os import path
 import tomli
 import os
 import sys
 import datetime
 import json
-import requests
-from time import sleep
 from botocore.exceptions import ClientError
-from processor.outputs.output_base import ElectricEyeOutput
+from processor.outputs.output_base import ElectricEyeOutput, BufferedOutput
+from processor.http_delivery import HttpDeliveryEngine
 
 # Boto3 Clients
 ssm = boto3.client("ssm")
@@ -37,12 +35,13 @@ asm = boto3.client("secretsmanager")
 # These Constants define legitimate values for certain parameters within the external_providers.toml file
 CREDENTIALS_LOCATION_CHOICES = ["AWS_SSM", "AWS_SECRETS_MANAGER", "CONFIG_FILE"]
 
-here = path.abspath(path.dirname(__file__))
-with open(f"{here}/mapped_compliance_controls.json") as jsonfile:
-    CONTROLS_CROSSWALK = json.load(jsonfile)
+SLACK_POST_MESSAGE_URL = "https://slack.com/api/chat.postMessage"
+# chat.postMessage allows about one message per second per channel, with short bursts
+SLACK_REQUESTS_PER_SECOND = 1
+SLACK_REQUEST_BURST = 3
 
 @ElectricEyeOutput
-class SlackProvider(object):
+class SlackProvider(BufferedOutput):
     __provider__ = "slack"
 
     def __init__(self):
@@ -114,44 +113,45 @@ class SlackProvider(object):
         if self.messageType == "Findings":
             processedBlocks = self.create_findings_blocks_payload(findings)
             del findings
-
-            # Send the findings to Slack
-            for blocks in processedBlocks:
-                # Token & Channel must be with "blocks" in the POST Args
-                slackPayload = {
-                    'token': self.slackBotToken,
-                    'channel': self.channelId,
-                    'blocks': json.dumps(blocks)
-                }
-                # Send request and backoff if throttled
-                r = requests.post('https://slack.com/api/chat.postMessage', slackPayload)
-                if r.status_code == 429:
-                    retry = r.headers["retry-after"]
-                    print(f"Slack Bot is being throttled, retrying in {retry} second(s).")
-
-                    backoff = int(retry) + 0.25
-                    sleep(backoff)
-            
-            print(f"Finished sending Findings to Slack!")
-
         elif self.messageType == "Summary":
-            summaryBlock = self.create_summary_blocks_payload(findings)
+            processedBlocks = [self.create_summary_blocks_payload(findings)]
             del findings
-
-            # Token & Channel must be with "blocks" in the POST Args
-            slackPayload = {
-                'token': self.slackBotToken,
-                'channel': self.channelId,
-                'blocks': json.dumps(summaryBlock)
-            }
-            # Send request and backoff if throttled
-            r = requests.post('https://slack.com/api/chat.postMessage', slackPayload)
-
-            print(f"Finished sending Summary to Slack!")
         else:
             print(f"Unsupported value for [outputs.slack][electric_eye_slack_message_type]")
             sys.exit(2)
 
+        # Token & Channel must be with "blocks" in the POST Args, throttled messages are sent again after the
+        # `Retry-After` that Slack asks for. A single sender keeps the messages in order within the channel
+        engine = HttpDeliveryEngine(SLACK_REQUESTS_PER_SECOND, burst=SLACK_REQUEST_BURST, maxWorkers=1)
+        try:
+            responses = engine.send_all(
+                [
+                    {
+                        "method": "POST",
+                        "url": SLACK_POST_MESSAGE_URL,
+                        "data": {
+                            "token": self.slackBotToken,
+                            "channel": self.channelId,
+                            "blocks": json.dumps(blocks)
+                        }
+                    } for blocks in processedBlocks
+                ]
+            )
+        finally:
+            engine.close()
+
+        failed = 0
+        for r in responses:
+            if r is None or not r.ok:
+                failed += 1
+            elif not r.json().get("ok", False):
+                print(f"Slack did not accept a message due to: {r.json().get('error')}")
+                failed += 1
+        if failed > 0:
+            print(f"Failed to send {failed} of {len(responses)} messages to Slack.")
+
+        print(f"Finished sending {self.messageType} to Slack!")
+
     def get_credential_from_aws_ssm(self, value, configurationName):
         """
         Retrieves a TOML variable from AWS Systems Manager Parameter Store and returns it
@@ -406,21 +406,6 @@ class SlackProvider(object):
             #severity = finding["Severity"]["Label"]
             #findingState = finding["RecordState"]
             relatedControls = ""
-            complianceRelatedRequirements = list(finding["Compliance"]["RelatedRequirements"])
-            newControls = []
-            nistCsfControls = [control for control in complianceRelatedRequirements if str(control).startswith("NIST CSF V1.1")]
-            for control in nistCsfControls:
-                crosswalkedControls = self.nist_csf_v_1_1_controls_crosswalk(control)
-                # Not every single NIST CSF Control maps across to other frameworks
-                if crosswalkedControls:
-                    for crosswalk in crosswalkedControls:
-                        if crosswalk not in newControls:
-                            newControls.append(crosswalk)
-                else:
-                    continue
-
-            complianceRelatedRequirements.extend(newControls)
-            
             for control in finding["Compliance"]["RelatedRequirements"]:
                 relatedControls += f"`{control}` \n "
 
@@ -537,16 +522,4 @@ class SlackProvider(object):
 
         return aBlockyListOfSlackBlocks
 
-    def nist_csf_v_1_1_controls_crosswalk(self, nistCsfSubcategory):
-        """
-        This function returns a list of additional control framework control IDs that mapped into a provided
-        NIST CSF V1.1 Subcategory (control)
-        """
-
-        # Not every single NIST CSF Control maps across to other frameworks
-        try:
-            return CONTROLS_CROSSWALK[nistCsfSubcategory]
-        except KeyError:
-            return []
-
 ## EOF
\ No newline at end of file
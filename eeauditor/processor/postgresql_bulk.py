@@ -0,0 +1,89 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import sys
+from psycopg2.extras import execute_values
+
+# Number of rows loaded and merged per transaction unless overridden by [outputs.postgresql.postgresql_batch_size]
+DEFAULT_POSTGRESQL_BATCH_SIZE = 1000
+
+def get_postgresql_batch_size(postgresqlDetails: dict) -> int:
+    """
+    Returns the optional `postgresql_batch_size` from the [outputs.postgresql] section of the TOML file
+    """
+    batchSize = postgresqlDetails.get("postgresql_batch_size", DEFAULT_POSTGRESQL_BATCH_SIZE)
+    if isinstance(batchSize, bool) or not isinstance(batchSize, int) or batchSize < 1:
+        print("Invalid value for '[outputs.postgresql.postgresql_batch_size]'. Must be a positive integer.")
+        sys.exit(2)
+
+    return batchSize
+
+def bulk_upsert(engine, tableName: str, columns: list, rows: list, earliestColumns=(), pageSize=DEFAULT_POSTGRESQL_BATCH_SIZE):
+    """
+    Upserts `rows` (tuples ordered like `columns`, the first column being the PRIMARY KEY) into `tableName` in a single
+    transaction. Rows are loaded into a temporary staging table with `execute_values` pages and merged with one set-based
+    INSERT ... SELECT ... ON CONFLICT statement. Every column is overwritten on conflict except `earliestColumns` which keep
+    the earliest value, duplicate keys within `rows` resolve to the last row in the same way as sequential upserts would
+    """
+    if not rows:
+        return 0
+
+    primaryKey = columns[0]
+    stagingTable = f"{tableName}_staging"
+    columnList = ", ".join(columns)
+
+    selectList = ", ".join(
+        f"MIN({column}) OVER (PARTITION BY {primaryKey})" if column in earliestColumns else column
+        for column in columns
+    )
+    updateList = ",\n                    ".join(
+        f"{column} = CASE WHEN {tableName}.{column} < excluded.{column} THEN {tableName}.{column} ELSE excluded.{column} END"
+        if column in earliestColumns else f"{column} = excluded.{column}"
+        for column in columns[1:]
+    )
+
+    cursor = engine.cursor()
+    try:
+        # the staging table only lives for this session and is emptied on every commit
+        cursor.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {stagingTable} (LIKE {tableName}, staging_seq INTEGER) ON COMMIT DELETE ROWS
+        """)
+        execute_values(
+            cursor,
+            f"INSERT INTO {stagingTable} ({columnList}, staging_seq) VALUES %s",
+            [(*row, seq) for seq, row in enumerate(rows)],
+            page_size=pageSize
+        )
+        cursor.execute(f"""
+            INSERT INTO {tableName} ({columnList})
+            SELECT DISTINCT ON ({primaryKey}) {selectList}
+            FROM {stagingTable}
+            ORDER BY {primaryKey}, staging_seq DESC
+            ON CONFLICT ({primaryKey}) DO UPDATE
+                SET {updateList}
+        """)
+        engine.commit()
+    except Exception as e:
+        engine.rollback()
+        raise e
+    finally:
+        cursor.close()
+
+    return len(rows)
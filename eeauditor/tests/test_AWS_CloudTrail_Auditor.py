@@ -0,0 +1,84 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+from . import context
+from auditors.aws.AWS_CloudTrail_Auditor import evaluate_trail_metric_filter_alarm, normalize_filter_pattern
+
+ROOT_USAGE_PATTERN = '{ $.userIdentity.type = "Root" && $.userIdentity.invokedBy NOT EXISTS && $.eventType != "AwsServiceEvent" }'
+TRAIL = {
+    "Name": "org-trail",
+    "CloudWatchLogsLogGroupArn": "arn:aws:logs:us-east-1:012345678901:log-group:org-trail-logs:*"
+}
+
+class FakePaginator(object):
+    def __init__(self, pages):
+        self.pages = pages
+
+    def paginate(self, **kwargs):
+        return iter(self.pages)
+
+class FakeSession(object):
+    def __init__(self, metricFilters, metricAlarms):
+        self.pages = {
+            "describe_metric_filters": [{"metricFilters": metricFilters}],
+            "describe_alarms": [{"MetricAlarms": metricAlarms}]
+        }
+
+    def client(self, service, **kwargs):
+        return self
+
+    def get_paginator(self, operation):
+        return FakePaginator(self.pages[operation])
+
+def metric_filter(filterPattern, metricName="RootUsage"):
+    return {
+        "logGroupName": "org-trail-logs",
+        "filterPattern": filterPattern,
+        "metricTransformations": [{"metricName": metricName, "metricNamespace": "CISBenchmark"}]
+    }
+
+def test_equivalent_filter_patterns_are_normalized():
+    assert normalize_filter_pattern(ROOT_USAGE_PATTERN) == normalize_filter_pattern(
+        '{($.eventType!="AwsServiceEvent")&&($.userIdentity.type=Root)&&($.userIdentity.invokedBy not exists)}'
+    )
+    # && binds tighter than ||, so these are different patterns
+    assert normalize_filter_pattern("{ ($.a = 1) || ($.b = 2) && ($.c = 3) }") != normalize_filter_pattern(
+        "{ (($.a = 1) || ($.b = 2)) && ($.c = 3) }"
+    )
+    # anything that is not a JSON filter pattern only has its whitespace collapsed
+    assert normalize_filter_pattern("[ip,  user, ...]") == "[ip, user, ...]"
+    assert normalize_filter_pattern("{ ($.a = 1 }") == "{ ($.a = 1 }"
+
+def test_metric_filter_needs_an_alarm():
+    session = FakeSession(
+        [metric_filter('{ ($.userIdentity.type = Root) && ($.userIdentity.invokedBy NOT EXISTS) && ($.eventType != AwsServiceEvent) }')],
+        [{"AlarmName": "root", "MetricName": "RootUsage", "Namespace": "CISBenchmark"}]
+    )
+    assert evaluate_trail_metric_filter_alarm({}, session, TRAIL, "012345678901", "us-east-1", [ROOT_USAGE_PATTERN]) is True
+
+    session = FakeSession([metric_filter(ROOT_USAGE_PATTERN)], [])
+    assert evaluate_trail_metric_filter_alarm({}, session, TRAIL, "012345678901", "us-east-1", [ROOT_USAGE_PATTERN]) is False
+
+def test_trails_without_assessable_log_groups():
+    session = FakeSession([], [])
+    assert evaluate_trail_metric_filter_alarm({}, session, {"Name": "no-logs"}, "012345678901", "us-east-1", [ROOT_USAGE_PATTERN]) is False
+    # Log Groups in another Region or Account cannot be assessed
+    assert evaluate_trail_metric_filter_alarm({}, session, TRAIL, "012345678901", "eu-west-1", [ROOT_USAGE_PATTERN]) is True
+    assert evaluate_trail_metric_filter_alarm({}, session, TRAIL, "210987654321", "us-east-1", [ROOT_USAGE_PATTERN]) is True
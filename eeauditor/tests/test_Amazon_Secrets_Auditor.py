@@ -0,0 +1,64 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import json
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from . import context
+from auditors.aws import Amazon_Secrets_Auditor
+from auditors.aws.Amazon_Secrets_Auditor import scan_for_secrets
+
+def test_concurrent_scans_use_their_own_files(monkeypatch):
+    scannedFiles = []
+
+    def fake_detect_secrets(command, **kwargs):
+        # stands in for detect-secrets, reports the scanned values back as the "results"
+        scanFile = command[-1]
+        scannedFiles.append(scanFile)
+        with open(scanFile) as f:
+            results = json.load(f)
+        return subprocess.CompletedProcess(command, 0, stdout=json.dumps({"results": results}), stderr="")
+
+    monkeypatch.setattr(Amazon_Secrets_Auditor.subprocess, "run", fake_detect_secrets)
+
+    values = [[{"name": "KEY", "value": str(i)}] for i in range(32)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        scans = list(pool.map(scan_for_secrets, values))
+
+    assert [scan["results"] for scan in scans] == values
+    assert len(set(scannedFiles)) == len(values)
+    assert not any(os.path.exists(scanFile) for scanFile in scannedFiles)
+
+def test_scan_file_is_removed_when_the_scan_fails(monkeypatch):
+    scannedFiles = []
+
+    def failing_detect_secrets(command, **kwargs):
+        scannedFiles.append(command[-1])
+        raise subprocess.CalledProcessError(1, command)
+
+    monkeypatch.setattr(Amazon_Secrets_Auditor.subprocess, "run", failing_detect_secrets)
+
+    with pytest.raises(subprocess.CalledProcessError):
+        scan_for_secrets({"value": "x"})
+    assert scannedFiles and not os.path.exists(scannedFiles[0])
@@ -0,0 +1,113 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import base64
+import gzip
+import json
+from threading import Lock
+
+from . import context
+from processor.aws_batching import pack_batches
+from processor.outputs.amazon_sqs_output import AmazonSqsProvider, SQS_MAX_PAYLOAD_BYTES, sqs_entry_size
+
+class LocalSqsQueue(object):
+    """
+    In-memory stand-in for the SQS SendMessageBatch API, enforcing its entry count and payload size limits. The first
+    `throttledEntries` entries it sees fail with a retryable (non-sender) fault
+    """
+
+    def __init__(self, throttledEntries=0):
+        self.messages = []
+        self.requests = 0
+        self.throttledEntries = throttledEntries
+        self.lock = Lock()
+
+    def send_message_batch(self, QueueUrl, Entries):
+        assert 1 <= len(Entries) <= 10
+        assert len({e["Id"] for e in Entries}) == len(Entries)
+        assert sum(sqs_entry_size(e) for e in Entries) <= SQS_MAX_PAYLOAD_BYTES
+        successful, failed = [], []
+        with self.lock:
+            self.requests += 1
+            for entry in Entries:
+                if self.throttledEntries > 0:
+                    self.throttledEntries -= 1
+                    failed.append({"Id": entry["Id"], "SenderFault": False, "Code": "InternalError", "Message": ""})
+                else:
+                    self.messages.append(entry)
+                    successful.append({"Id": entry["Id"]})
+
+        return {"Successful": successful, "Failed": failed}
+
+def make_provider(queue, oversizedFindingHandling="NONE"):
+    provider = AmazonSqsProvider.__new__(AmazonSqsProvider)
+    provider.queueUrl = "https://sqs.us-east-1.amazonaws.com/012345678901/electriceye"
+    provider.queueBatchSize = 10
+    provider.maxWorkers = 4
+    provider.maxRetries = 3
+    provider.oversizedFindingHandling = oversizedFindingHandling
+    provider.sqs = queue
+    provider.open()
+    return provider
+
+def make_finding(i, padding=0):
+    return {
+        "Id": f"finding-{i}",
+        "Description": "x" * padding,
+        # processor.main hands the findings over with AssetDetails decoded
+        "ProductFields": {"AssetDetails": {"Name": i}}
+    }
+
+def test_send_message_batch_reduces_requests():
+    queue = LocalSqsQueue(throttledEntries=3)
+    provider = make_provider(queue)
+    provider.write_batch([make_finding(i) for i in range(95)])
+    # ~100 KiB findings, only two fit in a single request
+    provider.write_batch([make_finding(i, padding=100_000) for i in range(95, 100)])
+    provider.close()
+
+    # one send_message per finding used to mean 100 requests
+    assert provider.findingsSent == 100
+    assert provider.findingsFailed == 0
+    assert queue.requests == provider.requestsSent <= 10 + 3 + 1
+    bodies = sorted((json.loads(m["MessageBody"]) for m in queue.messages), key=lambda f: int(f["Id"].split("-")[1]))
+    assert [f["Id"] for f in bodies] == [f"finding-{i}" for i in range(100)]
+    assert bodies[0]["ProductFields"]["AssetDetails"] == {"Name": 0}
+
+def test_oversized_findings_are_compressed_or_skipped():
+    queue = LocalSqsQueue()
+    provider = make_provider(queue, oversizedFindingHandling="GZIP")
+    provider.write_batch([make_finding(0, padding=300_000)])
+    provider.close()
+
+    message, = queue.messages
+    assert message["MessageAttributes"]["ContentEncoding"]["StringValue"] == "gzip+base64"
+    assert json.loads(gzip.decompress(base64.b64decode(message["MessageBody"])))["Id"] == "finding-0"
+
+    queue = LocalSqsQueue()
+    provider = make_provider(queue)
+    provider.write_batch([make_finding(0, padding=300_000), make_finding(1)])
+    provider.close()
+    assert provider.findingsFailed == 1
+    assert [json.loads(m["MessageBody"])["Id"] for m in queue.messages] == ["finding-1"]
+
+def test_pack_batches_respects_count_and_size():
+    batches = list(pack_batches([5, 5, 5, 20, 1, 1, 1], maxCount=3, maxBytes=12, sizeOf=lambda r: r))
+    assert batches == [[5, 5], [5], [20], [1, 1, 1]]
@@ -0,0 +1,88 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import base64
+import json
+
+from . import context
+from processor.asset_registry import AssetRegistry
+from processor.normalization import normalize_finding
+
+def make_finding(assetId, assetDetails, accountId="012345678901"):
+    return {
+        "Resources": [{"Id": assetId}],
+        "ProductFields": {
+            "Provider": "AWS",
+            "ProviderAccountId": accountId,
+            # like the Checks, a fresh (equal) payload is encoded for every finding
+            "AssetDetails": base64.b64encode(json.dumps(assetDetails).encode("utf-8"))
+        },
+        "Compliance": {"RelatedRequirements": []}
+    }
+
+def test_findings_share_one_payload_per_asset():
+    registry = AssetRegistry()
+    findings = [registry.register(make_finding("asset-a", {"Name": "a"})) for _ in range(3)]
+    other = registry.register(make_finding("asset-a", {"Name": "a"}, accountId="210987654321"))
+    view = registry.register(make_finding("asset-a", {"Name": "a", "Policy": {}}))
+
+    payloads = [f["ProductFields"]["AssetDetails"] for f in findings]
+    assert payloads[0] is payloads[1] is payloads[2]
+    assert other["ProductFields"]["AssetDetails"] is not payloads[0]
+    assert view["ProductFields"]["AssetDetails"] != payloads[0]
+    assert len(registry) == 2
+    # the raw payload is unchanged so ASFF serialization is byte-compatible
+    assert base64.b64decode(payloads[0]) == json.dumps({"Name": "a"}).encode("utf-8")
+
+def test_resolve_decodes_once():
+    registry = AssetRegistry()
+    first, second = (registry.register(make_finding("asset-a", {"Name": "a"})) for _ in range(2))
+
+    normalized = [normalize_finding(f, registry) for f in (first, second)]
+    assert normalized[0]["ProductFields"]["AssetDetails"] == {"Name": "a"}
+    assert normalized[0]["ProductFields"]["AssetDetails"] is normalized[1]["ProductFields"]["AssetDetails"]
+    assert normalized == [normalize_finding(f) for f in (first, second)]
+
+def test_unregistrable_findings_pass_through():
+    registry = AssetRegistry()
+    finding = make_finding("asset-a", {})
+    finding["ProductFields"]["AssetDetails"] = None
+    assert registry.register(finding) is finding
+    assert registry.resolve(None) is None
+    assert registry.register({"Id": "no-product-fields"}) == {"Id": "no-product-fields"}
+    assert len(registry) == 0
+
+def test_least_recently_used_assets_are_released():
+    registry = AssetRegistry(maxAssets=2)
+    a, b = (registry.register(make_finding(assetId, {"Name": assetId})) for assetId in ("asset-a", "asset-b"))
+    # asset-a is used again, so asset-b is the one evicted by asset-c
+    again = registry.register(make_finding("asset-a", {"Name": "asset-a"}))
+    c = registry.register(make_finding("asset-c", {"Name": "asset-c"}))
+    assert again["ProductFields"]["AssetDetails"] is a["ProductFields"]["AssetDetails"]
+    assert len(registry) == 2
+    assert ("AWS", "012345678901", "asset-b") not in registry.assets
+
+    for finding in (a, b, c):
+        registry.resolve(finding["ProductFields"]["AssetDetails"])
+    assert len(registry.decodedAssets) == 2
+    assert b["ProductFields"]["AssetDetails"] in registry.decodedAssets
+    assert a["ProductFields"]["AssetDetails"] not in registry.decodedAssets
+    # an evicted Asset is registered and decoded again
+    assert normalize_finding(registry.register(make_finding("asset-b", {"Name": "asset-b"})), registry)["ProductFields"]["AssetDetails"] == {"Name": "asset-b"}
@@ -0,0 +1,72 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import threading
+import time
+
+import pytest
+
+from . import context
+from attack_surface_scanner import AttackSurfaceScanner
+
+class FakeNmap(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.targets = []
+
+    def nmap_tcp_scan(self, target, args=None):
+        with self.lock:
+            self.targets.append((target, args))
+        time.sleep(0.05)
+        return {target: {"ports": [{"portid": "22", "state": "open", "reason": "syn-ack", "service": {"name": "ssh"}}]}}
+
+@pytest.fixture(scope="function")
+def scanner(monkeypatch):
+    scanner = AttackSurfaceScanner(ports=[22, 443], hostTimeoutSeconds=30, maxConcurrentScans=4)
+    scanner.nmap = FakeNmap()
+    # keep the test offline, "alias" names resolve to a shared IP
+    monkeypatch.setattr(
+        AttackSurfaceScanner,
+        "resolve",
+        staticmethod(lambda host: "203.0.113.10" if host.startswith("alias") else host)
+    )
+    return scanner
+
+def test_configured_ports_and_timeout(scanner):
+    assert scanner.args == "-Pn -p 22,443 --host-timeout 30s"
+
+def test_targets_are_deduplicated_across_asset_types(scanner):
+    scanner.prefetch(
+        [
+            ("203.0.113.10", "i-123", "EC2 Instance"),
+            ("203.0.113.10", "eipalloc-123", "Elastic IP"),
+            ("alias.example.com.", "example.com.", "Route53 Public Hosted Zone A Record"),
+            ("198.51.100.7", "i-456", "EC2 Instance")
+        ]
+    )
+    result = scanner.scan_host("alias.example.com.", "example.com.", "Route53 Public Hosted Zone A Record")
+    assert list(result.keys())[0] == "203.0.113.10"
+    assert scanner.scan_host("198.51.100.7", "i-456", "EC2 Instance")["198.51.100.7"]["ports"][0]["portid"] == "22"
+    assert sorted(target for target, _ in scanner.nmap.targets) == ["198.51.100.7", "203.0.113.10"]
+
+def test_nmap_key_errors_return_none(scanner):
+    def broken_scan(target, args=None):
+        raise KeyError(target)
+    scanner.nmap.nmap_tcp_scan = broken_scan
+    assert scanner.scan_host("192.0.2.1", "i-789", "EC2 Instance") is None
@@ -0,0 +1,90 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import threading
+import time
+
+import pytest
+
+from . import context
+from audit_scheduler import AuditScheduler, AuditUnit
+
+def make_unit(account, findings, tracker=None):
+    def runner():
+        if tracker is not None:
+            tracker.enter(account)
+        try:
+            for finding in findings:
+                time.sleep(0.01)
+                yield finding
+        finally:
+            if tracker is not None:
+                tracker.exit(account)
+    return AuditUnit(account=account, runner=runner)
+
+class ConcurrencyTracker(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peakTotal = 0
+        self.peakPerAccount = {}
+
+    def enter(self, account):
+        with self.lock:
+            self.active[account] = self.active.get(account, 0) + 1
+            self.peakTotal = max(self.peakTotal, sum(self.active.values()))
+            self.peakPerAccount[account] = max(self.peakPerAccount.get(account, 0), self.active[account])
+
+    def exit(self, account):
+        with self.lock:
+            self.active[account] -= 1
+
+def test_scheduler_yields_every_finding():
+    units = [make_unit(acct, [f"{acct}-{i}-{n}" for n in range(3)]) for acct in ("111", "222") for i in range(4)]
+    findings = list(AuditScheduler(maxWorkers=4, maxWorkersPerAccount=2).run(units))
+    assert len(findings) == 24
+    assert len(set(findings)) == 24
+
+def test_scheduler_sequential_preserves_order():
+    units = [make_unit("111", ["a", "b"]), make_unit("222", ["c"]), make_unit("111", ["d"])]
+    assert list(AuditScheduler().run(units)) == ["a", "b", "d", "c"]
+
+def test_scheduler_respects_concurrency_caps():
+    tracker = ConcurrencyTracker()
+    units = [make_unit(acct, range(5), tracker) for acct in ("111", "222", "333") for _ in range(6)]
+    list(AuditScheduler(maxWorkers=4, maxWorkersPerAccount=2).run(units))
+    assert tracker.peakTotal <= 4
+    assert all(peak <= 2 for peak in tracker.peakPerAccount.values())
+
+def test_scheduler_reraises_unit_errors():
+    def broken():
+        raise RuntimeError("assume role failed")
+        yield
+    units = [make_unit("111", ["a"]), AuditUnit(account="111", runner=broken)]
+    with pytest.raises(RuntimeError):
+        list(AuditScheduler(maxWorkers=2, maxWorkersPerAccount=2).run(units))
+
+def test_scheduler_reraises_system_exit():
+    def misconfigured():
+        yield "a"
+        raise SystemExit(2)
+    units = [AuditUnit(account="111", runner=misconfigured), make_unit("222", ["b"])]
+    with pytest.raises(SystemExit) as e:
+        list(AuditScheduler(maxWorkers=2, maxWorkersPerAccount=1).run(units))
+    assert e.value.code == 2
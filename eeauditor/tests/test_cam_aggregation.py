@@ -0,0 +1,62 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import base64
+import json
+
+from . import context
+from processor.cam_aggregation import aggregate_cam_assets
+
+def make_finding(assetId, severity, firstObserved, assetDetails=None):
+    productFields = {"Provider": "AWS", "AssetClass": "Compute"}
+    if assetDetails is not None:
+        productFields["AssetDetails"] = base64.b64encode(json.dumps(assetDetails).encode("utf-8")).decode("utf-8")
+    return {
+        "Resources": [{"Id": assetId}],
+        "Severity": {"Label": severity},
+        "FirstObservedAt": firstObserved,
+        "ProductFields": productFields
+    }
+
+def test_groups_and_counts_per_asset():
+    findings = [
+        make_finding("asset-a", "HIGH", "2023-05-01T00:00:00+00:00", {"Name": "a"}),
+        make_finding("asset-b", "LOW", "2023-05-02T00:00:00+00:00"),
+        make_finding("asset-a", "HIGH", "2023-04-01T00:00:00+00:00", {"Name": "ignored"}),
+        make_finding("asset-a", "INFORMATIONAL", "2023-06-01T00:00:00+00:00"),
+        make_finding("asset-a", "UNKNOWN", "2023-06-01T00:00:00+00:00")
+    ]
+    assets = aggregate_cam_assets(findings)
+
+    assert [a["AssetId"] for a in assets] == ["asset-a", "asset-b"]
+    assetA, assetB = assets
+    assert assetA["HighSeverityFindings"] == 2
+    assert assetA["InformationalSeverityFindings"] == 1
+    assert assetA["CriticalSeverityFindings"] == 0
+    assert assetA["FirstObservedAt"] == "2023-04-01T00:00:00+00:00"
+    assert assetA["AssetDetails"] == {"Name": "a"}
+    assert assetA["Provider"] == "AWS"
+    assert assetA["ProviderType"] == ""
+    assert assetB["LowSeverityFindings"] == 1
+    assert assetB["AssetDetails"] == ""
+
+def test_null_asset_details():
+    finding = make_finding("asset-a", "LOW", "2023-05-01T00:00:00+00:00")
+    finding["ProductFields"]["AssetDetails"] = None
+    assert aggregate_cam_assets([finding])[0]["AssetDetails"] is None
@@ -0,0 +1,75 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import os
+
+from . import context
+from processor import compliance_charts
+from processor.compliance_charts import chart_cache_key, render_framework_charts
+
+FRAMEWORK = "NIST CSF V1.1"
+CONTROLS = {"NIST CSF V1.1 PR.AC-3": {"Passed": 3, "Failed": 1}, "NIST CSF V1.1 DE.CM-7": {"Passed": 0, "Failed": 2}}
+
+def test_cache_key_follows_the_chart_data():
+    assert chart_cache_key(FRAMEWORK, CONTROLS) == chart_cache_key(FRAMEWORK, dict(CONTROLS))
+    # the order the controls were collected in does not matter
+    assert chart_cache_key(FRAMEWORK, CONTROLS) == chart_cache_key(FRAMEWORK, dict(reversed(list(CONTROLS.items()))))
+    assert chart_cache_key(FRAMEWORK, CONTROLS) != chart_cache_key("CIS Critical Security Controls V8", CONTROLS)
+    changed = dict(CONTROLS, **{"NIST CSF V1.1 DE.CM-7": {"Passed": 1, "Failed": 1}})
+    assert chart_cache_key(FRAMEWORK, CONTROLS) != chart_cache_key(FRAMEWORK, changed)
+
+def test_unchanged_frameworks_are_not_rendered_again(tmp_path, monkeypatch):
+    rendered = []
+    render = compliance_charts.render_framework_chart
+
+    def counting_render(framework, controlsData, filePath):
+        rendered.append(framework)
+        return render(framework, controlsData, filePath)
+
+    monkeypatch.setattr(compliance_charts, "render_framework_chart", counting_render)
+
+    first = render_framework_charts({FRAMEWORK: CONTROLS}, str(tmp_path))
+    assert first[FRAMEWORK].lstrip().startswith("<?xml")
+    assert render_framework_charts({FRAMEWORK: CONTROLS}, str(tmp_path)) == first
+    assert rendered == [FRAMEWORK]
+
+    # new data for the framework replaces its previous chart
+    changed = dict(CONTROLS, **{"NIST CSF V1.1 DE.CM-7": {"Passed": 2, "Failed": 0}})
+    render_framework_charts({FRAMEWORK: changed}, str(tmp_path))
+    assert rendered == [FRAMEWORK, FRAMEWORK]
+    assert len(os.listdir(tmp_path)) == 1
+
+def test_charts_default_to_a_private_cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    render_framework_charts({FRAMEWORK: CONTROLS})
+
+    chartDirectory = tmp_path / "electriceye" / "html_compliance_charts"
+    assert len(os.listdir(chartDirectory)) == 1
+    assert os.stat(chartDirectory).st_mode & 0o777 == 0o700
+
+def test_cached_charts_are_not_trusted_from_a_shared_directory(tmp_path):
+    os.chmod(tmp_path, 0o777)
+    planted = tmp_path / f"nistcsfv11_{chart_cache_key(FRAMEWORK, CONTROLS)[:16]}.svg"
+    planted.write_text("<svg onload=\"alert(1)\"></svg>")
+
+    svgImages = render_framework_charts({FRAMEWORK: CONTROLS}, str(tmp_path))
+    assert svgImages[FRAMEWORK].lstrip().startswith("<?xml")
+    # nothing is written to or removed from the shared directory
+    assert os.listdir(tmp_path) == [planted.name]
@@ -0,0 +1,126 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import base64
+import json
+
+from . import context
+from processor.delta_state import CheckRunTracker, FindingStateStore, finding_fingerprint
+
+def make_finding(findingId, status="FAILED", accountId="012345678901", updatedAt="2024-01-01T00:00:00+00:00"):
+    return {
+        "Id": findingId,
+        "CreatedAt": updatedAt,
+        "UpdatedAt": updatedAt,
+        "ProductFields": {
+            "ProviderAccountId": accountId,
+            "AssetDetails": base64.b64encode(json.dumps({"Name": findingId}).encode("utf-8"))
+        },
+        "Compliance": {"Status": status},
+        "RecordState": "ACTIVE"
+    }
+
+def run(store, findings, target="AWS", scope="/"):
+    sent = list(store.delta(findings, target, scope))
+    store.commit()
+    return sent
+
+def test_fingerprint_ignores_timestamps():
+    assert finding_fingerprint(make_finding("a")) == finding_fingerprint(make_finding("a", updatedAt="2024-02-01T00:00:00+00:00"))
+    assert finding_fingerprint(make_finding("a")) != finding_fingerprint(make_finding("a", status="PASSED"))
+
+def test_only_new_changed_and_resolved_findings_are_sent(tmp_path):
+    store = FindingStateStore(str(tmp_path / "state.sqlite3"))
+    assert [f["Id"] for f in run(store, [make_finding("a"), make_finding("b"), make_finding("c"), make_finding("a")])] == ["a", "b", "c"]
+
+    sent = run(store, [make_finding("a", updatedAt="2024-02-01T00:00:00+00:00"), make_finding("b", status="PASSED"), make_finding("d")])
+    assert [f["Id"] for f in sent] == ["b", "d", "c"]
+    resolved = sent[-1]
+    assert resolved["RecordState"] == "ARCHIVED"
+    assert resolved["Workflow"] == {"Status": "RESOLVED"}
+    # the stored copy is still decodable by the outputs
+    assert json.loads(base64.b64decode(resolved["ProductFields"]["AssetDetails"])) == {"Name": "c"}
+    assert store.counts == {"NEW": 4, "CHANGED": 1, "RESOLVED": 1, "UNCHANGED": 1}
+    store.close()
+
+    # state survives between runs, and a resolved finding that comes back is new again
+    store = FindingStateStore(str(tmp_path / "state.sqlite3"))
+    assert [f["Id"] for f in run(store, [make_finding("a"), make_finding("b", status="PASSED"), make_finding("d"), make_finding("c")])] == ["c"]
+    store.close()
+
+def test_unassessed_accounts_and_other_scopes_are_not_resolved(tmp_path):
+    store = FindingStateStore(str(tmp_path / "state.sqlite3"))
+    run(store, [make_finding("a"), make_finding("b", accountId="210987654321")])
+
+    assert run(store, [make_finding("a")]) == []
+    assert [f["Id"] for f in run(store, [make_finding("a")], scope="Amazon_EC2_Auditor/")] == ["a"]
+    assert [f["Id"] for f in run(store, [make_finding("a")], target="GCP")] == ["a"]
+    store.close()
+
+def run_checks(checks, checkRuns):
+    # mirrors EEAuditor.run_aws_auditor(), a Check that raises is logged and skipped
+    for unit, check in checks.items():
+        try:
+            for finding in check():
+                checkRuns.produced(finding, unit)
+                yield finding
+            checkRuns.completed(unit)
+        except Exception:
+            pass
+
+def test_findings_of_failed_checks_are_not_resolved(tmp_path):
+    def passing(*findingIds):
+        def check():
+            yield from (make_finding(findingId) for findingId in findingIds)
+        return check
+
+    def failing(*findingIds):
+        def check():
+            yield from (make_finding(findingId) for findingId in findingIds)
+            raise RuntimeError("AccessDenied")
+        return check
+
+    store = FindingStateStore(str(tmp_path / "state.sqlite3"))
+    checkRuns = CheckRunTracker()
+    sent = list(store.delta(run_checks({"a-check": passing("a1", "a2"), "b-check": passing("b1", "b2")}, checkRuns), "AWS", checkRuns=checkRuns))
+    store.commit()
+    assert [f["Id"] for f in sent] == ["a1", "a2", "b1", "b2"]
+    assert checkRuns.findingUnits == {}
+
+    # b-check raises part way through, only a-check's missing finding is resolved
+    checkRuns = CheckRunTracker()
+    sent = list(store.delta(run_checks({"a-check": passing("a1"), "b-check": failing("b1")}, checkRuns), "AWS", checkRuns=checkRuns))
+    store.commit()
+    assert [(f["Id"], f["RecordState"]) for f in sent] == [("a2", "ARCHIVED")]
+
+    # once b-check completes again its missing finding is resolved
+    checkRuns = CheckRunTracker()
+    sent = list(store.delta(run_checks({"a-check": passing("a1"), "b-check": passing("b1")}, checkRuns), "AWS", checkRuns=checkRuns))
+    assert [(f["Id"], f["RecordState"]) for f in sent] == [("b2", "ARCHIVED")]
+    store.close()
+
+def test_state_is_rolled_back_without_commit(tmp_path):
+    store = FindingStateStore(str(tmp_path / "state.sqlite3"))
+    list(store.delta([make_finding("a")], "AWS"))
+    store.close()
+
+    store = FindingStateStore(str(tmp_path / "state.sqlite3"))
+    assert [f["Id"] for f in store.delta([make_finding("a")], "AWS")] == ["a"]
+    store.close()
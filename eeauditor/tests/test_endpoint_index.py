@@ -0,0 +1,77 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import json
+import time
+
+from . import context
+from endpoint_index import ServiceEndpointIndex
+
+endpoint_data = {
+    "partitions": [
+        {
+            "partition": "aws",
+            "services": {
+                "api.ecr": {"endpoints": {"us-east-1": {}, "us-east-2": {}}},
+                "ecr": {"endpoints": {"eu-west-1": {}}},
+                "ec2": {"endpoints": {"us-east-1": {}, "eu-west-1": {}}},
+                "iam": {"endpoints": {"aws-global": {}}},
+                "execute-api": {"endpoints": {"us-east-1": {}}}
+            }
+        },
+        {
+            "partition": "aws-us-gov",
+            "services": {
+                "ec2": {"endpoints": {"us-gov-west-1": {}}}
+            }
+        }
+    ]
+}
+
+def test_regional_lookups():
+    endpointIndex = ServiceEndpointIndex.from_endpoint_data(endpoint_data)
+    assert endpointIndex.is_available("aws", "ec2", "eu-west-1")
+    assert not endpointIndex.is_available("aws", "ec2", "us-west-2")
+    assert endpointIndex.is_available("aws-us-gov", "ec2", "us-gov-west-1")
+    assert not endpointIndex.is_available("aws-us-gov", "iam", "us-gov-west-1")
+    assert not endpointIndex.is_available("aws-cn", "ec2", "cn-north-1")
+
+def test_api_prefix_first_entry_wins():
+    endpointIndex = ServiceEndpointIndex.from_endpoint_data(endpoint_data)
+    assert endpointIndex.is_available("aws", "ecr", "us-east-2")
+    assert not endpointIndex.is_available("aws", "ecr", "eu-west-1")
+    assert endpointIndex.is_available("aws", "execute-api", "us-east-1")
+
+def test_global_endpoints():
+    endpointIndex = ServiceEndpointIndex.from_endpoint_data(endpoint_data)
+    assert endpointIndex.is_available("aws", "iam", "ap-southeast-2")
+
+def test_cache_round_trip_and_ttl(tmp_path):
+    cachePath = str(tmp_path / "cache" / "endpoint_index.json")
+    ServiceEndpointIndex.from_endpoint_data(endpoint_data).write_cache(cachePath)
+
+    cached = ServiceEndpointIndex.read_cache(cachePath, ttlHours=24)
+    assert cached.index == ServiceEndpointIndex.from_endpoint_data(endpoint_data).index
+
+    with open(cachePath) as f:
+        payload = json.load(f)
+    payload["createdAt"] = time.time() - 25 * 3600
+    with open(cachePath, "w") as f:
+        json.dump(payload, f)
+    assert ServiceEndpointIndex.read_cache(cachePath, ttlHours=24) is None
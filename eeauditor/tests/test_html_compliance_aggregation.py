@@ -0,0 +1,85 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+from . import context
+from processor.outputs.html_compliance_output import (
+    JsonProvider,
+    MALFORMED_CONTROL,
+    control_frameworks,
+    load_control_objectives
+)
+
+CSF_CONTROL = "NIST CSF V1.1 PR.AC-3"
+CIS_CONTROL = "CIS Amazon Web Services Foundations Benchmark V1.5 1.1"
+
+def make_finding(assetId, status, requirements, assetClass="Compute", region="us-east-1"):
+    return {
+        "Resources": [{"Id": assetId}],
+        "ProductFields": {
+            "Provider": "AWS",
+            "ProviderAccountId": "012345678901",
+            "AssetRegion": region,
+            "AssetClass": assetClass,
+            "AssetService": "Amazon EC2",
+            "AssetComponent": "Instance"
+        },
+        "Compliance": {"Status": status, "RelatedRequirements": requirements}
+    }
+
+def test_control_frameworks_matches_every_prefix():
+    assert control_frameworks(CIS_CONTROL) == (
+        "CIS Amazon Web Services Foundations Benchmark V1.5",
+    )
+    assert control_frameworks("Not A Framework 1.1") == ()
+    assert control_frameworks(CSF_CONTROL) == ("NIST CSF V1.1",)
+
+def test_aggregate_findings_counts_controls_assets_and_totals():
+    findings = [
+        make_finding("i-1", "PASSED", [CSF_CONTROL, CIS_CONTROL]),
+        make_finding("i-1", "FAILED", [CSF_CONTROL, CIS_CONTROL], region="us-west-2"),
+        make_finding("i-2", "PASSED", [CSF_CONTROL], assetClass="Storage"),
+        make_finding("i-3", "FAILED", [CSF_CONTROL, MALFORMED_CONTROL]),
+    ]
+
+    controlsAggregation, assetDataPerControl, summaryStatistics = JsonProvider.__new__(JsonProvider).aggregate_findings(findings)
+
+    assert controlsAggregation["NIST CSF V1.1"] == {CSF_CONTROL: {"Passed": 2, "Failed": 2}}
+    assert controlsAggregation["CIS Amazon Web Services Foundations Benchmark V1.5"] == {CIS_CONTROL: {"Passed": 1, "Failed": 1}}
+
+    # the malformed control is still counted as a control, but has no Asset information
+    assert [c["ControlId"] for c in assetDataPerControl] == [CSF_CONTROL, CIS_CONTROL]
+    csf = assetDataPerControl[0]
+    assert csf["ResourcesImpacted"] == 3
+    assert csf["PassingControls"] == 2
+    assert csf["FailingControls"] == 2
+    assert csf["UniqueAssetClass"] == 2
+    assert csf["PassingPercentage"] == "66.67%"
+
+    assert summaryStatistics["Findings"] == 4
+    assert summaryStatistics["Passed"] == 2
+    assert list(summaryStatistics["Regions"]) == ["us-east-1", "us-west-2"]
+    assert len(summaryStatistics["AssetIds"]) == 3
+    assert summaryStatistics["UniqueControls"] == 3
+
+def test_control_objectives_are_loaded_once():
+    assert load_control_objectives() is load_control_objectives()
+    position, descriptions = load_control_objectives()[CSF_CONTROL]
+    assert position >= 0
+    assert descriptions
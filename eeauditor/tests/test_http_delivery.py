@@ -0,0 +1,104 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+import pytest
+
+from . import context
+from processor.http_delivery import HttpDeliveryEngine, parse_retry_after
+
+class LocalCollector(BaseHTTPRequestHandler):
+    """
+    Stand-in webhook that throttles (429 with a Retry-After) every 5th request and fails every 7th with a 503
+    """
+    protocol_version = "HTTP/1.1"
+    lock = Lock()
+    seen = 0
+    accepted = []
+    connections = set()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with LocalCollector.lock:
+            LocalCollector.seen += 1
+            seen = LocalCollector.seen
+            LocalCollector.connections.add(self.client_address)
+        if seen % 5 == 0:
+            self.reply(429, {"Retry-After": "0.05"})
+        elif seen % 7 == 0:
+            self.reply(503)
+        elif self.path == "/forbidden":
+            self.reply(403)
+        else:
+            with LocalCollector.lock:
+                LocalCollector.accepted.append(json.loads(body))
+            self.reply(200)
+
+    def reply(self, status, headers=None):
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def collector():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LocalCollector)
+    Thread(target=server.serve_forever, daemon=True).start()
+    LocalCollector.seen = 0
+    LocalCollector.accepted = []
+    LocalCollector.connections = set()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+def test_throttled_and_failed_requests_are_sent_again(collector):
+    engine = HttpDeliveryEngine(1000, burst=50, maxWorkers=4)
+    responses = engine.send_all(
+        [{"method": "POST", "url": f"{collector}/event", "data": json.dumps({"Id": i})} for i in range(60)]
+    )
+    engine.close()
+
+    assert all(r.status_code == 200 for r in responses)
+    assert sorted(f["Id"] for f in LocalCollector.accepted) == list(range(60))
+    assert engine.requestsThrottled > 0
+    assert engine.requestsFailed == 0
+    # keep-alive connections are reused instead of opening one per request
+    assert len(LocalCollector.connections) <= 8
+
+def test_client_errors_are_not_retried(collector):
+    engine = HttpDeliveryEngine(1000, burst=10, maxWorkers=2)
+    r = engine.send("POST", f"{collector}/forbidden", data="{}")
+    engine.close()
+
+    assert r.status_code == 403
+    assert engine.requestsSent == 1
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
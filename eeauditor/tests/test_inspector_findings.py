@@ -0,0 +1,92 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import boto3
+import pytest
+
+from botocore.stub import Stubber, ANY
+
+from . import context
+from inspector_findings import get_inspector_package_vulnerabilities
+
+def make_finding(resourceId, cveId):
+    return {
+        "awsAccountId": "012345678901",
+        "description": "example",
+        "findingArn": f"arn:aws:inspector2:us-east-1:012345678901:finding/{cveId}",
+        "firstObservedAt": "2024-01-01T00:00:00Z",
+        "lastObservedAt": "2024-01-01T00:00:00Z",
+        "remediation": {},
+        "resources": [{"id": resourceId, "type": "AWS_EC2_INSTANCE"}],
+        "severity": "HIGH",
+        "status": "ACTIVE",
+        "type": "PACKAGE_VULNERABILITY",
+        "packageVulnerabilityDetails": {"source": "NVD", "vulnerabilityId": cveId},
+        "exploitAvailable": "YES"
+    }
+
+class FakeSession(object):
+    def __init__(self, client):
+        self._client = client
+        self.calls = 0
+
+    def client(self, service_name, **kwargs):
+        self.calls += 1
+        return self._client
+
+@pytest.fixture(scope="function")
+def inspector_stubber():
+    inspector = boto3.client("inspector2", region_name="us-east-1")
+    inspector_stubber = Stubber(inspector)
+    inspector_stubber.activate()
+    yield inspector, inspector_stubber
+    inspector_stubber.deactivate()
+
+def test_findings_are_paged_and_indexed_once(inspector_stubber):
+    inspector, stubber = inspector_stubber
+    stubber.add_response(
+        "list_findings",
+        {"findings": [make_finding("i-1", "CVE-2021-44228"), make_finding("i-2", "CVE-2023-4966")], "nextToken": "page2"},
+        {"filterCriteria": ANY}
+    )
+    stubber.add_response(
+        "list_findings",
+        {"findings": [make_finding("i-1", "CVE-2024-3094")]},
+        {"filterCriteria": ANY, "nextToken": "page2"}
+    )
+    session = FakeSession(inspector)
+    cache = {}
+
+    index = get_inspector_package_vulnerabilities(cache, session, "AWS_EC2_INSTANCE")
+    assert len(index["i-1"]) == 2
+    assert len(index["i-2"]) == 1
+    # second lookup is served from the cache
+    assert get_inspector_package_vulnerabilities(cache, session, "AWS_EC2_INSTANCE") is index
+    assert session.calls == 1
+    stubber.assert_no_pending_responses()
+
+def test_empty_index_is_cached(inspector_stubber):
+    inspector, stubber = inspector_stubber
+    stubber.add_response("list_findings", {"findings": []}, {"filterCriteria": ANY})
+    session = FakeSession(inspector)
+    cache = {}
+
+    assert get_inspector_package_vulnerabilities(cache, session) == {}
+    assert get_inspector_package_vulnerabilities(cache, session) == {}
+    assert session.calls == 1
@@ -0,0 +1,232 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from threading import Event
+
+from . import context
+import inventory as inventory_module
+from auditors.aws.AWS_IAM_Auditor import get_access_keys
+from inventory import (
+    COLLECTORS,
+    AuditorCache,
+    InventoryCache,
+    collect_ec2_instances,
+    collect_iam_authorization_details,
+    collect_iam_credential_report,
+    collect_metric_alarms,
+    collect_metric_filters,
+    get_inventory,
+    inventory_collector
+)
+
+calls = []
+started = Event()
+
+@inventory_collector("test.slow_describe")
+def slow_describe(session):
+    calls.append(session)
+    started.wait(1)
+    return [{"Id": "a"}]
+
+class FakePaginator(object):
+    def __init__(self, pages):
+        self.pages = pages
+        self.kwargs = None
+
+    def paginate(self, **kwargs):
+        self.kwargs = kwargs
+        return iter(self.pages)
+
+class FakeSession(object):
+    def __init__(self, pages):
+        self.paginator = FakePaginator(pages)
+
+    def client(self, service, **kwargs):
+        return self
+
+    def get_paginator(self, operation):
+        return self.paginator
+
+def test_collectors_run_once_per_scope_and_are_freed():
+    del calls[:]
+    inventory = InventoryCache()
+    for _ in range(4):
+        inventory.expect("012345678901", "us-east-1")
+    inventory.expect("012345678901", "us-west-2")
+
+    caches = [AuditorCache(inventory.open("012345678901", "us-east-1")) for _ in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(get_inventory, cache, "session", "test.slow_describe") for cache in caches]
+        started.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    # a different Region is a different scope
+    get_inventory(AuditorCache(inventory.open("012345678901", "us-west-2")), "session", "test.slow_describe")
+    assert len(calls) == 2
+
+    for _ in range(3):
+        inventory.release("012345678901", "us-east-1")
+    assert ("012345678901", "us-east-1") in inventory.scopes
+    inventory.release("012345678901", "us-east-1")
+    assert ("012345678901", "us-east-1") not in inventory.scopes
+    assert ("012345678901", "us-west-2") in inventory.scopes
+
+def test_plain_dict_cache_calls_the_collector():
+    del calls[:]
+    started.set()
+    get_inventory({}, "session", "test.slow_describe")
+    get_inventory({}, "session", "test.slow_describe")
+    assert len(calls) == 2
+
+def test_ec2_collector_reads_every_page():
+    session = FakeSession([
+        {"Reservations": [{"Instances": [{"InstanceId": "i-1"}, {"InstanceId": "i-2"}]}]},
+        {"Reservations": [{"Instances": [{"InstanceId": "i-3"}]}, {"Instances": []}]}
+    ])
+    assert [i["InstanceId"] for i in collect_ec2_instances(session)] == ["i-1", "i-2", "i-3"]
+    assert session.paginator.kwargs == {"Filters": [{"Name": "instance-state-name", "Values": ["running", "stopped"]}]}
+    assert COLLECTORS["ec2.describe_instances"] is collect_ec2_instances
+
+def test_iam_authorization_details_are_indexed_by_principal():
+    session = FakeSession([
+        {
+            "UserDetailList": [{"UserName": "alice", "UserPolicyList": []}],
+            "GroupDetailList": [{"GroupName": "admins"}],
+            "RoleDetailList": [{"RoleName": "deploy"}],
+            "Policies": [{"Arn": "arn:aws:iam::012345678901:policy/p1"}]
+        },
+        {
+            "UserDetailList": [{"UserName": "bob", "UserPolicyList": []}],
+            "GroupDetailList": [],
+            "RoleDetailList": [],
+            "Policies": []
+        }
+    ])
+    details = collect_iam_authorization_details(session)
+    assert sorted(details["Users"]) == ["alice", "bob"]
+    assert list(details["Groups"]) == ["admins"]
+    assert list(details["Roles"]) == ["deploy"]
+    assert list(details["Policies"]) == ["arn:aws:iam::012345678901:policy/p1"]
+    assert session.paginator.kwargs == {"Filter": ["User", "Group", "Role", "LocalManagedPolicy"]}
+
+GENERATED_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+class FakeCredentialReportClient(object):
+    def __init__(self, states):
+        self.states = states
+
+    def client(self, service, **kwargs):
+        return self
+
+    def generate_credential_report(self):
+        return {"State": self.states.pop(0)}
+
+    def get_credential_report(self):
+        return {
+            "Content": (
+                b"user,arn,password_enabled,mfa_active\n"
+                b"<root_account>,arn:aws:iam::012345678901:root,not_supported,true\n"
+                b"alice,arn:aws:iam::012345678901:user/alice,true,false\n"
+            ),
+            "GeneratedTime": GENERATED_TIME
+        }
+
+def test_iam_credential_report_waits_until_complete(monkeypatch):
+    monkeypatch.setattr(inventory_module, "CREDENTIAL_REPORT_POLL_SECONDS", 0)
+    session = FakeCredentialReportClient(["STARTED", "INPROGRESS", "COMPLETE"])
+    report = collect_iam_credential_report(session)
+    assert session.states == []
+    assert sorted(report) == ["<root_account>", "alice"]
+    assert report["alice"]["password_enabled"] == "true"
+    assert report["alice"]["mfa_active"] == "false"
+    assert report["alice"]["report_generated_time"] == GENERATED_TIME
+
+class FakeAccessKeyClient(object):
+    def __init__(self, accessKeys):
+        self.accessKeys = accessKeys
+        self.lastUsedLookups = []
+
+    def client(self, service, **kwargs):
+        return self
+
+    def list_access_keys(self, UserName):
+        return {"AccessKeyMetadata": self.accessKeys}
+
+    def get_access_key_last_used(self, AccessKeyId):
+        self.lastUsedLookups.append(AccessKeyId)
+        return {"AccessKeyLastUsed": {"LastUsedDate": datetime(2024, 1, 2, tzinfo=timezone.utc)}}
+
+def test_access_keys_created_after_the_credential_report_are_listed():
+    reportRow = {
+        "access_key_1_last_rotated": "2023-06-01T00:00:00+00:00",
+        "access_key_1_last_used_date": "2023-12-01T00:00:00+00:00",
+        "access_key_2_last_rotated": "N/A",
+        "access_key_2_last_used_date": "N/A",
+        "report_generated_time": GENERATED_TIME
+    }
+    session = FakeAccessKeyClient([
+        {"AccessKeyId": "AKIAOLD", "CreateDate": datetime(2023, 6, 1, tzinfo=timezone.utc)},
+        # created since the report was generated, the report cannot know about it
+        {"AccessKeyId": "AKIANEW", "CreateDate": datetime(2024, 1, 1, 1, tzinfo=timezone.utc)}
+    ])
+    cache = {"get_credential_report": {"alice": reportRow}}
+
+    keys = get_access_keys(cache, session, "alice")
+    assert [(key["AccessKeyId"], key["LastUsedDate"].isoformat()) for key in keys] == [
+        ("AKIAOLD", "2023-12-01T00:00:00+00:00"), ("AKIANEW", "2024-01-02T00:00:00+00:00")
+    ]
+    assert session.lastUsedLookups == ["AKIANEW"]
+
+    # a report without any Access Key for the User is not trusted either
+    session = FakeAccessKeyClient([{"AccessKeyId": "AKIANEW", "CreateDate": datetime(2024, 1, 1, 1, tzinfo=timezone.utc)}])
+    cache = {"get_credential_report": {"alice": dict(reportRow, access_key_1_last_rotated="N/A", access_key_1_last_used_date="N/A")}}
+    assert [key["AccessKeyId"] for key in get_access_keys(cache, session, "alice")] == ["AKIANEW"]
+
+def test_metric_filters_are_indexed_by_log_group():
+    session = FakeSession([
+        {"metricFilters": [{"filterName": "a", "logGroupName": "trail"}, {"filterName": "b", "logGroupName": "app"}]},
+        {"metricFilters": [{"filterName": "c", "logGroupName": "trail"}]}
+    ])
+    metricFilters = collect_metric_filters(session)
+    assert [f["filterName"] for f in metricFilters["trail"]] == ["a", "c"]
+    assert [f["filterName"] for f in metricFilters["app"]] == ["b"]
+
+def test_metric_alarms_are_indexed_by_metric():
+    session = FakeSession([
+        {
+            "MetricAlarms": [
+                {"AlarmName": "simple", "MetricName": "RootUsage", "Namespace": "CISBenchmark"},
+                {
+                    "AlarmName": "math",
+                    "Metrics": [
+                        {"Id": "m1", "MetricStat": {"Metric": {"MetricName": "RootUsage", "Namespace": "CISBenchmark"}}},
+                        {"Id": "e1", "Expression": "m1 * 2"}
+                    ]
+                }
+            ]
+        }
+    ])
+    metricAlarms = collect_metric_alarms(session)
+    assert [a["AlarmName"] for a in metricAlarms[("RootUsage", "CISBenchmark")]] == ["simple", "math"]
+    assert session.paginator.kwargs == {"AlarmTypes": ["MetricAlarm"]}
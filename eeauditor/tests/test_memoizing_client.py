@@ -0,0 +1,117 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+from threading import Lock
+
+from . import context
+from cloud_utils import MemoizingClient, PooledAwsSession
+
+class FakeMeta(object):
+    method_to_api_mapping = {
+        "describe_listeners": "DescribeListeners",
+        "get_credential_report": "GetCredentialReport",
+        "list_tags": "ListTags",
+        "modify_listener": "ModifyListener"
+    }
+
+class FakeClient(object):
+    meta = FakeMeta()
+
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    def _call(self, operation, kwargs):
+        self.calls.append((operation, kwargs))
+        if self.fail:
+            raise RuntimeError(f"{operation} was throttled")
+        return {"Operation": operation, "Params": kwargs}
+
+    def describe_listeners(self, **kwargs):
+        return self._call("DescribeListeners", kwargs)
+
+    def get_credential_report(self, **kwargs):
+        return self._call("GetCredentialReport", kwargs)
+
+    def list_tags(self, **kwargs):
+        return self._call("ListTags", kwargs)
+
+    def modify_listener(self, **kwargs):
+        return self._call("ModifyListener", kwargs)
+
+    def get_paginator(self, operation):
+        return operation
+
+class FakeSession(object):
+    def client(self, service_name, region_name=None, **kwargs):
+        return FakeClient()
+
+def test_read_only_calls_are_memoized_by_parameters():
+    client = FakeClient()
+    memoized = MemoizingClient(client)
+
+    first = memoized.describe_listeners(LoadBalancerArn="arn:a", PageSize=10)
+    second = memoized.describe_listeners(PageSize=10, LoadBalancerArn="arn:a")
+    memoized.describe_listeners(LoadBalancerArn="arn:b", PageSize=10)
+
+    assert first is second
+    assert len(client.calls) == 2
+    assert memoized.counters == {"hits": 1, "misses": 2}
+
+def test_opt_out_and_mutating_calls_pass_through():
+    client = FakeClient()
+    memoized = MemoizingClient(client, optOut=["ListTags"])
+
+    for _ in range(2):
+        memoized.get_credential_report()
+        memoized.list_tags(ResourceArns=["arn:a"])
+        memoized.modify_listener(ListenerArn="arn:a")
+
+    assert len(client.calls) == 6
+    assert memoized.counters == {"hits": 0, "misses": 0}
+    assert memoized.get_paginator("describe_listeners") == "describe_listeners"
+    assert memoized.uncached is client
+
+def test_errors_are_not_memoized():
+    client = FakeClient()
+    memoized = MemoizingClient(client)
+
+    client.fail = True
+    try:
+        memoized.describe_listeners(LoadBalancerArn="arn:a")
+    except RuntimeError:
+        pass
+    client.fail = False
+    assert memoized.describe_listeners(LoadBalancerArn="arn:a")["Params"] == {"LoadBalancerArn": "arn:a"}
+    assert len(client.calls) == 2
+
+def test_pooled_session_shares_memoizing_clients_and_counters():
+    session = PooledAwsSession(FakeSession(), "us-east-1", {}, Lock())
+
+    assert session.memoized_client("elbv2") is session.memoized_client("elbv2")
+    assert session.memoized_client("elbv2") is not session.memoized_client("elbv2", optOut=["DescribeListeners"])
+
+    session.memoized_client("elbv2").describe_listeners(LoadBalancerArn="arn:a")
+    session.memoized_client("elbv2").describe_listeners(LoadBalancerArn="arn:a")
+    session.memoized_client("rds").list_tags(ResourceArns=["arn:a"])
+
+    assert session.memo_counters() == {"hits": 1, "misses": 2}
+    # a new view of the Session (i.e., the next Auditor) starts with an empty memo
+    assert PooledAwsSession(FakeSession(), "us-east-1", {}, Lock()).memo_counters() == {"hits": 0, "misses": 0}
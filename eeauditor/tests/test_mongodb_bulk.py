@@ -0,0 +1,76 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import pytest
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, ServerSelectionTimeoutError
+from pymongo.results import BulkWriteResult
+
+from . import context
+from processor.mongodb_bulk import bulk_upsert
+
+class FakeCollection(object):
+    def __init__(self, failOnCall=None):
+        self.calls = []
+        self.failOnCall = failOnCall
+
+    def bulk_write(self, operations, ordered=True):
+        self.calls.append((operations, ordered))
+        if len(self.calls) == self.failOnCall:
+            raise BulkWriteError(
+                {"writeErrors": [{"index": 0, "code": 11000, "errmsg": "duplicate key"}], "nUpserted": len(operations) - 1, "nMatched": 0}
+            )
+        return BulkWriteResult(
+            {"nUpserted": len(operations), "nMatched": 0, "nModified": 0, "upserted": [{"index": i, "_id": i} for i in range(len(operations))]},
+            True
+        )
+
+def test_batches_are_unordered_and_deduplicated():
+    documents = [{"Id": f"finding-{i % 4}", "Seq": i} for i in range(6)]
+    collection = FakeCollection()
+
+    written, failed = bulk_upsert(collection, documents, "Id", batchSize=5)
+
+    assert (written, failed) == (5, 0)
+    assert [len(operations) for operations, _ in collection.calls] == [4, 1]
+    assert all(ordered is False for _, ordered in collection.calls)
+    # the last document for a repeated ID wins and "Id" is mirrored into "_id" without mutating the input
+    expected = UpdateOne({"_id": "finding-0"}, {"$set": {"Id": "finding-0", "Seq": 4, "_id": "finding-0"}}, upsert=True)
+    assert expected in collection.calls[0][0]
+    assert "_id" not in documents[0]
+
+def test_write_errors_do_not_abort_the_run():
+    documents = [{"AssetId": f"asset-{i}"} for i in range(6)]
+    collection = FakeCollection(failOnCall=1)
+
+    written, failed = bulk_upsert(collection, documents, "AssetId", batchSize=3)
+
+    assert len(collection.calls) == 2
+    assert (written, failed) == (5, 1)
+
+def test_connection_errors_abort_the_run():
+    class UnreachableCollection(FakeCollection):
+        def bulk_write(self, operations, ordered=True):
+            self.calls.append((operations, ordered))
+            raise ServerSelectionTimeoutError("localhost:27017: [Errno 111] Connection refused")
+
+    collection = UnreachableCollection()
+    with pytest.raises(ServerSelectionTimeoutError):
+        bulk_upsert(collection, [{"Id": f"finding-{i}"} for i in range(6)], "Id", batchSize=3)
+    assert len(collection.calls) == 1
@@ -0,0 +1,64 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import base64
+import json
+
+from . import context
+from processor.normalization import CONTROLS_CROSSWALK, crosswalk_requirements, normalize_finding
+
+def make_finding(relatedRequirements, assetDetails):
+    return {
+        "Id": "finding-a",
+        "ProductFields": {
+            "Provider": "AWS",
+            "AssetDetails": base64.b64encode(json.dumps(assetDetails).encode("utf-8")).decode("utf-8")
+        },
+        "Compliance": {"RelatedRequirements": relatedRequirements, "Status": "FAILED"}
+    }
+
+def test_normalize_finding_does_not_mutate_raw_finding():
+    requirements = ["NIST CSF V1.1 DE.AE-3", "AICPA TSC CC7.2"]
+    finding = make_finding(list(requirements), {"Name": "a"})
+    normalized = normalize_finding(finding)
+
+    assert normalized["ProductFields"]["AssetDetails"] == {"Name": "a"}
+    assert normalized["ProductFields"]["Provider"] == "AWS"
+    assert list(normalized["Compliance"]) == ["Status", "RelatedRequirements"]
+    assert normalized["Compliance"]["RelatedRequirements"][:2] == requirements
+    assert normalized["Compliance"]["RelatedRequirements"][2:] == CONTROLS_CROSSWALK["NIST CSF V1.1 DE.AE-3"]
+    # normalizing the same raw finding again (i.e. for another output) never duplicates controls
+    assert normalize_finding(finding) == normalized
+    assert finding["Compliance"]["RelatedRequirements"] == requirements
+    assert isinstance(finding["ProductFields"]["AssetDetails"], str)
+
+def test_null_and_missing_asset_details():
+    finding = make_finding(["AICPA TSC CC7.2"], None)
+    finding["ProductFields"]["AssetDetails"] = None
+    assert normalize_finding(finding)["ProductFields"]["AssetDetails"] is None
+    del finding["ProductFields"]["AssetDetails"]
+    assert "AssetDetails" not in normalize_finding(finding)["ProductFields"]
+
+def test_crosswalk_is_unique_and_memoized():
+    requirements = ("NIST CSF V1.1 DE.AE-3", "NIST CSF V1.1 DE.AE-3", "NIST CSF V1.1 DOES-NOT-EXIST")
+    expanded = crosswalk_requirements(requirements)
+    assert expanded[:3] == requirements
+    assert len(set(expanded[3:])) == len(expanded[3:])
+    assert crosswalk_requirements(requirements) is expanded
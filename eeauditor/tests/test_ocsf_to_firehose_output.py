@@ -0,0 +1,137 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import json
+from threading import Event, Lock
+
+from . import context
+from processor.outputs.ocsf_to_firehose_output import (
+    FIREHOSE_MAX_BATCH_BYTES, FIREHOSE_MAX_BATCH_RECORDS, FIREHOSE_MAX_RECORD_BYTES, OcsfFirehoseOutput
+)
+
+class LocalDeliveryStream(object):
+    """
+    In-memory stand-in for the Firehose PutRecordBatch API, enforcing its limits. Every `failEvery`th record it sees
+    fails once with a ServiceUnavailableException entry in RequestResponses
+    """
+
+    def __init__(self, failEvery=0):
+        self.records = []
+        self.requests = 0
+        self.seen = 0
+        self.failEvery = failEvery
+        self.lock = Lock()
+
+    def put_record_batch(self, DeliveryStreamName, Records):
+        assert 1 <= len(Records) <= FIREHOSE_MAX_BATCH_RECORDS
+        assert sum(len(r["Data"]) for r in Records) <= FIREHOSE_MAX_BATCH_BYTES
+        responses = []
+        with self.lock:
+            self.requests += 1
+            for record in Records:
+                assert len(record["Data"]) <= FIREHOSE_MAX_RECORD_BYTES
+                self.seen += 1
+                if self.failEvery and self.seen % self.failEvery == 0:
+                    responses.append({"ErrorCode": "ServiceUnavailableException", "ErrorMessage": "Slow down."})
+                else:
+                    self.records.append(record["Data"])
+                    responses.append({"RecordId": str(self.seen)})
+
+        return {"FailedPutCount": sum("ErrorCode" in r for r in responses), "RequestResponses": responses}
+
+def make_provider(stream, eventsPerRecord=1):
+    provider = OcsfFirehoseOutput.__new__(OcsfFirehoseOutput)
+    provider.deliveryStream = "electriceye"
+    provider.eventsPerRecord = eventsPerRecord
+    provider.maxWorkers = 4
+    provider.maxRetries = 5
+    provider.firehose = stream
+    # the OCSF mapping is covered by the OCSF outputs, these "findings" already are OCSF events
+    provider.ocsf_compliance_finding_mapping = lambda findings: findings
+    provider.open()
+    return provider
+
+def make_events(count, padding=0):
+    return [{"finding_info": {"uid": f"finding-{i}"}, "message": "x" * padding} for i in range(count)]
+
+def test_packs_by_size_and_redrives_only_failed_records():
+    stream = LocalDeliveryStream(failEvery=7)
+    provider = make_provider(stream)
+    # 1,200 ~10 KiB events need at least 3 requests to fit within 4 MiB
+    provider.write_batch(make_events(1200, padding=10_000))
+    provider.close()
+
+    assert provider.findingsSent == 1200
+    assert provider.findingsFailed == 0
+    uids = sorted(json.loads(r)["finding_info"]["uid"] for r in stream.records)
+    assert uids == sorted(f"finding-{i}" for i in range(1200))
+    # the re-driven records are a small fraction of the original ones
+    assert stream.seen < 1200 * 1.2
+
+def test_aggregates_newline_delimited_events():
+    stream = LocalDeliveryStream()
+    provider = make_provider(stream, eventsPerRecord=50)
+    provider.write_batch(make_events(120))
+    provider.write_batch(make_events(1, padding=FIREHOSE_MAX_RECORD_BYTES))
+    provider.close()
+
+    assert len(stream.records) == 3
+    assert all(r.endswith(b"\n") for r in stream.records)
+    events = [json.loads(line) for r in stream.records for line in r.splitlines()]
+    assert len(events) == 120
+    assert provider.findingsSent == 120
+    assert provider.findingsFailed == 1
+
+class ConcurrencyObservingStream(LocalDeliveryStream):
+    """
+    Holds the first request until a second one arrives (or a few seconds passed), recording the most concurrent requests
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.inFlight = 0
+        self.maxInFlight = 0
+        self.secondRequest = Event()
+
+    def put_record_batch(self, DeliveryStreamName, Records):
+        with self.lock:
+            self.inFlight += 1
+            self.maxInFlight = max(self.maxInFlight, self.inFlight)
+            if self.inFlight > 1:
+                self.secondRequest.set()
+        self.secondRequest.wait(timeout=5)
+        try:
+            return super().put_record_batch(DeliveryStreamName, Records)
+        finally:
+            with self.lock:
+                self.inFlight -= 1
+
+def test_requests_stay_in_flight_across_batches():
+    stream = ConcurrencyObservingStream()
+    provider = make_provider(stream)
+    # processor.main hands over batches of 500 findings, each fits in a single PutRecordBatch request
+    for _ in range(3):
+        provider.write_batch(make_events(FIREHOSE_MAX_BATCH_RECORDS))
+    provider.close()
+
+    assert stream.maxInFlight > 1
+    assert stream.requests == 3
+    assert provider.findingsSent == 3 * FIREHOSE_MAX_BATCH_RECORDS
+    assert provider.pendingRequests == []
@@ -0,0 +1,219 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import base64
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from . import context
+from processor.main import process_findings
+from processor.outputs import output_base
+from processor.outputs.output_base import BufferedOutput, ElectricEyeOutput, JsonArrayStream, NdjsonStream
+
+@ElectricEyeOutput
+class StreamingTestOutput(object):
+    __provider__ = "test_streaming"
+    instances = []
+
+    def open(self, **kwargs):
+        StreamingTestOutput.instances.append(self)
+        self.kwargs = kwargs
+        self.batches = []
+        self.closed = False
+
+    def write_batch(self, findings: list):
+        self.batches.append(list(findings))
+
+    def close(self):
+        self.closed = True
+
+@ElectricEyeOutput
+class BufferedTestOutput(BufferedOutput):
+    __provider__ = "test_buffered"
+    instances = []
+
+    def write_findings(self, findings: list, output_file: str, **kwargs):
+        BufferedTestOutput.instances.append((findings, output_file))
+        return True
+
+def test_single_pass_fan_out_in_bounded_batches():
+    consumed = []
+
+    def findings():
+        for i in range(7):
+            consumed.append(i)
+            yield {"Id": i}
+
+    assert process_findings(findings(), ["test_streaming", "test_buffered"], batchSize=3, output_file="out") is True
+
+    streaming = StreamingTestOutput.instances[-1]
+    assert consumed == list(range(7))
+    assert [len(batch) for batch in streaming.batches] == [3, 3, 1]
+    assert streaming.kwargs == {"output_file": "out"}
+    assert streaming.closed
+    buffered, outputFile = BufferedTestOutput.instances[-1]
+    assert [f["Id"] for f in buffered] == list(range(7))
+    assert outputFile == "out"
+
+@ElectricEyeOutput
+class DecodedTestOutput(StreamingTestOutput):
+    __provider__ = "test_decoded"
+    __decoded__ = True
+
+@ElectricEyeOutput
+class NormalizedTestOutput(StreamingTestOutput):
+    __provider__ = "test_normalized"
+    __normalized__ = True
+
+def test_decoded_and_normalized_views():
+    assetDetails = base64.b64encode(json.dumps({"Name": "a"}).encode("utf-8")).decode("utf-8")
+    finding = {
+        "Id": 1,
+        "ProductFields": {"AssetDetails": assetDetails},
+        "Compliance": {"RelatedRequirements": ["NIST CSF V1.1 DE.AE-3"]}
+    }
+    process_findings(iter([finding]), ["test_streaming", "test_decoded", "test_normalized"])
+
+    raw, decoded, normalized = [instance.batches[0][0] for instance in StreamingTestOutput.instances[-3:]]
+    assert raw["ProductFields"]["AssetDetails"] == assetDetails
+    assert decoded["ProductFields"]["AssetDetails"] == normalized["ProductFields"]["AssetDetails"] == {"Name": "a"}
+    # only the normalized view has the NIST CSF crosswalk mapped in
+    assert decoded["Compliance"]["RelatedRequirements"] == ["NIST CSF V1.1 DE.AE-3"]
+    assert len(normalized["Compliance"]["RelatedRequirements"]) > 1
+
+@ElectricEyeOutput
+class AbortableTestOutput(StreamingTestOutput):
+    __provider__ = "test_abortable"
+
+    def abort(self):
+        self.aborted = True
+
+def test_outputs_are_cleaned_up_when_the_run_fails():
+    def findings():
+        for i in range(4):
+            yield {"Id": i}
+        raise RuntimeError("Check crashed")
+
+    BufferedTestOutput.instances.clear()
+    with pytest.raises(RuntimeError):
+        process_findings(findings(), ["test_streaming", "test_abortable", "test_buffered"], batchSize=3)
+
+    streaming, abortable = StreamingTestOutput.instances[-2:]
+    # outputs without abort() are closed, the others are aborted instead of closed
+    assert streaming.closed
+    assert abortable.aborted and not abortable.closed
+    # a buffered output never writes a partial report
+    assert BufferedTestOutput.instances == []
+
+@ElectricEyeOutput
+class LossyTestOutput(StreamingTestOutput):
+    __provider__ = "test_lossy"
+
+    def write_batch(self, findings: list):
+        # e.g., findings rejected by an API after every retry
+        self.findingsFailed = 1
+
+@ElectricEyeOutput
+class EmptyTestOutput(StreamingTestOutput):
+    __provider__ = "test_empty"
+
+    def close(self):
+        # outputs return False when they could not write, or had nothing to write
+        return False
+
+def test_undelivered_findings_are_reported():
+    assert process_findings(iter([{"Id": 1}]), ["test_streaming", "test_lossy"]) is False
+    assert process_findings(iter([{"Id": 1}]), ["test_streaming", "test_empty"]) is False
+    assert process_findings(iter([]), ["test_streaming", "test_empty"]) is True
+
+def test_provider_without_streaming_contract_is_rejected():
+    class LegacyOutput(object):
+        __provider__ = "test_legacy"
+
+        def write_findings(self, findings: list, **kwargs):
+            return True
+
+    with pytest.raises(TypeError):
+        ElectricEyeOutput(LegacyOutput)
+
+def test_json_array_stream_matches_json_dump():
+    for data in ([], [{"Id": "a", "Nested": {"List": [1, 2]}}, {"Id": "b", "Description": "line\nbreak"}]):
+        f = io.StringIO()
+        stream = JsonArrayStream(f, default=str)
+        for item in data:
+            stream.write(item)
+        stream.close()
+        assert f.getvalue() == json.dumps(data, indent=4, default=str)
+
+class BinaryStdout(io.StringIO):
+    """
+    Stand-in for sys.stdout, a text stream with a binary `buffer` underneath it
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.buffer = io.BytesIO()
+
+@pytest.mark.parametrize("encoder", ["orjson", "json"])
+def test_ndjson_stream_dedupes_and_buffers(encoder, monkeypatch):
+    if encoder == "json":
+        monkeypatch.setattr(output_base, "orjson", None)
+    elif output_base.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    f = BinaryStdout()
+    stream = NdjsonStream(f, default=str, bufferSize=64)
+    data = [{"Id": str(i), "Description": "line\nbreak", "Nested": {"Big": 2**70, 1: "x"}} for i in range(5)]
+    assert all(stream.write(item, key=item["Id"]) for item in data)
+    assert not stream.write(data[0], key="0")
+    # flushed as soon as 64 bytes were buffered, without waiting for close()
+    assert f.buffer.getvalue()
+    stream.close()
+
+    lines = f.buffer.getvalue().decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == json.loads(json.dumps(data))
+    assert stream.count == 5
+    assert stream.duplicates == 1
+    assert f.getvalue() == ""
+
+def test_ndjson_stream_encoders_write_the_same_bytes(monkeypatch):
+    if output_base.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    item = {
+        "Id": "arn:aws:s3:::bücket",
+        "Description": "line\nbreak \"quoted\" \u2713",
+        "CreatedAt": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        "Nested": {"List": [1, 2.5, None, True], 1: "x"},
+        "AssetDetails": b"eyJOYW1lIjogImEifQ=="
+    }
+
+    def encode():
+        f = BinaryStdout()
+        stream = NdjsonStream(f, default=str)
+        stream.write(item)
+        stream.close()
+        return f.buffer.getvalue()
+
+    encoded = encode()
+    monkeypatch.setattr(output_base, "orjson", None)
+    assert encode() == encoded
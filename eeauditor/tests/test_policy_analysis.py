@@ -0,0 +1,139 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import json
+import sys
+from urllib.parse import quote
+
+from . import context
+from policy_analysis import PolicyAnalysisCache, analyze_policy, normalize_statement
+
+def policy(*statements):
+    return {"Version": "2012-10-17", "Statement": list(statements)}
+
+def test_least_privilege_ratings():
+    assert analyze_policy(policy({"Effect": "Allow", "Action": "s3:*", "Resource": "*"}))["LeastPrivilegeRating"] == "failedHigh"
+    assert analyze_policy(policy({"Effect": "Allow", "Action": ["ec2:DescribeInstances", "*"], "Resource": ["*"]}))["LeastPrivilegeRating"] == "failedHigh"
+    # partial wildcards were previously missed
+    assert analyze_policy(policy({"Effect": "Allow", "Action": "s3:Get*", "Resource": "*"}))["LeastPrivilegeRating"] == "failedLow"
+    assert analyze_policy(policy({"Effect": "Allow", "Action": "s3:*", "Resource": "arn:aws:s3:::bucket/*"}))["LeastPrivilegeRating"] == "failedLow"
+    # NotAction grants everything that is not listed
+    assert analyze_policy(policy({"Effect": "Allow", "NotAction": "iam:*", "Resource": "*"}))["LeastPrivilegeRating"] == "failedHigh"
+    assert analyze_policy(policy({"Effect": "Deny", "NotAction": "iam:*", "Resource": "*"}))["LeastPrivilegeRating"] == "passing"
+    assert analyze_policy(
+        policy({"Effect": "Allow", "Action": "*", "Resource": "*", "Condition": {"Bool": {"aws:MultiFactorAuthPresent": "true"}}})
+    )["LeastPrivilegeRating"] == "passing"
+    # a later, lower failure does not overwrite an earlier high one
+    analysis = analyze_policy(
+        policy(
+            {"Effect": "Allow", "Action": "*", "Resource": "*"},
+            {"Effect": "Allow", "Action": "s3:List*", "Resource": ["arn:aws:s3:::bucket"]},
+            {"Effect": "Allow", "Action": "sqs:SendMessage", "Resource": "*"}
+        )
+    )
+    assert analysis["LeastPrivilegeRating"] == "failedHigh"
+    assert analysis["WildcardActions"] == frozenset({"*", "s3:list*"})
+
+def test_normalized_statements():
+    statement = normalize_statement({"Effect": "Allow", "Action": "S3:GetObject", "NotResource": "arn:aws:s3:::secret/*", "Principal": "*"})
+    assert statement["Actions"] == ("s3:getobject",)
+    assert statement["NotResource"] is True
+    assert statement["ResourceExposure"] == "ALL"
+    assert statement["ActionExposure"] == "NONE"
+    assert statement["Principals"] == {"*": ("*",)}
+
+def test_public_and_cross_account_principals():
+    assert analyze_policy(policy({"Effect": "Allow", "Principal": "*", "Action": "sqs:SendMessage"}))["IsPublic"] is True
+    assert analyze_policy(policy({"Effect": "Allow", "Principal": {"AWS": ["*"]}, "Action": "kms:*"}))["IsPublic"] is True
+    assert analyze_policy(policy({"Effect": "Deny", "Principal": "*", "Action": "kms:*"}))["IsPublic"] is False
+    conditioned = analyze_policy(
+        policy(
+            {
+                "Effect": "Allow",
+                "Principal": {"AWS": "*"},
+                "Action": "SNS:Publish",
+                "Condition": {"StringEquals": {"AWS:SourceOwner": "012345678901"}}
+            },
+            {"Effect": "Allow", "Principal": {"AWS": ["arn:aws:iam::210987654321:root", "111122223333"]}, "Action": "SNS:Subscribe"}
+        )
+    )
+    assert conditioned["IsPublic"] is False
+    assert conditioned["PrincipalAccounts"] == frozenset({"210987654321", "111122223333"})
+
+def test_insecure_transport_deny():
+    analysis = analyze_policy(
+        policy(
+            {
+                "Effect": "Deny",
+                "Principal": "*",
+                "Action": "s3:*",
+                "Resource": ["arn:aws:s3:::bucket", "arn:aws:s3:::bucket/*"],
+                "Condition": {"Bool": {"aws:SecureTransport": False}}
+            }
+        )
+    )
+    assert "arn:aws:s3:::bucket/*" in analysis["InsecureTransportDeniedResources"]
+
+def test_insecure_transport_deny_with_exemptions():
+    # NotAction and NotResource exempt what they list, neither Statement denies HTTP for the whole bucket
+    notAction = analyze_policy(
+        policy(
+            {
+                "Effect": "Deny",
+                "Principal": "*",
+                "NotAction": "s3:*",
+                "Resource": ["arn:aws:s3:::bucket", "arn:aws:s3:::bucket/*"],
+                "Condition": {"Bool": {"aws:SecureTransport": "false"}}
+            }
+        )
+    )
+    assert notAction["InsecureTransportDeniedResources"] == frozenset()
+
+    notResource = analyze_policy(
+        policy(
+            {
+                "Effect": "Deny",
+                "Principal": "*",
+                "Action": "s3:*",
+                "NotResource": "arn:aws:s3:::bucket/*",
+                "Condition": {"Bool": {"aws:SecureTransport": "false"}}
+            }
+        )
+    )
+    assert notResource["InsecureTransportDeniedResources"] == frozenset()
+
+def test_documents_are_memoized_by_content():
+    PolicyAnalysisCache.reset()
+    document = policy({"Effect": "Allow", "Action": "s3:*", "Resource": "*"})
+    first = analyze_policy(document)
+    # the same document as JSON, URL-encoded JSON, or with its keys in a different order
+    assert analyze_policy(json.dumps(document)) is first
+    assert analyze_policy(quote(json.dumps(document))) is first
+    assert analyze_policy({"Statement": [{"Resource": "*", "Action": "s3:*", "Effect": "Allow"}], "Version": "2012-10-17"}) is first
+    assert (PolicyAnalysisCache.hits, PolicyAnalysisCache.misses) == (3, 1)
+
+def test_memo_does_not_reference_documents():
+    PolicyAnalysisCache.reset()
+    document = policy({"Effect": "Allow", "Action": "s3:*", "Resource": "*"})
+    references = sys.getrefcount(document)
+    analyze_policy(document)
+    analyze_policy(json.dumps(document))
+    # the cached analysis must not keep a released document (e.g., from the inventory) alive
+    assert sys.getrefcount(document) == references
@@ -0,0 +1,94 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
+
+from . import context
+from processor.aws_batching import RateLimiter
+from processor.outputs.sechub_output import (
+    SECHUB_MAX_BATCH_BYTES, SECHUB_MAX_BATCH_FINDINGS, SecHubProvider
+)
+
+class LocalSecurityHub(object):
+    """
+    In-memory stand-in for BatchImportFindings enforcing its limits, the first time each of `failIds` is imported it is
+    returned in FailedFindings
+    """
+
+    def __init__(self, failIds=()):
+        self.imported = []
+        self.requests = 0
+        self.failIds = set(failIds)
+        self.lock = Lock()
+
+    def batch_import_findings(self, Findings):
+        assert 1 <= len(Findings) <= SECHUB_MAX_BATCH_FINDINGS
+        assert len(json.dumps(Findings)) <= SECHUB_MAX_BATCH_BYTES
+        failed = []
+        with self.lock:
+            self.requests += 1
+            for finding in Findings:
+                assert "AssetDetails" not in finding["ProductFields"]
+                if finding["Id"] in self.failIds:
+                    self.failIds.discard(finding["Id"])
+                    failed.append({"Id": finding["Id"], "ErrorCode": "InternalFailure", "ErrorMessage": ""})
+                else:
+                    self.imported.append(finding)
+
+        return {"FailedCount": len(failed), "SuccessCount": len(Findings) - len(failed), "FailedFindings": failed}
+
+def make_finding(i, padding=0):
+    return {
+        "Id": f"finding-{i}",
+        "Description": "x" * 2000,
+        "Resources": [{"Details": {"Other": {"Padding": "y" * padding}}}],
+        "ProductFields": {"Provider": "AWS", "AssetDetails": "eyJOYW1lIjogImEifQ=="}
+    }
+
+def test_upload_packs_batches_and_retries_failed_findings():
+    sechub = LocalSecurityHub(failIds=["finding-3", "finding-250"])
+    provider = SecHubProvider()
+    provider.open()
+    provider.sechub = sechub
+    provider.rateLimiter = RateLimiter(1000, 1000)
+    provider.executor = ThreadPoolExecutor(max_workers=4)
+    # 300 small findings and 40 ~200 KB findings, which cannot fit 100 to a 6 MB request
+    provider.write_batch([make_finding(i) for i in range(300)])
+    provider.write_batch([make_finding(i, padding=200_000) for i in range(300, 340)])
+    provider.close()
+
+    assert provider.findingsWritten == 340
+    assert provider.findingsFailed == 0
+    assert provider.findingsRetried == 2
+    assert sorted(int(f["Id"].split("-")[1]) for f in sechub.imported) == list(range(340))
+    assert all(len(f["Description"]) == 1021 for f in sechub.imported)
+    # 3 + 2 packed requests, plus the two retries
+    assert sechub.requests == provider.requestsSent <= 3 + 2 + 2 + 1
+
+def test_rate_limiter_bounds_request_rate():
+    limiter = RateLimiter(50, burst=5)
+    start = monotonic()
+    for _ in range(15):
+        limiter.acquire()
+    # 5 requests from the burst and 10 more at 50 per second
+    assert monotonic() - start >= 0.18
@@ -0,0 +1,88 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import json
+import time
+
+import pytest
+
+from . import context
+import threat_intel
+from threat_intel import CisaKevCatalog
+
+catalog = {
+    "vulnerabilities": [
+        {"cveID": "CVE-2021-44228"},
+        {"cveID": "CVE-2023-4966"}
+    ]
+}
+
+class FakeResponse(object):
+    def __init__(self, status_code, payload=None, etag=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.headers = {"ETag": etag} if etag else {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+@pytest.fixture(autouse=True)
+def reset_catalog():
+    CisaKevCatalog.reset()
+    yield
+    CisaKevCatalog.reset()
+
+def test_local_file_is_used_offline(tmp_path, monkeypatch):
+    localFile = tmp_path / "kev.json"
+    localFile.write_text(json.dumps(catalog))
+    monkeypatch.setattr(threat_intel, "get_threat_intel_settings", lambda: (str(localFile), None, 24))
+    monkeypatch.setattr(threat_intel.requests, "get", lambda *args, **kwargs: pytest.fail("KEV should not be downloaded"))
+
+    kev = threat_intel.get_cisa_kev()
+    assert isinstance(kev, frozenset)
+    assert "CVE-2021-44228" in kev
+
+def test_catalog_is_fetched_once_per_process(monkeypatch):
+    calls = []
+    def fake_get(*args, **kwargs):
+        calls.append(kwargs)
+        return FakeResponse(200, catalog)
+    monkeypatch.setattr(threat_intel, "get_threat_intel_settings", lambda: (None, None, 24))
+    monkeypatch.setattr(threat_intel.requests, "get", fake_get)
+
+    for _ in range(5):
+        assert "CVE-2023-4966" in threat_intel.get_cisa_kev()
+    assert len(calls) == 1
+
+def test_expired_cache_is_revalidated_with_etag(tmp_path, monkeypatch):
+    cachePath = tmp_path / "kev_cache.json"
+    cachePath.write_text(json.dumps({"fetchedAt": time.time() - 48 * 3600, "etag": "abc123", "catalog": catalog}))
+    requestHeaders = []
+    def fake_get(*args, **kwargs):
+        requestHeaders.append(kwargs["headers"])
+        return FakeResponse(304)
+    monkeypatch.setattr(threat_intel.requests, "get", fake_get)
+
+    result = CisaKevCatalog.load_catalog(cachePath=str(cachePath), ttlHours=24)
+    assert result == catalog
+    assert requestHeaders == [{"If-None-Match": "abc123"}]
+    assert json.loads(cachePath.read_text())["fetchedAt"] > time.time() - 60
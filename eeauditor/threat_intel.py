@@ -0,0 +1,146 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import logging
+import json
+from os import environ, path, makedirs
+from threading import Lock
+from time import time
+import requests
+import tomli
+
+logger = logging.getLogger("ThreatIntel")
+
+CISA_KEV_URL = "https://www.cisa.gov/sites/default/files/feeds/known_exploited_vulnerabilities.json"
+
+class CisaKevCatalog(object):
+    """
+    Process-wide copy of the U.S. CISA's Known Exploited Vulnerabilities (KEV) Catalog shared by every Auditor. The feed
+    is retrieved at most once per process and can optionally be persisted to disk (re-validated with its ETag once the
+    TTL expires) or read from a local file for offline / air-gapped runs
+    """
+
+    _lock = Lock()
+    _cveIds = None
+
+    @classmethod
+    def get_cve_ids(cls) -> frozenset:
+        """
+        Returns a frozenset of every CVE ID in the KEV Catalog
+        """
+        if cls._cveIds is None:
+            with cls._lock:
+                if cls._cveIds is None:
+                    localFilePath, cachePath, ttlHours = get_threat_intel_settings()
+                    catalog = cls.load_catalog(localFilePath, cachePath, ttlHours)
+                    cls._cveIds = frozenset(cve["cveID"] for cve in catalog["vulnerabilities"])
+                    logger.info("Loaded %s CVEs from the CISA KEV Catalog", len(cls._cveIds))
+
+        return cls._cveIds
+
+    @classmethod
+    def reset(cls):
+        """
+        Drops the in-memory copy of the KEV Catalog, mostly useful for testing
+        """
+        with cls._lock:
+            cls._cveIds = None
+
+    @staticmethod
+    def load_catalog(localFilePath=None, cachePath=None, ttlHours=24) -> dict:
+        """
+        Returns the parsed KEV Catalog from (in order of preference) a local file, an unexpired on-disk cache, or CISA. When
+        a cache is expired the download is conditional on the cached ETag, if CISA cannot be reached a stale cache is used
+        """
+        if localFilePath:
+            with open(localFilePath, "r") as f:
+                return json.load(f)
+
+        cached = None
+        if cachePath and path.exists(cachePath):
+            try:
+                with open(cachePath, "r") as f:
+                    cached = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable CISA KEV cache %s: %s", cachePath, e)
+                cached = None
+
+        if cached and time() - cached.get("fetchedAt", 0) <= ttlHours * 3600:
+            return cached["catalog"]
+
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        try:
+            r = requests.get(CISA_KEV_URL, headers=headers, timeout=30)
+            if r.status_code == 304 and cached:
+                catalog = cached["catalog"]
+                etag = cached.get("etag")
+            else:
+                r.raise_for_status()
+                catalog = r.json()
+                etag = r.headers.get("ETag")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            if cached:
+                logger.warning("Could not refresh the CISA KEV Catalog, using the stale cache at %s: %s", cachePath, e)
+                return cached["catalog"]
+            raise e
+
+        if cachePath:
+            try:
+                makedirs(path.dirname(path.abspath(cachePath)), exist_ok=True)
+                with open(cachePath, "w") as f:
+                    json.dump({"fetchedAt": time(), "etag": etag, "catalog": catalog}, f)
+            except OSError as e:
+                logger.warning("Failed to write the CISA KEV cache %s: %s", cachePath, e)
+
+        return catalog
+
+def get_threat_intel_settings():
+    """
+    Parses the optional threat intelligence feed settings from [global] within the TOML file, returning the local KEV
+    file path, the KEV cache path and the cache TTL in hours
+    """
+    tomlPath = environ.get("TOML_FILE_PATH")
+    if not tomlPath or tomlPath == "None":
+        tomlPath = path.join(path.abspath(path.dirname(__file__)), "external_providers.toml")
+
+    try:
+        with open(tomlPath, "rb") as f:
+            data = tomli.load(f)["global"]
+    except (OSError, KeyError, tomli.TOMLDecodeError) as e:
+        logger.warning("Could not read threat intelligence settings from %s: %s", tomlPath, e)
+        data = {}
+
+    localFilePath = data.get("cisa_kev_local_file_path") or None
+    cachePath = data.get("cisa_kev_cache_path") or None
+
+    return (
+        path.expanduser(localFilePath) if localFilePath else None,
+        path.expanduser(cachePath) if cachePath else None,
+        data.get("cisa_kev_cache_ttl_hours", 24)
+    )
+
+def get_cisa_kev() -> frozenset:
+    """
+    Returns a frozenset of the CVE ID's within the U.S. CISA's Known Exploitable Vulnerabilities (KEV) Catalog
+    """
+    return CisaKevCatalog.get_cve_ids()